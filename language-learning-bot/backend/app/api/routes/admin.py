@@ -0,0 +1,135 @@
+"""
+API routes for administrative diagnostics.
+This module contains endpoints used by administrators to inspect the backend at runtime.
+"""
+
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from starlette.status import HTTP_404_NOT_FOUND
+
+from app.db import slow_queries
+from app.db.maintenance import maintenance_jobs
+from app.utils.logger import setup_logger
+
+# Create router for admin operations
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Configure logger
+logger = setup_logger(__name__)
+
+
+def _get_sampler() -> slow_queries.SlowQuerySampler:
+    """
+    Get the running slow query sampler.
+
+    Returns:
+        SlowQuerySampler instance
+
+    Raises:
+        HTTPException: If the sampler is disabled
+    """
+    if slow_queries.slow_query_sampler is None:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail="Slow query sampler is disabled"
+        )
+    return slow_queries.slow_query_sampler
+
+
+@router.get("/slow-queries", response_model=Dict[str, Any])
+async def get_slow_queries(
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of query shapes to return")
+):
+    """
+    Get the top slow query shapes collected from production traffic.
+
+    Each entry contains the collection, command, query shape, call count,
+    total/avg/max duration, the latest explain summary, findings
+    (COLLSCAN, large docsExamined, in-memory SORT) and a suggested index.
+
+    Args:
+        limit: Maximum number of query shapes to return
+
+    Returns:
+        Dictionary with sampler settings and report entries
+    """
+    sampler = _get_sampler()
+    logger.info(f"Getting slow query report, limit={limit}")
+    report = sampler.get_report(limit)
+    return {
+        "threshold_ms": sampler.threshold_ms,
+        "sample_rate": sampler.sample_rate,
+        "total": len(report),
+        "queries": report
+    }
+
+
+@router.delete("/slow-queries", response_model=Dict[str, Any])
+async def reset_slow_queries():
+    """
+    Clear the collected slow query report.
+
+    Returns:
+        Success message
+    """
+    sampler = _get_sampler()
+    logger.info("Resetting slow query report")
+    sampler.reset()
+    return {"message": "Slow query report cleared"}
+
+
+@router.get("/jobs", response_model=List[Dict[str, Any]])
+async def get_maintenance_jobs():
+    """
+    Get background maintenance jobs (cascade deletes, integrity scans), newest first.
+    
+    Returns:
+        List of job progress reports
+    """
+    return [job.to_dict() for job in maintenance_jobs.list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_maintenance_job(job_id: str):
+    """
+    Get progress of a background maintenance job.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        Job status, processed/total counts, counters and the current _id checkpoint
+        
+    Raises:
+        HTTPException: If job not found
+    """
+    job = maintenance_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return job.to_dict()
+
+
+@router.delete("/jobs/{job_id}", response_model=Dict[str, Any])
+async def cancel_maintenance_job(job_id: str):
+    """
+    Cancel a running maintenance job. Batches already processed stay applied.
+    
+    Args:
+        job_id: Job identifier
+        
+    Returns:
+        Success message
+        
+    Raises:
+        HTTPException: If job not found or not running
+    """
+    logger.info(f"Cancelling maintenance job {job_id}")
+    if not maintenance_jobs.cancel(job_id):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f"Running job {job_id} not found"
+        )
+    return {"message": f"Job {job_id} cancelled"}
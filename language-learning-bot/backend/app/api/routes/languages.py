@@ -8,7 +8,7 @@ import logging
 import io
 import pandas as pd
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query, Header, Response
 from fastapi.responses import StreamingResponse
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST, HTTP_201_CREATED
 
@@ -17,6 +17,15 @@ from app.api.schemas.word import WordResponse
 from app.services.language_service import LanguageService
 from app.services.excel_service import ExcelService
 from app.core.dependencies import get_language_service, get_excel_service
+from app.core.etag import (
+    SCOPE_LANGUAGES,
+    SCOPE_LANGUAGE_WORDS,
+    CATALOG_KEY,
+    make_etag,
+    etag_matches,
+    set_etag_headers,
+    not_modified_response,
+)
 from app.utils.logger import setup_logger
 
 # Create router for language operations
@@ -28,29 +37,41 @@ logger = setup_logger(__name__)
 
 @router.get("/", response_model=List[LanguageResponse])
 async def get_languages(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
     language_service: LanguageService = Depends(get_language_service)
 ):
     """
     Get all languages with pagination.
     
     Args:
+        response: Response used to attach the ETag
         skip: Number of records to skip
         limit: Maximum number of records to return
+        if_none_match: ETag of the copy cached by the client
         language_service: Language service dependency
         
     Returns:
-        List of language objects
+        List of language objects or 304 if the client copy is fresh
     """
+    etag = make_etag((SCOPE_LANGUAGES, CATALOG_KEY), variant=(skip, limit))
+    if etag_matches(if_none_match, etag):
+        logger.debug("Languages not modified")
+        return not_modified_response(etag)
+    
     logger.info(f"Getting languages with skip={skip}, limit={limit}")
     languages = await language_service.get_languages(skip=skip, limit=limit)
+    set_etag_headers(response, etag)
     return languages
 
 
 @router.get("/{language_id}", response_model=LanguageResponse)
 async def get_language(
     language_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     language_service: LanguageService = Depends(get_language_service)
 ):
     """
@@ -58,14 +79,21 @@ async def get_language(
     
     Args:
         language_id: ID of the language to retrieve
+        response: Response used to attach the ETag
+        if_none_match: ETag of the copy cached by the client
         language_service: Language service dependency
         
     Returns:
-        Language object
+        Language object or 304 if the client copy is fresh
         
     Raises:
         HTTPException: If language not found
     """
+    etag = make_etag((SCOPE_LANGUAGES, language_id))
+    if etag_matches(if_none_match, etag):
+        logger.debug(f"Language id={language_id} not modified")
+        return not_modified_response(etag)
+    
     logger.info(f"Getting language with id={language_id}")
     language = await language_service.get_language(language_id)
     if not language:
@@ -74,6 +102,7 @@ async def get_language(
             status_code=HTTP_404_NOT_FOUND,
             detail=f"Language with ID {language_id} not found"
         )
+    set_etag_headers(response, etag)
     return language
 
 
@@ -135,12 +164,15 @@ async def delete_language(
     """
     Delete a language by ID.
     
+    Words of the language and their statistics are removed afterwards by a
+    throttled background job whose ID is returned in the response.
+    
     Args:
         language_id: ID of the language to delete
         language_service: Language service dependency
         
     Returns:
-        Success message
+        Success message and cleanup job ID
         
     Raises:
         HTTPException: If language not found
@@ -153,15 +185,21 @@ async def delete_language(
             status_code=HTTP_404_NOT_FOUND,
             detail=f"Language with ID {language_id} not found"
         )
-    return {"message": f"Language with ID {language_id} deleted successfully"}
+    cleanup_job = language_service.start_language_cleanup(language_id)
+    return {
+        "message": f"Language with ID {language_id} deleted successfully",
+        "cleanup_job_id": cleanup_job.job_id
+    }
 
 
 @router.get("/{language_id}/words", response_model=List[WordResponse])
 async def get_language_words(
     language_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     word_number: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
     language_service: LanguageService = Depends(get_language_service)
 ):
     """
@@ -169,17 +207,28 @@ async def get_language_words(
     
     Args:
         language_id: ID of the language
+        response: Response used to attach the ETag
         skip: Number of records to skip
         limit: Maximum number of records to return
         word_number: Optional word number to filter by
+        if_none_match: ETag of the copy cached by the client
         language_service: Language service dependency
         
     Returns:
-        List of word objects
+        List of word objects or 304 if the client copy is fresh
         
     Raises:
         HTTPException: If language not found
     """
+    etag = make_etag(
+        (SCOPE_LANGUAGES, language_id),
+        (SCOPE_LANGUAGE_WORDS, language_id),
+        variant=(skip, limit, word_number)
+    )
+    if etag_matches(if_none_match, etag):
+        logger.debug(f"Words for language id={language_id} not modified")
+        return not_modified_response(etag)
+    
     logger.info(f"Getting words for language id={language_id}, skip={skip}, limit={limit}, word_number={word_number}")
     
     # First check if language exists
@@ -200,6 +249,7 @@ async def get_language_words(
             limit=1,
             word_number=word_number
         )
+        set_etag_headers(response, etag)
         return words
     
     # Otherwise, get words with pagination
@@ -208,6 +258,7 @@ async def get_language_words(
         skip=skip,
         limit=limit
     )
+    set_etag_headers(response, etag)
     return words
 
 
@@ -470,6 +521,8 @@ async def upload_words_file(
 @router.get("/{language_id}/count")
 async def get_language_word_count(
     language_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     language_service: LanguageService = Depends(get_language_service)
 ):
     """
@@ -477,14 +530,24 @@ async def get_language_word_count(
     
     Args:
         language_id: ID of the language
+        response: Response used to attach the ETag
+        if_none_match: ETag of the copy cached by the client
         language_service: Language service dependency
         
     Returns:
-        Dictionary with count information
+        Dictionary with count information or 304 if the client copy is fresh
         
     Raises:
         HTTPException: If language not found
     """
+    etag = make_etag(
+        (SCOPE_LANGUAGES, language_id),
+        (SCOPE_LANGUAGE_WORDS, language_id),
+        variant="count"
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    
     logger.info(f"Getting word count for language id={language_id}")
     
     # First check if language exists
@@ -499,6 +562,7 @@ async def get_language_word_count(
     # Get the count of words for this language
     count = await language_service.get_word_count_by_language(language_id)
     
+    set_etag_headers(response, etag)
     return {"count": count}
 
 """
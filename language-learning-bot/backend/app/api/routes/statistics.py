@@ -420,7 +420,8 @@ async def get_statistics_integrity_report(
 ):
     """
     НОВЫЙ АДМИНИСТРАТИВНЫЙ ЭНДПОИНТ: Получить отчет о целостности данных статистики.
-    Показывает количество и процент мертвых ссылок.
+    Показывает количество и процент мертвых ссылок по последнему завершенному
+    инкрементальному проходу проверки.
     
     Returns:
         Отчет о целостности данных
@@ -448,13 +449,14 @@ async def cleanup_orphaned_statistics(
 ):
     """
     НОВЫЙ АДМИНИСТРАТИВНЫЙ ЭНДПОИНТ: Очистка статистики с мертвыми ссылками.
+    Запускает фоновое задание; ход выполнения: GET /admin/jobs/{job_id}.
     
     Args:
         dry_run: Если True, только подсчитывает без удаления
         statistics_service: Statistics service dependency
         
     Returns:
-        Отчет об операции очистки
+        Состояние задания очистки
     """
     logger.info(f"Starting cleanup of orphaned statistics, dry_run={dry_run}")
     
@@ -489,7 +491,11 @@ async def get_statistics_health(
         integrity_report = await statistics_service.get_data_integrity_report()
         
         # Дополнительные проверки можно добавить здесь
-        health_status = "healthy" if integrity_report["orphaned_percentage"] < 5.0 else "degraded"
+        if not integrity_report["complete"]:
+            # До первого полного прохода цифры неполные
+            health_status = "unknown"
+        else:
+            health_status = "healthy" if integrity_report["orphaned_percentage"] < 5.0 else "degraded"
         
         return {
             "success": True,
@@ -511,6 +517,9 @@ def _get_health_recommendations(integrity_report: Dict[str, Any]) -> List[str]:
     """
     recommendations = []
     
+    if not integrity_report.get("complete", True):
+        return ["INFO: Integrity scan has not completed a full pass yet; check again later."]
+    
     orphaned_percentage = integrity_report.get("orphaned_percentage", 0)
     
     if orphaned_percentage > 10:
@@ -5,7 +5,7 @@ This module contains all the API endpoints for managing user language settings i
 
 from typing import List, Optional, Dict, Any
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_201_CREATED, HTTP_400_BAD_REQUEST
 from pydantic import BaseModel
 
@@ -19,6 +19,13 @@ from app.services.user_language_settings_service import UserLanguageSettingsServ
 from app.services.user_service import UserService
 from app.services.language_service import LanguageService
 from app.core.dependencies import get_user_language_settings_service, get_user_service, get_language_service
+from app.core.etag import (
+    SCOPE_USER_SETTINGS,
+    make_etag,
+    etag_matches,
+    set_etag_headers,
+    not_modified_response,
+)
 from app.utils.logger import setup_logger
 
 # Create router for user language settings operations
@@ -45,6 +52,8 @@ class HintSettingsResponse(BaseModel):
 async def get_user_language_settings(
     user_id: str,
     language_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     settings_service: UserLanguageSettingsService = Depends(get_user_language_settings_service),
     user_service: UserService = Depends(get_user_service),
     language_service: LanguageService = Depends(get_language_service)
@@ -55,16 +64,23 @@ async def get_user_language_settings(
     Args:
         user_id: ID of the user
         language_id: ID of the language
+        response: Response used to attach the ETag
+        if_none_match: ETag of the copy cached by the client
         settings_service: User language settings service dependency
         user_service: User service dependency
         language_service: Language service dependency
         
     Returns:
-        Settings object or default settings if not found
+        Settings object, default settings if not found, or 304 if the client copy is fresh
         
     Raises:
         HTTPException: If user or language not found
     """
+    etag = make_etag((SCOPE_USER_SETTINGS, user_id), variant=language_id)
+    if etag_matches(if_none_match, etag):
+        logger.debug(f"Settings for user id={user_id}, language id={language_id} not modified")
+        return not_modified_response(etag)
+    
     logger.info(f"Getting settings for user id={user_id}, language id={language_id}")
     
     # First check if user exists
@@ -107,6 +123,8 @@ async def get_user_language_settings(
                     detail="Failed to get or create settings"
                 )
     
+    # Создание настроек по умолчанию меняет версию, поэтому ETag пересчитывается
+    set_etag_headers(response, make_etag((SCOPE_USER_SETTINGS, user_id), variant=language_id))
     return settings
 
 
@@ -172,6 +190,8 @@ async def update_user_language_settings(
 @router.get("/users/{user_id}/settings", response_model=List[UserLanguageSettingsInDB])
 async def get_all_user_settings(
     user_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     settings_service: UserLanguageSettingsService = Depends(get_user_language_settings_service),
     user_service: UserService = Depends(get_user_service)
 ):
@@ -180,15 +200,21 @@ async def get_all_user_settings(
     
     Args:
         user_id: ID of the user
+        response: Response used to attach the ETag
+        if_none_match: ETag of the copy cached by the client
         settings_service: User language settings service dependency
         user_service: User service dependency
         
     Returns:
-        List of settings objects
+        List of settings objects or 304 if the client copy is fresh
         
     Raises:
         HTTPException: If user not found
     """
+    etag = make_etag((SCOPE_USER_SETTINGS, user_id))
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    
     logger.info(f"Getting all settings for user id={user_id}")
     
     # First check if user exists
@@ -203,6 +229,7 @@ async def get_all_user_settings(
     # Get all settings for the user
     settings = await settings_service.get_all_settings_for_user(user_id)
     
+    set_etag_headers(response, etag)
     return settings
 
 
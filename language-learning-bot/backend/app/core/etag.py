@@ -0,0 +1,180 @@
+"""
+ETag and conditional GET support for rarely changing resources.
+
+Versions are kept per scope (language catalog, words of a language,
+settings of a user) and bumped by the services on every write.
+A route builds a strong ETag from the current version before touching
+the database, so a matching If-None-Match is answered with 304
+without running any query.
+"""
+
+import hashlib
+import threading
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+# Области версионирования
+SCOPE_LANGUAGES = "languages"
+SCOPE_LANGUAGE_WORDS = "language_words"
+SCOPE_USER_SETTINGS = "user_settings"
+
+# Ключ для всего каталога языков
+CATALOG_KEY = "all"
+
+
+class VersionRegistry:
+    """
+    In-process registry of version counters.
+
+    Counters start at zero on every process start; the random epoch is
+    mixed into every ETag so that tags issued by a previous process are
+    never treated as fresh.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry with a new epoch."""
+        self.epoch = uuid.uuid4().hex[:12]
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, scope: str, key: str) -> int:
+        """
+        Get current version for a scope and key.
+
+        Args:
+            scope: Version scope
+            key: Key inside the scope (language ID, user ID)
+
+        Returns:
+            Current version number
+        """
+        return self._versions.get((scope, str(key)), 0)
+
+    def bump(self, scope: str, key: str) -> int:
+        """
+        Increment version for a scope and key.
+
+        Args:
+            scope: Version scope
+            key: Key inside the scope (language ID, user ID)
+
+        Returns:
+            New version number
+        """
+        with self._lock:
+            version = self._versions.get((scope, str(key)), 0) + 1
+            self._versions[(scope, str(key))] = version
+            return version
+
+    def reset(self) -> None:
+        """Drop all counters and start a new epoch."""
+        with self._lock:
+            self._versions.clear()
+            self.epoch = uuid.uuid4().hex[:12]
+
+
+version_registry = VersionRegistry()
+
+
+def bump_language_catalog(language_id: Optional[str] = None) -> None:
+    """
+    Mark the language catalog (and optionally one language) as changed.
+
+    Args:
+        language_id: ID of the changed language
+    """
+    version_registry.bump(SCOPE_LANGUAGES, CATALOG_KEY)
+    if language_id:
+        version_registry.bump(SCOPE_LANGUAGES, language_id)
+
+
+def bump_language_words(language_id: Optional[str]) -> None:
+    """
+    Mark the words of a language as changed.
+
+    Args:
+        language_id: ID of the language whose words changed
+    """
+    if language_id:
+        version_registry.bump(SCOPE_LANGUAGE_WORDS, str(language_id))
+
+
+def bump_user_settings(user_id: Optional[str]) -> None:
+    """
+    Mark language settings of a user as changed.
+
+    Args:
+        user_id: ID of the user whose settings changed
+    """
+    if user_id:
+        version_registry.bump(SCOPE_USER_SETTINGS, str(user_id))
+
+
+def make_etag(*versions: Tuple[str, str], variant: Any = None) -> str:
+    """
+    Build a strong ETag from one or more (scope, key) versions.
+
+    Args:
+        versions: Pairs of (scope, key) the representation depends on
+        variant: Extra data that selects the representation (query params)
+
+    Returns:
+        Quoted ETag value
+    """
+    parts = [version_registry.epoch]
+    for scope, key in versions:
+        parts.append(f"{scope}:{key}:{version_registry.get(scope, key)}")
+    if variant is not None:
+        parts.append(repr(variant))
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current ETag
+
+    Returns:
+        True if the client copy is still valid
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Слабое сравнение для If-None-Match допускается RFC 7232
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def set_etag_headers(response: Response, etag: str) -> None:
+    """
+    Attach ETag and revalidation headers to a response.
+
+    Args:
+        response: Response to update
+        etag: ETag value
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Build an empty 304 response for a matching ETag.
+
+    Args:
+        etag: Current ETag
+
+    Returns:
+        Response with status 304
+    """
+    response = Response(status_code=HTTP_304_NOT_MODIFIED)
+    set_etag_headers(response, etag)
+    return response
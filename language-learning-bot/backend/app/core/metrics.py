@@ -0,0 +1,317 @@
+"""
+Runtime metrics for the backend application.
+
+Collects per-route HTTP latency, status codes and payload sizes, plus
+per-collection MongoDB command durations, and renders them in the
+Prometheus text exposition format for the /metrics endpoint.
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Границы корзин гистограмм
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Команды MongoDB, в которых имя коллекции лежит в значении самой команды
+_COLLECTION_COMMANDS = {
+    "find", "aggregate", "insert", "update", "delete", "count",
+    "distinct", "findAndModify", "createIndexes", "listIndexes",
+}
+
+
+class Histogram:
+    """Cumulative histogram with labels, in the Prometheus sense."""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...], buckets: Iterable[float]):
+        """
+        Initialize a histogram.
+
+        Args:
+            name: Metric name
+            description: Help text
+            label_names: Names of labels
+            buckets: Upper bounds of buckets (sorted)
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [counts per bucket (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            labels: Label values in the order of label_names
+            value: Observed value
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[labels] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """
+        Render the histogram in Prometheus text format.
+
+        Returns:
+            List of text lines
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(s[0]), s[1], s[2]) for labels, s in self._series.items()}
+        for labels, (counts, total, count) in sorted(snapshot.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_with_le(base, _format_number(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_with_le(base, '+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_wrap(base)} {total}")
+            lines.append(f"{self.name}_count{_wrap(base)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...]):
+        """
+        Initialize a counter.
+
+        Args:
+            name: Metric name
+            description: Help text
+            label_names: Names of labels
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        """
+        Increment the counter.
+
+        Args:
+            labels: Label values in the order of label_names
+            amount: Increment value
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        """
+        Render the counter in Prometheus text format.
+
+        Returns:
+            List of text lines
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_wrap(_format_labels(self.label_names, labels))} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all backend metrics and renders them."""
+
+    def __init__(self):
+        """Initialize metrics; collection is disabled until enabled explicitly."""
+        self.enabled = False
+        self.http_request_duration = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.http_response_size = Histogram(
+            "http_response_size_bytes",
+            "HTTP response body size by route",
+            ("method", "route"),
+            SIZE_BUCKETS,
+        )
+        self.http_requests = Counter(
+            "http_requests_total",
+            "HTTP requests by route and status code",
+            ("method", "route", "status"),
+        )
+        self.mongo_command_duration = Histogram(
+            "mongodb_command_duration_seconds",
+            "MongoDB command latency by collection",
+            ("collection", "command"),
+            LATENCY_BUCKETS,
+        )
+        self.mongo_command_failures = Counter(
+            "mongodb_command_failures_total",
+            "Failed MongoDB commands by collection",
+            ("collection", "command"),
+        )
+        self.mongo_documents = Counter(
+            "mongodb_command_documents_total",
+            "Documents returned or affected by MongoDB commands",
+            ("collection", "command"),
+        )
+        self.mongo_docs_examined = Counter(
+            "mongodb_command_docs_examined_total",
+            "Documents examined, when reported by the server",
+            ("collection", "command"),
+        )
+
+    def render(self) -> str:
+        """
+        Render all metrics in Prometheus text format.
+
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = []
+        for metric in (
+            self.http_requests,
+            self.http_request_duration,
+            self.http_response_size,
+            self.mongo_command_duration,
+            self.mongo_command_failures,
+            self.mongo_documents,
+            self.mongo_docs_examined,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and payload size per route.
+
+    The route label is the path template (e.g. /api/languages/{language_id}),
+    so the number of series stays bounded.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None, exclude_paths: Iterable[str] = ("/metrics",)):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            registry: Metrics registry (global one by default)
+            exclude_paths: Paths that are not measured
+        """
+        self.app = app
+        self.registry = registry or metrics_registry
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            status = str(state["status"])
+            self.registry.http_requests.inc((method, route_path, status))
+            self.registry.http_request_duration.observe((method, route_path, status), duration)
+            self.registry.http_response_size.observe((method, route_path), state["size"])
+
+
+class MongoCommandMetricsListener(monitoring.CommandListener):
+    """PyMongo command listener feeding MongoDB metrics into the registry."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the listener.
+
+        Args:
+            registry: Metrics registry (global one by default)
+        """
+        self.registry = registry or metrics_registry
+        # request_id -> collection; ответ сервера не содержит имени коллекции
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        command = event.command
+        name = event.command_name
+        if name in _COLLECTION_COMMANDS:
+            collection = command.get(name)
+        elif name == "getMore":
+            collection = command.get("collection")
+        else:
+            collection = None
+        self._collections[event.request_id] = str(collection) if collection else "-"
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "-")
+        labels = (collection, event.command_name)
+        self.registry.mongo_command_duration.observe(labels, event.duration_micros / 1_000_000)
+
+        reply = event.reply or {}
+        cursor = reply.get("cursor")
+        if cursor:
+            batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+            if batch is not None:
+                self.registry.mongo_documents.inc(labels, len(batch))
+        elif "n" in reply:
+            self.registry.mongo_documents.inc(labels, reply["n"])
+        # docsExamined приходит только в ответах explain/профилировщика
+        stats = reply.get("executionStats")
+        if stats and "totalDocsExamined" in stats:
+            self.registry.mongo_docs_examined.inc(labels, stats["totalDocsExamined"])
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "-")
+        labels = (collection, event.command_name)
+        self.registry.mongo_command_duration.observe(labels, event.duration_micros / 1_000_000)
+        self.registry.mongo_command_failures.inc(labels)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+def _wrap(labels: str) -> str:
+    return "{" + labels + "}" if labels else ""
+
+
+def _with_le(labels: str, le: str) -> str:
+    return "{" + (labels + "," if labels else "") + f'le="{le}"' + "}"
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
@@ -11,6 +11,9 @@ from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from fastapi import Depends
 from app.utils.logger import setup_logger
+from app.core.metrics import metrics_registry, MongoCommandMetricsListener
+from app.db import slow_queries
+from app.db.maintenance import maintenance_jobs
 
 # Попытка импорта Hydra - если он доступен, будет использоваться для конфигурации
 try:
@@ -98,6 +101,72 @@ def get_mongodb_config():
     
     return mongodb_url, mongodb_db_name, connection_options
 
+def get_slow_query_config():
+    """
+    Получает настройки сэмплера медленных запросов из Hydra или переменных окружения.
+    
+    Returns:
+        dict: Настройки SlowQuerySampler и флаг enabled
+    """
+    settings = {
+        "enabled": os.getenv("SLOW_QUERIES_ENABLED", "True").lower() in ("true", "1", "t"),
+        "threshold_ms": float(os.getenv("SLOW_QUERIES_THRESHOLD_MS", "100")),
+        "top_n": int(os.getenv("SLOW_QUERIES_TOP_N", "20")),
+        "sample_rate": float(os.getenv("SLOW_QUERIES_SAMPLE_RATE", "1.0")),
+        "explain_enabled": True,
+        "explain_interval_seconds": 300.0,
+        "docs_examined_threshold": 1000,
+        "docs_examined_ratio": 10.0,
+    }
+    
+    if hydra_available:
+        try:
+            if not hasattr(get_mongodb_config, "_hydra_initialized"):
+                initialize(config_path="../conf/config", version_base=None)
+                get_mongodb_config._hydra_initialized = True
+            
+            cfg = compose(config_name="default")
+            if hasattr(cfg, "database") and hasattr(cfg.database, "slow_queries"):
+                slow_cfg = cfg.database.slow_queries
+                for key in list(settings.keys()):
+                    if hasattr(slow_cfg, key):
+                        settings[key] = type(settings[key])(getattr(slow_cfg, key))
+        except Exception as e:
+            logger.warning(f"Failed to load slow query config from Hydra: {e}")
+    
+    return settings
+
+def get_maintenance_config():
+    """
+    Получает настройки фоновых заданий обслуживания из Hydra или переменных окружения.
+    
+    Returns:
+        dict: Настройки MaintenanceJobManager
+    """
+    settings = {
+        "batch_size": int(os.getenv("MAINTENANCE_BATCH_SIZE", "500")),
+        "max_batches_per_second": float(os.getenv("MAINTENANCE_MAX_BATCHES_PER_SECOND", "5")),
+        "integrity_batch_size": int(os.getenv("MAINTENANCE_INTEGRITY_BATCH_SIZE", "1000")),
+        "integrity_refresh_seconds": float(os.getenv("MAINTENANCE_INTEGRITY_REFRESH_SECONDS", "3600")),
+    }
+    
+    if hydra_available:
+        try:
+            if not hasattr(get_mongodb_config, "_hydra_initialized"):
+                initialize(config_path="../conf/config", version_base=None)
+                get_mongodb_config._hydra_initialized = True
+            
+            cfg = compose(config_name="default")
+            if hasattr(cfg, "database") and hasattr(cfg.database, "maintenance"):
+                maintenance_cfg = cfg.database.maintenance
+                for key in list(settings.keys()):
+                    if hasattr(maintenance_cfg, key):
+                        settings[key] = type(settings[key])(getattr(maintenance_cfg, key))
+        except Exception as e:
+            logger.warning(f"Failed to load maintenance config from Hydra: {e}")
+    
+    return settings
+
 async def connect_to_mongo():
     """Устанавливает соединение с MongoDB."""
     global client, db
@@ -106,10 +175,28 @@ async def connect_to_mongo():
         
         logger.info(f"Connecting to MongoDB at {mongodb_url}, database: {mongodb_db_name}")
         
+        # Слушатели команд регистрируются только при включенных метриках и сэмплере
+        event_listeners = []
+        if metrics_registry.enabled:
+            event_listeners.append(MongoCommandMetricsListener(metrics_registry))
+        
+        slow_query_settings = get_slow_query_config()
+        if slow_query_settings.pop("enabled"):
+            slow_queries.slow_query_sampler = slow_queries.SlowQuerySampler(**slow_query_settings)
+            event_listeners.append(slow_queries.slow_query_sampler)
+        
+        if event_listeners:
+            connection_options["event_listeners"] = event_listeners
+        
         # Создаем клиента MongoDB с настройками
         client = AsyncIOMotorClient(mongodb_url, **connection_options)
         db = client[mongodb_db_name]
         
+        if slow_queries.slow_query_sampler:
+            slow_queries.slow_query_sampler.start(db)
+        
+        maintenance_jobs.configure(**get_maintenance_config())
+        
         logger.info("Successfully connected to MongoDB")
     except Exception as e:
         logger.error(f"Could not connect to MongoDB: {e}", exc_info=True)
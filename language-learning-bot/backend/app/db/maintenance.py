@@ -0,0 +1,485 @@
+"""
+Batched, throttled background maintenance jobs.
+
+Cascade deletes of a language's words with their statistics and the
+statistics integrity scan walk collections in ``_id`` order in fixed-size
+batches. Between batches the job sleeps so that at most
+``max_batches_per_second`` batches are issued, which keeps production
+latency flat while large collections are processed. The integrity scan
+persists its ``_id`` cursor in the ``maintenance_checkpoints`` collection,
+so every run continues where the previous one stopped and the report is
+built incrementally instead of one ``$lookup`` over the whole collection.
+A deleting scan only continues a cycle that deleted orphans from its start;
+otherwise it starts a new cycle, so no part of the collection is skipped.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.etag import bump_language_catalog, bump_language_words
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_COLLECTION = "maintenance_checkpoints"
+INTEGRITY_CHECKPOINT_ID = "statistics_integrity"
+
+JOB_CASCADE_DELETE = "language_cascade_delete"
+JOB_INTEGRITY_SCAN = "statistics_integrity_scan"
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+
+def _language_filter(language_id: str) -> Dict[str, Any]:
+    """Words store language_id either as a string or as an ObjectId."""
+    values: List[Any] = [language_id]
+    if ObjectId.is_valid(language_id):
+        values.append(ObjectId(language_id))
+    return {"language_id": {"$in": values}}
+
+
+class MaintenanceJob:
+    """State and progress of one background job."""
+
+    def __init__(self, job_id: str, job_type: str, params: Dict[str, Any]):
+        """
+        Initialize the job.
+
+        Args:
+            job_id: Job identifier
+            job_type: One of JOB_CASCADE_DELETE, JOB_INTEGRITY_SCAN
+            params: Job parameters shown in the progress report
+        """
+        self.job_id = job_id
+        self.job_type = job_type
+        self.params = params
+        self.status = STATUS_PENDING
+        self.total: Optional[int] = None
+        self.processed = 0
+        self.batches = 0
+        self.counters: Dict[str, int] = {}
+        self.checkpoint: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def add(self, counter: str, value: int) -> None:
+        """Increase a named progress counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished."""
+        return self.status in (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Progress report of the job.
+
+        Returns:
+            Dictionary suitable for JSON responses
+        """
+        progress = None
+        if self.total:
+            progress = round(min(self.processed / self.total, 1.0) * 100, 2)
+        elif self.status == STATUS_COMPLETED:
+            progress = 100.0
+        return {
+            "job_id": self.job_id,
+            "type": self.job_type,
+            "status": self.status,
+            "params": self.params,
+            "total": self.total,
+            "processed": self.processed,
+            "progress_percent": progress,
+            "batches": self.batches,
+            "counters": dict(self.counters),
+            "checkpoint": self.checkpoint,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class MaintenanceJobManager:
+    """Runs maintenance jobs as asyncio tasks and keeps their progress."""
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        max_batches_per_second: float = 5.0,
+        integrity_batch_size: int = 1000,
+        integrity_refresh_seconds: float = 3600.0,
+        history_size: int = 50
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            batch_size: Words per cascade delete batch
+            max_batches_per_second: Upper bound on batches per second (0 = no throttling)
+            integrity_batch_size: Statistics per integrity scan batch
+            integrity_refresh_seconds: Age of the last completed integrity report after which a new pass is started
+            history_size: Number of finished jobs kept for the progress endpoint
+        """
+        self.batch_size = batch_size
+        self.max_batches_per_second = max_batches_per_second
+        self.integrity_batch_size = integrity_batch_size
+        self.integrity_refresh_seconds = integrity_refresh_seconds
+        self.history_size = history_size
+        self._jobs: Dict[str, MaintenanceJob] = {}
+        self._ids = itertools.count(1)
+
+    def configure(self, **settings) -> None:
+        """
+        Update throttling settings (used when connecting to MongoDB).
+
+        Args:
+            **settings: Any of the constructor arguments
+        """
+        for key, value in settings.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+
+    def get_job(self, job_id: str) -> Optional[MaintenanceJob]:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[MaintenanceJob]:
+        """Get all known jobs, newest first."""
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def find_active(self, job_type: str, **params) -> Optional[MaintenanceJob]:
+        """Find a running job of the given type with matching parameters."""
+        for job in self._jobs.values():
+            if job.job_type == job_type and not job.done and all(
+                job.params.get(key) == value for key, value in params.items()
+            ):
+                return job
+        return None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a running job; processed batches stay applied.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job was running and has been cancelled
+        """
+        job = self._jobs.get(job_id)
+        if not job or job.done or not job.task:
+            return False
+        job.task.cancel()
+        return True
+
+    def _register(self, job_type: str, params: Dict[str, Any]) -> MaintenanceJob:
+        job = MaintenanceJob(f"{job_type}-{next(self._ids)}", job_type, params)
+        self._jobs[job.job_id] = job
+        finished = [item for item in self.list_jobs() if item.done]
+        for old in finished[self.history_size:]:
+            self._jobs.pop(old.job_id, None)
+        return job
+
+    def _start(self, job: MaintenanceJob, coroutine, after: Optional[MaintenanceJob] = None) -> MaintenanceJob:
+        job.task = asyncio.ensure_future(self._run(job, coroutine, after))
+        return job
+
+    async def _run(self, job: MaintenanceJob, coroutine, after: Optional[MaintenanceJob] = None) -> None:
+        if after is not None and after.task is not None and not after.done:
+            # Задание в очереди за другим, работающим с той же позицией проверки
+            try:
+                await asyncio.wait([after.task])
+            except asyncio.CancelledError:
+                coroutine.close()
+                job.status = STATUS_CANCELLED
+                job.finished_at = datetime.utcnow()
+                raise
+        job.status = STATUS_RUNNING
+        job.started_at = datetime.utcnow()
+        logger.info(f"Maintenance job {job.job_id} started: {job.params}")
+        try:
+            await coroutine
+            job.status = STATUS_COMPLETED
+        except asyncio.CancelledError:
+            job.status = STATUS_CANCELLED
+            raise
+        except Exception as e:
+            job.status = STATUS_FAILED
+            job.error = str(e)
+            logger.error(f"Maintenance job {job.job_id} failed: {e}", exc_info=True)
+        finally:
+            job.finished_at = datetime.utcnow()
+            logger.info(f"Maintenance job {job.job_id} {job.status}: processed={job.processed}, {job.counters}")
+
+    async def _throttle(self, batch_started: float) -> None:
+        """Sleep so that batches are issued at most max_batches_per_second."""
+        if self.max_batches_per_second <= 0:
+            await asyncio.sleep(0)
+            return
+        remaining = 1.0 / self.max_batches_per_second - (time.monotonic() - batch_started)
+        await asyncio.sleep(max(remaining, 0))
+
+    # ----- Каскадное удаление слов языка -----
+
+    def start_cascade_delete(
+        self,
+        db: AsyncIOMotorDatabase,
+        language_id: str,
+        delete_language: bool = False
+    ) -> MaintenanceJob:
+        """
+        Start deleting all words of a language together with their statistics.
+
+        A running job for the same language is returned instead of starting a second one.
+
+        Args:
+            db: MongoDB database
+            language_id: ID of the language
+            delete_language: Also delete the language document when words are gone
+
+        Returns:
+            Job handle; await ``job.task`` to wait for completion
+        """
+        active = self.find_active(JOB_CASCADE_DELETE, language_id=language_id)
+        if active:
+            return active
+        job = self._register(JOB_CASCADE_DELETE, {"language_id": language_id, "delete_language": delete_language})
+        return self._start(job, self._cascade_delete(db, job, language_id, delete_language))
+
+    async def cascade_delete_now(self, db: AsyncIOMotorDatabase, language_id: str) -> Dict[str, int]:
+        """
+        Delete all words of a language with their statistics in the caller's task.
+
+        Same batches as the background job but without throttling, for request
+        paths that need the words gone before they continue (upload with clear_existing).
+
+        Args:
+            db: MongoDB database
+            language_id: ID of the language
+
+        Returns:
+            Counters: words_deleted, statistics_deleted
+        """
+        job = MaintenanceJob(f"{JOB_CASCADE_DELETE}-inline", JOB_CASCADE_DELETE, {"language_id": language_id})
+        await self._cascade_delete(db, job, language_id, delete_language=False, throttle=False)
+        return dict(job.counters)
+
+    async def _cascade_delete(
+        self,
+        db: AsyncIOMotorDatabase,
+        job: MaintenanceJob,
+        language_id: str,
+        delete_language: bool,
+        throttle: bool = True
+    ) -> None:
+        language_filter = _language_filter(language_id)
+        job.total = await db.words.count_documents(language_filter)
+        last_id = None
+        while True:
+            batch_started = time.monotonic()
+            query = dict(language_filter)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            cursor = db.words.find(query, {"_id": 1}).sort("_id", 1).limit(self.batch_size)
+            word_ids = [document["_id"] async for document in cursor]
+            if not word_ids:
+                break
+
+            # Сначала статистика: при сбое остаются слова, а не мертвые ссылки
+            statistics_result = await db.user_statistics.delete_many(
+                {"word_id": {"$in": [str(word_id) for word_id in word_ids]}}
+            )
+            words_result = await db.words.delete_many({"_id": {"$in": word_ids}})
+
+            last_id = word_ids[-1]
+            job.checkpoint = str(last_id)
+            job.batches += 1
+            job.processed += len(word_ids)
+            job.add("words_deleted", words_result.deleted_count)
+            job.add("statistics_deleted", statistics_result.deleted_count)
+            bump_language_words(language_id)
+            if throttle:
+                await self._throttle(batch_started)
+
+        if delete_language and ObjectId.is_valid(language_id):
+            result = await db.languages.delete_one({"_id": ObjectId(language_id)})
+            job.add("languages_deleted", result.deleted_count)
+            bump_language_catalog(language_id)
+        bump_language_words(language_id)
+
+    # ----- Инкрементальная проверка целостности статистики -----
+
+    def start_integrity_scan(
+        self,
+        db: AsyncIOMotorDatabase,
+        delete_orphans: bool = False,
+        max_batches: Optional[int] = None
+    ) -> MaintenanceJob:
+        """
+        Continue the statistics integrity scan from the stored checkpoint.
+
+        A running scan that does at least what is asked is returned instead of
+        starting a second one. A deleting scan requested while a non-deleting one
+        is running is queued after it.
+
+        Args:
+            db: MongoDB database
+            delete_orphans: Delete statistics whose word no longer exists
+            max_batches: Stop after this many batches (the next run continues from the checkpoint)
+
+        Returns:
+            Job handle
+        """
+        if delete_orphans:
+            active = self.find_active(JOB_INTEGRITY_SCAN, delete_orphans=True)
+        else:
+            active = self.find_active(JOB_INTEGRITY_SCAN)
+        if active:
+            return active
+        previous = self.find_active(JOB_INTEGRITY_SCAN)
+        job = self._register(JOB_INTEGRITY_SCAN, {"delete_orphans": delete_orphans, "max_batches": max_batches})
+        return self._start(job, self._integrity_scan(db, job, delete_orphans, max_batches), after=previous)
+
+    async def _integrity_scan(
+        self,
+        db: AsyncIOMotorDatabase,
+        job: MaintenanceJob,
+        delete_orphans: bool,
+        max_batches: Optional[int]
+    ) -> None:
+        checkpoints = db[CHECKPOINTS_COLLECTION]
+        state = await checkpoints.find_one({"_id": INTEGRITY_CHECKPOINT_ID}) or {}
+        cursor_state = state.get("cursor")
+        if cursor_state is None or (delete_orphans and not cursor_state.get("delete_orphans", False)):
+            # Начало цикла без удаления не очищено: удаляющий проход идет с начала коллекции
+            cursor_state = _new_cycle(delete_orphans)
+        elif not delete_orphans:
+            cursor_state["delete_orphans"] = False
+        job.total = await db.user_statistics.estimated_document_count()
+        job.processed = cursor_state["scanned"]
+
+        while max_batches is None or job.batches < max_batches:
+            batch_started = time.monotonic()
+            query = {}
+            if cursor_state["last_id"] is not None:
+                query["_id"] = {"$gt": cursor_state["last_id"]}
+            cursor = db.user_statistics.find(query, {"_id": 1, "word_id": 1}).sort("_id", 1).limit(
+                self.integrity_batch_size
+            )
+            statistics = [document async for document in cursor]
+
+            if not statistics:
+                # Цикл завершен: сохраняем отчет и начинаем следующий проход с начала коллекции
+                report = _build_report(cursor_state)
+                await checkpoints.replace_one(
+                    {"_id": INTEGRITY_CHECKPOINT_ID},
+                    {"_id": INTEGRITY_CHECKPOINT_ID, "cursor": None, "last_report": report},
+                    upsert=True
+                )
+                job.add("cycles_completed", 1)
+                break
+
+            word_object_ids = {
+                ObjectId(document["word_id"]) for document in statistics
+                if isinstance(document.get("word_id"), str) and ObjectId.is_valid(document["word_id"])
+            }
+            existing = set()
+            if word_object_ids:
+                async for word in db.words.find({"_id": {"$in": list(word_object_ids)}}, {"_id": 1}):
+                    existing.add(str(word["_id"]))
+            orphaned = [document["_id"] for document in statistics if document.get("word_id") not in existing]
+
+            deleted = 0
+            if delete_orphans and orphaned:
+                deleted = (await db.user_statistics.delete_many({"_id": {"$in": orphaned}})).deleted_count
+
+            cursor_state["last_id"] = statistics[-1]["_id"]
+            cursor_state["scanned"] += len(statistics)
+            cursor_state["orphaned"] += len(orphaned)
+            cursor_state["deleted"] += deleted
+            await checkpoints.update_one(
+                {"_id": INTEGRITY_CHECKPOINT_ID}, {"$set": {"cursor": cursor_state}}, upsert=True
+            )
+
+            job.checkpoint = str(cursor_state["last_id"])
+            job.batches += 1
+            job.processed = cursor_state["scanned"]
+            job.add("scanned", len(statistics))
+            job.add("orphaned_found", len(orphaned))
+            job.add("orphaned_deleted", deleted)
+            await self._throttle(batch_started)
+
+
+def _new_cycle(delete_orphans: bool = False) -> Dict[str, Any]:
+    # delete_orphans - мертвые ссылки удалялись во всех пакетах цикла
+    return {
+        "last_id": None,
+        "scanned": 0,
+        "orphaned": 0,
+        "deleted": 0,
+        "delete_orphans": delete_orphans,
+        "started_at": datetime.utcnow(),
+    }
+
+
+def _build_report(cursor_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Integrity report in the format of StatisticsRepository.get_data_integrity_report."""
+    # Удаленные записи больше не входят в коллекцию и не считаются мертвыми ссылками
+    total = cursor_state["scanned"] - cursor_state["deleted"]
+    orphaned = cursor_state["orphaned"] - cursor_state["deleted"]
+    return {
+        "total_statistics": total,
+        "valid_statistics": total - orphaned,
+        "orphaned_statistics": orphaned,
+        "orphaned_percentage": round(orphaned / total * 100, 2) if total > 0 else 0,
+        "orphaned_deleted": cursor_state["deleted"],
+        "started_at": cursor_state["started_at"],
+        "completed_at": datetime.utcnow(),
+    }
+
+
+async def get_integrity_report(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Latest integrity report built by the incremental scan.
+
+    Returns the last completed cycle with ``last_completed_at``; while no cycle
+    has completed yet, the figures of the cycle in progress are returned with
+    ``complete=False``.
+
+    Args:
+        db: MongoDB database
+
+    Returns:
+        Integrity report with scan state
+    """
+    state = await db[CHECKPOINTS_COLLECTION].find_one({"_id": INTEGRITY_CHECKPOINT_ID}) or {}
+    cursor_state = state.get("cursor")
+    report = state.get("last_report")
+    if report:
+        report = dict(report, complete=True)
+    else:
+        report = dict(_build_report(cursor_state or _new_cycle()), complete=False, completed_at=None)
+    report["last_completed_at"] = report["completed_at"]
+    report["scan_in_progress"] = bool(cursor_state)
+    report["scan_checkpoint"] = str(cursor_state["last_id"]) if cursor_state and cursor_state["last_id"] else None
+    report["scan_scanned"] = cursor_state["scanned"] if cursor_state else 0
+    return report
+
+
+# Глобальный менеджер заданий, настраивается при подключении к MongoDB
+maintenance_jobs = MaintenanceJobManager()
@@ -9,6 +9,7 @@ from bson.objectid import ObjectId
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.db import maintenance
 from app.api.models.statistics import (
     UserStatisticsCreate, 
     UserStatisticsUpdate, 
@@ -732,45 +733,12 @@ class StatisticsRepository:
 
     async def get_data_integrity_report(self) -> Dict[str, Any]:
         """
-        НОВЫЙ МЕТОД: Отчет о целостности данных - какой процент статистики имеет мертвые ссылки.
-        """
-        # Общее количество записей статистики
-        total_stats = await self.collection.count_documents({})
-        
-        # Количество записей с существующими словами
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "words",
-                    "let": {"word_id_str": "$word_id"},
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {
-                                    "$eq": [{"$toString": "$_id"}, "$$word_id_str"]
-                                }
-                            }
-                        },
-                        {"$project": {"_id": 1}}
-                    ],
-                    "as": "word_exists"
-                }
-            },
-            {"$match": {"word_exists": {"$ne": []}}},
-            {"$count": "valid_stats"}
-        ]
+        Отчет о целостности данных - какой процент статистики имеет мертвые ссылки.
         
-        cursor = self.collection.aggregate(pipeline)
-        result = await cursor.to_list(length=1)
-        valid_stats = result[0]["valid_stats"] if result else 0
-        
-        orphaned_stats = total_stats - valid_stats
-        orphaned_percentage = (orphaned_stats / total_stats * 100) if total_stats > 0 else 0
+        Отчет строится инкрементально фоновым заданием проверки целостности
+        (app.db.maintenance), здесь только читается последний результат.
         
-        return {
-            "total_statistics": total_stats,
-            "valid_statistics": valid_stats, 
-            "orphaned_statistics": orphaned_stats,
-            "orphaned_percentage": round(orphaned_percentage, 2)
-        }
-    
\ No newline at end of file
+        Returns:
+            Отчет о целостности с состоянием сканирования
+        """
+        return await maintenance.get_integrity_report(self.db)
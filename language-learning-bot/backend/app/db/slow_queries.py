@@ -0,0 +1,400 @@
+"""
+Runtime slow-query sampler.
+
+A PyMongo command listener watches every read command issued by the
+repositories. Commands slower than the threshold are grouped by query
+shape; for each shape an explain (executionStats) is run on a copy of the
+command in the background, and COLLSCAN or inefficient plans are recorded
+together with a suggested index. The top-N report is served to admins
+through /api/admin/slow-queries.
+"""
+
+import asyncio
+import copy
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Команды, для которых можно безопасно выполнить explain
+_EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+
+# Служебные поля драйвера, которые нельзя передавать внутрь explain
+_DRIVER_FIELDS = {
+    "lsid", "$db", "$clusterTime", "txnNumber", "$readPreference",
+    "readConcern", "startTransaction", "autocommit", "apiVersion",
+    "apiStrict", "apiDeprecationErrors",
+}
+
+# Стадии агрегации с записью - explain с executionStats для них не выполняем
+_WRITE_STAGES = {"$out", "$merge"}
+
+
+def _shape(value: Any) -> Any:
+    """
+    Replace literal values with placeholders, keeping the structure.
+
+    Args:
+        value: Filter or pipeline fragment
+
+    Returns:
+        Structure with the same keys and operators but no literal values
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Для списков значений ($in) важна не длина, а сам факт списка
+        if value and all(not isinstance(item, (dict, list)) for item in value):
+            return ["?"]
+        return [_shape(item) for item in value]
+    return "?"
+
+
+def _filter_fields(query: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Split top-level filter fields into equality and range fields.
+
+    Args:
+        query: MongoDB filter
+
+    Returns:
+        Tuple of (equality fields, range fields)
+    """
+    equality, ranges = [], []
+    for field, condition in (query or {}).items():
+        if field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            if "$eq" in condition or "$in" in condition:
+                equality.append(field)
+            else:
+                ranges.append(field)
+        else:
+            equality.append(field)
+    return equality, ranges
+
+
+def suggest_index(command_name: str, command: Dict[str, Any]) -> Optional[List[Tuple[str, int]]]:
+    """
+    Suggest an index for a command using the equality-sort-range rule.
+
+    Args:
+        command_name: Name of the command (find, aggregate, count)
+        command: Command document
+
+    Returns:
+        List of (field, direction) pairs or None if nothing can be suggested
+    """
+    query: Dict[str, Any] = {}
+    sort: Dict[str, int] = {}
+    if command_name in ("find", "count", "distinct"):
+        query = command.get("filter") or command.get("query") or {}
+        sort = command.get("sort") or {}
+    elif command_name == "aggregate":
+        for stage in command.get("pipeline", []):
+            if "$match" in stage and not query:
+                query = stage["$match"]
+            elif "$sort" in stage and query:
+                sort = stage["$sort"]
+                break
+            elif "$match" not in stage:
+                # Дальше первой стадии $match/$sort индекс уже не помогает
+                break
+
+    equality, ranges = _filter_fields(query)
+    keys: List[Tuple[str, int]] = [(field, 1) for field in equality]
+    keys += [(field, int(direction)) for field, direction in dict(sort).items() if field not in equality]
+    keys += [(field, 1) for field in ranges if field not in dict(keys)]
+    return keys or None
+
+
+def _walk_plan(plan: Dict[str, Any]):
+    """Yield every stage of a query plan tree."""
+    if not isinstance(plan, dict):
+        return
+    yield plan
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _walk_plan(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _walk_plan(child)
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract plan stages, index names and execution counters from explain output.
+
+    Args:
+        explain: Result of the explain command
+
+    Returns:
+        Summary with stages, indexes, docs/keys examined and documents returned
+    """
+    # Для агрегации план может лежать в первой стадии $cursor
+    planner = explain.get("queryPlanner")
+    stats = explain.get("executionStats")
+    if planner is None:
+        for stage in explain.get("stages", []):
+            cursor_stage = stage.get("$cursor")
+            if cursor_stage:
+                planner = cursor_stage.get("queryPlanner")
+                stats = cursor_stage.get("executionStats")
+                break
+    planner = planner or {}
+    stats = stats or {}
+
+    stages, indexes = [], []
+    for stage in _walk_plan(planner.get("winningPlan", {})):
+        name = stage.get("stage")
+        if name:
+            stages.append(name)
+        if stage.get("indexName"):
+            indexes.append(stage["indexName"])
+
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "docs_examined": stats.get("totalDocsExamined", 0),
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "returned": stats.get("nReturned", 0),
+        "execution_time_ms": stats.get("executionTimeMillis", 0),
+    }
+
+
+class SlowQuerySampler(monitoring.CommandListener):
+    """
+    Command listener collecting slow read commands and their explain plans.
+
+    The listener callbacks run in driver threads, so all shared state is
+    guarded by a lock and explains are scheduled on the event loop captured
+    by start().
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100,
+        top_n: int = 20,
+        sample_rate: float = 1.0,
+        explain_enabled: bool = True,
+        explain_interval_seconds: float = 300,
+        docs_examined_threshold: int = 1000,
+        docs_examined_ratio: float = 10.0
+    ):
+        """
+        Initialize the sampler.
+
+        Args:
+            threshold_ms: Commands slower than this are recorded
+            top_n: Number of query shapes kept in the report
+            sample_rate: Fraction of slow commands that are recorded (0..1)
+            explain_enabled: Whether explain is run for slow shapes
+            explain_interval_seconds: Minimum interval between explains of the same shape
+            docs_examined_threshold: docsExamined above this is a finding
+            docs_examined_ratio: docsExamined / nReturned above this is a finding
+        """
+        self.threshold_ms = threshold_ms
+        self.top_n = top_n
+        self.sample_rate = sample_rate
+        self.explain_enabled = explain_enabled
+        self.explain_interval_seconds = explain_interval_seconds
+        self.docs_examined_threshold = docs_examined_threshold
+        self.docs_examined_ratio = docs_examined_ratio
+
+        self._pending: Dict[int, Tuple[str, str, Dict[str, Any]]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._database = None
+
+    def start(self, database, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Attach the sampler to a database used for background explains.
+
+        Args:
+            database: Motor database instance
+            loop: Event loop for explain tasks (the running one by default)
+        """
+        self._database = database
+        self._loop = loop or asyncio.get_event_loop()
+
+    # CommandListener callbacks
+
+    def started(self, event):
+        if event.command_name not in _EXPLAINABLE_COMMANDS:
+            return
+        # Команду сохраняем только по ссылке - копия делается лишь для медленных
+        self._pending[event.request_id] = (event.command_name, event.database_name, event.command)
+
+    def succeeded(self, event):
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        if self.sample_rate < 1.0 and random.random() > self.sample_rate:
+            return
+        command_name, database_name, command = pending
+        self.record(command_name, database_name, command, duration_ms)
+
+    def failed(self, event):
+        self._pending.pop(event.request_id, None)
+
+    # Report
+
+    def record(self, command_name: str, database_name: str, command: Dict[str, Any], duration_ms: float) -> None:
+        """
+        Record one slow command and schedule an explain if due.
+
+        Args:
+            command_name: Name of the command
+            database_name: Database the command ran against
+            command: Command document
+            duration_ms: Command duration in milliseconds
+        """
+        clean_command = {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+        collection = str(clean_command.get(command_name, "-"))
+        if command_name == "aggregate":
+            shape_source = clean_command.get("pipeline", [])
+        else:
+            shape_source = {"filter": clean_command.get("filter") or clean_command.get("query"),
+                            "sort": clean_command.get("sort")}
+        shape_key = f"{collection}.{command_name}:{_shape(shape_source)!r}"
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(shape_key)
+            if entry is None:
+                entry = {
+                    "collection": collection,
+                    "command": command_name,
+                    "shape": repr(_shape(shape_source)),
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_seen": None,
+                    "explain": None,
+                    "findings": [],
+                    "suggested_index": suggest_index(command_name, clean_command),
+                    "_explained_at": 0.0,
+                    "_explain_running": False,
+                }
+                self._entries[shape_key] = entry
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = datetime.utcnow()
+
+            explain_due = (
+                self.explain_enabled
+                and command_name in _EXPLAINABLE_COMMANDS
+                and not entry["_explain_running"]
+                and now - entry["_explained_at"] >= self.explain_interval_seconds
+                and not any(stage_name in _WRITE_STAGES
+                            for stage in clean_command.get("pipeline", []) for stage_name in stage)
+            )
+            if explain_due:
+                entry["_explain_running"] = True
+                entry["_explained_at"] = now
+
+            self._trim()
+
+        if explain_due:
+            self._schedule_explain(shape_key, database_name, copy.deepcopy(clean_command))
+
+    def _trim(self) -> None:
+        """Keep only the slowest shapes; caller holds the lock."""
+        limit = max(self.top_n * 2, self.top_n + 10)
+        if len(self._entries) <= limit:
+            return
+        ordered = sorted(self._entries.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        self._entries = dict(ordered[:limit])
+
+    def _schedule_explain(self, shape_key: str, database_name: str, command: Dict[str, Any]) -> None:
+        """Schedule an explain task on the event loop from any thread."""
+        if self._loop is None or self._database is None or self._loop.is_closed():
+            with self._lock:
+                if shape_key in self._entries:
+                    self._entries[shape_key]["_explain_running"] = False
+            return
+        self._loop.call_soon_threadsafe(
+            lambda: self._loop.create_task(self._explain(shape_key, database_name, command))
+        )
+
+    async def _explain(self, shape_key: str, database_name: str, command: Dict[str, Any]) -> None:
+        """Run explain for a command copy and store findings."""
+        summary = None
+        try:
+            database = self._database.client[database_name] if database_name else self._database
+            result = await database.command({"explain": command, "verbosity": "executionStats"})
+            summary = summarize_explain(result)
+        except Exception as e:
+            logger.warning(f"Slow query explain failed for {shape_key}: {e}")
+
+        with self._lock:
+            entry = self._entries.get(shape_key)
+            if entry is None:
+                return
+            entry["_explain_running"] = False
+            if summary is None:
+                return
+            entry["explain"] = summary
+            entry["findings"] = self._findings(summary)
+
+        if summary and entry["findings"]:
+            logger.warning(
+                f"Slow query {entry['collection']}.{entry['command']} "
+                f"({entry['max_ms']:.0f} ms): {', '.join(entry['findings'])}; "
+                f"suggested index: {entry['suggested_index']}"
+            )
+
+    def _findings(self, summary: Dict[str, Any]) -> List[str]:
+        """Turn an explain summary into human readable findings."""
+        findings = []
+        if "COLLSCAN" in summary["stages"]:
+            findings.append("COLLSCAN")
+        docs_examined = summary["docs_examined"]
+        returned = max(summary["returned"], 1)
+        if docs_examined >= self.docs_examined_threshold:
+            findings.append(f"docsExamined={docs_examined}")
+        if docs_examined / returned >= self.docs_examined_ratio and docs_examined >= returned * 2:
+            findings.append(f"docsExamined/nReturned={docs_examined / returned:.1f}")
+        if "SORT" in summary["stages"]:
+            findings.append("in-memory SORT")
+        return findings
+
+    def get_report(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get slow query shapes ordered by total time spent.
+
+        Args:
+            limit: Maximum number of entries (top_n by default)
+
+        Returns:
+            List of report entries
+        """
+        with self._lock:
+            entries = [
+                {key: value for key, value in entry.items() if not key.startswith("_")}
+                for entry in self._entries.values()
+            ]
+        for entry in entries:
+            entry["avg_ms"] = entry["total_ms"] / entry["count"] if entry["count"] else 0.0
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return entries[: limit or self.top_n]
+
+    def reset(self) -> None:
+        """Clear collected entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_sampler: Optional[SlowQuerySampler] = None
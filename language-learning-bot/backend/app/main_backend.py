@@ -9,7 +9,7 @@ import argparse
 import os
 import sys
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from dotenv import load_dotenv
@@ -25,9 +25,10 @@ try:
 except ImportError:
     hydra_available = False
 
-from app.api.routes import languages, users, words, statistics
+from app.api.routes import languages, users, words, statistics, admin
 from app.api.routes.user_language_settings import router as user_language_settings_router
 from app.db.database import connect_to_mongo, close_mongo_connection
+from app.core.metrics import metrics_registry, MetricsMiddleware
 from app.utils.logger import setup_logger
 
 # Load environment variables
@@ -82,7 +83,8 @@ def get_api_settings():
         "debug_mode": os.getenv("DEBUG", "False").lower() in ("true", "1", "t"),
         "cors_origins": os.getenv("CORS_ORIGINS", "*").split(","),
         "app_name": os.getenv("APP_NAME", "Language Learning Bot"),
-        "app_environment": os.getenv("ENVIRONMENT", "development")
+        "app_environment": os.getenv("ENVIRONMENT", "development"),
+        "metrics_enabled": os.getenv("METRICS_ENABLED", "True").lower() in ("true", "1", "t")
     }
     
     # Если используется Hydra, переопределяем значения из конфигурации
@@ -96,6 +98,8 @@ def get_api_settings():
                 settings["port"] = int(cfg.api.port)
             if hasattr(cfg.api, "cors_origins"):
                 settings["cors_origins"] = cfg.api.cors_origins.split(",") if isinstance(cfg.api.cors_origins, str) else cfg.api.cors_origins
+            if hasattr(cfg.api, "metrics_enabled") and "METRICS_ENABLED" not in os.environ:
+                settings["metrics_enabled"] = bool(cfg.api.metrics_enabled)
         
         if hasattr(cfg, "app"):
             if hasattr(cfg.app, "name"):
@@ -119,6 +123,10 @@ def create_application() -> FastAPI:
     app_name = settings["app_name"]
     app_environment = settings["app_environment"]
     cors_origins = settings["cors_origins"]
+    metrics_enabled = settings["metrics_enabled"]
+    
+    # Флаг читается при подключении к MongoDB, чтобы не регистрировать слушатель команд
+    metrics_registry.enabled = metrics_enabled
     
     app = FastAPI(
         title=f"{app_name} API",
@@ -138,6 +146,10 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Метрики добавляются последними, чтобы измерять полное время обработки запроса
+    if metrics_enabled:
+        app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+    
     # Add event handlers for startup and shutdown
     app.add_event_handler("startup", connect_to_mongo)
     app.add_event_handler("shutdown", close_mongo_connection)
@@ -147,6 +159,7 @@ def create_application() -> FastAPI:
     app.include_router(users.router, prefix=api_prefix)
     app.include_router(words.router, prefix=api_prefix)
     app.include_router(statistics.router, prefix=api_prefix)
+    app.include_router(admin.router, prefix=api_prefix)
     app.include_router(user_language_settings_router, prefix="/api")
 
     # Add health check endpoint
@@ -159,6 +172,15 @@ def create_application() -> FastAPI:
             "config_source": "Hydra" if using_hydra else "Environment Variables"
         }
     
+    if metrics_enabled:
+        @app.get("/metrics", tags=["health"], include_in_schema=False)
+        async def metrics():
+            """Expose collected metrics in Prometheus text format."""
+            return Response(
+                content=metrics_registry.render(),
+                media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
+    
     return app
 
 app = create_application()
@@ -10,6 +10,8 @@ from app.db.repositories.word_repository import WordRepository
 from app.db.repositories.statistics_repository import StatisticsRepository
 from app.api.models.language import LanguageCreate, LanguageUpdate, Language, LanguageInDB
 from app.api.models.word import WordInDB
+from app.core.etag import bump_language_catalog, bump_language_words
+from app.db.maintenance import maintenance_jobs, MaintenanceJob
 
 logger = logging.getLogger(__name__)
 
@@ -79,7 +81,9 @@ class LanguageService:
         Returns:
             Created language object
         """
-        return await self.language_repository.create(language)
+        created_language = await self.language_repository.create(language)
+        bump_language_catalog(created_language.id)
+        return created_language
     
     async def update_language(self, language_id: str, language: LanguageUpdate) -> Optional[LanguageInDB]:
         """
@@ -92,7 +96,10 @@ class LanguageService:
         Returns:
             Updated language object or None if not found
         """
-        return await self.language_repository.update(language_id, language)
+        updated_language = await self.language_repository.update(language_id, language)
+        if updated_language:
+            bump_language_catalog(language_id)
+        return updated_language
     
     async def delete_language(self, language_id: str) -> bool:
         """
@@ -104,11 +111,18 @@ class LanguageService:
         Returns:
             True if deleted, False if not found
         """
-        return await self.language_repository.delete(language_id)
+        deleted = await self.language_repository.delete(language_id)
+        if deleted:
+            bump_language_catalog(language_id)
+            bump_language_words(language_id)
+        return deleted
     
     async def delete_all_words_for_language(self, language_id: str) -> int:
         """
-        Delete all words for a specific language.
+        Delete all words for a specific language together with their statistics.
+        
+        Words are removed in _id batches without throttling, so the caller
+        (upload with clear_existing) is not held up by the maintenance rate limit.
         
         Args:
             language_id: ID of the language
@@ -119,24 +133,26 @@ class LanguageService:
         logger.info(f"Deleting all words for language id={language_id}")
         
         try:
-            # Try with string ID first (this is how API client expects it)
-            result = await self.word_repository.collection.delete_many({"language_id": language_id})
-            deleted_count = result.deleted_count
-            
-            # If no results, try with ObjectId conversion (backward compatibility)
-            if deleted_count == 0:
-                try:
-                    result = await self.word_repository.collection.delete_many({"language_id": ObjectId(language_id)})
-                    deleted_count = result.deleted_count
-                except Exception:
-                    # If ObjectId conversion fails, return 0
-                    pass
-                    
-            logger.info(f"Deleted {deleted_count} words for language id={language_id}")
-            return deleted_count
+            counters = await maintenance_jobs.cascade_delete_now(self.word_repository.db, language_id)
         except Exception as e:
-            logger.error(f"Error deleting words for language id={language_id}: {str(e)}")
+            logger.error(f"Error deleting words for language id={language_id}: {e}")
             return 0
+        
+        deleted_count = counters.get("words_deleted", 0)
+        logger.info(f"Deleted {deleted_count} words for language id={language_id}")
+        return deleted_count
+    
+    def start_language_cleanup(self, language_id: str) -> MaintenanceJob:
+        """
+        Start a background cascade delete of the language words and their statistics.
+        
+        Args:
+            language_id: ID of the language
+            
+        Returns:
+            Maintenance job; progress is available at /admin/jobs/{job_id}
+        """
+        return maintenance_jobs.start_cascade_delete(self.word_repository.db, language_id)
     
     async def get_words_by_language(
         self, 
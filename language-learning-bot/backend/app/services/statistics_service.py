@@ -9,6 +9,7 @@ from bson.objectid import ObjectId
 
 from app.db.repositories.statistics_repository import StatisticsRepository
 from app.db.repositories.word_repository import WordRepository
+from app.db.maintenance import maintenance_jobs, JOB_INTEGRITY_SCAN
 from app.api.models.statistics import (
     UserStatisticsCreate, 
     UserStatisticsUpdate, 
@@ -395,88 +396,47 @@ class StatisticsService:
 
     async def get_data_integrity_report(self) -> Dict[str, Any]:
         """
-        НОВЫЙ МЕТОД: Получить отчет о целостности данных статистики.
+        Получить отчет о целостности данных статистики.
+        
+        Если проверка не запущена, а полный проход еще не завершен или последний
+        завершен раньше integrity_refresh_seconds назад, запускает фоновую проверку
+        (с сохраненной позиции или новый проход). До ее завершения отдается
+        предыдущий отчет, время его завершения - в last_completed_at.
         
         Returns:
             Отчет с информацией о мертвых ссылках в статистике
         """
         logger.info("Getting data integrity report for statistics")
         
-        return await self.repository.get_data_integrity_report()
+        report = await self.repository.get_data_integrity_report()
+        if self._integrity_scan_due(report) and not maintenance_jobs.find_active(JOB_INTEGRITY_SCAN):
+            job = maintenance_jobs.start_integrity_scan(self.repository.db)
+            report["scan_job_id"] = job.job_id
+        return report
+
+    @staticmethod
+    def _integrity_scan_due(report: Dict[str, Any]) -> bool:
+        """Нужен ли новый проход проверки целостности."""
+        last_completed_at = report.get("last_completed_at")
+        if not report["complete"] or last_completed_at is None:
+            return True
+        age = (datetime.utcnow() - last_completed_at).total_seconds()
+        return age >= maintenance_jobs.integrity_refresh_seconds
 
     async def cleanup_orphaned_statistics(self, dry_run: bool = True) -> Dict[str, Any]:
         """
-        НОВЫЙ МЕТОД: Очистка статистики с мертвыми ссылками.
+        Запустить фоновую очистку статистики с мертвыми ссылками.
+        
+        Проверка идет пакетами по _id с сохранением позиции, с ограничением
+        скорости; ход выполнения доступен через /admin/jobs/{job_id}.
         
         Args:
             dry_run: Если True, только подсчитывает, не удаляет
             
         Returns:
-            Отчет об операции очистки
+            Состояние запущенного задания
         """
         logger.info(f"Starting cleanup of orphaned statistics, dry_run={dry_run}")
         
-        # Находим статистику без соответствующих слов
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "words",
-                    "let": {"word_id_str": "$word_id"},
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {
-                                    "$eq": [{"$toString": "$_id"}, "$$word_id_str"]
-                                }
-                            }
-                        },
-                        {"$project": {"_id": 1}}
-                    ],
-                    "as": "word_exists"
-                }
-            },
-            # Найти статистику БЕЗ соответствующих слов
-            {"$match": {"word_exists": {"$eq": []}}},
-            {"$project": {"_id": 1, "user_id": 1, "word_id": 1, "language_id": 1}}
-        ]
-        
-        cursor = self.repository.collection.aggregate(pipeline)
-        orphaned_records = await cursor.to_list(length=None)
-        
-        orphaned_count = len(orphaned_records)
-        
-        if dry_run:
-            logger.info(f"Dry run: found {orphaned_count} orphaned statistics records")
-            return {
-                "dry_run": True,
-                "orphaned_found": orphaned_count,
-                "deleted": 0,
-                "sample_orphaned": orphaned_records[:5]  # Показываем первые 5 для примера
-            }
-        else:
-            # Реальное удаление
-            if orphaned_count > 0:
-                orphaned_ids = [record["_id"] for record in orphaned_records]
-                
-                delete_result = await self.repository.collection.delete_many({
-                    "_id": {"$in": orphaned_ids}
-                })
-                
-                deleted_count = delete_result.deleted_count
-                logger.info(f"Deleted {deleted_count} orphaned statistics records")
-                
-                return {
-                    "dry_run": False,
-                    "orphaned_found": orphaned_count,
-                    "deleted": deleted_count,
-                    "success": deleted_count == orphaned_count
-                }
-            else:
-                logger.info("No orphaned statistics found")
-                return {
-                    "dry_run": False,
-                    "orphaned_found": 0,
-                    "deleted": 0,
-                    "success": True
-                }
-            
\ No newline at end of file
+        job = maintenance_jobs.start_integrity_scan(self.repository.db, delete_orphans=not dry_run)
+        return job.to_dict()
@@ -14,6 +14,7 @@ from app.api.schemas.user_language_settings import (
     UserLanguageSettingsInDB,
     UserLanguageSettings
 )
+from app.core.etag import bump_user_settings, version_registry
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -99,7 +100,9 @@ class UserLanguageSettingsService:
             return existing_settings
             
         # Create settings
-        return await self.repository.create(user_id, language_id, settings)
+        created_settings = await self.repository.create(user_id, language_id, settings)
+        bump_user_settings(user_id)
+        return created_settings
 
     async def update_settings(
         self, user_id: str, language_id: str, settings: UserLanguageSettingsUpdate
@@ -128,7 +131,10 @@ class UserLanguageSettingsService:
             return None
             
         # Update settings (repository handles upsert logic)
-        return await self.repository.update(user_id, language_id, settings)
+        updated_settings = await self.repository.update(user_id, language_id, settings)
+        if updated_settings:
+            bump_user_settings(user_id)
+        return updated_settings
 
     async def delete_settings(self, user_id: str, language_id: str) -> bool:
         """
@@ -141,7 +147,10 @@ class UserLanguageSettingsService:
         Returns:
             True if deleted, False if not found
         """
-        return await self.repository.delete(user_id, language_id)
+        deleted = await self.repository.delete(user_id, language_id)
+        if deleted:
+            bump_user_settings(user_id)
+        return deleted
 
     async def get_all_settings_for_user(self, user_id: str) -> List[UserLanguageSettingsInDB]:
         """
@@ -241,6 +250,9 @@ class UserLanguageSettingsService:
         
         try:
             count = await self.repository.migrate_existing_settings()
+            # Миграция затрагивает всех пользователей - сбрасываем все ETag
+            if count:
+                version_registry.reset()
             logger.info(f"Successfully migrated {count} user language settings")
             return count
         except Exception as e:
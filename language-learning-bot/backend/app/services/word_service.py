@@ -8,6 +8,7 @@ from typing import List, Optional, Dict, Any
 from app.db.repositories.word_repository import WordRepository
 from app.db.repositories.language_repository import LanguageRepository
 from app.api.models.word import WordCreate, WordUpdate, Word, WordInDB, WordForReview
+from app.core.etag import bump_language_words
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +124,9 @@ class WordService:
         # Convert Dict to Pydantic model
         word_create = WordCreate(**word_data)
         
-        return await self.repository.create(word_create)
+        created_word = await self.repository.create(word_create)
+        bump_language_words(language_id)
+        return created_word
     
     async def update_word(self, word_id: str, word_data: Dict[str, Any]) -> Optional[WordInDB]:
         """
@@ -143,7 +146,10 @@ class WordService:
         # Convert Dict to Pydantic model
         word_update = WordUpdate(**word_data)
         
-        return await self.repository.update(word_id, word_update)
+        updated_word = await self.repository.update(word_id, word_update)
+        if updated_word:
+            bump_language_words(updated_word.language_id)
+        return updated_word
     
     async def delete_word(self, word_id: str) -> bool:
         """
@@ -155,7 +161,12 @@ class WordService:
         Returns:
             True if deleted, False if not found
         """
-        return await self.repository.delete(word_id)
+        # Язык нужен для инвалидации ETag списка слов
+        word = await self.repository.get_by_id(word_id)
+        deleted = await self.repository.delete(word_id)
+        if deleted and word:
+            bump_language_words(word.language_id)
+        return deleted
     
     async def get_words_for_review(
         self, 
@@ -0,0 +1,13 @@
+"""
+Load-test and benchmark suite for the backend API.
+
+Usage (from the backend directory, with a local mongod running):
+
+    python -m benchmarks seed --languages 2 --words 50000 --users 200
+    python -m benchmarks run --concurrency 32 --duration 60 --output results/run.json
+    python -m benchmarks compare results/base.json results/run.json
+
+The seeded dataset lives in a separate database (language_learning_bot_bench
+by default) and the real FastAPI app is driven in-process through
+httpx.ASGITransport, or over HTTP with --base-url.
+"""
@@ -0,0 +1,172 @@
+"""
+Command line entry point: python -m benchmarks seed|run|compare.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+DEFAULT_MONGODB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+DEFAULT_DB_NAME = os.getenv("BENCH_MONGODB_DB_NAME", "language_learning_bot_bench")
+
+# Тестовый язык для загрузки файлов, чтобы не трогать слова основного набора
+UPLOAD_LANGUAGE_NAME = "Бенчмарк загрузка"
+
+
+def _database(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongodb_url)
+    return client, client[args.db_name]
+
+
+async def _seed(args) -> None:
+    from benchmarks.dataset import seed_dataset
+
+    client, db = _database(args)
+    try:
+        manifest = await seed_dataset(
+            db,
+            languages=args.languages,
+            words_per_language=args.words,
+            users=args.users,
+            pareto_alpha=args.pareto_alpha,
+            due_share=args.due_share,
+            seed=args.seed,
+            with_indexes=not args.no_indexes,
+        )
+        await db.bench_meta.replace_one({"_id": "manifest"}, {"_id": "manifest", **manifest}, upsert=True)
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+    finally:
+        client.close()
+
+
+async def _ensure_upload_language(db) -> str:
+    from datetime import datetime
+
+    document = await db.languages.find_one({"name_ru": UPLOAD_LANGUAGE_NAME})
+    if document:
+        return str(document["_id"])
+    now = datetime.utcnow()
+    result = await db.languages.insert_one({
+        "name_ru": UPLOAD_LANGUAGE_NAME, "name_foreign": "Bench upload", "created_at": now, "updated_at": now
+    })
+    return str(result.inserted_id)
+
+
+async def _run(args) -> None:
+    import httpx
+
+    from benchmarks.dataset import load_targets
+    from benchmarks.runner import LoadRunner, build_report
+
+    client, db = _database(args)
+    try:
+        targets = await load_targets(db)
+        manifest = await db.bench_meta.find_one({"_id": "manifest"}) or {}
+        manifest.pop("_id", None)
+        upload_language_id = None if args.no_upload else await _ensure_upload_language(db)
+
+        if args.base_url:
+            http_client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        else:
+            # Приложение работает в этом же процессе с базой бенчмарка
+            os.environ.setdefault("METRICS_ENABLED", "false")
+            from app.db import database
+            from app.main_backend import app
+
+            database.client, database.db = client, db
+            http_client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout
+            )
+
+        runner = LoadRunner(
+            http_client,
+            targets,
+            api_prefix=args.api_prefix,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            iterations=args.iterations,
+            upload_language_id=upload_language_id,
+            seed=args.seed,
+        )
+        async with http_client:
+            summary = await runner.run()
+    finally:
+        client.close()
+
+    config = {
+        "mode": "http" if args.base_url else "asgi",
+        "base_url": args.base_url,
+        "db_name": args.db_name,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "iterations": args.iterations,
+        "mix": runner.mix,
+    }
+    report = build_report(summary, config, manifest)
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+
+    for name, stats in summary["operations"].items():
+        print(f"{name:<24} n={stats['count']:<7} p50={stats['p50_ms']:.1f}ms "
+              f"p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms errors={stats['errors']}")
+    print(f"total {summary['total_requests']} requests, {summary['throughput_rps']:.1f} rps -> {output}")
+
+
+def _compare(args) -> None:
+    from benchmarks.runner import compare_reports
+
+    base = json.loads(Path(args.base).read_text())
+    current = json.loads(Path(args.current).read_text())
+    print("\n".join(compare_reports(base, current)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend load tests")
+    parser.add_argument("--mongodb-url", default=DEFAULT_MONGODB_URL)
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed = subparsers.add_parser("seed", help="Generate the synthetic dataset")
+    seed.add_argument("--languages", type=int, default=2)
+    seed.add_argument("--words", type=int, default=50000, help="Words per language")
+    seed.add_argument("--users", type=int, default=200)
+    seed.add_argument("--pareto-alpha", type=float, default=1.2)
+    seed.add_argument("--due-share", type=float, default=0.3)
+    seed.add_argument("--no-indexes", action="store_true", help="Do not create production indexes")
+
+    run = subparsers.add_parser("run", help="Run the load test")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    run.add_argument("--iterations", type=int, default=None, help="Stop after N scenario iterations")
+    run.add_argument("--base-url", default=None, help="Test a running server instead of the in-process app")
+    run.add_argument("--api-prefix", default="/api")
+    run.add_argument("--timeout", type=float, default=30.0)
+    run.add_argument("--no-upload", action="store_true", help="Skip xlsx upload requests")
+    run.add_argument("--output", default="benchmarks/results/latest.json")
+
+    compare = subparsers.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("base")
+    compare.add_argument("current")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.command == "seed":
+        asyncio.run(_seed(args))
+    elif args.command == "run":
+        asyncio.run(_run(args))
+    else:
+        _compare(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Synthetic dataset generator for backend benchmarks.
+
+Generates N languages with a frequency-ordered word list each, M users and
+per-user statistics with skewed distributions: a few users have studied
+thousands of words while most have studied a few dozen, studied words are
+concentrated at the top of the frequency list, and a share of the words
+is due for review today.
+"""
+
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+BENCH_LANGUAGE_PREFIX = "Бенчмарк"
+BENCH_TELEGRAM_ID_BASE = 9_000_000_000
+
+_SYLLABLES = ["ka", "mi", "to", "re", "su", "na", "lo", "pe", "zu", "xi", "ang", "ong", "shi", "qu"]
+
+
+def _make_word(rng: random.Random, number: int) -> Dict[str, Any]:
+    """Build a pseudo-random word document (without language_id)."""
+    length = rng.randint(1, 4)
+    foreign = "".join(rng.choice(_SYLLABLES) for _ in range(length))
+    return {
+        "word_number": number,
+        "word_foreign": f"{foreign}{number}",
+        "translation": f"перевод {number}",
+        "transcription": f"[{foreign}]",
+        "sound_file_path": "",
+    }
+
+
+def _studied_count(rng: random.Random, words_per_language: int, alpha: float) -> int:
+    """Number of studied words for one user, Pareto distributed."""
+    count = int(20 * rng.paretovariate(alpha))
+    return max(1, min(count, words_per_language))
+
+
+async def _insert_chunked(collection, documents: List[Dict[str, Any]], chunk_size: int) -> None:
+    """Insert documents in chunks to bound memory and request size."""
+    for start in range(0, len(documents), chunk_size):
+        await collection.insert_many(documents[start:start + chunk_size], ordered=False)
+
+
+async def drop_dataset(db: AsyncIOMotorDatabase) -> None:
+    """
+    Remove all benchmark collections content.
+
+    Args:
+        db: Benchmark database
+    """
+    for name in ("languages", "words", "users", "user_statistics", "user_language_settings"):
+        await db[name].delete_many({})
+
+
+async def create_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+    Create the indexes production relies on (see scripts/db_indexes.py).
+
+    Args:
+        db: Benchmark database
+    """
+    await db.words.create_index([("language_id", 1), ("word_number", 1)], name="lang_word_number_idx")
+    await db.users.create_index([("telegram_id", 1)], name="telegram_id_idx", unique=True)
+    await db.user_statistics.create_index([("user_id", 1), ("word_id", 1)], name="user_word_unique_idx", unique=True)
+    await db.user_statistics.create_index(
+        [("user_id", 1), ("language_id", 1), ("updated_at", -1)], name="user_lang_updated_idx"
+    )
+    await db.user_statistics.create_index(
+        [("user_id", 1), ("language_id", 1), ("next_check_date", 1)], name="user_lang_review_idx"
+    )
+
+
+async def seed_dataset(
+    db: AsyncIOMotorDatabase,
+    languages: int = 2,
+    words_per_language: int = 50000,
+    users: int = 200,
+    pareto_alpha: float = 1.2,
+    due_share: float = 0.3,
+    skipped_share: float = 0.05,
+    seed: int = 42,
+    chunk_size: int = 5000,
+    with_indexes: bool = True
+) -> Dict[str, Any]:
+    """
+    Generate and insert the synthetic dataset.
+
+    Args:
+        db: Benchmark database (existing content is removed)
+        languages: Number of languages
+        words_per_language: Number of words per language
+        users: Number of users
+        pareto_alpha: Shape of the studied-words distribution (smaller = more skewed)
+        due_share: Share of statistics due for review today
+        skipped_share: Share of statistics marked as skipped
+        seed: Random seed for reproducible datasets
+        chunk_size: insert_many batch size
+        with_indexes: Create production indexes before inserting
+
+    Returns:
+        Manifest with counts and generation parameters
+    """
+    rng = random.Random(seed)
+    await drop_dataset(db)
+    if with_indexes:
+        await create_indexes(db)
+
+    now = datetime.utcnow()
+    language_ids: List[ObjectId] = []
+    for index in range(languages):
+        language_id = ObjectId()
+        language_ids.append(language_id)
+        await db.languages.insert_one({
+            "_id": language_id,
+            "name_ru": f"{BENCH_LANGUAGE_PREFIX} {index + 1}",
+            "name_foreign": f"Bench {index + 1}",
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    # Слова храним с language_id как ObjectId - так их создает WordRepository
+    word_ids: Dict[ObjectId, List[ObjectId]] = {}
+    for language_id in language_ids:
+        documents = []
+        for number in range(1, words_per_language + 1):
+            document = _make_word(rng, number)
+            document.update({"_id": ObjectId(), "language_id": language_id, "created_at": now, "updated_at": now})
+            documents.append(document)
+        await _insert_chunked(db.words, documents, chunk_size)
+        word_ids[language_id] = [document["_id"] for document in documents]
+        logger.info(f"Inserted {len(documents)} words for language {language_id}")
+
+    user_ids: List[ObjectId] = []
+    user_documents = []
+    for index in range(users):
+        user_id = ObjectId()
+        user_ids.append(user_id)
+        user_documents.append({
+            "_id": user_id,
+            "telegram_id": BENCH_TELEGRAM_ID_BASE + index,
+            "username": f"bench_user_{index}",
+            "first_name": "Bench",
+            "last_name": str(index),
+            "is_admin": False,
+            "created_at": now,
+            "updated_at": now,
+        })
+    await _insert_chunked(db.users, user_documents, chunk_size)
+
+    statistics_total = 0
+    statistics_batch: List[Dict[str, Any]] = []
+    for user_id in user_ids:
+        # Большинство пользователей изучает один язык, часть - несколько
+        user_languages = rng.sample(language_ids, k=1 if rng.random() < 0.8 else min(2, len(language_ids)))
+        for language_id in user_languages:
+            studied = _studied_count(rng, words_per_language, pareto_alpha)
+            # Изучаемые слова сосредоточены в начале частотного списка
+            indexes = sorted({min(int(rng.expovariate(1 / max(studied, 1))), words_per_language - 1)
+                              for _ in range(studied)})
+            for word_index in indexes:
+                due = rng.random() < due_share
+                interval = rng.choice([1, 2, 4, 8, 16, 32])
+                next_check = now - timedelta(days=rng.randint(0, 3)) if due else now + timedelta(days=interval)
+                statistics_batch.append({
+                    "user_id": str(user_id),
+                    "word_id": str(word_ids[language_id][word_index]),
+                    "language_id": str(language_id),
+                    "hint_phoneticsound": None,
+                    "hint_phoneticassociation": None,
+                    "hint_meaning": None,
+                    "hint_writing": None,
+                    "score": 1 if rng.random() < 0.6 else 0,
+                    "is_skipped": rng.random() < skipped_share,
+                    "next_check_date": next_check,
+                    "check_interval": interval,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            if len(statistics_batch) >= chunk_size:
+                await _insert_chunked(db.user_statistics, statistics_batch, chunk_size)
+                statistics_total += len(statistics_batch)
+                statistics_batch = []
+    if statistics_batch:
+        await _insert_chunked(db.user_statistics, statistics_batch, chunk_size)
+        statistics_total += len(statistics_batch)
+
+    manifest = {
+        "languages": languages,
+        "words_per_language": words_per_language,
+        "users": users,
+        "statistics": statistics_total,
+        "pareto_alpha": pareto_alpha,
+        "due_share": due_share,
+        "skipped_share": skipped_share,
+        "seed": seed,
+        "indexes": with_indexes,
+    }
+    logger.info(f"Seeded benchmark dataset: {manifest}")
+    return manifest
+
+
+async def load_targets(db: AsyncIOMotorDatabase, statistics_per_user: int = 200) -> List[Dict[str, Any]]:
+    """
+    Load (user, language, studied word IDs) tuples used by the load generator.
+
+    Args:
+        db: Benchmark database
+        statistics_per_user: Maximum number of word IDs kept per user and language
+
+    Returns:
+        List of targets with user_id, language_id and word_ids
+    """
+    pipeline = [
+        {"$group": {
+            "_id": {"user_id": "$user_id", "language_id": "$language_id"},
+            "word_ids": {"$push": "$word_id"},
+        }},
+        {"$project": {"word_ids": {"$slice": ["$word_ids", statistics_per_user]}}},
+    ]
+    targets = []
+    async for document in db.user_statistics.aggregate(pipeline, allowDiskUse=True):
+        targets.append({
+            "user_id": document["_id"]["user_id"],
+            "language_id": document["_id"]["language_id"],
+            "word_ids": document["word_ids"],
+        })
+    return targets
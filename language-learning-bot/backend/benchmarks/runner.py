@@ -0,0 +1,318 @@
+"""
+Load generator driving the backend API through its HTTP interface.
+
+Virtual users run the study loop (get_study_words -> update_score ->
+get_user_progress) mixed with stats, export and upload requests at a
+configurable concurrency. Latencies are recorded per operation and
+summarized as p50/p95/p99 and throughput.
+"""
+
+import asyncio
+import io
+import logging
+import random
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Веса операций в смешанной нагрузке (study loop считается одной итерацией)
+DEFAULT_MIX = {
+    "study_loop": 0.85,
+    "stats": 0.10,
+    "export": 0.04,
+    "upload": 0.01,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of pre-sorted values.
+
+    Args:
+        sorted_values: Values sorted ascending
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        Percentile value or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """Collects per-operation latencies and errors."""
+
+    def __init__(self):
+        """Initialize empty samples."""
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[str, Dict[int, int]] = {}
+
+    def record(self, operation: str, seconds: float, status: int) -> None:
+        """
+        Record one request.
+
+        Args:
+            operation: Operation name
+            seconds: Request latency
+            status: HTTP status code (0 for transport errors)
+        """
+        self.samples.setdefault(operation, []).append(seconds)
+        codes = self.status_codes.setdefault(operation, {})
+        codes[status] = codes.get(status, 0) + 1
+        if status == 0 or status >= 400:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Summarize recorded latencies.
+
+        Args:
+            elapsed: Wall time of the run in seconds
+
+        Returns:
+            Per-operation statistics in milliseconds plus totals
+        """
+        operations = {}
+        total = 0
+        for operation, values in sorted(self.samples.items()):
+            ordered = sorted(values)
+            total += len(ordered)
+            operations[operation] = {
+                "count": len(ordered),
+                "errors": self.errors.get(operation, 0),
+                "status_codes": {str(code): count for code, count in sorted(self.status_codes[operation].items())},
+                "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return {
+            "elapsed_seconds": elapsed,
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "operations": operations,
+        }
+
+
+def _build_upload_file(rows: int, rng: random.Random) -> bytes:
+    """Build an in-memory xlsx file in the layout expected by the upload route."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["№", "Слово", "Перевод", "Транскрипция"])
+    for number in range(1, rows + 1):
+        sheet.append([number, f"upload{number}_{rng.randint(0, 9999)}", f"перевод {number}", "[-]"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class LoadRunner:
+    """Runs virtual users against the API and records latencies."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        targets: List[Dict[str, Any]],
+        api_prefix: str = "/api",
+        concurrency: int = 16,
+        duration: Optional[float] = 30.0,
+        iterations: Optional[int] = None,
+        study_limit: int = 20,
+        scores_per_loop: int = 5,
+        mix: Optional[Dict[str, float]] = None,
+        upload_rows: int = 500,
+        upload_language_id: Optional[str] = None,
+        seed: int = 42
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            client: HTTP client bound to the app (ASGI transport or base URL)
+            targets: (user, language, word IDs) tuples from dataset.load_targets
+            api_prefix: API prefix of the backend
+            concurrency: Number of concurrent virtual users
+            duration: Run time in seconds (ignored when iterations is set)
+            iterations: Total number of scenario iterations
+            study_limit: limit passed to get_study_words
+            scores_per_loop: Number of update_score calls per study loop
+            mix: Operation weights (see DEFAULT_MIX)
+            upload_rows: Rows in the uploaded xlsx file
+            upload_language_id: Language for uploads (uploads skipped if None)
+            seed: Random seed
+        """
+        self.client = client
+        self.targets = targets
+        self.api_prefix = api_prefix
+        self.concurrency = concurrency
+        self.duration = duration
+        self.iterations = iterations
+        self.study_limit = study_limit
+        self.scores_per_loop = scores_per_loop
+        self.mix = dict(mix or DEFAULT_MIX)
+        if upload_language_id is None:
+            self.mix.pop("upload", None)
+        self.upload_rows = upload_rows
+        self.upload_language_id = upload_language_id
+        self.rng = random.Random(seed)
+        self.recorder = LatencyRecorder()
+        self._upload_file: Optional[bytes] = None
+        self._remaining = iterations
+
+    async def _request(self, operation: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Send one request and record its latency."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"{self.api_prefix}{path}", **kwargs)
+            self.recorder.record(operation, time.perf_counter() - start, response.status_code)
+            return response
+        except Exception as e:
+            # В режиме ASGI исключения приложения доходят до клиента - считаем их ошибками запроса
+            self.recorder.record(operation, time.perf_counter() - start, 0)
+            logger.warning(f"{operation} failed: {e}")
+            return None
+
+    async def study_loop(self, target: Dict[str, Any]) -> None:
+        """One iteration of the bot study loop for a user."""
+        user_id, language_id = target["user_id"], target["language_id"]
+        await self._request(
+            "get_study_words", "GET", f"/users/{user_id}/languages/{language_id}/study",
+            params={"start_word": 1, "skip_marked": "true", "use_check_date": "true", "limit": self.study_limit},
+        )
+        word_ids = target["word_ids"]
+        for word_id in self.rng.sample(word_ids, k=min(self.scores_per_loop, len(word_ids))):
+            score = 1 if self.rng.random() < 0.7 else 0
+            await self._request("update_score", "PUT", f"/users/{user_id}/statistics/{word_id}/score/{score}")
+        await self._request("get_user_progress", "GET", f"/users/{user_id}/languages/{language_id}/progress")
+
+    async def stats(self, target: Dict[str, Any]) -> None:
+        """Statistics screens of the bot."""
+        user_id, language_id = target["user_id"], target["language_id"]
+        await self._request("statistics_count", "GET", f"/users/{user_id}/statistics/count",
+                            params={"language_id": language_id})
+        await self._request("language_active_users", "GET", f"/languages/{language_id}/users/count")
+        await self._request("language_word_count", "GET", f"/languages/{language_id}/count")
+
+    async def export(self, target: Dict[str, Any]) -> None:
+        """Admin export of a word range."""
+        start_word = self.rng.randint(1, 1000)
+        await self._request("export_json", "GET", f"/languages/{target['language_id']}/export",
+                            params={"format": "json", "start_word": start_word, "end_word": start_word + 999})
+
+    async def upload(self, target: Dict[str, Any]) -> None:
+        """Admin upload of an xlsx file into the dedicated upload language."""
+        if self._upload_file is None:
+            self._upload_file = _build_upload_file(self.upload_rows, self.rng)
+        files = {"file": ("bench.xlsx", self._upload_file,
+                          "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        data = {"column_word": 1, "column_translation": 2, "column_transcription": 3,
+                "column_number": 0, "start_row": 1, "clear_existing": "true"}
+        await self._request("upload_xlsx", "POST", f"/languages/{self.upload_language_id}/upload",
+                            files=files, data=data)
+
+    def _next_operation(self) -> str:
+        operations = list(self.mix.keys())
+        return self.rng.choices(operations, weights=[self.mix[name] for name in operations])[0]
+
+    def _take_iteration(self) -> bool:
+        if self._remaining is None:
+            return True
+        if self._remaining <= 0:
+            return False
+        self._remaining -= 1
+        return True
+
+    async def _virtual_user(self, deadline: Optional[float]) -> None:
+        while self._take_iteration():
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            target = self.rng.choice(self.targets)
+            await getattr(self, self._next_operation())(target)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run all virtual users until the duration or iteration budget is spent.
+
+        Returns:
+            Latency summary (see LatencyRecorder.summary)
+        """
+        if not self.targets:
+            raise ValueError("No benchmark targets: seed the dataset first")
+        start = time.perf_counter()
+        deadline = None if self.iterations else start + (self.duration or 0)
+        await asyncio.gather(*(self._virtual_user(deadline) for _ in range(self.concurrency)))
+        return self.recorder.summary(time.perf_counter() - start)
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit of the working tree, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def build_report(summary: Dict[str, Any], config: Dict[str, Any], dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Assemble the JSON report stored for comparisons across commits.
+
+    Args:
+        summary: Latency summary
+        config: Runner configuration
+        dataset: Dataset manifest or counts
+
+    Returns:
+        Report dictionary
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_revision": git_revision(),
+        "config": config,
+        "dataset": dataset,
+        "results": summary,
+    }
+
+
+def compare_reports(base: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Format a per-operation comparison of two reports.
+
+    Args:
+        base: Baseline report
+        current: Report to compare with the baseline
+
+    Returns:
+        Table lines
+    """
+    lines = [
+        f"base: {base.get('git_revision')}  current: {current.get('git_revision')}",
+        f"{'operation':<24}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>16}",
+    ]
+    base_ops = base["results"]["operations"]
+    for name, stats in current["results"]["operations"].items():
+        old = base_ops.get(name)
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            if old and old[key]:
+                change = (stats[key] - old[key]) / old[key] * 100
+                cells.append(f"{stats[key]:.1f} ({change:+.0f}%)")
+            else:
+                cells.append(f"{stats[key]:.1f}")
+        lines.append(f"{name:<24}{cells[0]:>18}{cells[1]:>18}{cells[2]:>18}{cells[3]:>16}")
+    return lines
@@ -0,0 +1,54 @@
+"""
+Tests for admin API routes
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import admin
+from app.db import slow_queries
+from app.db.slow_queries import SlowQuerySampler
+
+app = FastAPI()
+app.include_router(admin.router)
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def sampler(monkeypatch):
+    sampler = SlowQuerySampler(threshold_ms=50, explain_enabled=False)
+    monkeypatch.setattr(slow_queries, "slow_query_sampler", sampler)
+    return sampler
+
+
+class TestSlowQueriesRoutes:
+
+    def test_disabled_sampler(self, monkeypatch):
+        monkeypatch.setattr(slow_queries, "slow_query_sampler", None)
+
+        assert client.get("/admin/slow-queries").status_code == 404
+        assert client.delete("/admin/slow-queries").status_code == 404
+
+    def test_report(self, sampler):
+        sampler.record("find", "learning", {"find": "words", "filter": {"language_id": "1"}}, 300)
+        sampler.record("find", "learning", {"find": "users", "filter": {"telegram_id": 1}}, 100)
+
+        response = client.get("/admin/slow-queries", params={"limit": 1})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["threshold_ms"] == 50
+        assert data["total"] == 1
+        assert data["queries"][0]["collection"] == "words"
+        assert data["queries"][0]["suggested_index"] == [["language_id", 1]]
+
+    def test_invalid_limit(self, sampler):
+        assert client.get("/admin/slow-queries", params={"limit": 0}).status_code == 422
+
+    def test_reset(self, sampler):
+        sampler.record("find", "learning", {"find": "words", "filter": {}}, 300)
+
+        assert client.delete("/admin/slow-queries").status_code == 200
+        assert client.get("/admin/slow-queries").json()["total"] == 0
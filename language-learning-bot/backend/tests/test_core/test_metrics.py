@@ -0,0 +1,151 @@
+"""
+Tests for runtime metrics
+"""
+
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Counter, Histogram, MetricsMiddleware, MetricsRegistry, MongoCommandMetricsListener
+
+
+def make_client(registry: MetricsRegistry) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/api/languages/{language_id}")
+    async def get_language(language_id: str):
+        return {"id": language_id}
+
+    @app.get("/metrics")
+    async def metrics():
+        return registry.render()
+
+    return TestClient(app)
+
+
+def samples(text: str) -> dict:
+    """Metric lines of the exposition text: {"name{labels}": value}."""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            result[series] = float(value)
+    return result
+
+
+class TestMetricsMiddleware:
+
+    def test_route_template_label(self):
+        registry = MetricsRegistry()
+        client = make_client(registry)
+
+        client.get("/api/languages/1")
+        client.get("/api/languages/2")
+
+        values = samples(registry.render())
+        labels = 'method="GET",route="/api/languages/{language_id}",status="200"'
+        assert values[f"http_requests_total{{{labels}}}"] == 2
+        assert values[f"http_request_duration_seconds_count{{{labels}}}"] == 2
+        assert not any("/api/languages/1" in series for series in values)
+
+    def test_unmatched_label_for_404(self):
+        registry = MetricsRegistry()
+        client = make_client(registry)
+
+        assert client.get("/no/such/path").status_code == 404
+
+        values = samples(registry.render())
+        assert values['http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+        assert not any("/no/such/path" in series for series in values)
+
+    def test_excluded_paths_not_measured(self):
+        registry = MetricsRegistry()
+        client = make_client(registry)
+
+        client.get("/metrics")
+
+        assert "route=" not in registry.render()
+
+    def test_response_size(self):
+        registry = MetricsRegistry()
+        client = make_client(registry)
+
+        body = client.get("/api/languages/abc").content
+
+        values = samples(registry.render())
+        assert values['http_response_size_bytes_sum{method="GET",route="/api/languages/{language_id}"}'] == len(body)
+
+
+class TestExposition:
+
+    def test_histogram_format(self):
+        histogram = Histogram("latency_seconds", "Latency", ("route",), (0.1, 1, 2.5))
+        histogram.observe(("/a",), 0.05)
+        histogram.observe(("/a",), 0.5)
+        histogram.observe(("/a",), 10)
+
+        assert histogram.render() == [
+            "# HELP latency_seconds Latency",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{route="/a",le="0.1"} 1',
+            'latency_seconds_bucket{route="/a",le="1"} 2',
+            'latency_seconds_bucket{route="/a",le="2.5"} 2',
+            'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+            'latency_seconds_sum{route="/a"} 10.55',
+            'latency_seconds_count{route="/a"} 3',
+        ]
+
+    def test_counter_format_and_label_escaping(self):
+        counter = Counter("requests_total", "Requests", ("route",))
+        counter.inc(('/a"b\\',), 2)
+
+        assert counter.render() == [
+            "# HELP requests_total Requests",
+            "# TYPE requests_total counter",
+            'requests_total{route="/a\\"b\\\\"} 2',
+        ]
+
+    def test_registry_render_ends_with_newline(self):
+        text = MetricsRegistry().render()
+
+        assert text.endswith("\n")
+        assert "# TYPE http_requests_total counter" in text
+        assert "# TYPE mongodb_command_duration_seconds histogram" in text
+
+
+class TestMongoCommandMetricsListener:
+
+    def test_find_and_get_more_by_collection(self):
+        registry = MetricsRegistry()
+        listener = MongoCommandMetricsListener(registry)
+
+        listener.started(SimpleNamespace(command={"find": "words"}, command_name="find", request_id=1))
+        listener.succeeded(SimpleNamespace(
+            command_name="find", request_id=1, duration_micros=2000,
+            reply={"cursor": {"firstBatch": [{}, {}, {}]}}
+        ))
+        listener.started(SimpleNamespace(command={"getMore": 7, "collection": "words"}, command_name="getMore", request_id=2))
+        listener.succeeded(SimpleNamespace(
+            command_name="getMore", request_id=2, duration_micros=1000, reply={"cursor": {"nextBatch": [{}]}}
+        ))
+
+        values = samples(registry.render())
+        assert values['mongodb_command_documents_total{collection="words",command="find"}'] == 3
+        assert values['mongodb_command_documents_total{collection="words",command="getMore"}'] == 1
+        assert values['mongodb_command_duration_seconds_sum{collection="words",command="find"}'] == 0.002
+
+    def test_failed_command(self):
+        registry = MetricsRegistry()
+        listener = MongoCommandMetricsListener(registry)
+
+        listener.started(SimpleNamespace(command={"delete": "user_statistics"}, command_name="delete", request_id=3))
+        listener.failed(SimpleNamespace(command_name="delete", request_id=3, duration_micros=500))
+        listener.started(SimpleNamespace(command={"ping": 1}, command_name="ping", request_id=4))
+        listener.succeeded(SimpleNamespace(command_name="ping", request_id=4, duration_micros=100, reply={"ok": 1}))
+
+        values = samples(registry.render())
+        assert values['mongodb_command_failures_total{collection="user_statistics",command="delete"}'] == 1
+        assert values['mongodb_command_duration_seconds_count{collection="-",command="ping"}'] == 1
+        assert listener._collections == {}
@@ -0,0 +1,112 @@
+"""
+Tests for batched maintenance jobs
+"""
+
+import time
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from app.db.maintenance import (
+    CHECKPOINTS_COLLECTION,
+    INTEGRITY_CHECKPOINT_ID,
+    STATUS_COMPLETED,
+    MaintenanceJobManager,
+    get_integrity_report,
+)
+
+ORPHANS = 5
+
+
+@pytest_asyncio.fixture
+async def db():
+    """25 statistics, the first ORPHANS of them (in _id order) point to deleted words."""
+    db = AsyncMongoMockClient()["test_maintenance"]
+    word_ids = [ObjectId() for _ in range(25)]
+    await db.words.insert_many([{"_id": word_id} for word_id in word_ids[ORPHANS:]])
+    await db.user_statistics.insert_many([{"_id": ObjectId(), "word_id": str(word_id)} for word_id in word_ids])
+    return db
+
+
+def make_manager(**settings) -> MaintenanceJobManager:
+    return MaintenanceJobManager(**{"integrity_batch_size": 10, "max_batches_per_second": 0, **settings})
+
+
+async def run(manager, db, **params):
+    job = manager.start_integrity_scan(db, **params)
+    await job.task
+    return job
+
+
+@pytest.mark.asyncio
+async def test_integrity_scan_in_batches(db):
+    job = await run(make_manager(), db)
+
+    assert job.status == STATUS_COMPLETED
+    assert job.batches == 3
+    assert job.counters == {"scanned": 25, "orphaned_found": ORPHANS, "orphaned_deleted": 0, "cycles_completed": 1}
+    report = await get_integrity_report(db)
+    assert report["complete"] is True
+    assert report["total_statistics"] == 25
+    assert report["orphaned_statistics"] == ORPHANS
+    assert await db.user_statistics.count_documents({}) == 25
+
+
+@pytest.mark.asyncio
+async def test_integrity_scan_throttled(db):
+    started = time.monotonic()
+    job = await run(make_manager(max_batches_per_second=20), db)
+
+    # 3 пакета и пустой завершающий запрос, не чаще 20 в секунду
+    assert job.batches == 3
+    assert time.monotonic() - started >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_integrity_scan_resumes_from_checkpoint(db):
+    manager = make_manager()
+
+    first = await run(manager, db, max_batches=1)
+    state = await db[CHECKPOINTS_COLLECTION].find_one({"_id": INTEGRITY_CHECKPOINT_ID})
+    assert first.processed == 10
+    assert state["cursor"]["scanned"] == 10
+    assert (await get_integrity_report(db))["scan_checkpoint"] == first.checkpoint
+
+    second = await run(manager, db)
+    assert second.counters["scanned"] == 15
+    assert second.processed == 25
+    report = await get_integrity_report(db)
+    assert report["complete"] is True
+    assert report["total_statistics"] == 25
+
+
+@pytest.mark.asyncio
+async def test_deleting_scan_restarts_cycle_begun_without_deletion(db):
+    manager = make_manager()
+    await run(manager, db, max_batches=1)
+
+    job = await run(manager, db, delete_orphans=True)
+
+    # Мертвые ссылки в уже пройденном пакете тоже удалены
+    assert job.counters["scanned"] == 25
+    assert job.counters["orphaned_deleted"] == ORPHANS
+    assert await db.user_statistics.count_documents({}) == 25 - ORPHANS
+
+
+@pytest.mark.asyncio
+async def test_deleting_scan_queued_after_running_scan(db):
+    manager = make_manager(max_batches_per_second=50)
+    scan = manager.start_integrity_scan(db)
+
+    cleanup = manager.start_integrity_scan(db, delete_orphans=True)
+    assert cleanup is not scan
+    assert manager.start_integrity_scan(db, delete_orphans=True) is cleanup
+    assert manager.start_integrity_scan(db) is scan
+
+    await cleanup.task
+    assert scan.status == STATUS_COMPLETED
+    assert scan.started_at <= scan.finished_at <= cleanup.started_at
+    assert cleanup.counters["orphaned_deleted"] == ORPHANS
+    assert await db.user_statistics.count_documents({}) == 25 - ORPHANS
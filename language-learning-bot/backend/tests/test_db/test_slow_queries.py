@@ -0,0 +1,176 @@
+"""
+Tests for the slow query sampler
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.slow_queries import SlowQuerySampler, suggest_index, summarize_explain
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}},
+    "executionStats": {"totalDocsExamined": 5000, "totalKeysExamined": 0, "nReturned": 10, "executionTimeMillis": 120},
+}
+
+
+class FakeDatabase:
+    """Motor database stub answering explain commands."""
+
+    def __init__(self, result):
+        self.result = result
+        self.commands = []
+        self.client = {"learning": self}
+
+    async def command(self, command):
+        self.commands.append(command)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def find_command(language_id, skip=0):
+    return {"find": "words", "filter": {"language_id": language_id, "word_number": {"$gte": skip}},
+            "sort": {"word_number": 1}, "lsid": {"id": "session"}, "$db": "learning"}
+
+
+class TestRecord:
+
+    def test_listener_records_only_slow_read_commands(self):
+        sampler = SlowQuerySampler(threshold_ms=100, explain_enabled=False)
+
+        for request_id, (name, micros) in enumerate([("find", 150_000), ("find", 50_000), ("insert", 500_000)]):
+            sampler.started(SimpleNamespace(command_name=name, request_id=request_id,
+                                            database_name="learning", command=find_command("1")))
+            sampler.succeeded(SimpleNamespace(request_id=request_id, duration_micros=micros))
+        sampler.started(SimpleNamespace(command_name="find", request_id=9, database_name="learning", command={}))
+        sampler.failed(SimpleNamespace(request_id=9))
+
+        report = sampler.get_report()
+        assert len(report) == 1
+        assert report[0]["count"] == 1
+        assert report[0]["max_ms"] == 150
+        assert sampler._pending == {}
+
+    def test_same_shape_with_different_values_grouped(self):
+        sampler = SlowQuerySampler(explain_enabled=False)
+
+        sampler.record("find", "learning", find_command("1", skip=0), 200)
+        sampler.record("find", "learning", find_command("2", skip=50), 400)
+        sampler.record("find", "learning", {"find": "words", "filter": {"word_number": 5}}, 300)
+
+        report = sampler.get_report()
+        assert [entry["count"] for entry in report] == [2, 1]
+        grouped = report[0]
+        assert grouped["collection"] == "words"
+        assert grouped["total_ms"] == 600
+        assert grouped["avg_ms"] == 300
+        assert "'1'" not in grouped["shape"] and "lsid" not in grouped["shape"]
+        assert grouped["shape"] == repr({
+            "filter": {"language_id": "?", "word_number": {"$gte": "?"}},
+            "sort": {"word_number": "?"},
+        })
+
+    def test_in_list_length_does_not_change_shape(self):
+        sampler = SlowQuerySampler(explain_enabled=False)
+
+        sampler.record("find", "learning", {"find": "user_statistics", "filter": {"word_id": {"$in": ["a"]}}}, 200)
+        sampler.record("find", "learning", {"find": "user_statistics", "filter": {"word_id": {"$in": ["a", "b", "c"]}}}, 200)
+
+        assert len(sampler.get_report()) == 1
+
+    def test_report_ordered_by_total_time_and_limited(self):
+        sampler = SlowQuerySampler(top_n=2, explain_enabled=False)
+        for index, duration in enumerate([100, 900, 500]):
+            sampler.record("find", "learning", {"find": f"c{index}", "filter": {}}, duration)
+
+        assert [entry["collection"] for entry in sampler.get_report()] == ["c1", "c2"]
+        assert len(sampler.get_report(limit=3)) == 3
+        sampler.reset()
+        assert sampler.get_report() == []
+
+
+class TestSuggestIndex:
+
+    def test_equality_sort_range_order(self):
+        command = {"filter": {"created_at": {"$gt": 1}, "language_id": "1", "user_id": {"$in": [1, 2]}},
+                   "sort": {"word_number": -1}}
+
+        assert suggest_index("find", command) == [
+            ("language_id", 1), ("user_id", 1), ("word_number", -1), ("created_at", 1)
+        ]
+
+    def test_aggregate_uses_leading_match_and_sort(self):
+        command = {"pipeline": [{"$match": {"language_id": "1"}}, {"$sort": {"word_number": 1}}, {"$limit": 10}]}
+
+        assert suggest_index("aggregate", command) == [("language_id", 1), ("word_number", 1)]
+
+    def test_nothing_to_suggest(self):
+        assert suggest_index("find", {"filter": {}}) is None
+        assert suggest_index("aggregate", {"pipeline": [{"$group": {"_id": "$x"}}]}) is None
+
+
+class TestSummarizeExplain:
+
+    def test_find_plan(self):
+        summary = summarize_explain({
+            "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "language_id_1"}}},
+            "executionStats": {"totalDocsExamined": 10, "totalKeysExamined": 10, "nReturned": 10, "executionTimeMillis": 1},
+        })
+
+        assert summary == {"stages": ["FETCH", "IXSCAN"], "indexes": ["language_id_1"], "docs_examined": 10,
+                           "keys_examined": 10, "returned": 10, "execution_time_ms": 1}
+
+    def test_aggregate_plan_in_cursor_stage(self):
+        summary = summarize_explain({"stages": [{"$cursor": COLLSCAN_EXPLAIN}, {"$group": {}}]})
+
+        assert summary["stages"] == ["SORT", "COLLSCAN"]
+        assert summary["docs_examined"] == 5000
+
+    def test_findings(self):
+        sampler = SlowQuerySampler()
+
+        findings = sampler._findings(summarize_explain(COLLSCAN_EXPLAIN))
+
+        assert findings == ["COLLSCAN", "docsExamined=5000", "docsExamined/nReturned=500.0", "in-memory SORT"]
+
+
+class TestExplain:
+
+    @pytest.mark.asyncio
+    async def test_explain_runs_once_per_interval_on_command_copy(self):
+        database = FakeDatabase(COLLSCAN_EXPLAIN)
+        sampler = SlowQuerySampler(explain_interval_seconds=300)
+        sampler.start(database, asyncio.get_running_loop())
+
+        sampler.record("find", "learning", find_command("1"), 200)
+        sampler.record("find", "learning", find_command("2"), 200)
+        await asyncio.sleep(0.01)
+
+        assert len(database.commands) == 1
+        explained = database.commands[0]
+        assert explained["verbosity"] == "executionStats"
+        assert "lsid" not in explained["explain"] and "$db" not in explained["explain"]
+        entry = sampler.get_report()[0]
+        assert entry["explain"]["stages"] == ["SORT", "COLLSCAN"]
+        assert "COLLSCAN" in entry["findings"]
+        assert entry["suggested_index"] == [("language_id", 1), ("word_number", 1)]
+
+    @pytest.mark.asyncio
+    async def test_write_pipelines_and_failures_not_explained(self):
+        database = FakeDatabase(RuntimeError("not authorized"))
+        sampler = SlowQuerySampler(explain_interval_seconds=0)
+        sampler.start(database, asyncio.get_running_loop())
+
+        sampler.record("aggregate", "learning", {"aggregate": "words", "pipeline": [{"$out": "copy"}]}, 200)
+        sampler.record("find", "learning", find_command("1"), 200)
+        await asyncio.sleep(0.01)
+
+        assert len(database.commands) == 1
+        entry = next(entry for entry in sampler.get_report() if entry["command"] == "find")
+        assert entry["explain"] is None
+        # После неудачи explain можно запустить снова
+        sampler.record("find", "learning", find_command("1"), 200)
+        await asyncio.sleep(0.01)
+        assert len(database.commands) == 2
@@ -0,0 +1,148 @@
+"""
+Tests for the font coverage index and font selection in common.utils.font_utils.
+"""
+
+import os
+
+import pytest
+from PIL import ImageFont
+
+from common.utils.font_utils import FontCoverageIndex, FontManager
+
+
+class FakeCmapReader:
+    """Возвращает заданное покрытие и считает чтения cmap."""
+
+    def __init__(self, coverage):
+        self.coverage = coverage
+        self.calls = []
+
+    def __call__(self, font_path):
+        self.calls.append(font_path)
+        return [ord(ch) for ch in self.coverage[os.path.basename(font_path)]]
+
+
+@pytest.fixture
+def fonts(tmp_path):
+    paths = {}
+    for name in ("latin.ttf", "cjk.otf"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        paths[name] = str(path)
+    return paths
+
+
+@pytest.fixture
+def reader():
+    return FakeCmapReader({"latin.ttf": "abcxué", "cjk.otf": "学习得abc"})
+
+
+def test_coverage_is_stored_on_disk_and_reused(tmp_path, fonts, reader):
+    index_path = str(tmp_path / "index" / "coverage.json")
+    index = FontCoverageIndex(index_path, read_codepoints=reader)
+
+    assert index.supports(fonts["cjk.otf"], "学习")
+    assert not index.supports(fonts["latin.ttf"], "学")
+    index.save()
+
+    reloaded = FontCoverageIndex(index_path, read_codepoints=reader)
+    assert reloaded.supports(fonts["cjk.otf"], "学 习")
+    assert reloaded.missing(fonts["latin.ttf"], "xué学") == {ord("学")}
+    # Второй экземпляр не читает cmap повторно
+    assert len(reader.calls) == 2
+
+
+def test_coverage_is_rebuilt_when_font_changes(tmp_path, fonts, reader):
+    index = FontCoverageIndex(str(tmp_path / "coverage.json"), read_codepoints=reader)
+    index.coverage(fonts["latin.ttf"])
+
+    reader.coverage["latin.ttf"] = "abc学"
+    with open(fonts["latin.ttf"], "ab") as file:
+        file.write(b"changed")
+
+    assert index.supports(fonts["latin.ttf"], "学")
+    assert reader.calls == [fonts["latin.ttf"], fonts["latin.ttf"]]
+
+
+def test_missing_font_has_empty_coverage(tmp_path, reader):
+    index = FontCoverageIndex(None, read_codepoints=reader)
+
+    assert index.coverage(str(tmp_path / "missing.ttf")) == frozenset()
+    assert reader.calls == []
+
+
+def test_select_font_path_picks_first_font_covering_text(fonts, reader, monkeypatch):
+    manager = FontManager(FontCoverageIndex(None, read_codepoints=reader))
+    monkeypatch.setattr(manager, "_downloaded_font_path", lambda: fonts["latin.ttf"])
+    monkeypatch.setattr(manager, "get_unicode_font_paths", lambda: [fonts["cjk.otf"]])
+    monkeypatch.setattr(manager, "_find_all_system_fonts", lambda: [])
+
+    assert manager.select_font_path("xué") == fonts["latin.ttf"]
+    assert manager.select_font_path("学习") == fonts["cjk.otf"]
+    # По умолчанию проверяется иероглиф
+    assert manager.select_font_path() == fonts["cjk.otf"]
+    # Ни один шрифт не покрывает весь текст - берется покрывающий больше символов
+    assert manager.select_font_path("学习é") == fonts["cjk.otf"]
+
+    reader.calls.clear()
+    assert manager.select_font_path("学习") == fonts["cjk.otf"]
+    assert reader.calls == []
+
+
+@pytest.fixture
+def measuring_manager(monkeypatch):
+    """FontManager со встроенным шрифтом Pillow вместо поиска системных шрифтов."""
+    manager = FontManager(FontCoverageIndex(None, read_codepoints=lambda path: []))
+    fonts = {}
+    monkeypatch.setattr(
+        manager, "get_font",
+        lambda size, font_path=None, text=None: fonts.setdefault(size, ImageFont.load_default(size))
+    )
+    return manager
+
+
+def linear_fit_size(manager, text, max_width, max_height, initial, minimum):
+    """Прежний подбор: уменьшение на 10%, пока текст не поместится."""
+    size = initial
+    while size >= minimum:
+        _, bbox = manager.measure_text(text, size)
+        if bbox[2] - bbox[0] <= max_width and bbox[3] - bbox[1] <= max_height:
+            return size
+        size = int(size * 0.9)
+    return minimum
+
+
+@pytest.mark.parametrize("text, max_width, max_height, initial", [
+    ("hello", 800, 200, 80),
+    ("[xué xí]", 740, 100, 20),
+    ("a considerably longer line of text", 300, 200, 120),
+    ("a considerably longer line of text", 300, 200, 1024),
+    ("tall", 1000, 30, 200),
+    ("x", 400, 400, 512),
+])
+def test_fit_font_size_matches_linear_search(measuring_manager, text, max_width, max_height, initial):
+    font, size, width, height, top = measuring_manager.fit_font_size(text, max_width, max_height, initial, 12)
+
+    assert size == linear_fit_size(measuring_manager, text, max_width, max_height, initial, 12)
+    assert width <= max_width and height <= max_height
+    _, bbox = measuring_manager.measure_text(text, size)
+    assert (width, height, top) == (bbox[2] - bbox[0], bbox[3] - bbox[1], bbox[1])
+
+
+def test_fit_font_size_returns_minimum_when_nothing_fits(measuring_manager):
+    _, size, width, _, _ = measuring_manager.fit_font_size("too long to fit anywhere", 10, 10, 80, 12)
+
+    assert size == 12
+    assert width > 10
+
+
+def test_fit_font_size_uses_few_measurements_and_bbox_cache(measuring_manager):
+    measuring_manager.fit_font_size("a considerably longer line of text", 300, 200, 1024, 12)
+    misses = measuring_manager.get_cache_info()["bbox_cache"]["misses"]
+    # Линейный поиск с шагом 10% от 1024 сделал бы больше 30 измерений
+    assert misses <= 6
+
+    measuring_manager.fit_font_size("a considerably longer line of text", 300, 200, 1024, 12)
+    bbox_cache = measuring_manager.get_cache_info()["bbox_cache"]
+    assert bbox_cache["misses"] == misses
+    assert bbox_cache["hits"] >= 1
@@ -4,8 +4,11 @@ Utilities for working with fonts in image generation.
 """
 
 import os
+import json
 import asyncio
-from typing import Optional, List, Tuple, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Dict, Any, Callable, FrozenSet, Iterable
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 from common.utils.logger import get_module_logger
@@ -19,17 +22,209 @@ def relative_path_to_absolute_path(relative_path: str) -> str:
     return os.path.abspath(os.path.join(os.path.dirname(__file__), relative_path))
 
 
+# Индекс покрытия шрифтов: путь к файлу можно переопределить переменной окружения
+FONT_COVERAGE_INDEX_ENV = "FONT_COVERAGE_INDEX"
+DEFAULT_FONT_COVERAGE_INDEX = os.path.join(Path.home(), ".cache", "language_learning_bot", "font_coverage.json")
+FONT_COVERAGE_INDEX_VERSION = 1
+
+FONT_EXTENSIONS = (".ttf", ".ttc", ".otf")
+
+# Каталоги системных шрифтов (вместо matplotlib.font_manager.findSystemFonts)
+SYSTEM_FONT_DIRS = [
+    "C:/Windows/Fonts",
+    "/System/Library/Fonts",
+    "/Library/Fonts",
+    os.path.join(Path.home(), "Library", "Fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.join(Path.home(), ".fonts"),
+    os.path.join(Path.home(), ".local", "share", "fonts"),
+]
+
+
+def read_cmap_codepoints(font_path: str) -> List[int]:
+    """
+    Read all codepoints mapped to a real glyph in the font cmap.
+    Читает все коды символов, для которых в cmap шрифта есть глиф.
+
+    Args:
+        font_path: Path to font file (for .ttc - the first face, as ImageFont.truetype)
+
+    Returns:
+        List of codepoints
+    """
+    face = freetype.Face(font_path)
+    return [charcode for charcode, glyph_index in face.get_chars() if glyph_index != 0]
+
+
+def _to_ranges(codepoints: Iterable[int]) -> List[List[int]]:
+    """Сжимает отсортированные коды в диапазоны [start, end] для хранения на диске."""
+    ranges: List[List[int]] = []
+    for codepoint in sorted(set(codepoints)):
+        if ranges and codepoint == ranges[-1][1] + 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+    return ranges
+
+
+def _from_ranges(ranges: List[List[int]]) -> FrozenSet[int]:
+    return frozenset(codepoint for start, end in ranges for codepoint in range(start, end + 1))
+
+
+class FontCoverageIndex:
+    """
+    Per-font codepoint coverage built once from the cmap and stored on disk.
+    Индекс покрытия шрифтов: множество кодов символов каждого шрифта.
+
+    Entries are invalidated by font file mtime and size, so the cmap is read
+    only for new or changed fonts; otherwise checking a word is a set lookup.
+    """
+
+    def __init__(
+        self,
+        index_path: Optional[str] = None,
+        read_codepoints: Callable[[str], Iterable[int]] = read_cmap_codepoints
+    ):
+        """
+        Initialize coverage index.
+
+        Args:
+            index_path: JSON file with the index (None - only in memory)
+            read_codepoints: Reads codepoints of a font file
+        """
+        self.index_path = index_path
+        self._read_codepoints = read_codepoints
+        self._lock = threading.Lock()
+        # font_path -> {"mtime_ns", "size", "ranges"}; множества строятся лениво
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._coverage: Dict[str, FrozenSet[int]] = {}
+        self._dirty = False
+        self._stats = {"hits": 0, "builds": 0, "failures": 0}
+        self._load()
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == FONT_COVERAGE_INDEX_VERSION:
+                self._entries = data.get("fonts", {})
+                logger.debug(f"Loaded font coverage index: {len(self._entries)} fonts from {self.index_path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load font coverage index {self.index_path}: {e}")
+
+    def save(self):
+        """
+        Save index to disk if it changed.
+        Сохраняет индекс на диск, если он изменился (атомарная замена файла).
+        """
+        with self._lock:
+            if not self._dirty or not self.index_path:
+                return
+            data = {"version": FONT_COVERAGE_INDEX_VERSION, "fonts": self._entries}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not save font coverage index {self.index_path}: {e}")
+
+    def coverage(self, font_path: str) -> FrozenSet[int]:
+        """
+        Get codepoints covered by the font.
+        Получает множество кодов символов, которые есть в шрифте.
+
+        Args:
+            font_path: Path to font file
+
+        Returns:
+            Set of codepoints (empty if the file is missing or unreadable)
+        """
+        try:
+            stat = os.stat(font_path)
+        except OSError:
+            return frozenset()
+
+        with self._lock:
+            entry = self._entries.get(font_path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                coverage = self._coverage.get(font_path)
+                if coverage is None:
+                    coverage = self._coverage[font_path] = _from_ranges(entry["ranges"])
+                self._stats["hits"] += 1
+                return coverage
+
+        try:
+            codepoints = frozenset(self._read_codepoints(font_path))
+            self._stats["builds"] += 1
+        except Exception as e:
+            logger.debug(f"Could not read cmap of {font_path}: {e}")
+            codepoints = frozenset()
+            self._stats["failures"] += 1
+
+        with self._lock:
+            self._entries[font_path] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "ranges": _to_ranges(codepoints),
+            }
+            self._coverage[font_path] = codepoints
+            self._dirty = True
+        return codepoints
+
+    def missing(self, font_path: str, text: str) -> FrozenSet[int]:
+        """Коды символов текста (без пробельных), которых нет в шрифте."""
+        return frozenset(ord(char) for char in text if not char.isspace()) - self.coverage(font_path)
+
+    def supports(self, font_path: str, text: str) -> bool:
+        """Есть ли в шрифте все символы текста."""
+        return not self.missing(font_path, text)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {"indexed_fonts": len(self._entries), "index_path": self.index_path, **self._stats}
+
+
 class FontManager:
     """
     Font management utilities with Unicode support.
     Утилиты управления шрифтами с поддержкой Unicode.
     """
     
-    def __init__(self):
-        """Initialize font manager."""
+    # Символ для проверки поддержки CJK, если текст не передан
+    DEFAULT_TEST_CHARS = "得"
+    # Максимум запомненных выборов шрифта (по наборам символов слов)
+    MAX_SELECTION_CACHE = 4096
+    # Максимум запомненных bbox (текст, шрифт, размер)
+    MAX_BBOX_CACHE = 8192
+
+    def __init__(self, coverage_index: Optional[FontCoverageIndex] = None):
+        """
+        Initialize font manager.
+
+        Args:
+            coverage_index: Font coverage index (default - stored in FONT_COVERAGE_INDEX
+                or ~/.cache/language_learning_bot/font_coverage.json)
+        """
         self._font_cache: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
         self._font_paths_cache: Optional[List[str]] = None
+        self._system_fonts_cache: Optional[List[str]] = None
         self._default_font: Optional[ImageFont.ImageFont] = None
+        # (font_path or "auto", символы текста) -> выбранный файл шрифта
+        self._selection_cache: Dict[Tuple[str, FrozenSet[str]], Optional[str]] = {}
+        if coverage_index is None:
+            coverage_index = FontCoverageIndex(os.environ.get(FONT_COVERAGE_INDEX_ENV, DEFAULT_FONT_COVERAGE_INDEX))
+        self.coverage_index = coverage_index
+        # LRU (text, font file, size) -> bbox и один контекст рисования для измерений
+        self._bbox_cache: "OrderedDict[Tuple[str, str, int], Tuple[int, int, int, int]]" = OrderedDict()
+        self._bbox_lock = threading.Lock()
+        self._bbox_stats = {"hits": 0, "misses": 0}
+        self._scratch_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
         
     def get_unicode_font_paths(self) -> List[str]:
         """
@@ -103,84 +298,121 @@ class FontManager:
         return existing_paths
 
     def _has_real_glyph(self, font_path: str, char: str) -> bool:
-        try:
-            face = freetype.Face(font_path)
-            return face.get_char_index(ord(char)) != 0
-        except Exception:
-            return False
+        return ord(char) in self.coverage_index.coverage(font_path)
 
     def _supports_unicode(self, font_path: str, test_chars: list[str], min_supported: int = 1) -> bool:
-        supported = 0
-        for ch in test_chars:
-            logger.debug(f"font_path: {font_path}, ch: {ch}")
-            logger.debug(f"self._has_real_glyph(font_path, ch): {self._has_real_glyph(font_path, ch)}")
-            if self._has_real_glyph(font_path, ch):
-                supported += 1
-            if supported >= min_supported:
-                return True
-        return False
+        coverage = self.coverage_index.coverage(font_path)
+        supported = sum(1 for ch in test_chars if ord(ch) in coverage)
+        logger.debug(f"font_path: {font_path}, supported: {supported}/{len(test_chars)}")
+        return supported >= min_supported
 
     def _find_all_system_fonts(self) -> list[str]:
-        from matplotlib import font_manager
-        return list(set(font_manager.findSystemFonts(fontpaths=None, fontext='ttf')))
-        
-    def get_font(self, size: int, font_path: Optional[str] = None) -> Optional[ImageFont.ImageFont]:
-        cache_key = (font_path or "auto", size)
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
+        if self._system_fonts_cache is not None:
+            return self._system_fonts_cache
 
-        font = None
-        test_chars = ["得", ]
+        fonts = set()
+        for font_dir in SYSTEM_FONT_DIRS:
+            for root, _, files in os.walk(font_dir):
+                fonts.update(os.path.join(root, name) for name in files if name.lower().endswith(FONT_EXTENSIONS))
+
+        self._system_fonts_cache = sorted(fonts)
+        return self._system_fonts_cache
+
+    def _downloaded_font_path(self) -> str:
+        # font_path_candidate = os.path.abspath(os.path.join(os.getcwd(), "./fonts/noto_cjk/NotoSansCJK-Regular.ttc"))
+        return os.path.abspath(os.path.join(os.getcwd(), "./fonts/NotoSansSC-Regular/NotoSansSC-Regular.otf"))
+
+    def _iter_font_candidates(self, font_path: Optional[str] = None):
+        """Кандидаты в порядке предпочтения: заданный, скачанный, известные Unicode, все системные."""
+        if font_path and os.path.exists(font_path):
+            yield font_path
+        yield self._downloaded_font_path()
+        yield from self.get_unicode_font_paths()
+        logger.debug("Checking all system fonts...")
+        yield from self._find_all_system_fonts()
+
+    def select_font_path(self, text: Optional[str] = None, font_path: Optional[str] = None) -> Optional[str]:
+        """
+        Select a font file covering all characters of the text.
+        Выбирает файл шрифта, в котором есть все символы текста.
+
+        Uses the coverage index, so the choice is a set lookup per candidate.
+        If no font covers the whole text, the one covering most characters is used.
+
+        Args:
+            text: Text to render (default - a CJK test character)
+            font_path: Preferred font file path (optional)
+
+        Returns:
+            Font file path or None if no font covers any character
+        """
+        chars = frozenset(ch for ch in (text or self.DEFAULT_TEST_CHARS) if not ch.isspace())
+        if not chars:
+            chars = frozenset(self.DEFAULT_TEST_CHARS)
+        selection_key = (font_path or "auto", chars)
+        if selection_key in self._selection_cache:
+            return self._selection_cache[selection_key]
+
+        codepoints = frozenset(ord(ch) for ch in chars)
+        selected, best_covered = None, 0
+        for candidate in self._iter_font_candidates(font_path):
+            covered = len(codepoints & self.coverage_index.coverage(candidate))
+            if covered > best_covered:
+                selected, best_covered = candidate, covered
+            if covered == len(codepoints):
+                break
+
+        self.coverage_index.save()
+        if selected and best_covered < len(codepoints):
+            logger.warning(f"No font covers all characters of {''.join(sorted(chars))!r}, using {selected}")
+
+        if len(self._selection_cache) >= self.MAX_SELECTION_CACHE:
+            self._selection_cache.clear()
+        self._selection_cache[selection_key] = selected
+        return selected
 
+    def get_font(
+        self,
+        size: int,
+        font_path: Optional[str] = None,
+        text: Optional[str] = None
+    ) -> Optional[ImageFont.ImageFont]:
+        """
+        Get font of the given size supporting the text.
+        Получает шрифт заданного размера с поддержкой символов текста.
+
+        Args:
+            size: Font size
+            font_path: Preferred font file path (optional)
+            text: Text to render (default - a CJK test character)
+
+        Returns:
+            ImageFont object or None (default PIL font)
+        """
         logger.debug(f"searching font for {size} size")
 
         try:
-            # 1. Если задан конкретный путь
-            if font_path and os.path.exists(font_path):
-                if self._supports_unicode(font_path, test_chars):
-                    font = ImageFont.truetype(font_path, size)
-                    logger.info(f"Using specified font: {font_path} (size: {size})")
-
-            # 1.5. Попробовать шрифты из скачанных
-            if not font:
-                logger.debug(f"Current directory: {os.getcwd()}")
-
-                # font_path_candidate = os.path.abspath(os.path.join(os.getcwd(), "./fonts/noto_cjk/NotoSansCJK-Regular.ttc"))
-                font_path_candidate = os.path.abspath(os.path.join(os.getcwd(), "./fonts/NotoSansSC-Regular/NotoSansSC-Regular.otf"))
-                logger.debug(f"font_path_candidate: {font_path_candidate}")
-                
-                if self._supports_unicode(font_path_candidate, test_chars, min_supported=1):
-                    font = ImageFont.truetype(font_path_candidate, size)
-                    logger.debug(f"Using downloaded font: {font_path_candidate} (size: {size})")
-                   
-            # 2. Попробовать шрифты из get_unicode_font_paths
-            if not font:
-                for font_path_candidate in self.get_unicode_font_paths():
-                    if self._supports_unicode(font_path_candidate, test_chars, min_supported=1):
-                        font = ImageFont.truetype(font_path_candidate, size)
-                        logger.info(f"Using Unicode font: {font_path_candidate} (size: {size})")
-                        break
-
-            # 3. Проверить все системные шрифты
-            if not font:
-                logger.info("Scanning all system fonts...")
-                for font_path_candidate in self._find_all_system_fonts():
-                    if self._supports_unicode(font_path_candidate, test_chars, min_supported=1):
-                        font = ImageFont.truetype(font_path_candidate, size)
-                        logger.info(f"Found fallback Unicode font: {font_path_candidate} (size: {size})")
-                        break
-
-            # 4. Fallback
-            if not font:
-                logger.warning(f"No suitable font found, using default PIL font.")
-                font = None
-
+            selected_path = self.select_font_path(text, font_path)
         except Exception as e:
-            logger.error(f"Error loading font: {e}")
-            font = None
+            logger.error(f"Error selecting font: {e}")
+            selected_path = None
+
+        cache_key = (selected_path or "default", size)
+        if cache_key in self._font_cache:
+            return self._font_cache[cache_key]
+
+        font = None
+        if selected_path:
+            try:
+                font = ImageFont.truetype(selected_path, size)
+                logger.info(f"Using font: {selected_path} (size: {size})")
+            except Exception as e:
+                logger.error(f"Error loading font: {e}")
+        else:
+            logger.warning(f"No suitable font found, using default PIL font.")
 
         self._font_cache[cache_key] = font
-        logger.debug(f"font: {font}: {font_path or 'auto'} (size: {size})")
+        logger.debug(f"font: {font}: {selected_path or 'default'} (size: {size})")
         return font
 
     def _load_and_test_font(self, font_path: str, size: int) -> Optional[ImageFont.ImageFont]:
@@ -206,7 +438,7 @@ class FontManager:
             unicode_support_count = 0
             for test_char in test_chars:
                 try:
-                    if self.has_glyph(font_path, test_char):
+                    if self._has_real_glyph(font_path, test_char):
                         unicode_support_count += 1
                     
                         logger.info(f"Font {font_path}, test_char: {test_char}, unicode_support_count: {unicode_support_count}")
@@ -230,7 +462,12 @@ class FontManager:
             logger.debug(f"Could not load font {font_path}: {e}")
             return None
     
-    async def get_font_async(self, size: int, font_path: Optional[str] = None) -> ImageFont.ImageFont:
+    async def get_font_async(
+        self,
+        size: int,
+        font_path: Optional[str] = None,
+        text: Optional[str] = None
+    ) -> ImageFont.ImageFont:
         """
         Asynchronously get font with Unicode support.
         Асинхронно получает шрифт с поддержкой Unicode.
@@ -238,16 +475,54 @@ class FontManager:
         Args:
             size: Font size
             font_path: Specific font file path (optional)
+            text: Text to render (optional)
             
         Returns:
             ImageFont object with Unicode support
         """
         def _load_font():
-            return self.get_font(size, font_path)
+            return self.get_font(size, font_path, text)
         
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, _load_font)
     
+    def measure_text(
+        self,
+        text: str,
+        font_size: int,
+        font_path: Optional[str] = None
+    ) -> Tuple[Optional[ImageFont.ImageFont], Tuple[int, int, int, int]]:
+        """
+        Measure text bbox at the given font size.
+        Измеряет bbox текста при заданном размере шрифта.
+
+        Bboxes are memoized in an LRU by (text, font file, size).
+
+        Args:
+            text: Text to measure
+            font_size: Font size
+            font_path: Specific font file path (optional)
+
+        Returns:
+            (font, bbox) where bbox is (left, top, right, bottom) as in ImageDraw.textbbox
+        """
+        font = self.get_font(font_size, font_path, text)
+        cache_key = (text, getattr(font, "path", None) or "default", font_size)
+
+        with self._bbox_lock:
+            bbox = self._bbox_cache.get(cache_key)
+            if bbox is not None:
+                self._bbox_cache.move_to_end(cache_key)
+                self._bbox_stats["hits"] += 1
+                return font, bbox
+
+            self._bbox_stats["misses"] += 1
+            bbox = tuple(self._scratch_draw.textbbox((0, 0), text, font=font))
+            self._bbox_cache[cache_key] = bbox
+            if len(self._bbox_cache) > self.MAX_BBOX_CACHE:
+                self._bbox_cache.popitem(last=False)
+        return font, bbox
+
     async def calculate_text_size_async(
         self,
         text: str,
@@ -267,20 +542,101 @@ class FontManager:
             (width, height) of rendered text
         """
         def _calculate_size():
-            font = self.get_font(font_size, font_path)
-            
-            # Create temporary image to measure text
-            temp_image = Image.new('RGB', (1, 1))
-            draw = ImageDraw.Draw(temp_image)
-            
-            bbox = draw.textbbox((0, 0), text, font=font)
-            width = bbox[2] - bbox[0]
-            height = bbox[3] - bbox[1]
-            
-            return (width, height)
+            _, bbox = self.measure_text(text, font_size, font_path)
+            return (bbox[2] - bbox[0], bbox[3] - bbox[1])
         
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, _calculate_size)
+
+    @staticmethod
+    def font_size_ladder(initial_font_size: int, min_font_size: int) -> List[int]:
+        """Размеры шрифта, которые перебирает подбор: от начального с шагом -10%."""
+        sizes = []
+        current_font_size = initial_font_size
+        while current_font_size >= min_font_size:
+            sizes.append(current_font_size)
+            current_font_size = int(current_font_size * 0.9)
+        return sizes
+
+    def fit_font_size(
+        self,
+        text: str,
+        max_width: int,
+        max_height: int,
+        initial_font_size: int = 80,
+        min_font_size: int = 12,
+        font_path: Optional[str] = None
+    ) -> Tuple[Optional[ImageFont.ImageFont], int, int, int, int]:
+        """
+        Find the largest size of the -10% ladder at which the text fits.
+        Находит наибольший размер из ряда (начальный, -10%, ...), при котором текст помещается.
+
+        The result is the same as reducing the size by 10% until the text fits,
+        but the ladder is searched from an estimate (the initial size scaled by
+        the measured overflow) with galloping steps and a binary search, so a
+        long word takes a few measurements instead of one per step.
+
+        Args:
+            text: Text to fit
+            max_width: Maximum width
+            max_height: Maximum height
+            initial_font_size: Starting font size
+            min_font_size: Minimum font size
+            font_path: Specific font file path (optional)
+
+        Returns:
+            Tuple of (font, final_font_size, text_width, text_height, bbox_top)
+        """
+        def fits(font_size: int):
+            font, bbox = self.measure_text(text, font_size, font_path)
+            width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+            return width <= max_width and height <= max_height, (font, font_size, width, height, bbox[1])
+
+        sizes = self.font_size_ladder(initial_font_size, min_font_size)
+        if not sizes:
+            return fits(min_font_size)[1]
+
+        fitted, result = fits(sizes[0])
+        if fitted:
+            return result
+
+        # Оценка по пропорции: размер текста почти линейно зависит от размера шрифта
+        _, _, width, height, _ = result
+        scale = min(max_width / max(width, 1), max_height / max(height, 1))
+        estimate = initial_font_size * scale
+        # Ряд убывает: ищем первый индекс, где текст помещается, в (low, high]
+        low, high = 0, len(sizes)
+        best = None
+        probe = next((index for index, size in enumerate(sizes) if size <= estimate), len(sizes) - 1)
+        probe = max(probe, 1)
+
+        # Шаги от оценки с удвоением, пока не найдена граница помещается/не помещается
+        step = 1
+        while low < probe < high:
+            fitted, candidate = fits(sizes[probe])
+            if fitted:
+                best, high = candidate, probe
+                if probe - 1 == low:
+                    break
+                probe -= step
+            else:
+                low = probe
+                if best is not None:
+                    break
+                probe += step
+            step *= 2
+
+        # Бинарный поиск внутри оставшегося интервала
+        while high - low > 1:
+            probe = (low + high) // 2
+            fitted, candidate = fits(sizes[probe])
+            if fitted:
+                best, high = candidate, probe
+            else:
+                low = probe
+
+        # Ничего не помещается - минимальный размер
+        return best or fits(min_font_size)[1]
     
     async def auto_fit_font_size(
         self,
@@ -304,37 +660,10 @@ class FontManager:
             font_path: Specific font file path (optional)
             
         Returns:
-            Tuple of (font, final_font_size, text_width, text_height)
+            Tuple of (font, final_font_size, text_width, text_height, bbox_top)
         """
         def _fit_font():
-            current_font_size = initial_font_size
-            
-            while current_font_size >= min_font_size:
-                font = self.get_font(current_font_size, font_path)
-                
-                # Create temporary image to measure text
-                temp_image = Image.new('RGB', (1, 1))
-                draw = ImageDraw.Draw(temp_image)
-                
-                bbox = draw.textbbox((0, 0), text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                
-                if text_width <= max_width and text_height <= max_height:
-                    return font, current_font_size, text_width, text_height, bbox[1]
-                
-                # Reduce font size by 10%
-                current_font_size = int(current_font_size * 0.9)
-            
-            # Return minimum size if nothing fits
-            font = self.get_font(min_font_size, font_path)
-            temp_image = Image.new('RGB', (1, 1))
-            draw = ImageDraw.Draw(temp_image)
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            return font, min_font_size, text_width, text_height, bbox[1]
+            return self.fit_font_size(text, max_width, max_height, initial_font_size, min_font_size, font_path)
         
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, _fit_font)
@@ -342,6 +671,9 @@ class FontManager:
     def clear_cache(self):
         """Clear font cache."""
         self._font_cache.clear()
+        self._selection_cache.clear()
+        with self._bbox_lock:
+            self._bbox_cache.clear()
         logger.debug("Font cache cleared")
     
     def get_cache_info(self) -> Dict[str, Any]:
@@ -349,7 +681,9 @@ class FontManager:
         return {
             "cached_fonts": len(self._font_cache),
             "available_font_files": len(self.get_unicode_font_paths()),
-            "cache_keys": list(self._font_cache.keys())
+            "cache_keys": list(self._font_cache.keys()),
+            "coverage_index": self.coverage_index.get_stats(),
+            "bbox_cache": {"size": len(self._bbox_cache), **self._bbox_stats},
         }
 
 
@@ -4,9 +4,11 @@ This client is used by the frontend to communicate with the backend API,
 not directly with the database.
 """
 
+import copy
 import logging
 import os
-from typing import Dict, List, Optional, Any, Union
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple, Union
 
 import aiohttp
 from dotenv import load_dotenv
@@ -22,7 +24,15 @@ class APIClient:
     Client for interacting with the backend API.
     """
     
-    def __init__(self, base_url: str, api_prefix: str = "/api", timeout: int = 5, retry_count: int = 3):
+    def __init__(
+        self,
+        base_url: str,
+        api_prefix: str = "/api",
+        timeout: int = 5,
+        retry_count: int = 3,
+        etag_cache_enabled: bool = True,
+        etag_cache_size: int = 512
+    ):
         """
         Initialize API client.
         
@@ -31,13 +41,69 @@ class APIClient:
             api_prefix: Prefix for API endpoints
             timeout: Request timeout in seconds
             retry_count: Number of retry attempts for failed requests
+            etag_cache_enabled: Revalidate GET responses with If-None-Match
+            etag_cache_size: Maximum number of cached GET responses
         """
         self.base_url = base_url
         self.api_prefix = api_prefix
         self.timeout = timeout
         self.retry_count = retry_count
+        self.etag_cache_enabled = etag_cache_enabled
+        self.etag_cache_size = etag_cache_size
+        # Кэш GET-ответов с ETag: ключ запроса -> (etag, result)
+        self._etag_cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
         logger.info(f"Initialized API client with base URL: {self.base_url}{self.api_prefix}")
 
+    @staticmethod
+    def _etag_cache_key(url: str, params: Optional[Dict]) -> str:
+        """
+        Build a cache key for a GET request.
+        
+        Args:
+            url: Full request URL
+            params: Query parameters (already processed)
+            
+        Returns:
+            Cache key string
+        """
+        if not params:
+            return url
+        query = "&".join(f"{key}={params[key]}" for key in sorted(params))
+        return f"{url}?{query}"
+
+    def _get_cached_response(self, cache_key: str) -> Optional[Tuple[str, Any]]:
+        """
+        Get cached (etag, result) pair and mark it as recently used.
+        
+        Args:
+            cache_key: Cache key of the request
+            
+        Returns:
+            Tuple of (etag, result) or None if not cached
+        """
+        entry = self._etag_cache.get(cache_key)
+        if entry is not None:
+            self._etag_cache.move_to_end(cache_key)
+        return entry
+
+    def _store_cached_response(self, cache_key: str, etag: str, result: Any) -> None:
+        """
+        Store a GET result with its ETag, evicting the least recently used entry.
+        
+        Args:
+            cache_key: Cache key of the request
+            etag: ETag returned by the backend
+            result: Parsed response body
+        """
+        self._etag_cache[cache_key] = (etag, copy.deepcopy(result))
+        self._etag_cache.move_to_end(cache_key)
+        while len(self._etag_cache) > self.etag_cache_size:
+            self._etag_cache.popitem(last=False)
+
+    def clear_etag_cache(self) -> None:
+        """Drop all cached GET responses."""
+        self._etag_cache.clear()
+
     async def _make_request(
         self, 
         method: str, 
@@ -82,6 +148,16 @@ class APIClient:
                     processed_params[key] = value
             params = processed_params
         
+        # Условный GET: если ответ уже закэширован, просим бэкенд вернуть 304
+        cache_key = None
+        cached_entry = None
+        headers = None
+        if self.etag_cache_enabled and method == "GET":
+            cache_key = self._etag_cache_key(url, params)
+            cached_entry = self._get_cached_response(cache_key)
+            if cached_entry:
+                headers = {"If-None-Match": cached_entry[0]}
+        
         # Добавляем поддержку повторных попыток при ошибках
         for attempt in range(self.retry_count):
             try:
@@ -91,10 +167,19 @@ class APIClient:
                         url=url,
                         json=data,
                         params=params,
+                        headers=headers,
                         timeout=self.timeout
                     ) as response:
                         response_dict["status"] = response.status
                         
+                        if response.status == 304 and cached_entry:
+                            # Данные не изменились - отдаем копию из кэша как обычный 200
+                            logger.debug(f"Not modified: {cache_key}")
+                            response_dict["status"] = 200
+                            response_dict["result"] = copy.deepcopy(cached_entry[1])
+                            response_dict["success"] = True
+                            return response_dict
+                        
                         if response.status >= 400:
                             error_data = await response.json()
                             error_message = str(error_data)
@@ -114,6 +199,10 @@ class APIClient:
                         else:
                             response_dict["result"] = await response.text()
                         
+                        etag = response.headers.get("ETag") if cache_key else None
+                        if etag:
+                            self._store_cached_response(cache_key, etag, response_dict["result"])
+                        
                         response_dict["success"] = True
                         return response_dict
                 
@@ -2,11 +2,16 @@
 API client for writing image generation service.
 Клиент для взаимодействия с сервисом генерации картинок написания.
 UPDATED: Removed stub mode, configured for real service calls.
+
+By default the multipart endpoint is used: images arrive as raw WebP/PNG
+parts next to a JSON metadata part instead of base64 strings inside JSON.
+The JSON and single-image binary endpoints are still understood.
 """
 
 import io
 import asyncio
-from typing import Dict, Optional, Any
+import base64
+from typing import Dict, List, Optional, Any
 
 import aiohttp
 
@@ -29,7 +34,9 @@ class WritingImageClient:
         api_endpoint: str = "/api/generate-writing-image",
         timeout: int = 10,
         retry_count: int = 1,
-        retry_delay: int = 1
+        retry_delay: int = 1,
+        image_formats: Optional[List[str]] = None,
+        allow_cached_variant: bool = True
     ):
         """
         Initialize writing image client.
@@ -40,15 +47,77 @@ class WritingImageClient:
             timeout: Request timeout in seconds
             retry_count: Number of retry attempts
             retry_delay: Delay between retries in seconds
+            image_formats: Preferred image formats for binary responses (e.g. ["webp", "png"])
+            allow_cached_variant: Reuse any cached image of the same request (incl. pre-generated ones)
         """
         self.service_url = service_url
         self.api_endpoint = api_endpoint
         self.timeout = timeout
         self.retry_count = retry_count
         self.retry_delay = retry_delay
+        self.image_formats = list(image_formats or ["webp", "png"])
+        self.allow_cached_variant = allow_cached_variant
         
         logger.info(f"Initialized WritingImageClient with service URL: {self.service_url}")
 
+    def _accept_header(self) -> str:
+        """
+        Accept header: multipart/JSON envelopes and image formats by preference.
+        
+        Returns:
+            str: e.g. "multipart/mixed, image/webp, image/png;q=0.9, application/json;q=0.5"
+        """
+        image_ranges = [
+            f"image/{image_format}" if index == 0 else f"image/{image_format};q={max(0.1, 1 - index / 10):.1f}"
+            for index, image_format in enumerate(self.image_formats)
+        ]
+        return ", ".join(["multipart/mixed", *image_ranges, "application/json;q=0.5"])
+
+    @staticmethod
+    async def _read_multipart(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+        """
+        Read a multipart/mixed generation response.
+        Читает multipart ответ: JSON метаданные и изображения.
+        
+        Args:
+            response: Response of the multipart endpoint
+            
+        Returns:
+            Dict in the same shape as the decoded JSON response
+        """
+        metadata: Dict[str, Any] = {}
+        images: Dict[str, bytes] = {}
+        
+        reader = aiohttp.MultipartReader.from_response(response)
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            if part.name == "metadata":
+                metadata = await part.json()
+            else:
+                images[part.name] = bytes(await part.read())
+        
+        conditioning_images = {}
+        for key_type, methods in (metadata.get("conditioning_methods") or {}).items():
+            conditioning_images[key_type] = {
+                key_method: images.get(f"conditioning/{key_type}/{key_method}")
+                for key_method in methods
+            }
+        
+        return {
+            "generated_image": images.get("generated_image"),
+            "format": metadata.get("format"),
+            "success": metadata.get("success", False),
+            "status": metadata.get("status", None),
+            "base_image": images.get("base_image"),
+            "conditioning_images": conditioning_images,
+            "prompt_used": metadata.get("prompt_used", None),
+            "generation_metadata": metadata.get("generation_metadata", None),
+            "error": metadata.get("error", None),
+            "warnings": metadata.get("warnings", None),
+        }
+
     async def generate_writing_image(
         self, 
         word: str, 
@@ -73,7 +142,7 @@ class WritingImageClient:
                 "status": int,
                 "result": {
                     "generated_image": bytes,  # Image binary data
-                    "format": str,        # Image format (png, jpg)
+                    "format": str,        # Image format (webp, png)
                     "metadata": dict      # Additional metadata
                 },
                 "error": str
@@ -105,6 +174,7 @@ class WritingImageClient:
             "include_conditioning_images": include_conditioning_images,
             "include_prompt": include_prompt,
             "batch_size": batch_size,
+            "allow_cached_variant": self.allow_cached_variant,
         }
         if hint_writing:
             request_data["hint_writing"] = hint_writing
@@ -118,6 +188,7 @@ class WritingImageClient:
                     async with session.post(
                         url,
                         json=request_data,
+                        headers={"Accept": self._accept_header()},
                         timeout=self.timeout
                     ) as response:
                         response_dict["status"] = response.status
@@ -142,12 +213,37 @@ class WritingImageClient:
                             return response_dict
                         
                         # Check content type
-                        if response.content_type.startswith('image/'):
+                        if response.content_type.startswith('multipart/'):
+                            # Metadata and raw images in one multipart response
+                            try:
+                                result = await self._read_multipart(response)
+                            except Exception as read_error:
+                                logger.error(f"Failed to read multipart response: {read_error}")
+                                response_dict["error"] = f"Failed to read image data: {read_error}"
+                                return response_dict
+                            
+                            if not result["success"] or result["generated_image"] is None:
+                                error_message = result.get("error") or "Missing generated_image in response"
+                                logger.error(f"Service error: {error_message}")
+                                response_dict["error"] = error_message
+                                return response_dict
+                            
+                            response_dict["result"] = result
+                            logger.info(f"Received {result['format']} image, size: {len(result['generated_image'])} bytes")
+                        elif response.content_type.startswith('image/'):
                             # Binary image response
                             generated_image = await response.read()
                             response_dict["result"] = {
                                 "generated_image": generated_image,
                                 "format": response.content_type.split('/')[-1],
+                                "success": True,
+                                "status": "success",
+                                "base_image": None,
+                                "conditioning_images": {},
+                                "prompt_used": None,
+                                "generation_metadata": None,
+                                "error": None,
+                                "warnings": None,
                                 "metadata": {
                                     "word": word,
                                     "translation": translation,
@@ -162,12 +258,11 @@ class WritingImageClient:
                             # Writing Service возвращает данные напрямую, не в поле "result"
                             if json_data.get("success"):
                                 if "generated_image_base64" in json_data:
-                                    import base64
                                     try:
                                         generated_image = base64.b64decode(json_data["generated_image_base64"]) if json_data["generated_image_base64"] is not None else None
                                         base_image = base64.b64decode(json_data["base_image_base64"]) if json_data["base_image_base64"] is not None else None
                                         conditioning_images  = {}
-                                        for key_type in json_data["conditioning_images_base64"].keys():
+                                        for key_type in (json_data["conditioning_images_base64"] or {}).keys():
                                             conditioning_images[key_type] = {}
                                             for key_method in json_data["conditioning_images_base64"][key_type].keys():
                                                 conditioning_images[key_type][key_method] = base64.b64decode(json_data["conditioning_images_base64"][key_type][key_method]) if json_data["conditioning_images_base64"][key_type][key_method] is not None else None
@@ -241,6 +336,8 @@ def get_writing_image_client() -> WritingImageClient:
         timeout = 10
         retry_count = 2
         retry_delay = 1
+        image_formats = ["webp", "png"]
+        allow_cached_variant = True
         
         try:
             if hasattr(config_holder.cfg, 'writing_images'):
@@ -250,6 +347,8 @@ def get_writing_image_client() -> WritingImageClient:
                 timeout = config.get('timeout', timeout)
                 retry_count = config.get('retry_count', retry_count)
                 retry_delay = config.get('retry_delay', retry_delay)
+                image_formats = list(config.get('image_formats', image_formats))
+                allow_cached_variant = config.get('allow_cached_variant', allow_cached_variant)
         except Exception as e:
             logger.warning(f"Could not load writing image client config, using defaults: {e}")
         
@@ -258,7 +357,9 @@ def get_writing_image_client() -> WritingImageClient:
             api_endpoint=api_endpoint,
             timeout=timeout,
             retry_count=retry_count,
-            retry_delay=retry_delay
+            retry_delay=retry_delay,
+            image_formats=image_formats,
+            allow_cached_variant=allow_cached_variant
         )
     return _client_instance
 
@@ -20,7 +20,14 @@ from app.utils.word_data_utils import update_word_score
 from app.utils.callback_constants import CallbackData
 from app.bot.states.centralized_states import StudyStates
 from app.bot.handlers.study.study_words import show_study_word
-from app.utils.big_word_generator import generate_big_word
+from app.utils.big_word_generator import get_big_word_generator
+from app.utils.telegram_file_cache import (
+    answer_photo_by_file_id,
+    answer_photo_cached,
+    make_cache_key,
+    remember_photo_file_id,
+)
+from app.utils import config_holder
 from app.bot.keyboards.study_keyboards import create_word_image_keyboard, create_writing_image_keyboard
 from app.api.writing_image_client import get_writing_image_client
 from app.utils.settings_utils import is_writing_images_enabled, get_user_language_settings
@@ -239,21 +246,6 @@ async def process_show_big(
             return
         
         
-        # Generate word image
-        logger.info(f"Generating image for word: '{word_foreign}', transcription: '{transcription}'")
-        
-        image_buffer = await generate_big_word(
-            word=word_foreign,
-            transcription=transcription,
-        )
-        
-        # Create BufferedInputFile from BytesIO for Telegram
-        image_buffer.seek(0)  # Reset buffer position
-        input_file = BufferedInputFile(
-            file=image_buffer.read(),
-            filename=f"word_{word_foreign}.png"
-        )
-        
         # Prepare caption
         caption = ""
         
@@ -263,10 +255,19 @@ async def process_show_big(
         # Set state
         await state.set_state(StudyStates.viewing_word_image)
         
-        # Send image
+        # Send image: по сохраненному file_id без рендеринга и загрузки, иначе из кэша PNG или рендер
+        generator = get_big_word_generator()
+
+        async def render_word_image() -> bytes:
+            logger.info(f"Generating image for word: '{word_foreign}', transcription: '{transcription}'")
+            return await generator.get_image_bytes(word_foreign, transcription)
+
         await message.answer("🔍 Показываю крупное написание")
-        await message.answer_photo(
-            photo=input_file,
+        await answer_photo_cached(
+            message,
+            generator.cache_key(word_foreign, transcription),
+            render_word_image,
+            filename=f"word_{word_foreign}.png",
             caption=caption,
             reply_markup=keyboard,
             parse_mode="HTML"
@@ -281,6 +282,36 @@ async def process_show_big(
         await message.answer(error_msg)
 
 
+def _writing_image_file_key(word: str, translation: str, hint_writing: str):
+    """
+    Ключ file_id для картинки написания (None - повторное использование отключено).
+
+    Args:
+        word: Слово
+        translation: Перевод
+        hint_writing: Подсказка написания
+
+    Returns:
+        Tuple[Optional[str], Optional[float]]: Ключ и максимальный возраст file_id в секундах
+    """
+    reuse_cfg = {}
+    if hasattr(config_holder.cfg, 'writing_images'):
+        reuse_cfg = config_holder.cfg.writing_images.get('file_id_reuse', {}) or {}
+    if not reuse_cfg.get('enabled', True):
+        return None, None
+
+    ttl_hours = reuse_cfg.get('ttl_hours')
+    client = get_writing_image_client()
+    key = make_cache_key(
+        "writing_image",
+        word=word,
+        translation=translation or "",
+        hint_writing=hint_writing or "",
+        service=f"{client.service_url}{client.api_endpoint}",
+    )
+    return key, ttl_hours * 3600 if ttl_hours else None
+
+
 async def process_show_writing_image(
     message_or_callback, 
     state: FSMContext,
@@ -347,6 +378,25 @@ async def process_show_writing_image(
             await message.answer("❌ Слово на иностранном языке не найдено")
             return
 
+        # Картинка для этого слова и подсказки уже отправлялась - повторно используем file_id.
+        # В режиме отладки нужны base/conditioning изображения, поэтому генерируем заново.
+        file_key, file_max_age = (None, None) if show_debug else _writing_image_file_key(
+            word_foreign, translation, hint_writing
+        )
+        if file_key:
+            sent = await answer_photo_by_file_id(
+                message,
+                file_key,
+                file_max_age,
+                caption=f"🖼️ Картинка написания для: <b>{word_foreign}</b>\n\n",
+                reply_markup=create_writing_image_keyboard(),
+                parse_mode="HTML",
+            )
+            if sent is not None:
+                await state.set_state(StudyStates.viewing_writing_image)
+                logger.info(f"Sent cached writing image for: {word_foreign}")
+                return
+
         # Generate writing image using real service
         logger.info(f"Generating writing image for word: '{word_foreign}', translation: '{translation}'")
         
@@ -368,6 +418,7 @@ async def process_show_writing_image(
             return
         
         image_result = request_result["result"]
+        image_extension = image_result.get("format") or "png"
         
         # Get image data from result
         base_image = image_result["base_image"]
@@ -376,7 +427,7 @@ async def process_show_writing_image(
             image_buffer.seek(0)  # Reset buffer position
             input_file = BufferedInputFile(
                 file=image_buffer.read(),
-                filename=f"base_image_{word_foreign}.png"
+                filename=f"base_image_{word_foreign}.{image_extension}"
             )
 
             caption = f"base_image: <b>{word_foreign}</b>"
@@ -397,7 +448,7 @@ async def process_show_writing_image(
 
             for key_method, image in conditioning_images[key_type].items():
                 if image is not None:
-                    file = BufferedInputFile(image, filename=f"conditioning_{key_type}_{key_method}.png")
+                    file = BufferedInputFile(image, filename=f"conditioning_{key_type}_{key_method}.{image_extension}")
 
                     input_media = InputMediaPhoto(
                         media=file,
@@ -435,16 +486,17 @@ async def process_show_writing_image(
         image_buffer.seek(0)  # Reset buffer position
         input_file = BufferedInputFile(
             file=image_buffer.read(),
-            filename=f"writing_{word_foreign}.png"
+            filename=f"writing_{word_foreign}.{image_extension}"
         )
 
         # Send image
-        await message.answer_photo(
+        sent = await message.answer_photo(
             photo=input_file,
             caption=caption,
             reply_markup=keyboard,
             parse_mode="HTML",
         )
+        remember_photo_file_id(file_key, sent)
 
         logger.info(f"Successfully sent writing image for: {word_foreign}")
         
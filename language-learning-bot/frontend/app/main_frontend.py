@@ -517,18 +517,23 @@ async def main() -> None:
         api_timeout = int(cfg.api.timeout) if hasattr(cfg, "api") and hasattr(cfg.api, "timeout") else 5
         api_retry_count = int(cfg.api.retry_count) if hasattr(cfg, "api") and hasattr(cfg.api, "retry_count") else 3
         api_prefix = cfg.api.prefix if hasattr(cfg, "api") and hasattr(cfg.api, "prefix") else "/api"
+        api_etag_cache_enabled = bool(cfg.api.etag_cache_enabled) if hasattr(cfg, "api") and hasattr(cfg.api, "etag_cache_enabled") else True
+        api_etag_cache_size = int(cfg.api.etag_cache_size) if hasattr(cfg, "api") and hasattr(cfg.api, "etag_cache_size") else 512
 
         logger.info(f"Initializing API client:")
         logger.info(f"  - Base URL: {api_base_url}")
         logger.info(f"  - Timeout: {api_timeout}s")
         logger.info(f"  - Retry count: {api_retry_count}")
         logger.info(f"  - API prefix: {api_prefix}")
+        logger.info(f"  - ETag cache: {api_etag_cache_enabled} (size={api_etag_cache_size})")
 
         api_client = APIClient(
             base_url=api_base_url,
             api_prefix=api_prefix,
             timeout=api_timeout,
-            retry_count=api_retry_count
+            retry_count=api_retry_count,
+            etag_cache_enabled=api_etag_cache_enabled,
+            etag_cache_size=api_etag_cache_size
         )        
         
         # Сохраняем api_client используя утилиту
@@ -6,6 +6,7 @@
 import io
 import os
 import tempfile
+from collections import OrderedDict
 from typing import Optional
 from pathlib import Path
 
@@ -14,6 +15,7 @@ from PIL import Image, ImageDraw, ImageFont
 
 from app.utils import config_holder
 from app.utils.logger import setup_logger
+from app.utils.telegram_file_cache import make_cache_key
 from common.utils.font_utils import get_font_manager
 
 logger = setup_logger(__name__)
@@ -66,6 +68,73 @@ class BigWordGenerator:
         # Настройка временной директории
         self.temp_dir = config_holder.cfg.show_big.temp_dir or tempfile.gettempdir()
 
+        # LRU готовых PNG: результат зависит только от слова, транскрипции и настроек
+        self.render_cache_items = 256
+        if config_holder.cfg.show_big:
+            self.render_cache_items = config_holder.cfg.show_big.get('render_cache_items', self.render_cache_items)
+        self._render_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self.render_cache_hits = 0
+        self.render_cache_misses = 0
+
+    def _render_settings(self) -> dict:
+        """Настройки, от которых зависит изображение (входят в ключ кэша)."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "colors": [self.bg_color, self.text_color, self.border_color, self.transcription_color],
+            "fonts": [self.word_font_size, self.transcription_font_size],
+        }
+
+    def cache_key(self, word: str, transcription: Optional[str] = None) -> str:
+        """
+        Ключ изображения: слово, транскрипция, настройки и выбранные файлы шрифтов.
+
+        Args:
+            word: Слово
+            transcription: Транскрипция (опционально)
+
+        Returns:
+            str: Ключ для кэша изображений и кэша file_id Telegram
+        """
+        font_files = [self.font_manager.select_font_path(word)]
+        if transcription:
+            font_files.append(self.font_manager.select_font_path(f"[{transcription}]"))
+        return make_cache_key(
+            "big_word",
+            word=word,
+            transcription=transcription or "",
+            settings=self._render_settings(),
+            font_files=font_files,
+        )
+
+    async def get_image_bytes(self, word: str, transcription: Optional[str] = None) -> bytes:
+        """
+        Возвращает PNG слова из LRU, при промахе генерирует его.
+
+        Args:
+            word: Слово для отображения
+            transcription: Транскрипция (опционально)
+
+        Returns:
+            bytes: PNG изображение
+        """
+        key = self.cache_key(word, transcription)
+        data = self._render_cache.get(key)
+        if data is not None:
+            self._render_cache.move_to_end(key)
+            self.render_cache_hits += 1
+            logger.debug(f"Big word image for '{word}' taken from render cache")
+            return data
+
+        self.render_cache_misses += 1
+        image_buffer = await self.generate_big_word(word, transcription)
+        data = image_buffer.getvalue()
+        if self.render_cache_items > 0:
+            self._render_cache[key] = data
+            while len(self._render_cache) > self.render_cache_items:
+                self._render_cache.popitem(last=False)
+        return data
+
     async def generate_big_word(
         self, 
         word: str, 
@@ -258,4 +327,4 @@ async def generate_big_word(
         io.BytesIO: Изображение в памяти
     """
     generator = get_big_word_generator()
-    return await generator.generate_big_word(word, transcription)
+    return io.BytesIO(await generator.get_image_bytes(word, transcription))
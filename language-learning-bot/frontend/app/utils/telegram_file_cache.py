@@ -0,0 +1,230 @@
+"""
+Persistent map from image cache keys to Telegram file_id.
+Постоянное соответствие ключ изображения -> file_id Telegram.
+
+After the first upload Telegram returns a file_id for the photo; sending
+that id again costs neither rendering nor upload. Entries live in memory
+and are written through to SQLite, so they survive bot restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from app.utils import config_holder
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_DB_PATH = "cache/telegram_file_ids.sqlite3"
+
+
+def make_cache_key(kind: str, **parts: Any) -> str:
+    """
+    Стабильный ключ изображения по его параметрам.
+
+    Args:
+        kind: Вид изображения ("big_word", "writing_image", ...)
+        **parts: Все параметры, от которых зависит изображение
+
+    Returns:
+        str: "<kind>:<sha256 от параметров>"
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class TelegramFileIdCache:
+    """
+    file_id of uploaded photos by image key, with optional TTL.
+    file_id загруженных фото по ключу изображения.
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: Файл SQLite (None - только в памяти)
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self._lock = threading.Lock()
+        # key -> (file_id, created_at)
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidated": 0}
+        self._connection = None
+
+        if self.db_path is not None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS file_ids ("
+                    "key TEXT PRIMARY KEY, file_id TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._connection.commit()
+                rows = self._connection.execute("SELECT key, file_id, created_at FROM file_ids").fetchall()
+                self._entries = {key: (file_id, created_at) for key, file_id, created_at in rows}
+                logger.info(f"Loaded {len(self._entries)} Telegram file_ids from {self.db_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Telegram file_id cache is memory-only, could not open {self.db_path}: {e}")
+                self._connection = None
+
+    def _execute(self, sql: str, params: tuple):
+        if self._connection is None:
+            return
+        try:
+            with self._connection:
+                self._connection.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update Telegram file_id cache: {e}")
+
+    def get(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[str]:
+        """
+        Получает file_id по ключу.
+
+        Args:
+            key: Ключ изображения
+            max_age_seconds: Не возвращать более старые записи (None - без ограничения)
+
+        Returns:
+            Optional[str]: file_id или None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (max_age_seconds is not None and time.time() - entry[1] > max_age_seconds):
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: str, file_id: str):
+        """Сохраняет file_id для ключа."""
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (file_id, created_at)
+            self._stats["stores"] += 1
+            self._execute(
+                "INSERT OR REPLACE INTO file_ids (key, file_id, created_at) VALUES (?, ?, ?)",
+                (key, file_id, created_at)
+            )
+
+    def delete(self, key: str):
+        """Удаляет запись (например, Telegram больше не принимает file_id)."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidated"] += 1
+            self._execute("DELETE FROM file_ids WHERE key = ?", (key,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша."""
+        return {"entries": len(self._entries), "db_path": str(self.db_path) if self.db_path else None, **self._stats}
+
+
+async def answer_photo_by_file_id(
+    message: Message,
+    cache_key: Optional[str],
+    max_age_seconds: Optional[float] = None,
+    **kwargs
+) -> Optional[Message]:
+    """
+    Отправляет фото по сохраненному file_id, если он есть.
+
+    Args:
+        message: Сообщение, в чат которого отправляется фото
+        cache_key: Ключ изображения (None - кэш не используется)
+        max_age_seconds: Максимальный возраст file_id
+        **kwargs: Параметры message.answer_photo (caption, reply_markup, ...)
+
+    Returns:
+        Optional[Message]: Отправленное сообщение или None (нет file_id или Telegram его не принял)
+    """
+    cache = get_telegram_file_cache() if cache_key else None
+    if cache is None:
+        return None
+
+    file_id = cache.get(cache_key, max_age_seconds)
+    if not file_id:
+        return None
+    try:
+        sent = await message.answer_photo(photo=file_id, **kwargs)
+        logger.debug(f"Sent photo by cached file_id for {cache_key}")
+        return sent
+    except TelegramBadRequest as e:
+        logger.warning(f"Cached file_id rejected for {cache_key}, uploading again: {e}")
+        cache.delete(cache_key)
+        return None
+
+
+def remember_photo_file_id(cache_key: Optional[str], sent: Optional[Message]):
+    """
+    Запоминает file_id загруженного фото.
+
+    Args:
+        cache_key: Ключ изображения (None - ничего не делать)
+        sent: Сообщение, которое вернул answer_photo
+    """
+    cache = get_telegram_file_cache() if cache_key else None
+    if cache is not None and sent is not None and sent.photo:
+        # Самый большой размер - последний в списке
+        cache.set(cache_key, sent.photo[-1].file_id)
+
+
+async def answer_photo_cached(
+    message: Message,
+    cache_key: Optional[str],
+    render: Callable[[], Awaitable[bytes]],
+    filename: str,
+    max_age_seconds: Optional[float] = None,
+    **kwargs
+) -> Message:
+    """
+    Отправляет фото по сохраненному file_id, а при его отсутствии рендерит и загружает.
+
+    Args:
+        message: Сообщение, в чат которого отправляется фото
+        cache_key: Ключ изображения (None - без кэша file_id)
+        render: Получение байтов изображения (вызывается только при промахе)
+        filename: Имя файла при загрузке
+        max_age_seconds: Максимальный возраст file_id
+        **kwargs: Параметры message.answer_photo (caption, reply_markup, ...)
+
+    Returns:
+        Message: Отправленное сообщение
+    """
+    sent = await answer_photo_by_file_id(message, cache_key, max_age_seconds, **kwargs)
+    if sent is not None:
+        return sent
+
+    data = await render()
+    sent = await message.answer_photo(photo=BufferedInputFile(file=data, filename=filename), **kwargs)
+    remember_photo_file_id(cache_key, sent)
+    return sent
+
+
+# Глобальный экземпляр кэша
+_file_cache_instance: Optional[TelegramFileIdCache] = None
+
+
+def get_telegram_file_cache() -> Optional[TelegramFileIdCache]:
+    """
+    Получает глобальный кэш file_id (настройки bot.telegram_file_cache).
+
+    Returns:
+        Optional[TelegramFileIdCache]: Кэш или None, если он отключен
+    """
+    global _file_cache_instance
+    if _file_cache_instance is None:
+        cache_cfg = {}
+        if config_holder.cfg is not None and hasattr(config_holder.cfg, "bot"):
+            cache_cfg = config_holder.cfg.bot.get("telegram_file_cache", {}) or {}
+        if not cache_cfg.get("enabled", True):
+            return None
+        _file_cache_instance = TelegramFileIdCache(cache_cfg.get("path", DEFAULT_DB_PATH))
+    return _file_cache_instance
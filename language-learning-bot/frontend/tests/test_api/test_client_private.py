@@ -159,4 +159,140 @@ class TestAPIClientPrivate:
         - Проверить, что метод вернул None
         - Проверить, что было залогировано сообщение о том, что все попытки провалились
         """
-        pass
\ No newline at end of file
+        pass
+
+class _FakeResponse:
+    """Минимальная замена ответа aiohttp для тестов условного GET."""
+
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.content_type = "application/json"
+        self.headers = headers or {}
+        self._body = body
+
+    async def json(self):
+        return self._body
+
+    async def text(self):
+        return str(self._body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class _FakeSession:
+    """Сессия aiohttp, отдающая заранее подготовленные ответы и запоминающая заголовки."""
+
+    def __init__(self, responses, calls):
+        self._responses = responses
+        self._calls = calls
+
+    def request(self, **kwargs):
+        self._calls.append(kwargs)
+        return self._responses.pop(0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class TestAPIClientETagCache:
+    """Test cases for conditional GET revalidation in APIClient."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Fixture to create API client instance."""
+        return APIClient(base_url="http://testserver", timeout=5, retry_count=1)
+
+    def _patch_session(self, responses):
+        calls = []
+        patcher = mock.patch(
+            "app.api.client.aiohttp.ClientSession",
+            side_effect=lambda: _FakeSession(responses, calls)
+        )
+        return patcher, calls
+
+    @pytest.mark.asyncio
+    async def test_not_modified_returns_cached_result(self, api_client):
+        """
+        Проверяет, что повторный GET отправляет If-None-Match и при 304 отдает данные из кэша.
+        """
+        languages = [{"id": "1", "name_ru": "Английский", "name_foreign": "English"}]
+        responses = [
+            _FakeResponse(200, languages, {"ETag": '"v1"'}),
+            _FakeResponse(304),
+        ]
+        patcher, calls = self._patch_session(responses)
+
+        with patcher:
+            first = await api_client._make_request("GET", "/languages")
+            second = await api_client._make_request("GET", "/languages")
+
+        assert calls[0]["headers"] is None
+        assert calls[1]["headers"] == {"If-None-Match": '"v1"'}
+        assert first["result"] == languages
+        assert second["success"] is True
+        assert second["status"] == 200
+        assert second["result"] == languages
+        # Изменение результата вызывающим кодом не портит кэш
+        second["result"].append({"id": "2"})
+        assert api_client._etag_cache[api_client._etag_cache_key(
+            "http://testserver/api/languages", None
+        )][1] == languages
+
+    @pytest.mark.asyncio
+    async def test_modified_response_replaces_cache(self, api_client):
+        """
+        Проверяет, что новый ответ с другим ETag заменяет закэшированный.
+        """
+        responses = [
+            _FakeResponse(200, {"count": 1}, {"ETag": '"v1"'}),
+            _FakeResponse(200, {"count": 2}, {"ETag": '"v2"'}),
+            _FakeResponse(304),
+        ]
+        patcher, calls = self._patch_session(responses)
+
+        with patcher:
+            await api_client._make_request("GET", "/languages/1/count")
+            second = await api_client._make_request("GET", "/languages/1/count")
+            third = await api_client._make_request("GET", "/languages/1/count")
+
+        assert second["result"] == {"count": 2}
+        assert calls[2]["headers"] == {"If-None-Match": '"v2"'}
+        assert third["result"] == {"count": 2}
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_and_non_get(self):
+        """
+        Проверяет, что при отключенном кэше и для не-GET запросов условные заголовки не отправляются.
+        """
+        api_client = APIClient(base_url="http://testserver", retry_count=1, etag_cache_enabled=False)
+        responses = [
+            _FakeResponse(200, [], {"ETag": '"v1"'}),
+            _FakeResponse(200, [], {"ETag": '"v1"'}),
+        ]
+        patcher, calls = self._patch_session(responses)
+
+        with patcher:
+            await api_client._make_request("GET", "/languages")
+            await api_client._make_request("GET", "/languages")
+
+        assert all(call["headers"] is None for call in calls)
+        assert not api_client._etag_cache
+
+    def test_cache_evicts_least_recently_used(self):
+        """
+        Проверяет вытеснение самых старых записей при превышении размера кэша.
+        """
+        api_client = APIClient(base_url="http://testserver", etag_cache_size=2)
+        api_client._store_cached_response("a", '"1"', 1)
+        api_client._store_cached_response("b", '"2"', 2)
+        api_client._get_cached_response("a")
+        api_client._store_cached_response("c", '"3"', 3)
+
+        assert list(api_client._etag_cache) == ["a", "c"]
@@ -245,6 +245,8 @@ class TestMain:
         mock_cfg.api.timeout = 10
         mock_cfg.api.retry_count = 5
         mock_cfg.api.prefix = "/test-api"
+        mock_cfg.api.etag_cache_enabled = False
+        mock_cfg.api.etag_cache_size = 64
         mock_cfg.bot.token = "fake_token"
         
         # Моки для объектов
@@ -286,7 +288,9 @@ class TestMain:
                 base_url="http://testapi.example.com",
                 api_prefix="/test-api",
                 timeout=10,
-                retry_count=5
+                retry_count=5,
+                etag_cache_enabled=False,
+                etag_cache_size=64
             )
             
             # Проверяем, что API клиент был сохранен
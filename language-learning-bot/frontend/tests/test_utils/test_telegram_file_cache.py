@@ -0,0 +1,94 @@
+"""
+Tests for telegram_file_cache module.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from aiogram.exceptions import TelegramBadRequest
+
+from app.utils import telegram_file_cache
+from app.utils.telegram_file_cache import TelegramFileIdCache, answer_photo_cached, make_cache_key
+
+
+def sent_message(file_id):
+    message = MagicMock()
+    message.photo = [MagicMock(file_id=f"{file_id}_small"), MagicMock(file_id=file_id)]
+    return message
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TelegramFileIdCache(str(tmp_path / "file_ids.sqlite3"))
+    monkeypatch.setattr(telegram_file_cache, "get_telegram_file_cache", lambda: cache)
+    return cache
+
+
+class TestTelegramFileIdCache:
+
+    def test_make_cache_key_is_stable_and_depends_on_parts(self):
+        key = make_cache_key("big_word", word="学习", transcription="xuéxí")
+
+        assert key == make_cache_key("big_word", transcription="xuéxí", word="学习")
+        assert key != make_cache_key("big_word", word="学习", transcription="")
+        assert key.startswith("big_word:")
+
+    def test_entries_survive_restart(self, tmp_path):
+        path = str(tmp_path / "file_ids.sqlite3")
+        TelegramFileIdCache(path).set("key", "file-1")
+
+        reloaded = TelegramFileIdCache(path)
+
+        assert reloaded.get("key") == "file-1"
+        reloaded.delete("key")
+        assert TelegramFileIdCache(path).get("key") is None
+
+    def test_max_age(self, cache, monkeypatch):
+        cache.set("key", "file-1")
+        monkeypatch.setattr(telegram_file_cache.time, "time", lambda: cache._entries["key"][1] + 100)
+
+        assert cache.get("key", max_age_seconds=200) == "file-1"
+        assert cache.get("key", max_age_seconds=50) is None
+
+
+class TestAnswerPhotoCached:
+
+    @pytest.mark.asyncio
+    async def test_uploads_once_then_sends_file_id(self, cache):
+        message = MagicMock()
+        message.answer_photo = AsyncMock(side_effect=[sent_message("file-1"), sent_message("file-1")])
+        render = AsyncMock(return_value=b"png")
+
+        await answer_photo_cached(message, "key", render, filename="word.png", caption="")
+        await answer_photo_cached(message, "key", render, filename="word.png", caption="")
+
+        render.assert_awaited_once()
+        assert cache.get("key") == "file-1"
+        assert message.answer_photo.await_args_list[1].kwargs["photo"] == "file-1"
+
+    @pytest.mark.asyncio
+    async def test_rejected_file_id_is_replaced(self, cache):
+        cache.set("key", "stale")
+        message = MagicMock()
+        message.answer_photo = AsyncMock(side_effect=[
+            TelegramBadRequest(method=MagicMock(), message="wrong file identifier"),
+            sent_message("file-2"),
+        ])
+        render = AsyncMock(return_value=b"png")
+
+        await answer_photo_cached(message, "key", render, filename="word.png")
+
+        render.assert_awaited_once()
+        assert cache.get("key") == "file-2"
+
+    @pytest.mark.asyncio
+    async def test_without_key_always_renders(self, cache):
+        message = MagicMock()
+        message.answer_photo = AsyncMock(return_value=sent_message("file-1"))
+        render = AsyncMock(return_value=b"png")
+
+        await answer_photo_cached(message, None, render, filename="word.png")
+        await answer_photo_cached(message, None, render, filename="word.png")
+
+        assert render.await_count == 2
+        assert cache.get_stats()["entries"] == 0
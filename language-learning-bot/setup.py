@@ -19,6 +19,7 @@ setup(
             "pytest-asyncio>=0.21.0",
             "pytest-cov>=4.1.0",
             "pytest-mock>=3.10.0",
+            "mongomock-motor>=0.0.21",
             "black>=23.3.0",
             "isort>=5.12.0",
             "flake8>=6.0.0",
@@ -16,6 +16,7 @@ from app.ai.core.conditioning_manager import ConditioningManager
 from app.ai.core.translation_manager import TranslationManager
 from app.ai.core.prompt_manager import PromptManager
 from app.ai.core.image_processor import ImageProcessor
+from app.utils.stage_graph import StageGraph
 
 logger = get_module_logger(__name__)
 
@@ -90,30 +91,37 @@ class AIImageGenerator:
             # 1. Инициализация всех менеджеров
             await self._ensure_managers_ready()
             
-            # 2. Предобработка иероглифа
-            base_image = await self.image_processor.preprocess_character(
-                character, self.config.width, self.config.height
-            )
-            logger.info(f"✓ Character preprocessed: {base_image.size}")
-            
-            # 3. Генерация conditioning изображений
-            conditioning_images = await self.conditioning_manager.generate_all_conditioning(
-                base_image, character, conditioning_methods
-            )
-            logger.info(f"✓ Generated conditioning for: {list(conditioning_images.keys())}")
+            # 2-7. Этапы генерации как граф зависимостей: предобработка -> conditioning
+            # и оба перевода выполняются одновременно, диффузия ждет conditioning и промпт
+            user_hint_data = {}
+            has_hint = bool(hint_writing and hint_writing.strip())
             
-            # 4. Обработка перевода (основного)
-            english_translation, translation_metadata = await self.translation_manager.translate_to_english(
-                character, translation
-            )
-            logger.info(f"✓ Translation: '{translation}' -> '{english_translation}' "
-                       f"(source: {translation_metadata.get('source', 'unknown')})")
+            async def preprocess():
+                base_image = await self.image_processor.preprocess_character(
+                    character, self.config.width, self.config.height
+                )
+                logger.info(f"✓ Character preprocessed: {base_image.size}")
+                return base_image
             
-            # 5. НОВОЕ: Обработка пользовательской подсказки
-            user_hint_data = {}
-            english_hint = ""
+            async def conditioning(preprocess):
+                conditioning_images = await self.conditioning_manager.generate_all_conditioning(
+                    preprocess, character, conditioning_methods
+                )
+                logger.info(f"✓ Generated conditioning for: {list(conditioning_images.keys())}")
+                return conditioning_images
             
-            if hint_writing and hint_writing.strip():
+            async def translation_stage():
+                english_translation, translation_metadata = await self.translation_manager.translate_to_english(
+                    character, translation
+                )
+                logger.info(f"✓ Translation: '{translation}' -> '{english_translation}' "
+                           f"(source: {translation_metadata.get('source', 'unknown')})")
+                return english_translation, translation_metadata
+            
+            async def hint_translation():
+                # НОВОЕ: Обработка пользовательской подсказки
+                if not has_hint:
+                    return ""
                 logger.info(f"Processing user hint: '{hint_writing}'")
                 
                 # Переводим подсказку на английский
@@ -121,42 +129,65 @@ class AIImageGenerator:
                     character, hint_writing
                 )
                 
-                user_hint_data = {
+                user_hint_data.update({
                     "original_hint": hint_writing,
                     "translated_hint": english_hint,
                     "translation_source": hint_translation_metadata.get('source', 'unknown'),
                     "translation_time_ms": hint_translation_metadata.get('time_ms', 0),
                     "used_in_prompt": True
-                }
+                })
                 
                 logger.info(f"✓ User hint translated: '{hint_writing}' -> '{english_hint}' "
                            f"(source: {hint_translation_metadata.get('source', 'unknown')})")
-                
-                # Увеличиваем счетчик генераций с подсказками
-                self.hint_generation_count += 1
-            
-            # 6. Получаем случайный стиль
-            style = random.choice(self.prompt_manager.prompt_builder.style_definitions.get_style_names())
+                return english_hint
             
-            # Построение промпта с учетом подсказки
-            prompt_result = await self.prompt_manager.build_prompt(
-                character=character,
-                translation=english_translation,
-                hint_writing=english_hint,  # НОВОЕ: передаем переведенную подсказку
-                style=style  # НОВОЕ: передаем стиль
+            async def prompt(translation, hint_translation):
+                # Получаем случайный стиль
+                style = random.choice(self.prompt_manager.prompt_builder.style_definitions.get_style_names())
+                
+                # Построение промпта с учетом подсказки
+                prompt_result = await self.prompt_manager.build_prompt(
+                    character=character,
+                    translation=translation[0],
+                    hint_writing=hint_translation,  # НОВОЕ: передаем переведенную подсказку
+                    style=style  # НОВОЕ: передаем стиль
+                )
+                logger.info(f"✓ Generated prompt: '{prompt_result.main_prompt}'")
+                return style, prompt_result
+            
+            async def diffusion(conditioning, prompt):
+                # AI генерация - единственный сериализованный этап (GPU, через батчинг ModelManager)
+                logger.info(f"generation_params={generation_params.keys()}")
+                final_image = await self.model_manager.run_generation(
+                    prompt=prompt[1].main_prompt,
+                    conditioning_images=conditioning,
+                    seed=seed,
+                    **generation_params
+                )
+                logger.info(f"✓ AI generation completed: {final_image.size}")
+                return final_image
+            
+            stages = (
+                StageGraph()
+                .add("preprocess", preprocess)
+                .add("conditioning", conditioning, depends_on=["preprocess"])
+                .add("translation", translation_stage)
+                .add("hint_translation", hint_translation)
+                .add("prompt", prompt, depends_on=["translation", "hint_translation"])
+                .add("diffusion", diffusion, depends_on=["conditioning", "prompt"])
             )
-            logger.info(f"✓ Generated prompt: '{prompt_result.main_prompt}'")
+            results = await stages.run()
             
-            logger.info(f"generation_params={generation_params.keys()}")
+            base_image = results["preprocess"]
+            conditioning_images = results["conditioning"]
+            english_translation, translation_metadata = results["translation"]
+            english_hint = results["hint_translation"]
+            style, prompt_result = results["prompt"]
+            final_image = results["diffusion"]
             
-            # 7. AI генерация
-            final_image = await self.model_manager.run_generation(
-                prompt=prompt_result.main_prompt,
-                conditioning_images=conditioning_images,
-                seed=seed,
-                **generation_params
-            )
-            logger.info(f"✓ AI generation completed: {final_image.size}")
+            if has_hint:
+                # Увеличиваем счетчик генераций с подсказками
+                self.hint_generation_count += 1
             
             # 8. Подготовка результата с метаданными подсказки
             generation_time_ms = int((time.time() - start_time) * 1000)
@@ -174,6 +205,7 @@ class AIImageGenerator:
                 generation_time_ms=generation_time_ms,
                 seed_used=seed,
                 model_config=self.config,
+                stage_timings=stages.timings,
                 # TODO - добавить поля
                 # user_hint_metadata=user_hint_data,  # НОВОЕ: метаданные подсказки
                 # style_used=style  # НОВОЕ: использованный стиль
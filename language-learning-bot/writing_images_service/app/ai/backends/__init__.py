@@ -0,0 +1,25 @@
+"""
+Generation backends behind ModelManager.
+Бэкенды генерации для ModelManager.
+
+sdxl_union - SDXL + ControlNet Union on GPU (default);
+cpu - deterministic stand-in without models for profiling and load tests.
+"""
+
+from .base import (
+    DEFAULT_BACKEND,
+    GenerationBackend,
+    available_backends,
+    create_backend,
+    get_backend_class,
+    register_backend,
+)
+
+__all__ = [
+    "DEFAULT_BACKEND",
+    "GenerationBackend",
+    "available_backends",
+    "create_backend",
+    "get_backend_class",
+    "register_backend",
+]
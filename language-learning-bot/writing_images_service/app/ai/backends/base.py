@@ -0,0 +1,166 @@
+"""
+Generation backend interface and registry.
+Интерфейс бэкендов генерации и их реестр.
+
+A backend turns a prompt and conditioning images into a picture; ModelManager
+wraps it with batching and statistics. Backends are registered by name, the
+built-in ones by import path so that choosing the CPU backend does not import
+torch/diffusers.
+"""
+
+import importlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type, Union
+
+from PIL import Image
+
+from app.ai.core.generation_config import AIGenerationConfig
+
+DEFAULT_BACKEND = "sdxl_union"
+
+
+class GenerationBackend(ABC):
+    """
+    Модель генерации за ModelManager.
+    Контракт повторяет MultiControlNetPipeline: generate(prompt, control_images, seed, ...).
+    """
+
+    # Имя в реестре (ai_generation.backend.name)
+    name: str = ""
+    # Нужен ли GPU (без него сервис не проверяет CUDA при старте)
+    requires_gpu: bool = True
+
+    def __init__(self, config: AIGenerationConfig, **options: Any):
+        """
+        Args:
+            config: Конфигурация AI генерации
+            **options: Параметры бэкенда (ai_generation.backend.<name>)
+        """
+        self.config = config
+        self.options = options
+
+    @abstractmethod
+    async def load(self):
+        """Загружает модели. Raises: RuntimeError, если загрузка не удалась."""
+
+    @abstractmethod
+    async def unload(self):
+        """Выгружает модели и освобождает память."""
+
+    @abstractmethod
+    def is_ready(self) -> bool:
+        """Готов ли бэкенд к генерации."""
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        control_images: Dict[str, Image.Image],
+        seed: Optional[int] = None,
+        **generation_params
+    ) -> Image.Image:
+        """
+        Генерирует одно изображение.
+
+        Args:
+            prompt: Промпт
+            control_images: Conditioning изображения по типам
+            seed: Seed (None - случайный)
+            **generation_params: width, height, num_inference_steps, guidance_scale,
+                controlnet_conditioning_scale
+
+        Returns:
+            Image.Image: Сгенерированное изображение
+        """
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        control_images_list: List[Dict[str, Image.Image]],
+        seeds: List[Optional[int]],
+        **generation_params
+    ) -> List[Image.Image]:
+        """
+        Генерирует батч; по умолчанию - по одному изображению.
+
+        Args:
+            prompts: Промпты по элементам батча
+            control_images_list: Conditioning изображения по элементам батча
+            seeds: Seed по элементам батча
+            **generation_params: Общие параметры генерации
+
+        Returns:
+            List[Image.Image]: Изображения в порядке промптов
+        """
+        return [
+            await self.generate(prompt, control_images, seed, **generation_params)
+            for prompt, control_images, seed in zip(prompts, control_images_list, seeds)
+        ]
+
+    def recommended_batch_size(self, max_batch_size: int) -> int:
+        """Ограничение размера батча ресурсами бэкенда."""
+        return max_batch_size
+
+    def get_status(self) -> Dict[str, Any]:
+        """Статус и статистика бэкенда."""
+        return {"backend": self.name, "ready": self.is_ready()}
+
+
+# Имя -> класс или "модуль:Класс" (импортируется при первом использовании)
+_BACKENDS: Dict[str, Union[str, Type[GenerationBackend]]] = {
+    "sdxl_union": "app.ai.backends.sdxl_union:SDXLUnionBackend",
+    "cpu": "app.ai.backends.cpu_backend:CPUBackend",
+}
+
+
+def register_backend(name: str, backend: Union[str, Type[GenerationBackend]]):
+    """
+    Регистрирует бэкенд.
+
+    Args:
+        name: Имя для ai_generation.backend.name
+        backend: Класс GenerationBackend или путь "модуль:Класс"
+    """
+    _BACKENDS[name] = backend
+
+
+def available_backends() -> List[str]:
+    """Имена зарегистрированных бэкендов."""
+    return sorted(_BACKENDS)
+
+
+def get_backend_class(name: str) -> Type[GenerationBackend]:
+    """
+    Находит класс бэкенда по имени.
+
+    Args:
+        name: Имя бэкенда
+
+    Returns:
+        Type[GenerationBackend]: Класс бэкенда
+
+    Raises:
+        ValueError: Если бэкенд не зарегистрирован
+    """
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown generation backend '{name}', available: {available_backends()}")
+    if isinstance(backend, str):
+        module_name, class_name = backend.split(":")
+        backend = getattr(importlib.import_module(module_name), class_name)
+        _BACKENDS[name] = backend
+    return backend
+
+
+def create_backend(config: AIGenerationConfig) -> GenerationBackend:
+    """
+    Создает бэкенд из конфигурации (config.backend, config.backend_options).
+
+    Args:
+        config: Конфигурация AI генерации
+
+    Returns:
+        GenerationBackend: Незагруженный бэкенд
+    """
+    backend_class = get_backend_class(config.backend)
+    return backend_class(config, **(config.backend_options or {}))
@@ -0,0 +1,193 @@
+"""
+Deterministic CPU backend without models.
+Детерминированный бэкенд на CPU без моделей.
+
+Blends the conditioning images into a smooth texture derived from a hash of
+the prompt and the seed, so the same request always gives the same picture
+and the character stays visible. Optional artificial latency stands in for
+diffusion time. Used to profile and load-test everything around the model
+(conditioning, translation, prompts, encoding, HTTP) on machines without a
+GPU, and in tests.
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from app.utils.logger import get_module_logger
+from app.ai.backends.base import GenerationBackend
+
+logger = get_module_logger(__name__)
+
+# Разрешение шума, из которого растягивается текстура
+TEXTURE_CELLS = 8
+
+
+class CPUBackend(GenerationBackend):
+    """Текстура от хэша промпта и seed, смешанная с conditioning картами."""
+
+    name = "cpu"
+    requires_gpu = False
+
+    def __init__(
+        self,
+        config,
+        latency_ms: float = 0.0,
+        latency_per_image_ms: float = 0.0,
+        run_in_thread: bool = False,
+        **options: Any
+    ):
+        """
+        Args:
+            config: Конфигурация AI генерации
+            latency_ms: Искусственная задержка на вызов (батч - один вызов)
+            latency_per_image_ms: Искусственная задержка на каждое изображение
+            run_in_thread: Выполнять в потоке; по умолчанию, как SDXL pipeline, в потоке event loop
+        """
+        super().__init__(config, **options)
+        self.latency_ms = float(latency_ms)
+        self.latency_per_image_ms = float(latency_per_image_ms)
+        self.run_in_thread = run_in_thread
+        self._loaded = False
+        self.generation_count = 0
+        self.batch_count = 0
+        self.total_inference_time = 0.0
+
+    async def load(self):
+        self._loaded = True
+        logger.info(f"CPU generation backend ready (latency {self.latency_ms:g}ms + "
+                    f"{self.latency_per_image_ms:g}ms per image)")
+
+    async def unload(self):
+        self._loaded = False
+
+    def is_ready(self) -> bool:
+        return self._loaded
+
+    async def generate(
+        self,
+        prompt: str,
+        control_images: Dict[str, Image.Image],
+        seed: Optional[int] = None,
+        **generation_params
+    ) -> Image.Image:
+        return (await self.generate_batch([prompt], [control_images], [seed], **generation_params))[0]
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        control_images_list: List[Dict[str, Image.Image]],
+        seeds: List[Optional[int]],
+        **generation_params
+    ) -> List[Image.Image]:
+        if not self._loaded:
+            raise RuntimeError("CPU backend not loaded")
+
+        # Как и в pipeline, seed=None - случайный
+        seeds = [seed if seed is not None else random.randrange(2**32) for seed in seeds]
+        if self.run_in_thread:
+            return await asyncio.to_thread(self._run, prompts, control_images_list, seeds, generation_params)
+        return self._run(prompts, control_images_list, seeds, generation_params)
+
+    def _run(
+        self,
+        prompts: List[str],
+        control_images_list: List[Dict[str, Image.Image]],
+        seeds: List[int],
+        generation_params: Dict[str, Any]
+    ) -> List[Image.Image]:
+        start_time = time.perf_counter()
+        width = int(generation_params.get("width", self.config.width))
+        height = int(generation_params.get("height", self.config.height))
+        strength = min(1.0, max(0.0, float(generation_params.get("controlnet_conditioning_scale", 1.0))))
+
+        images = [
+            render_image(prompt, control_images, seed, width, height, strength)
+            for prompt, control_images, seed in zip(prompts, control_images_list, seeds)
+        ]
+
+        # Оставшаяся часть искусственной задержки (время рендера в нее входит)
+        delay = (self.latency_ms + self.latency_per_image_ms * len(prompts)) / 1000
+        remaining = delay - (time.perf_counter() - start_time)
+        if remaining > 0:
+            time.sleep(remaining)
+
+        self.generation_count += len(prompts)
+        self.batch_count += 1
+        self.total_inference_time += time.perf_counter() - start_time
+        return images
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status.update({
+            "generation_count": self.generation_count,
+            "batch_count": self.batch_count,
+            "total_inference_time_seconds": round(self.total_inference_time, 3),
+            "latency_ms": self.latency_ms,
+            "latency_per_image_ms": self.latency_per_image_ms,
+        })
+        return status
+
+
+def control_mask(control_images: Dict[str, Image.Image], width: int, height: int) -> np.ndarray:
+    """
+    Объединяет conditioning карты в одну маску (максимум по типам).
+
+    Args:
+        control_images: Conditioning изображения по типам
+        width: Ширина результата
+        height: Высота результата
+
+    Returns:
+        np.ndarray: Маска (height, width) со значениями 0..1
+    """
+    mask = np.zeros((height, width), dtype=np.float32)
+    for control_type in sorted(control_images):
+        image = control_images[control_type]
+        if image is None:
+            continue
+        if image.size != (width, height):
+            image = image.resize((width, height), Image.BILINEAR)
+        np.maximum(mask, np.asarray(image.convert("L"), dtype=np.float32) / 255, out=mask)
+    return mask
+
+
+def render_image(
+    prompt: str,
+    control_images: Dict[str, Image.Image],
+    seed: int,
+    width: int,
+    height: int,
+    strength: float = 1.0
+) -> Image.Image:
+    """
+    Детерминированная картинка: текстура от (prompt, seed) с наложенными conditioning картами.
+
+    Args:
+        prompt: Промпт
+        control_images: Conditioning изображения по типам
+        seed: Seed
+        width: Ширина
+        height: Высота
+        strength: Доля conditioning в результате (controlnet_conditioning_scale)
+
+    Returns:
+        Image.Image: RGB изображение
+    """
+    digest = hashlib.sha256(f"{seed}:{prompt}".encode("utf-8")).digest()
+    rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+    # Плавная цветная текстура: мелкий шум, растянутый до нужного размера
+    cells = (rng.random((TEXTURE_CELLS, TEXTURE_CELLS, 3)) * 255).astype(np.uint8)
+    texture = np.asarray(Image.fromarray(cells).resize((width, height), Image.BICUBIC), dtype=np.float32)
+    # Цвет штрихов от хэша, темнее текстуры
+    ink = np.frombuffer(digest[8:11], dtype=np.uint8).astype(np.float32) * 0.3
+
+    alpha = (control_mask(control_images, width, height) * strength)[..., None]
+    result = texture * (1 - alpha) + ink * alpha
+    return Image.fromarray(result.astype(np.uint8), "RGB")
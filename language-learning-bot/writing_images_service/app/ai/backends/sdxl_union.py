@@ -0,0 +1,128 @@
+"""
+SDXL + ControlNet Union backend (GPU).
+Бэкенд SDXL + Union ControlNet на GPU.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from PIL import Image
+
+from app.utils.logger import get_module_logger
+from app.ai.backends.base import GenerationBackend
+from app.ai.multi_controlnet_pipeline import MultiControlNetPipeline, PipelineConfig
+from app.ai.models.model_loader import ModelLoader
+
+logger = get_module_logger(__name__)
+
+
+class SDXLUnionBackend(GenerationBackend):
+    """Stable Diffusion XL с Union ControlNet (ModelLoader + MultiControlNetPipeline)."""
+
+    name = "sdxl_union"
+    requires_gpu = True
+
+    def __init__(self, config, **options: Any):
+        super().__init__(config, **options)
+        self.model_loader: Optional[ModelLoader] = None
+        self.pipeline: Optional[MultiControlNetPipeline] = None
+
+    async def load(self):
+        # Инициализируем Model Loader
+        self.model_loader = ModelLoader()
+
+        # Загружаем Stable Diffusion XL
+        await self.model_loader.load_stable_diffusion_xl(self.config.base_model)
+
+        # Загружаем Union ControlNet модель
+        await self.model_loader.load_controlnet_models(self.config.controlnet_models)
+
+        # Настраиваем Multi-ControlNet pipeline
+        pipeline_config = PipelineConfig(
+            base_model=self.config.base_model,
+            controlnet_models=self.config.controlnet_models,
+            device=self.config.device,
+            memory_efficient=self.config.memory_efficient,
+            enable_attention_slicing=self.config.enable_attention_slicing,
+            enable_cpu_offload=self.config.enable_cpu_offload
+        )
+
+        self.pipeline = MultiControlNetPipeline(pipeline_config)
+        await self.pipeline.setup_pipeline()
+
+        # Проверяем что pipeline готов
+        if not self.pipeline.is_ready():
+            raise RuntimeError("Pipeline setup failed")
+
+        # Логируем статистику моделей
+        model_status = self.model_loader.get_model_status()
+        loaded_count = sum(1 for status in model_status.values() if status.loaded)
+        logger.info(f"Model status: {loaded_count}/{len(model_status)} loaded")
+
+    async def unload(self):
+        if self.pipeline:
+            await self.pipeline.unload_pipeline()
+            self.pipeline = None
+
+        if self.model_loader:
+            await self.model_loader.unload_all_models()
+            self.model_loader = None
+
+    def is_ready(self) -> bool:
+        return self.pipeline is not None and self.pipeline.is_ready()
+
+    async def generate(
+        self,
+        prompt: str,
+        control_images: Dict[str, Image.Image],
+        seed: Optional[int] = None,
+        **generation_params
+    ) -> Image.Image:
+        return await self.pipeline.generate(prompt=prompt, control_images=control_images, seed=seed, **generation_params)
+
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        control_images_list: List[Dict[str, Image.Image]],
+        seeds: List[Optional[int]],
+        **generation_params
+    ) -> List[Image.Image]:
+        return await self.pipeline.generate_batch(
+            prompts=prompts,
+            control_images_list=control_images_list,
+            seeds=seeds,
+            **generation_params
+        )
+
+    def recommended_batch_size(self, max_batch_size: int) -> int:
+        """Размер батча, ограниченный свободной памятью GPU."""
+        try:
+            from app.ai.models.gpu_manager import GPUManager
+
+            recommended = GPUManager().get_recommended_batch_size(max(self.config.width, self.config.height))
+            return max(1, min(max_batch_size, recommended))
+        except Exception as e:
+            logger.warning(f"Could not get recommended batch size, using {max_batch_size}: {e}")
+            return max_batch_size
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+
+        # Добавляем статистику моделей если доступно
+        if self.model_loader:
+            model_status = self.model_loader.get_model_status()
+            status["model_status"] = {
+                name: {
+                    "loaded": model.loaded,
+                    "memory_usage_mb": model.memory_usage_mb,
+                    "load_time_seconds": model.load_time_seconds
+                }
+                for name, model in model_status.items()
+            }
+
+            status["total_memory_usage"] = self.model_loader.get_total_memory_usage()
+
+        # Добавляем статистику pipeline если доступно
+        if self.pipeline:
+            status["pipeline_stats"] = self.pipeline.get_generation_stats()
+
+        return status
@@ -58,6 +58,9 @@ class BaseConditioning(ABC):
     Определяет общий интерфейс и предоставляет общие утилиты.
     """
     
+    # Методы со случайной составляющей: их результат нельзя кэшировать
+    RANDOM_METHODS: frozenset = frozenset()
+    
     def __init__(self, config: Optional[ConditioningConfig] = None):
         """
         Инициализация базового conditioning.
@@ -76,6 +79,7 @@ class BaseConditioning(ABC):
         self, 
         image: Image.Image, 
         method: str = None,
+        add_noise: bool = True,
         **kwargs
     ) -> ConditioningResult:
         """
@@ -84,6 +88,8 @@ class BaseConditioning(ABC):
         Args:
             image: Входное изображение
             method: Конкретный метод генерации
+            add_noise: Применить случайный шум (add_final_noise); без него результат
+                детерминирован для методов не из RANDOM_METHODS
             **kwargs: Дополнительные параметры
             
         Returns:
@@ -293,6 +299,31 @@ class BaseConditioning(ABC):
         
         return True, "", processed_data
         
+    def is_deterministic(self, method: str, **kwargs) -> bool:
+        """
+        Зависит ли результат метода (без финального шума) только от входного изображения и параметров.
+        
+        Args:
+            method: Метод генерации
+            **kwargs: Параметры метода
+            
+        Returns:
+            bool: True если результат можно кэшировать
+        """
+        return method not in self.RANDOM_METHODS
+    
+    def add_final_noise(self, image: Image.Image) -> Image.Image:
+        """
+        Случайный шум поверх результата метода (для разнообразия генераций).
+        
+        Args:
+            image: Результат метода
+            
+        Returns:
+            Image.Image: Изображение с шумом
+        """
+        return image
+    
     def add_noise_to_mask(self, img: Image.Image, noise_level=30, mask_threshold=50, mask_is_less_than=True):
         arr = np.array(img).astype(np.int16)
 
@@ -39,6 +39,7 @@ class CannyConditioning(BaseConditioning):
         self, 
         image: Image.Image, 
         method: str = "simple_canny",
+        add_noise: bool = True,
         **kwargs
     ) -> ConditioningResult:
         """
@@ -47,6 +48,7 @@ class CannyConditioning(BaseConditioning):
         Args:
             image: Входное изображение
             method: Метод детекции ("simple_canny", "opencv_canny", "hed_canny", etc.)
+            add_noise: Применить случайный шум к результату
             **kwargs: Дополнительные параметры
             
         Returns:
@@ -84,7 +86,8 @@ class CannyConditioning(BaseConditioning):
             
             result_image = self.wave_distort(result_image, amplitude=5, wavelength=100)
             # result_image = self.blur_image(result_image, radius=10)
-            result_image = self.add_noise_to_mask(result_image, noise_level=10, mask_threshold=50, mask_is_less_than=False)
+            if add_noise:
+                result_image = self.add_final_noise(result_image)
             
             # Вычисление времени обработки
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -112,6 +115,10 @@ class CannyConditioning(BaseConditioning):
                 processing_time_ms=int((time.time() - start_time) * 1000)
             )
     
+    def add_final_noise(self, image: Image.Image) -> Image.Image:
+        """Случайный шум поверх результата метода."""
+        return self.add_noise_to_mask(image, noise_level=10, mask_threshold=50, mask_is_less_than=False)
+    
     async def generate_from_text(
         self, 
         character: str, 
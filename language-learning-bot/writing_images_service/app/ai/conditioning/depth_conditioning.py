@@ -35,6 +35,7 @@ class DepthConditioning(BaseConditioning):
         self, 
         image: Image.Image, 
         method: str = "simple_depth",
+        add_noise: bool = True,
         **kwargs
     ) -> ConditioningResult:
         """
@@ -43,6 +44,7 @@ class DepthConditioning(BaseConditioning):
         Args:
             image: Входное изображение
             method: Метод генерации depth map
+            add_noise: Применить случайный шум к результату
             **kwargs: Дополнительные параметры
             
         Returns:
@@ -80,7 +82,8 @@ class DepthConditioning(BaseConditioning):
             
             result_image = self.wave_distort(result_image, amplitude=5, wavelength=100)
             result_image = self.blur_image(result_image, radius=10)
-            result_image = self.add_noise_to_mask(result_image, noise_level=30, mask_threshold=50, mask_is_less_than=False)
+            if add_noise:
+                result_image = self.add_final_noise(result_image)
             
             # Вычисление времени обработки
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -108,6 +111,10 @@ class DepthConditioning(BaseConditioning):
                 processing_time_ms=int((time.time() - start_time) * 1000)
             )
     
+    def add_final_noise(self, image: Image.Image) -> Image.Image:
+        """Случайный шум поверх результата метода."""
+        return self.add_noise_to_mask(image, noise_level=30, mask_threshold=50, mask_is_less_than=False)
+    
     async def generate_from_text(
         self, 
         character: str, 
@@ -10,7 +10,7 @@ import cv2
 from PIL import Image
 from skimage import morphology
 from scipy import interpolate
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter1d
 
 from .base_conditioning import BaseConditioning, ConditioningResult, ConditioningConfig
 from app.utils.logger import get_module_logger
@@ -23,6 +23,9 @@ class ScribbleConditioning(BaseConditioning):
     Генерация scribble conditioning с различными алгоритмами создания набросков.
     """
     
+    # Дрожание руки и нажим линии моделируются случайным шумом
+    RANDOM_METHODS = frozenset({"hand_drawn_simulation"})
+    
     def __init__(self, config: Optional[ConditioningConfig] = None):
         """
         Инициализация Scribble conditioning.
@@ -38,6 +41,7 @@ class ScribbleConditioning(BaseConditioning):
         self, 
         image: Image.Image, 
         method: str = "simple_scribble",
+        add_noise: bool = True,
         **kwargs
     ) -> ConditioningResult:
         """
@@ -46,6 +50,7 @@ class ScribbleConditioning(BaseConditioning):
         Args:
             image: Входное изображение
             method: Метод генерации scribble
+            add_noise: Применить случайный шум к результату
             **kwargs: Дополнительные параметры
             
         Returns:
@@ -97,7 +102,8 @@ class ScribbleConditioning(BaseConditioning):
             
             result_image = self.wave_distort(result_image, amplitude=5, wavelength=100)
             result_image = self.blur_image(result_image, radius=10)
-            result_image = self.add_noise_to_mask(result_image, noise_level=30, mask_threshold=50, mask_is_less_than=True)
+            if add_noise:
+                result_image = self.add_final_noise(result_image)
             
             # Вычисление времени обработки
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -125,6 +131,16 @@ class ScribbleConditioning(BaseConditioning):
                 processing_time_ms=int((time.time() - start_time) * 1000)
             )
     
+    def is_deterministic(self, method: str, **kwargs) -> bool:
+        """Стиль watercolor строится на hand_drawn_simulation и текстурном шуме."""
+        if method == "style_aware_scribble":
+            return kwargs.get("target_style", "comic") != "watercolor"
+        return super().is_deterministic(method, **kwargs)
+    
+    def add_final_noise(self, image: Image.Image) -> Image.Image:
+        """Случайный шум поверх результата метода."""
+        return self.add_noise_to_mask(image, noise_level=30, mask_threshold=50, mask_is_less_than=True)
+    
     async def generate_from_text(
         self, 
         character: str, 
@@ -676,9 +692,8 @@ class ScribbleConditioning(BaseConditioning):
             points = contour.reshape(-1, 2)
             
             # Параметризация по длине дуги
-            distances = np.zeros(len(points))
-            for i in range(1, len(points)):
-                distances[i] = distances[i-1] + np.linalg.norm(points[i] - points[i-1])
+            segment_lengths = np.linalg.norm(np.diff(points, axis=0), axis=1)
+            distances = np.concatenate(([0.0], np.cumsum(segment_lengths)))
             
             # Создаем сплайны для x и y координат
             if len(np.unique(distances)) < 4:  # Недостаточно уникальных точек
@@ -721,18 +736,14 @@ class ScribbleConditioning(BaseConditioning):
             # Извлекаем точки
             points = contour.reshape(-1, 2).astype(np.float32)
             
-            # Генерируем шум
-            noise_x = np.random.normal(0, noise_level, len(points))
-            noise_y = np.random.normal(0, noise_level, len(points))
+            # Генерируем шум сразу для x и y (строки 0 и 1)
+            noise = np.random.normal(0, noise_level, (2, len(points)))
             
-            # Применяем сглаживание к шуму для более естественного дрожания
-            noise_x = gaussian_filter(noise_x, sigma=1.0)
-            noise_y = gaussian_filter(noise_y, sigma=1.0)
+            # Применяем сглаживание к шуму вдоль контура для более естественного дрожания
+            noise = gaussian_filter1d(noise, sigma=1.0, axis=1)
             
             # Добавляем шум к точкам
-            noisy_points = points.copy()
-            noisy_points[:, 0] += noise_x
-            noisy_points[:, 1] += noise_y
+            noisy_points = (points + noise.T).astype(np.float32)
             
             # Ограничиваем координаты в разумных пределах
             noisy_points = np.clip(noisy_points, 0, 2048).astype(np.int32)
@@ -764,28 +775,29 @@ class ScribbleConditioning(BaseConditioning):
             if len(contour) < 2:
                 return
             
-            points = contour.reshape(-1, 2)
+            points = contour.reshape(-1, 2).astype(np.int32)
+            segment_count = len(points) - 1
             
             # Вычисляем толщину для каждого сегмента
             base_thickness = 2
             
-            for i in range(len(points) - 1):
-                # Симулируем изменение нажима (больше нажим в середине штриха)
-                t = i / max(len(points) - 1, 1)
-                pressure = np.sin(t * np.pi)  # Синусоидальное изменение нажима
-                
-                # Добавляем случайную вариацию
-                pressure += np.random.normal(0, line_variation * 0.1)
-                pressure = np.clip(pressure, 0.1, 1.0)
-                
-                # Вычисляем толщину линии
-                thickness = int(base_thickness * pressure * line_variation)
-                thickness = max(1, min(thickness, 8))  # Ограничиваем толщину
-                
-                # Рисуем сегмент
-                pt1 = tuple(points[i])
-                pt2 = tuple(points[i + 1])
-                cv2.line(image, pt1, pt2, 0, thickness)
+            # Симулируем изменение нажима (больше нажим в середине штриха)
+            t = np.arange(segment_count) / max(segment_count, 1)
+            pressure = np.sin(t * np.pi)  # Синусоидальное изменение нажима
+            
+            # Добавляем случайную вариацию
+            pressure = pressure + np.random.normal(0, line_variation * 0.1, segment_count)
+            pressure = np.clip(pressure, 0.1, 1.0)
+            
+            # Вычисляем толщину линии
+            thickness = (base_thickness * pressure * line_variation).astype(np.int32)
+            thickness = np.clip(thickness, 1, 8)  # Ограничиваем толщину
+            
+            # Сегменты (N, 2, 2); рисуем одним вызовом на каждую толщину.
+            # Все сегменты одного цвета, поэтому порядок отрисовки не влияет на результат
+            segments = np.stack([points[:-1], points[1:]], axis=1)
+            for value in np.unique(thickness):
+                cv2.polylines(image, list(segments[thickness == value]), False, 0, int(value))
                 
         except Exception as e:
             logger.warning(f"Error drawing pressure sensitive line: {e}")
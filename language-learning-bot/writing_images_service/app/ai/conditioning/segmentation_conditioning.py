@@ -41,6 +41,7 @@ class SegmentationConditioning(BaseConditioning):
         self, 
         image: Image.Image, 
         method: str = "simple_segmentation",
+        add_noise: bool = True,
         **kwargs
     ) -> ConditioningResult:
         """
@@ -49,6 +50,7 @@ class SegmentationConditioning(BaseConditioning):
         Args:
             image: Входное изображение
             method: Метод сегментации
+            add_noise: Применить случайный шум к результату
             **kwargs: Дополнительные параметры
             
         Returns:
@@ -94,7 +96,8 @@ class SegmentationConditioning(BaseConditioning):
             
             result_image = self.wave_distort(result_image, amplitude=5, wavelength=100)
             result_image = self.blur_image(result_image, radius=10)
-            result_image = self.add_noise_to_mask(result_image, noise_level=30, mask_threshold=20, mask_is_less_than=False)
+            if add_noise:
+                result_image = self.add_final_noise(result_image)
             
             # Вычисление времени обработки
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -122,6 +125,10 @@ class SegmentationConditioning(BaseConditioning):
                 processing_time_ms=int((time.time() - start_time) * 1000)
             )
     
+    def add_final_noise(self, image: Image.Image) -> Image.Image:
+        """Случайный шум поверх результата метода."""
+        return self.add_noise_to_mask(image, noise_level=30, mask_threshold=20, mask_is_less_than=False)
+    
     async def generate_from_text(
         self, 
         character: str, 
@@ -1,12 +1,19 @@
 """
 Conditioning Manager
 Менеджер для генерации conditioning изображений.
+
+Режимы (ai_generation.conditioning.mode):
+- single - один случайный тип conditioning на запрос;
+- multi - набор типов вычисляется одновременно в пуле процессов, каждый со своим
+  таймаутом; в генерацию идут типы, успевшие за таймаут (Union ControlNet
+  принимает несколько карт). Общая задержка - примерно самая медленная карта.
 """
 
 import time
 import asyncio
 import random
-from typing import Dict, Any, Optional
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
 from PIL import Image
 
 from app.utils.logger import get_module_logger
@@ -15,9 +22,85 @@ from app.ai.conditioning.canny_conditioning import CannyConditioning
 from app.ai.conditioning.depth_conditioning import DepthConditioning
 from app.ai.conditioning.segmentation_conditioning import SegmentationConditioning
 from app.ai.conditioning.scribble_conditioning import ScribbleConditioning
+from app.ai.conditioning.base_conditioning import ConditioningResult
+from app.utils.shared_memory_pool import SharedMemoryProcessPool
+from app.utils.two_level_cache import cache_key, get_render_cache, image_digest
+from app.utils.method_latency import get_method_latency_table
 
 logger = get_module_logger(__name__)
 
+CONDITIONING_CLASSES = {
+    "canny": CannyConditioning,
+    "depth": DepthConditioning,
+    "segmentation": SegmentationConditioning,
+    "scribble": ScribbleConditioning,
+}
+
+CONDITIONING_MODES = ("single", "multi")
+
+
+def resolve_multi_types(configured: Optional[List[str]]) -> List[str]:
+    """
+    Типы режима multi: заданные в конфигурации известные типы, по умолчанию все.
+    
+    Args:
+        configured: ai_generation.conditioning.multi.types
+        
+    Returns:
+        List[str]: Типы в порядке конфигурации
+    """
+    types = configured or list(CONDITIONING_CLASSES)
+    return [conditioning_type for conditioning_type in types if conditioning_type in CONDITIONING_CLASSES]
+
+# Генераторы внутри процесса пула (создаются один раз на процесс)
+_worker_generators: Dict[str, Any] = {}
+
+# Общий пул процессов: менеджеры создаются на каждый запрос, пул - один на сервис
+_conditioning_pool: Optional[SharedMemoryProcessPool] = None
+
+
+def _generate_in_worker(image: Image.Image, conditioning_type: str, method: str):
+    """Выполняется в процессе пула: синхронно генерирует conditioning без финального шума."""
+    generator = _worker_generators.get(conditioning_type)
+    if generator is None:
+        generator = CONDITIONING_CLASSES[conditioning_type]()
+        _worker_generators[conditioning_type] = generator
+    
+    result = asyncio.run(generator.generate_from_image(image, method=method, add_noise=False))
+    return (result.image if result.success else None), {
+        "success": result.success,
+        "method_used": result.method_used,
+        "processing_time_ms": result.processing_time_ms,
+        "error_message": result.error_message,
+        "metadata": result.metadata,
+    }
+
+
+def get_conditioning_pool(workers: int) -> Optional[SharedMemoryProcessPool]:
+    """
+    Возвращает общий пул процессов conditioning.
+    
+    Args:
+        workers: Число процессов (0 - пул не используется)
+        
+    Returns:
+        SharedMemoryProcessPool или None
+    """
+    global _conditioning_pool
+    if workers <= 0:
+        return None
+    if _conditioning_pool is None:
+        _conditioning_pool = SharedMemoryProcessPool(workers)
+    return _conditioning_pool
+
+
+def shutdown_conditioning_pool():
+    """Останавливает общий пул процессов conditioning."""
+    global _conditioning_pool
+    if _conditioning_pool is not None:
+        _conditioning_pool.shutdown()
+        _conditioning_pool = None
+
 
 class ConditioningManager:
     """
@@ -31,22 +114,37 @@ class ConditioningManager:
         Args:
             config: Конфигурация AI генерации
         """
+        if config.conditioning_mode not in CONDITIONING_MODES:
+            raise ValueError(f"Unknown conditioning mode '{config.conditioning_mode}', expected one of {CONDITIONING_MODES}")
         self.config = config
         
         # Инициализация conditioning генераторов
         self.conditioning_generators = {
-            "canny": CannyConditioning(),
-            "depth": DepthConditioning(),
-            "segmentation": SegmentationConditioning(),
-            "scribble": ScribbleConditioning()
+            conditioning_type: conditioning_class()
+            for conditioning_type, conditioning_class in CONDITIONING_CLASSES.items()
         }
         
+        # Тяжелая OpenCV/scikit-image обработка выполняется в пуле процессов,
+        # чтобы не блокировать event loop сервиса
+        self.process_pool = get_conditioning_pool(config.conditioning_workers)
+        
+        # Результаты детерминированных методов зависят только от изображения иероглифа
+        self.map_cache = get_render_cache("conditioning")
+        
+        # Задержки методов из бенчмарка: медленные методы выбираются реже
+        self.latency_table = None
+        if config.conditioning_latency_budget_ms > 0 and config.conditioning_latency_report:
+            self.latency_table = get_method_latency_table(config.conditioning_latency_report)
+        
         # Статистика
         self.conditioning_count = 0
         self.total_conditioning_time = 0
+        # Режим multi: карты, не успевшие за таймаут, и завершившиеся ошибкой
+        self.timeouts: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
         self.start_time = time.time()
         
-        logger.info("ConditioningManager initialized")
+        logger.info(f"ConditioningManager initialized (mode: {config.conditioning_mode})")
     
     async def ensure_conditioning_ready(self):
         """Обеспечивает готовность conditioning генераторов"""
@@ -54,6 +152,129 @@ class ConditioningManager:
         # Они готовы к работе сразу
         logger.debug("✓ Conditioning generators ready")
     
+    async def _generate_map(self, conditioning_type: str, base_image: Image.Image, method: str) -> ConditioningResult:
+        """Генерирует conditioning без шума в пуле процессов (или в текущем процессе, если пул отключен)."""
+        if self.process_pool:
+            try:
+                image, fields = await self.process_pool.run_image(
+                    _generate_in_worker, base_image, conditioning_type, method
+                )
+                return ConditioningResult(image=image, **fields)
+            except BrokenProcessPool as e:
+                logger.warning(f"Conditioning process pool failed, generating in-process: {e}")
+        
+        generator = self.conditioning_generators[conditioning_type]
+        return await generator.generate_from_image(base_image, method=method, add_noise=False)
+    
+    async def _generate(self, conditioning_type: str, base_image: Image.Image, method: str) -> ConditioningResult:
+        """
+        Генерирует conditioning: детерминированная карта берется из кэша или вычисляется,
+        случайный шум добавляется поверх при каждом вызове.
+        """
+        start_time = time.time()
+        generator = self.conditioning_generators[conditioning_type]
+        
+        key = None
+        if self.map_cache and generator.is_deterministic(method):
+            key = cache_key(conditioning_type, method, image_digest(base_image))
+            cached = await self.map_cache.get(key)
+            if cached is not None:
+                return ConditioningResult(
+                    success=True,
+                    image=generator.add_final_noise(cached),
+                    method_used=method,
+                    processing_time_ms=int((time.time() - start_time) * 1000),
+                    metadata={'cache_hit': True}
+                )
+        
+        result = await self._generate_map(conditioning_type, base_image, method)
+        if result.success and result.image is not None:
+            if key:
+                await self.map_cache.put(key, result.image)
+            result.image = generator.add_final_noise(result.image)
+        return result
+    
+    def _choose_method(self, conditioning_type: str, methods: list) -> str:
+        """Случайный метод; при заданном бюджете задержки - с весами по отчету бенчмарка."""
+        if not self.latency_table:
+            return random.choice(methods)
+        weights = self.latency_table.weights(
+            conditioning_type, methods, max(self.config.width, self.config.height),
+            self.config.conditioning_latency_budget_ms
+        )
+        return random.choices(methods, weights=weights)[0]
+    
+    def _select_method(self, conditioning_type: str, conditioning_methods: Optional[Dict[str, str]]) -> str:
+        """Метод из запроса или случайный."""
+        if conditioning_methods and conditioning_type in conditioning_methods:
+            return conditioning_methods[conditioning_type]
+        generator = self.conditioning_generators[conditioning_type]
+        return self._choose_method(conditioning_type, generator.get_available_methods())
+    
+    def get_multi_types(self) -> List[str]:
+        """Типы режима multi (ai_generation.conditioning.multi.types, по умолчанию все)."""
+        return resolve_multi_types(self.config.conditioning_types)
+    
+    def _timeout_seconds(self, conditioning_type: str) -> Optional[float]:
+        timeouts = self.config.conditioning_type_timeouts_ms or {}
+        timeout_ms = timeouts.get(conditioning_type, self.config.conditioning_timeout_ms)
+        return timeout_ms / 1000 if timeout_ms and timeout_ms > 0 else None
+    
+    async def _generate_within_timeout(
+        self,
+        conditioning_type: str,
+        base_image: Image.Image,
+        method: str
+    ) -> Optional[Image.Image]:
+        """
+        Генерирует одну карту режима multi; по таймауту или ошибке возвращает None.
+        
+        Вычисление в процессе пула после таймаута не прерывается, но его результат
+        отбрасывается, и запрос его не ждет.
+        """
+        try:
+            result = await asyncio.wait_for(
+                self._generate(conditioning_type, base_image, method),
+                timeout=self._timeout_seconds(conditioning_type)
+            )
+        except asyncio.TimeoutError:
+            self.timeouts[conditioning_type] = self.timeouts.get(conditioning_type, 0) + 1
+            logger.warning(f"{conditioning_type} conditioning ({method}) timed out "
+                           f"after {self._timeout_seconds(conditioning_type):.2f}s, skipping")
+            return None
+        except Exception as e:
+            self.failures[conditioning_type] = self.failures.get(conditioning_type, 0) + 1
+            logger.error(f"Error generating {conditioning_type} conditioning {method}: {e}")
+            return None
+        
+        if not result.success or result.image is None:
+            self.failures[conditioning_type] = self.failures.get(conditioning_type, 0) + 1
+            logger.warning(f"Failed to generate {conditioning_type} conditioning {method}: {result.error_message}")
+            return None
+        
+        logger.debug(f"✓ Generated {conditioning_type} conditioning "
+                     f"(method: {result.method_used}, time: {result.processing_time_ms}ms)")
+        return result.image
+    
+    async def _generate_multi(
+        self,
+        base_image: Image.Image,
+        conditioning_methods: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Optional[Image.Image]]]:
+        """Режим multi: все типы одновременно, каждый со своим таймаутом."""
+        types = self.get_multi_types()
+        methods = {conditioning_type: self._select_method(conditioning_type, conditioning_methods) for conditioning_type in types}
+        
+        logger.debug(f"Generating conditioning in parallel: {methods}")
+        images = await asyncio.gather(*(
+            self._generate_within_timeout(conditioning_type, base_image, methods[conditioning_type])
+            for conditioning_type in types
+        ))
+        return {
+            conditioning_type: {methods[conditioning_type]: image}
+            for conditioning_type, image in zip(types, images)
+        }
+    
     async def generate_all_conditioning(
         self,
         base_image: Image.Image,
@@ -61,7 +282,7 @@ class ConditioningManager:
         conditioning_methods: Optional[Dict[str, str]] = None
     ) -> Dict[str, Dict[str, Image.Image]]:
         """
-        Генерирует все типы conditioning изображений.
+        Генерирует conditioning изображения: один случайный тип или (режим multi) набор типов.
         
         Args:
             base_image: Базовое изображение иероглифа
@@ -69,45 +290,15 @@ class ConditioningManager:
             conditioning_methods: Методы для разных типов conditioning (опционально)
             
         Returns:
-            Dict[str, Dict[str, Image.Image]]: Conditioning изображения
+            Dict[str, Dict[str, Image.Image]]: Conditioning изображения (None - тип не получен)
         """
         start_time = time.time()
         
         try:
-            # Выбираем случайный тип conditioning для разнообразия
-            # В реальности можно генерировать несколько типов параллельно
-            conditioning_type = random.choice(list(self.conditioning_generators.keys()))
-            generator = self.conditioning_generators[conditioning_type]
-            
-            # Выбираем метод
-            if conditioning_methods and conditioning_type in conditioning_methods:
-                method = conditioning_methods[conditioning_type]
+            if self.config.conditioning_mode == "multi":
+                conditioning_images = await self._generate_multi(base_image, conditioning_methods)
             else:
-                method = random.choice(generator.get_available_methods())
-
-            conditioning_images = {
-                conditioning_type: {
-                    method: None
-                }
-            }
-            
-            logger.debug(f"Generating {conditioning_type} conditioning with method: {method}")
-            
-            try:
-                result = await generator.generate_from_image(base_image, method=method)
-                if result.success and result.image:
-                    conditioning_images[conditioning_type][method] = result.image
-                    logger.debug(f"✓ Generated {conditioning_type} conditioning "
-                               f"(method: {result.method_used}, "
-                               f"time: {result.processing_time_ms}ms)")
-                else:
-                    logger.warning(f"Failed to generate {conditioning_type} conditioning {method}: "
-                                 f"{result.error_message}")
-                    conditioning_images[conditioning_type][method] = None
-                    
-            except Exception as e:
-                logger.error(f"Error generating {conditioning_type} conditioning {method}: {e}")
-                conditioning_images[conditioning_type][method] = None
+                conditioning_images = await self._generate_single(base_image, conditioning_methods)
             
             # Проверяем что хотя бы один conditioning тип сгенерирован
             valid_conditioning = {
@@ -132,6 +323,40 @@ class ConditioningManager:
             logger.error(f"Error in conditioning generation: {e}")
             raise RuntimeError(f"Conditioning generation failed: {e}")
     
+    async def _generate_single(
+        self,
+        base_image: Image.Image,
+        conditioning_methods: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Optional[Image.Image]]]:
+        """Режим single: один случайный тип conditioning."""
+        # Выбираем случайный тип conditioning для разнообразия
+        conditioning_type = random.choice(list(self.conditioning_generators.keys()))
+        method = self._select_method(conditioning_type, conditioning_methods)
+        
+        conditioning_images = {
+            conditioning_type: {
+                method: None
+            }
+        }
+        
+        logger.debug(f"Generating {conditioning_type} conditioning with method: {method}")
+        
+        try:
+            result = await self._generate(conditioning_type, base_image, method)
+            if result.success and result.image:
+                conditioning_images[conditioning_type][method] = result.image
+                logger.debug(f"✓ Generated {conditioning_type} conditioning "
+                           f"(method: {result.method_used}, "
+                           f"time: {result.processing_time_ms}ms)")
+            else:
+                logger.warning(f"Failed to generate {conditioning_type} conditioning {method}: "
+                             f"{result.error_message}")
+                
+        except Exception as e:
+            logger.error(f"Error generating {conditioning_type} conditioning {method}: {e}")
+        
+        return conditioning_images
+    
     async def generate_specific_conditioning(
         self,
         base_image: Image.Image,
@@ -154,8 +379,7 @@ class ConditioningManager:
             return None
         
         try:
-            generator = self.conditioning_generators[conditioning_type]
-            result = await generator.generate_from_image(base_image, method=method)
+            result = await self._generate(conditioning_type, base_image, method)
             
             if result.success and result.image:
                 logger.debug(f"✓ Generated {conditioning_type} conditioning with {method}")
@@ -189,7 +413,17 @@ class ConditioningManager:
             "average_conditioning_time_seconds": avg_conditioning_time,
             "uptime_seconds": uptime_seconds,
             "available_conditioning_types": list(self.conditioning_generators.keys()),
-            "available_methods": self.get_available_conditioning_types()
+            "available_methods": self.get_available_conditioning_types(),
+            "mode": self.config.conditioning_mode,
+            "multi_types": self.get_multi_types() if self.config.conditioning_mode == "multi" else None,
+            "timeouts": dict(self.timeouts),
+            "failures": dict(self.failures),
+            "process_pool": {
+                "workers": self.process_pool.workers,
+                "tasks": self.process_pool.task_count,
+                "failures": self.process_pool.failed_count,
+            } if self.process_pool else None,
+            "map_cache": self.map_cache.get_stats() if self.map_cache else None
         }
     
     async def cleanup(self):
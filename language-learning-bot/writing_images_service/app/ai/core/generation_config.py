@@ -3,7 +3,7 @@ AI Generation Configuration
 Конфигурация для AI генерации изображений.
 """
 
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
 
@@ -14,10 +14,16 @@ class AIGenerationConfig:
     base_model: str = "stabilityai/stable-diffusion-xl-base-1.0"
     controlnet_models: Optional[Dict[str, str]] = None
     
+    # Бэкенд генерации (app.ai.backends) и его параметры
+    backend: str = "sdxl_union"
+    backend_options: Optional[Dict[str, Any]] = None
+    
     # Параметры генерации
     width: int = 1024
     height: int = 1024
     batch_size: int = 1
+    # Окно ожидания совместимых запросов для батча (мс)
+    batch_window_ms: float = 50.0
     
     # GPU настройки
     device: str = "cuda"
@@ -25,6 +31,20 @@ class AIGenerationConfig:
     enable_attention_slicing: bool = True
     enable_cpu_offload: bool = False
     
+    # Процессы для генерации conditioning (0 - в процессе сервиса)
+    conditioning_workers: int = 2
+    # Бюджет задержки для выбора метода conditioning (0 - равновероятный выбор)
+    conditioning_latency_budget_ms: float = 0.0
+    # Отчет python -m benchmarks conditioning с задержками методов
+    conditioning_latency_report: Optional[str] = None
+    # single - один случайный тип на запрос, multi - набор типов параллельно
+    conditioning_mode: str = "single"
+    # Типы режима multi (None - все доступные)
+    conditioning_types: Optional[List[str]] = None
+    # Таймаут одной карты в режиме multi (0 - без ограничения) и переопределения по типам
+    conditioning_timeout_ms: float = 0.0
+    conditioning_type_timeouts_ms: Optional[Dict[str, float]] = None
+    
     # Translation настройки
     enable_translation: bool = True
     translation_fallback_to_original: bool = True
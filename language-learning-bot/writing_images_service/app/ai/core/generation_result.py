@@ -3,24 +3,25 @@ AI Generation Result
 Результат AI генерации изображения.
 """
 
-import io
-import base64
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from PIL import Image
 
 from app.ai.core.generation_config import AIGenerationConfig
+from app.utils.image_encoding import image_to_base64
 
 
 @dataclass 
 class AIGenerationResult:
     """Результат AI генерации изображения"""
     success: bool
-    generated_image_base64: Optional[str] = None
+    # Изображения хранятся как есть и кодируются только при обращении:
+    # бинарный ответ кодирует их сразу в WebP/PNG, минуя base64
+    generated_image: Optional[Image.Image] = field(default=None, repr=False)
     
     # Промежуточные результаты
-    base_image_base64: Optional[str] = None
-    conditioning_images_base64: Optional[Dict[str, Dict[str, str]]] = None
+    base_image: Optional[Image.Image] = field(default=None, repr=False)
+    conditioning_images: Optional[Dict[str, Dict[str, Optional[Image.Image]]]] = field(default=None, repr=False)
     
     # Промпты
     prompt_used: Optional[str] = None
@@ -42,13 +43,25 @@ class AIGenerationResult:
         if self.warnings is None:
             self.warnings = []
     
+    @property
+    def generated_image_base64(self) -> Optional[str]:
+        """Итоговое изображение в base64 (PNG)"""
+        return self._to_base64(self.generated_image) if self.generated_image is not None else None
+    
+    @property
+    def base_image_base64(self) -> Optional[str]:
+        """Базовое изображение в base64 (PNG)"""
+        return self._to_base64(self.base_image) if self.base_image is not None else None
+    
+    @property
+    def conditioning_images_base64(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Conditioning изображения в base64 (PNG)"""
+        return self._conditioning_to_base64(self.conditioning_images) if self.conditioning_images else None
+    
     @staticmethod
     def _to_base64(image: Image.Image) -> str:
         """Конвертирует изображение в base64"""
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-        buffer.seek(0)
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return image_to_base64(image)
     
     @staticmethod
     def _conditioning_to_base64(conditioning_images: Dict[str, Dict[str, Image.Image]]) -> Dict[str, Dict[str, str]]:
@@ -76,7 +89,8 @@ class AIGenerationResult:
         model_config: AIGenerationConfig,
         base_image: Optional[Image.Image] = None,
         conditioning_images: Optional[Dict[str, Dict[str, Image.Image]]] = None,
-        prompt_used: Optional[str] = None
+        prompt_used: Optional[str] = None,
+        stage_timings: Optional[Dict[str, Dict[str, float]]] = None
     ) -> 'AIGenerationResult':
         """
         Создает успешный результат генерации.
@@ -93,15 +107,16 @@ class AIGenerationResult:
             base_image: Базовое изображение (опционально)
             conditioning_images: Conditioning изображения (опционально)
             prompt_used: Использованный промпт (опционально)
+            stage_timings: Начало и длительность этапов генерации (опционально)
             
         Returns:
             AIGenerationResult: Результат генерации
         """
         return cls(
             success=True,
-            generated_image_base64=cls._to_base64(generated_image),
-            base_image_base64=cls._to_base64(base_image) if base_image else None,
-            conditioning_images_base64=cls._conditioning_to_base64(conditioning_images) if conditioning_images else None,
+            generated_image=generated_image,
+            base_image=base_image,
+            conditioning_images=conditioning_images,
             prompt_used=prompt_used,
             translation_used=english_translation,
             translation_source=translation_metadata.get('source'),
@@ -120,6 +135,8 @@ class AIGenerationResult:
                 'model_used': model_config.base_model,
                 'controlnet_model': "union",
                 'image_size': (model_config.width, model_config.height),
+                'cache_hit': False,
+                'stage_timings': stage_timings or {},
             }
         )
     
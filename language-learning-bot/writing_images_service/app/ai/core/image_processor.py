@@ -9,6 +9,7 @@ from PIL import Image
 
 from app.utils.logger import get_module_logger
 from app.utils.image_utils import get_image_processor
+from app.utils.two_level_cache import cache_key, get_render_cache
 from app.ai.core.generation_config import AIGenerationConfig
 
 logger = get_module_logger(__name__)
@@ -29,6 +30,9 @@ class ImageProcessor:
         self.config = config
         self.image_processor = get_image_processor()
         
+        # Отрендеренные иероглифы: зависят только от символа, размера и шрифта
+        self.glyph_cache = get_render_cache("glyphs")
+        
         # Статистика
         self.processing_count = 0
         self.total_processing_time = 0
@@ -56,6 +60,14 @@ class ImageProcessor:
         start_time = time.time()
         
         try:
+            key = None
+            if self.glyph_cache:
+                key = self._glyph_cache_key(character, width, height)
+                cached = await self.glyph_cache.get(key)
+                if cached is not None:
+                    logger.debug(f"Character '{character}' {width}x{height} taken from glyph cache")
+                    return cached
+            
             # Используем ImageProcessor для рендеринга с автоподбором шрифта
             image = await self.image_processor.create_image(width, height, (255, 255, 255))
             
@@ -83,12 +95,20 @@ class ImageProcessor:
             logger.info(f"Rendered character '{character}' with font size {font_size} "
                        f"in {processing_time:.3f}s")
             
+            if key:
+                await self.glyph_cache.put(key, image)
+            
             return image
             
         except Exception as e:
             logger.error(f"Error preprocessing character {character}: {e}")
             raise RuntimeError(f"Character preprocessing failed: {e}")
     
+    def _glyph_cache_key(self, character: str, width: int, height: int) -> str:
+        """Ключ кэша иероглифа: символ, размер и файл шрифта, который выберет автоподбор."""
+        font = self.image_processor.font_manager.get_font(min(width, height), text=character)
+        return cache_key("glyph", character, width, height, getattr(font, "path", None) or "default")
+    
     async def resize_image(
         self,
         image: Image.Image,
@@ -176,7 +196,8 @@ class ImageProcessor:
             "average_processing_time_seconds": avg_processing_time,
             "uptime_seconds": uptime_seconds,
             "default_image_size": (self.config.width, self.config.height),
-            "image_processor_ready": self.image_processor is not None
+            "image_processor_ready": self.image_processor is not None,
+            "glyph_cache": self.glyph_cache.get_stats() if self.glyph_cache else None
         }
     
     async def cleanup(self):
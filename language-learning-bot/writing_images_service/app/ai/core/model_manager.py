@@ -1,24 +1,28 @@
 """
 Model Manager
 Менеджер для загрузки и управления AI моделями.
+
+Сама модель - бэкенд из app.ai.backends (ai_generation.backend.name): по
+умолчанию SDXL + Union ControlNet, для профилирования без GPU - cpu.
 """
 
 import time
 import asyncio
-from typing import Dict, Any, Optional
+import traceback
+from typing import Dict, Any, List, Optional
 from PIL import Image
 
 from app.utils.logger import get_module_logger
 from app.ai.core.generation_config import AIGenerationConfig
-from app.ai.multi_controlnet_pipeline import MultiControlNetPipeline, PipelineConfig
-from app.ai.models.model_loader import ModelLoader
+from app.ai.backends import GenerationBackend, create_backend
+from app.utils.batch_scheduler import BatchItem, BatchScheduler
 
 logger = get_module_logger(__name__)
 
 
 class ModelManager:
     """
-    Менеджер для загрузки и управления AI моделями (SDXL + Union ControlNet).
+    Менеджер для загрузки и управления AI моделями (бэкенд генерации + батчинг).
     """
     
     def __init__(self, config: AIGenerationConfig):
@@ -29,8 +33,8 @@ class ModelManager:
             config: Конфигурация AI генерации
         """
         self.config = config
-        self.model_loader: Optional[ModelLoader] = None
-        self.pipeline: Optional[MultiControlNetPipeline] = None
+        self.backend: Optional[GenerationBackend] = None
+        self.batch_scheduler: Optional[BatchScheduler] = None
         self._models_loaded = False
         self._model_loading_lock = asyncio.Lock()
         
@@ -53,46 +57,27 @@ class ModelManager:
                 return
             
             try:
-                logger.info("Loading AI models...")
+                logger.info(f"Loading AI models (backend: {self.config.backend})...")
                 load_start = time.time()
                 
-                # Инициализируем Model Loader
-                self.model_loader = ModelLoader()
-                
-                # Загружаем Stable Diffusion XL
-                await self.model_loader.load_stable_diffusion_xl(self.config.base_model)
+                self.backend = create_backend(self.config)
+                await self.backend.load()
                 
-                # Загружаем Union ControlNet модель
-                controlnets = await self.model_loader.load_controlnet_models(self.config.controlnet_models)
+                # Проверяем что бэкенд готов
+                if not self.backend.is_ready():
+                    raise RuntimeError("Backend setup failed")
                 
-                # Настраиваем Multi-ControlNet pipeline
-                pipeline_config = PipelineConfig(
-                    base_model=self.config.base_model,
-                    controlnet_models=self.config.controlnet_models,
-                    device=self.config.device,
-                    memory_efficient=self.config.memory_efficient,
-                    enable_attention_slicing=self.config.enable_attention_slicing,
-                    enable_cpu_offload=self.config.enable_cpu_offload
+                self.batch_scheduler = BatchScheduler(
+                    self._run_batch,
+                    max_batch_size=self._max_batch_size(),
+                    max_wait_ms=self.config.batch_window_ms
                 )
                 
-                self.pipeline = MultiControlNetPipeline(pipeline_config)
-                await self.pipeline.setup_pipeline()
-                
-                # Проверяем что pipeline готов
-                if not self.pipeline.is_ready():
-                    raise RuntimeError("Pipeline setup failed")
-                
                 load_time = time.time() - load_start
                 self._models_loaded = True
                 
                 logger.info(f"✓ All AI models loaded successfully in {load_time:.1f}s")
                 
-                # Логируем статистику моделей
-                model_status = self.model_loader.get_model_status()
-                loaded_count = sum(1 for status in model_status.values() if status.loaded)
-                total_count = len(model_status)
-                logger.info(f"Model status: {loaded_count}/{total_count} loaded")
-                
             except Exception as e:
                 logger.error(f"Failed to load AI models: {e}")
                 self._models_loaded = False
@@ -120,7 +105,7 @@ class ModelManager:
         start_time = time.time()
         
         try:
-            if not self.pipeline or not self.pipeline.is_ready():
+            if not self.backend or not self.backend.is_ready():
                 raise RuntimeError("Pipeline not ready for generation")
             
             # Подготавливаем conditioning изображения для pipeline
@@ -162,13 +147,21 @@ class ModelManager:
             
             logger.debug(f"Generation parameters: {gen_params}")
             
-            # Запускаем AI генерацию
-            result_image = await self.pipeline.generate(
-                prompt=prompt,
-                control_images=control_images,
-                seed=seed,
-                **gen_params
-            )
+            # Запускаем AI генерацию (через батчинг, если доступен)
+            if self.batch_scheduler:
+                result_image = await self.batch_scheduler.submit(
+                    prompt,
+                    control_images,
+                    seed=seed,
+                    **gen_params
+                )
+            else:
+                result_image = await self.backend.generate(
+                    prompt=prompt,
+                    control_images=control_images,
+                    seed=seed,
+                    **gen_params
+                )
             
             # Обновляем статистику
             inference_time = time.time() - start_time
@@ -183,6 +176,23 @@ class ModelManager:
             logger.error(traceback.format_exc())
             raise RuntimeError(f"AI generation failed: {e}")
     
+    def _max_batch_size(self) -> int:
+        """Размер батча из конфигурации, ограниченный ресурсами бэкенда (свободной памятью GPU)."""
+        max_batch_size = self.backend.recommended_batch_size(max(1, self.config.batch_size))
+        logger.info(f"Generation batching: max_batch_size={max_batch_size}, window={self.config.batch_window_ms}ms")
+        return max_batch_size
+    
+    async def _run_batch(self, items: List[BatchItem]) -> List[Image.Image]:
+        """Запускает батч запросов одним вызовом бэкенда."""
+        if not self.backend or not self.backend.is_ready():
+            raise RuntimeError("Pipeline not ready for generation")
+        return await self.backend.generate_batch(
+            prompts=[item.prompt for item in items],
+            control_images_list=[item.control_images for item in items],
+            seeds=[item.seed for item in items],
+            **items[0].params
+        )
+    
     async def get_status(self) -> Dict[str, Any]:
         """Возвращает статус Model Manager"""
         uptime_seconds = int(time.time() - self.start_time)
@@ -193,7 +203,8 @@ class ModelManager:
         
         status = {
             "models_loaded": self._models_loaded,
-            "pipeline_ready": self.pipeline.is_ready() if self.pipeline else False,
+            "pipeline_ready": self.backend.is_ready() if self.backend else False,
+            "backend": self.config.backend,
             "generation_count": self.generation_count,
             "total_inference_time_seconds": self.total_inference_time,
             "average_inference_time_seconds": avg_inference_time,
@@ -201,23 +212,12 @@ class ModelManager:
             "controlnet_model": "union"
         }
         
-        # Добавляем статистику моделей если доступно
-        if self.model_loader:
-            model_status = self.model_loader.get_model_status()
-            status["model_status"] = {
-                name: {
-                    "loaded": status.loaded,
-                    "memory_usage_mb": status.memory_usage_mb,
-                    "load_time_seconds": status.load_time_seconds
-                }
-                for name, status in model_status.items()
-            }
-            
-            status["total_memory_usage"] = self.model_loader.get_total_memory_usage()
+        # Статистика моделей и pipeline от бэкенда
+        if self.backend:
+            status["backend_status"] = self.backend.get_status()
         
-        # Добавляем статистику pipeline если доступно
-        if self.pipeline:
-            status["pipeline_stats"] = self.pipeline.get_generation_stats()
+        if self.batch_scheduler:
+            status["batching"] = self.batch_scheduler.get_stats()
         
         return status
     
@@ -226,13 +226,13 @@ class ModelManager:
         try:
             logger.info("Cleaning up Model Manager...")
             
-            if self.pipeline:
-                await self.pipeline.unload_pipeline()
-                self.pipeline = None
+            if self.batch_scheduler:
+                await self.batch_scheduler.stop()
+                self.batch_scheduler = None
             
-            if self.model_loader:
-                await self.model_loader.unload_all_models()
-                self.model_loader = None
+            if self.backend:
+                await self.backend.unload()
+                self.backend = None
             
             self._models_loaded = False
             
@@ -9,7 +9,7 @@ Supports multiple model types: Qwen, NLLB, mT5, OPUS
 import time
 import torch
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import traceback
@@ -76,6 +76,7 @@ class TranslationModel:
         # Статус загрузки
         self._is_loaded = False
         self._loading_lock = asyncio.Lock()
+        self._inference_lock = asyncio.Lock()
         
         # ИСПРАВЛЕНО: Явно определяем основное устройство
         self.device = self._determine_primary_device()
@@ -83,6 +84,7 @@ class TranslationModel:
         
         # Статистика
         self.translation_count = 0
+        self.batch_count = 0
         self.total_translation_time = 0
         self.start_time = time.time()
         
@@ -316,85 +318,150 @@ class TranslationModel:
         Returns:
             TranslationResult: Результат перевода
         """
+        results = await self.translate_batch([(character, russian_text)], **generation_kwargs)
+        return results[0]
+    
+    async def translate_batch(
+        self,
+        items: List[Tuple[str, str]],
+        **generation_kwargs
+    ) -> List[TranslationResult]:
+        """
+        Переводит несколько значений одним вызовом generate.
+        
+        Входы дополняются (padding) до общей длины, результаты возвращаются
+        в порядке items. Если вызов модели падает, все элементы батча
+        получают success=False.
+        
+        Args:
+            items: Пары (китайский иероглиф, русское значение)
+            **generation_kwargs: Параметры генерации (общие для всего батча)
+            
+        Returns:
+            List[TranslationResult]: Результат для каждого элемента
+        """
+        if not items:
+            return []
+        
         if not self._is_loaded:
             await self.load_model()
             
         start_time = time.time()
         
         try:
-            logger.debug(f"Translating: '{russian_text}' for character '{character}' on device: {self.device}")
-            
-            # Генерируем перевод в зависимости от типа модели
-            if self.model_type == "qwen":
-                translated_text = await self._translate_with_qwen(character, russian_text, **generation_kwargs)
-            elif self.model_type == "nllb":
-                translated_text = await self._translate_with_nllb(russian_text, **generation_kwargs)
-            elif self.model_type == "mt5":
-                translated_text = await self._translate_with_mt5(character, russian_text, **generation_kwargs)
-            elif self.model_type == "opus":
-                translated_text = await self._translate_with_opus(russian_text, **generation_kwargs)
-            else:
-                # Универсальный подход
-                translated_text = await self._translate_generic(character, russian_text, **generation_kwargs)
+            logger.debug(f"Translating batch of {len(items)} on device: {self.device}")
+            
+            # generate блокирует поток - выполняем его вне event loop, чтобы за это время
+            # успевали собираться следующие запросы; одновременно идет один вызов модели
+            async with self._inference_lock:
+                translated_texts = await asyncio.to_thread(self._translate_batch_sync, items, generation_kwargs)
+            
+            if len(translated_texts) != len(items):
+                raise RuntimeError(f"Model returned {len(translated_texts)} translations for {len(items)} inputs")
             
             translation_time_ms = int((time.time() - start_time) * 1000)
             
             # Обновляем статистику
-            self.translation_count += 1
+            self.translation_count += len(items)
+            self.batch_count += 1
             self.total_translation_time += translation_time_ms
             
-            logger.debug(f"✓ Translation completed: '{translated_text}' ({translation_time_ms}ms)")
-            
-            return TranslationResult(
-                success=True,
-                translated_text=translated_text,
-                original_text=russian_text,
-                character=character,
-                translation_time_ms=translation_time_ms,
-                model_used=self.model_id,
-                cache_hit=False,
-                confidence_score=0.9  # TODO: вычислять реальную уверенность
-            )
+            logger.debug(f"✓ Batch of {len(items)} translations completed ({translation_time_ms}ms)")
+            
+            return [
+                TranslationResult(
+                    success=True,
+                    translated_text=translated_text,
+                    original_text=russian_text,
+                    character=character,
+                    translation_time_ms=translation_time_ms,
+                    model_used=self.model_id,
+                    cache_hit=False,
+                    confidence_score=0.9  # TODO: вычислять реальную уверенность
+                )
+                for (character, russian_text), translated_text in zip(items, translated_texts)
+            ]
             
         except Exception as e:
             translation_time_ms = int((time.time() - start_time) * 1000)
             logger.error(traceback.format_exc())
-            logger.error(f"Translation failed: {e}")
-            
-            return TranslationResult(
-                success=False,
-                original_text=russian_text,
-                character=character,
-                translation_time_ms=translation_time_ms,
-                model_used=self.model_id,
-                error_message=str(e)
-            )
+            logger.error(f"Translation of {len(items)} items failed: {e}")
+            
+            return [
+                TranslationResult(
+                    success=False,
+                    original_text=russian_text,
+                    character=character,
+                    translation_time_ms=translation_time_ms,
+                    model_used=self.model_id,
+                    error_message=str(e)
+                )
+                for character, russian_text in items
+            ]
+    
+    def _translate_batch_sync(self, items: List[Tuple[str, str]], kwargs: Dict[str, Any]) -> List[str]:
+        """Выбирает способ перевода по типу модели (выполняется в рабочем потоке)."""
+        if self.model_type == "qwen":
+            return self._translate_batch_with_qwen(items, **kwargs)
+        elif self.model_type == "nllb":
+            return self._translate_batch_with_nllb([text for _, text in items], **kwargs)
+        elif self.model_type == "mt5":
+            return self._translate_batch_with_mt5(items, **kwargs)
+        elif self.model_type == "opus":
+            return self._translate_batch_with_opus([text for _, text in items], **kwargs)
+        else:
+            # Универсальный подход
+            return self._translate_batch_generic([text for _, text in items], **kwargs)
+    
+    def _tokenize_batch(self, texts: List[str]) -> Dict[str, torch.Tensor]:
+        """
+        Токенизирует батч с padding до самой длинной строки.
+        
+        Args:
+            texts: Входные строки
+            
+        Returns:
+            Dict[str, torch.Tensor]: input_ids и attention_mask на устройстве модели
+        """
+        model_inputs = self.tokenizer(texts, return_tensors="pt", padding=True)
+        return self._ensure_tensor_device(model_inputs)
     
-    async def _translate_with_qwen(self, character: str, russian_text: str, **kwargs) -> str:
+    def _decode_batch(self, outputs: torch.Tensor) -> List[str]:
+        """Декодирует выход generate в строки без служебных токенов."""
+        return [text.strip() for text in self.tokenizer.batch_decode(outputs, skip_special_tokens=True)]
+    
+    def _translate_batch_with_qwen(self, items: List[Tuple[str, str]], **kwargs) -> List[str]:
         """
         Перевод с помощью Qwen модели (инструкционной).
         ИСПРАВЛЕНО: Обеспечение совместимости устройств
         """
         # Prompt для Qwen
         system_prompt = "You are a professional translator. Translate the given text to English concisely and accurately for AI image generation prompts."
-        user_prompt = f"Chinese character: {character}\nRussian meaning: {russian_text}\nTranslate to English (short phrase for image prompt):"
         
-        # Форматируем для Qwen
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
+        texts = []
+        for character, russian_text in items:
+            user_prompt = f"Chinese character: {character}\nRussian meaning: {russian_text}\nTranslate to English (short phrase for image prompt):"
+            
+            # Форматируем для Qwen
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            
+            # Применяем chat template
+            texts.append(self.tokenizer.apply_chat_template(
+                messages,
+                tokenize=False,
+                add_generation_prompt=True
+            ))
         
-        # Применяем chat template
-        text = self.tokenizer.apply_chat_template(
-            messages,
-            tokenize=False,
-            add_generation_prompt=True
-        )
+        # Causal LM продолжает последний токен входа - padding должен быть слева
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token_id is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
         
         # ИСПРАВЛЕНО: Токенизируем и обеспечиваем правильное устройство
-        model_inputs = self.tokenizer([text], return_tensors="pt")
-        model_inputs = self._ensure_tensor_device(model_inputs)
+        model_inputs = self._tokenize_batch(texts)
         
         # Проверяем устройства перед генерацией
         input_device = model_inputs['input_ids'].device
@@ -418,18 +485,11 @@ class TranslationModel:
                 attention_mask=model_inputs.get('attention_mask')
             )
         
-        # Декодируем только новые токены
+        # Декодируем только новые токены (при левом padding входы одной длины)
         input_length = model_inputs['input_ids'].shape[1]
-        new_tokens = generated_ids[:, input_length:]
-        
-        response = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)[0]
-        
-        # Очищаем ответ
-        response = response.strip()
-        
-        return response
+        return self._decode_batch(generated_ids[:, input_length:])
     
-    async def _translate_with_nllb(self, russian_text: str, **kwargs) -> str:
+    def _translate_batch_with_nllb(self, russian_texts: List[str], **kwargs) -> List[str]:
         """
         Перевод с помощью NLLB модели.
         ИСПРАВЛЕНО: Обеспечение совместимости устройств
@@ -438,8 +498,7 @@ class TranslationModel:
         self.tokenizer.src_lang = "rus_Cyrl"  # Русский
         
         # ИСПРАВЛЕНО: Токенизируем и обеспечиваем правильное устройство
-        encoded = self.tokenizer(russian_text, return_tensors="pt")
-        encoded = self._ensure_tensor_device(encoded)
+        encoded = self._tokenize_batch(russian_texts)
         
         # Генерируем перевод
         with torch.no_grad():
@@ -451,85 +510,76 @@ class TranslationModel:
                 length_penalty=kwargs.get('length_penalty', 1.0)
             )
         
-        # Декодируем
-        translated_text = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
-        
-        return translated_text.strip()
+        return self._decode_batch(generated_tokens)
     
-    async def _translate_with_mt5(self, character: str, russian_text: str, **kwargs) -> str:
+    def _translate_batch_with_mt5(self, items: List[Tuple[str, str]], **kwargs) -> List[str]:
         """
         Перевод с помощью mT5 модели.
         ИСПРАВЛЕНО: Обеспечение совместимости устройств
         """
         # mT5 использует prefix для указания задачи
-        input_text = f"translate Russian to English: Character {character} means: {russian_text}"
+        input_texts = [
+            f"translate Russian to English: Character {character} means: {russian_text}"
+            for character, russian_text in items
+        ]
         
         # ИСПРАВЛЕНО: Токенизируем и обеспечиваем правильное устройство
-        model_inputs = self.tokenizer(input_text, return_tensors="pt")
-        model_inputs = self._ensure_tensor_device(model_inputs)
+        model_inputs = self._tokenize_batch(input_texts)
         
         # Генерируем
         with torch.no_grad():
             outputs = self.model.generate(
-                model_inputs['input_ids'],
+                **model_inputs,
                 max_length=kwargs.get('max_length', 50),
                 num_beams=kwargs.get('num_beams', 4),
                 length_penalty=kwargs.get('length_penalty', 0.6),
                 early_stopping=True
             )
         
-        # Декодируем
-        translated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        return translated_text.strip()
+        return self._decode_batch(outputs)
     
-    async def _translate_with_opus(self, russian_text: str, **kwargs) -> str:
+    def _translate_batch_with_opus(self, russian_texts: List[str], **kwargs) -> List[str]:
         """
         Перевод с помощью OPUS модели.
         ИСПРАВЛЕНО: Обеспечение совместимости устройств
         """
         # ИСПРАВЛЕНО: Токенизируем и обеспечиваем правильное устройство
-        model_inputs = self.tokenizer(russian_text, return_tensors="pt")
-        model_inputs = self._ensure_tensor_device(model_inputs)
+        model_inputs = self._tokenize_batch(russian_texts)
         
         with torch.no_grad():
             outputs = self.model.generate(
-                model_inputs['input_ids'],
+                **model_inputs,
                 max_length=kwargs.get('max_length', 50),
                 num_beams=kwargs.get('num_beams', 4),
                 early_stopping=True
             )
         
-        translated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        return translated_text.strip()
+        return self._decode_batch(outputs)
     
-    async def _translate_generic(self, character: str, russian_text: str, **kwargs) -> str:
+    def _translate_batch_generic(self, russian_texts: List[str], **kwargs) -> List[str]:
         """
         Универсальный перевод для неизвестных моделей.
         ИСПРАВЛЕНО: Обеспечение совместимости устройств
         """
         # Пробуем как seq2seq модель
         try:
-            input_text = f"translate: {russian_text}"
-            model_inputs = self.tokenizer(input_text, return_tensors="pt")
-            model_inputs = self._ensure_tensor_device(model_inputs)
+            model_inputs = self._tokenize_batch([f"translate: {text}" for text in russian_texts])
             
             with torch.no_grad():
                 outputs = self.model.generate(
-                    model_inputs['input_ids'],
+                    **model_inputs,
                     max_length=kwargs.get('max_length', 50),
                     num_beams=kwargs.get('num_beams', 4)
                 )
             
-            translated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            return translated_text.strip()
+            return self._decode_batch(outputs)
             
         except Exception as e:
             # Если не получилось, возвращаем оригинальный текст
             logger.warning(f"Generic translation failed: {e}, returning original text")
-            return russian_text
+            return list(russian_texts)
     
+
     def _get_memory_usage(self) -> float:
         """Возвращает использование GPU памяти в MB."""
         if torch.cuda.is_available():
@@ -566,6 +616,7 @@ class TranslationModel:
             "is_loaded": self._is_loaded,
             "device": self.device,
             "translation_count": self.translation_count,
+            "batch_count": self.batch_count,
             "total_translation_time_ms": self.total_translation_time,
             "average_translation_time_ms": avg_time,
             "uptime_seconds": uptime_seconds,
@@ -202,6 +202,83 @@ class MultiControlNetPipeline:
             # Очистка памяти
             await self._cleanup_memory()
     
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        control_images_list: List[Dict[str, Image.Image]],
+        seeds: List[Optional[int]],
+        **generation_params
+    ) -> List[Image.Image]:
+        """
+        Генерирует несколько изображений одним вызовом pipeline.
+        
+        Все элементы батча должны иметь одинаковые размеры, число шагов и набор
+        типов conditioning (union_control_type общий для батча).
+        
+        Args:
+            prompts: Промпты по элементам батча
+            control_images_list: Conditioning изображения по элементам батча
+            seeds: Seed по элементам батча (None - случайный)
+            **generation_params: Общие параметры генерации
+            
+        Returns:
+            List[Image.Image]: Изображения в порядке промптов
+            
+        Raises:
+            RuntimeError: Если генерация не удалась
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Pipeline not loaded. Call setup_pipeline() first.")
+        if len(prompts) == 1:
+            return [await self.generate(prompt=prompts[0], control_images=control_images_list[0],
+                                        seed=seeds[0], **generation_params)]
+        
+        start_time = time.time()
+        
+        try:
+            params = GenerationParams(prompt=prompts[0], **generation_params)
+            
+            # Собираем conditioning по слотам Union ControlNet: в каждом слоте список изображений батча
+            prepared_items = [
+                await self._prepare_union_control_inputs(control_images or {})
+                for control_images in control_images_list
+            ]
+            union_control_type = prepared_items[0]['union_control_type']
+            image_list = [
+                [item['image_list'][idx] for item in prepared_items] if union_control_type[idx] else torch.zeros(1)
+                for idx in range(len(union_control_type))
+            ]
+            prepared_controls = {
+                'image_list': image_list,
+                'union_control_type': union_control_type,
+                'used_types': prepared_items[0]['used_types'],
+            }
+            
+            # Генератор на каждый элемент, чтобы seed давал тот же результат, что и без батча
+            generators = None
+            if any(seed is not None for seed in seeds):
+                generators = [
+                    self._setup_generator(seed if seed is not None else int(torch.seed() % 2**32))
+                    for seed in seeds
+                ]
+            
+            memory_before = self._get_memory_usage()
+            images = await self._run_union_inference(params, prepared_controls, generators, prompts=prompts)
+            
+            inference_time = time.time() - start_time
+            memory_after = self._get_memory_usage()
+            self._update_stats(inference_time, memory_before, memory_after)
+            
+            logger.info(f"Generated batch of {len(prompts)} images with Union ControlNet in {inference_time:.2f}s")
+            
+            return images
+            
+        except Exception as e:
+            logger.error(f"Error in Union ControlNet batch generation: {e}")
+            raise RuntimeError(f"Batch generation failed: {e}")
+        finally:
+            await self._cleanup_memory()
+    
     async def _check_device_availability(self):
         """Проверяет доступность GPU и настраивает устройство."""
         if not torch.cuda.is_available():
@@ -465,8 +542,9 @@ class MultiControlNetPipeline:
         self,
         params: GenerationParams,
         prepared_controls: Dict[str, Any],
-        generator: Optional[torch.Generator]
-    ) -> Image.Image:
+        generator: Union[torch.Generator, List[torch.Generator], None],
+        prompts: Optional[List[str]] = None
+    ) -> Union[Image.Image, List[Image.Image]]:
         """
         Выполняет AI генерацию с Union ControlNet.
         Использует правильный API согласно документации.
@@ -474,17 +552,18 @@ class MultiControlNetPipeline:
         Args:
             params: Параметры генерации
             prepared_controls: Подготовленные control inputs
-            generator: Генератор для seed
+            generator: Генератор для seed (или список генераторов для батча)
+            prompts: Промпты батча; если заданы, возвращается список изображений
             
         Returns:
-            Image.Image: Сгенерированное изображение
+            Сгенерированное изображение (или список изображений для батча)
         """
         try:
             logger.debug(f"Running Union ControlNet inference with prompt: '{params.prompt[:50]}...'")
             
             # FIXED: Используем правильный API для Union ControlNet
             pipeline_args = {
-                "prompt": [params.prompt],  # Список промптов
+                "prompt": prompts or [params.prompt],  # Список промптов
                 "width": params.width,
                 "height": params.height,
                 "generator": generator,
@@ -514,11 +593,12 @@ class MultiControlNetPipeline:
             with torch.no_grad():
                 result = self.pipeline(**pipeline_args)
             
-            # Возвращаем первое изображение
-            generated_image = result.images[0]
-            
             logger.debug("✓ Union ControlNet inference completed successfully")
-            return generated_image
+            if prompts:
+                return list(result.images)
+            
+            # Возвращаем первое изображение
+            return result.images[0]
             
         except Exception as e:
             logger.error(f"Error in Union ControlNet inference: {e}")
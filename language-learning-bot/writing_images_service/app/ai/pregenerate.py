@@ -0,0 +1,211 @@
+"""
+Offline pre-generation of writing images for the top-N words of a language.
+Офлайн генерация картинок написания для самых частых слов языка.
+
+Usage (from the writing_images_service directory):
+
+    python -m app.ai.pregenerate --words-file export.json --top 1000
+    python -m app.ai.pregenerate --words-file export.csv --top 500 --concurrency 2 --batch-size 16
+
+The words come from the backend export of a language
+(GET /api/languages/{id}/export?format=json|csv) or from words/*.json.
+Every word is generated through WritingImageService with a fixed seed and
+the same request parameters the bot sends, so the result lands in the
+persistent image cache under the key of the bot's request; the bot reads it
+via allow_cached_variant. Finished words are appended to a JSONL checkpoint
+after every batch, so the command can be interrupted and rerun.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from hydra import compose, initialize
+from hydra.core.global_hydra import GlobalHydra
+
+from app.utils import config_holder
+from app.utils.logger import get_module_logger
+from app.utils.word_lists import WordEntry, load_words
+from app.api.routes.models.requests import AIImageRequest
+from app.api.routes.services.image_cache import get_image_cache
+from app.api.routes.services.writing_image_service import WritingImageService
+from app.ai.prewarm_cache import DEFAULT_WORDS_FILE
+
+logger = get_module_logger(__name__)
+
+DEFAULT_CHECKPOINT = Path("./cache/pregenerate/checkpoint.jsonl")
+
+
+def build_request(entry: WordEntry, seed: int, width: int, height: int) -> AIImageRequest:
+    """
+    Запрос с теми же параметрами, что отправляет бот (app.api.writing_image_client), и фиксированным seed.
+
+    Args:
+        entry: Слово и перевод
+        seed: Фиксированный seed
+        width: Ширина изображения
+        height: Высота изображения
+
+    Returns:
+        AIImageRequest: Запрос генерации
+    """
+    return AIImageRequest(word=entry.word, translation=entry.translation, width=width, height=height, seed=seed)
+
+
+def _read_checkpoint(path: Path) -> Set[str]:
+    done = set()
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                # Оборванная последняя строка после прерывания
+                continue
+    return done
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def pregenerate(
+    words: List[WordEntry],
+    service: WritingImageService,
+    seed: int,
+    width: int,
+    height: int,
+    concurrency: int = 1,
+    batch_size: int = 16,
+    checkpoint_path: Path = DEFAULT_CHECKPOINT
+) -> Dict[str, Any]:
+    """
+    Генерирует картинки для списка слов и сохраняет их в кэш изображений.
+
+    Args:
+        words: Слова по убыванию важности
+        service: Сервис генерации (результаты попадают в его кэш изображений)
+        seed: Фиксированный seed
+        width: Ширина изображения
+        height: Высота изображения
+        concurrency: Сколько генераций выполняется одновременно
+        batch_size: Сколько слов обрабатывается между записями в checkpoint
+        checkpoint_path: JSONL файл с уже сгенерированными словами
+
+    Returns:
+        Dict[str, Any]: Статистика и пропускная способность
+    """
+    image_cache = get_image_cache()
+    if image_cache is None:
+        raise RuntimeError("Image cache is disabled (generation.image_cache.enabled)")
+
+    # В ключ checkpoint входит ключ кэша: после смены моделей или версии кэша слова генерируются заново
+    requests = [build_request(entry, seed, width, height) for entry in words]
+    keys = [f"{service.cache_key_for(request, image_cache)}.s{seed}" for request in requests]
+
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    done = _read_checkpoint(checkpoint_path)
+    pending = [(request, key) for request, key in zip(requests, keys) if key not in done]
+
+    stats = {"words": len(words), "skipped": len(words) - len(pending), "generated": 0, "cached": 0, "failed": 0}
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    start_time = time.time()
+
+    async def run_one(request: AIImageRequest, key: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await service.generate_image(request)
+            elapsed = time.perf_counter() - started
+        if not result.success:
+            stats["failed"] += 1
+            logger.warning(f"Failed to generate '{request.word}': {result.error}")
+            return None
+        if result.metadata.cache_hit:
+            stats["cached"] += 1
+        else:
+            stats["generated"] += 1
+            latencies.append(elapsed)
+        return {"key": key, "word": request.word, "translation": request.translation, "seed": seed}
+
+    for batch_start in range(0, len(pending), max(1, batch_size)):
+        batch = pending[batch_start:batch_start + max(1, batch_size)]
+        records = await asyncio.gather(*(run_one(request, key) for request, key in batch))
+
+        # Неудачные слова не записываются и будут повторены при следующем запуске
+        with open(checkpoint_path, "a", encoding="utf-8") as f:
+            for record in records:
+                if record is not None:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        processed = batch_start + len(batch)
+        elapsed = time.time() - start_time
+        rate = processed / elapsed if elapsed else 0.0
+        eta = (len(pending) - processed) / rate if rate else 0.0
+        logger.info(f"Pre-generated {processed}/{len(pending)} words in {elapsed:.1f}s "
+                    f"({rate * 60:.1f} words/min, ETA {eta:.0f}s)")
+
+    elapsed = time.time() - start_time
+    latencies.sort()
+    stats.update({
+        "elapsed_seconds": round(elapsed, 1),
+        "words_per_minute": round(len(pending) / elapsed * 60, 2) if elapsed else None,
+        "images_per_minute": round(stats["generated"] / elapsed * 60, 2) if elapsed else None,
+        "generation_p50_seconds": round(_percentile(latencies, 0.5), 2) if latencies else None,
+        "generation_p95_seconds": round(_percentile(latencies, 0.95), 2) if latencies else None,
+        "checkpoint": str(checkpoint_path),
+        "image_cache": image_cache.get_stats(),
+    })
+    return stats
+
+
+def _load_config():
+    if GlobalHydra().is_initialized():
+        GlobalHydra.instance().clear()
+    initialize(config_path="../../conf/config", version_base=None)
+    config_holder.cfg = compose(config_name="default")
+    return config_holder.cfg
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.ai.pregenerate", description=__doc__.splitlines()[1])
+    parser.add_argument("--words-file", type=Path, default=DEFAULT_WORDS_FILE,
+                        help="Backend export (JSON/CSV) or words/*.json")
+    parser.add_argument("--top", type=int, default=1000, help="Number of top words")
+    parser.add_argument("--seed", type=int, default=42, help="Fixed seed for all words")
+    parser.add_argument("--width", type=int, default=512, help="Must match the bot's request (512)")
+    parser.add_argument("--height", type=int, default=512, help="Must match the bot's request (512)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Simultaneous generations (like api.queue.workers)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Words per checkpoint flush")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args(argv)
+
+    _load_config()
+    words = load_words(args.words_file, args.top)
+
+    service = WritingImageService()
+    # Модели загружаются один раз на весь прогон, а не перед каждым словом
+    service.release_models_after_generation = False
+
+    async def run():
+        try:
+            return await pregenerate(words, service, args.seed, args.width, args.height,
+                                     args.concurrency, args.batch_size, args.checkpoint)
+        finally:
+            await service.cleanup()
+
+    stats = asyncio.run(run())
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Pre-warm the render caches for the most frequent characters.
+Предварительное заполнение кэшей иероглифов и conditioning карт.
+
+Usage (from the writing_images_service directory):
+
+    python -m app.ai.prewarm_cache --top 1000
+    python -m app.ai.prewarm_cache --top 200 --types canny depth --width 1024 --height 1024
+
+Renders every character with the same size and font the service uses and
+computes all deterministic conditioning methods for it, so the first real
+request for a popular character only pays for the diffusion itself. Entries
+already on disk are skipped, so the command can be interrupted and rerun.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from hydra import compose, initialize
+from hydra.core.global_hydra import GlobalHydra
+
+from app.utils import config_holder
+from app.utils.logger import get_module_logger
+from app.utils.two_level_cache import cache_key, image_digest
+from app.ai.core.generation_config import AIGenerationConfig
+from app.ai.core.image_processor import ImageProcessor
+from app.ai.core.conditioning_manager import ConditioningManager, shutdown_conditioning_pool
+
+logger = get_module_logger(__name__)
+
+DEFAULT_WORDS_FILE = Path(__file__).resolve().parents[4] / "words" / "chinese_characters_0_10000.json"
+
+
+def load_top_characters(words_file: Path, top: int) -> List[str]:
+    """
+    Читает самые частотные иероглифы из словаря.
+
+    Args:
+        words_file: JSON вида {"1": {"character": "的", "frequency": 1, ...}, ...}
+        top: Сколько иероглифов вернуть
+
+    Returns:
+        List[str]: Иероглифы по убыванию частотности (без повторов)
+    """
+    with open(words_file, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    def rank(entry):
+        # У части записей частотность не заполнена ("") - они идут в конец
+        frequency = entry.get("frequency")
+        return frequency if isinstance(frequency, (int, float)) else float("inf")
+
+    ranked = sorted((entry for entry in entries.values() if entry.get("character")), key=rank)
+    characters = []
+    for entry in ranked:
+        if entry["character"] not in characters:
+            characters.append(entry["character"])
+        if len(characters) >= top:
+            break
+    return characters
+
+
+async def prewarm(
+    characters: List[str],
+    config: AIGenerationConfig,
+    conditioning_types: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Заполняет кэши для списка иероглифов.
+
+    Args:
+        characters: Иероглифы
+        config: Конфигурация генерации (размер изображения, процессы conditioning)
+        conditioning_types: Типы conditioning (по умолчанию все)
+
+    Returns:
+        Dict[str, Any]: Статистика прогрева
+    """
+    image_processor = ImageProcessor(config)
+    conditioning_manager = ConditioningManager(config)
+    if not image_processor.glyph_cache or not conditioning_manager.map_cache:
+        raise RuntimeError("Render cache is disabled (ai_generation.render_cache.enabled)")
+
+    conditioning_types = conditioning_types or list(conditioning_manager.conditioning_generators)
+    stats = {"characters": 0, "computed_maps": 0, "skipped_maps": 0, "failed_maps": 0}
+    start_time = time.time()
+
+    for index, character in enumerate(characters, 1):
+        base_image = await image_processor.preprocess_character(character, config.width, config.height)
+        digest = image_digest(base_image)
+
+        jobs = []
+        for conditioning_type in conditioning_types:
+            generator = conditioning_manager.conditioning_generators[conditioning_type]
+            for method in generator.get_available_methods():
+                if not generator.is_deterministic(method):
+                    continue
+                if conditioning_manager.map_cache.contains(cache_key(conditioning_type, method, digest)):
+                    stats["skipped_maps"] += 1
+                    continue
+                jobs.append(conditioning_manager.generate_specific_conditioning(base_image, conditioning_type, method))
+
+        # Методы одного иероглифа выполняются параллельно в пуле процессов
+        results = await asyncio.gather(*jobs)
+        stats["computed_maps"] += sum(1 for image in results if image is not None)
+        stats["failed_maps"] += sum(1 for image in results if image is None)
+        stats["characters"] += 1
+
+        if index % 50 == 0 or index == len(characters):
+            logger.info(f"Pre-warmed {index}/{len(characters)} characters in {time.time() - start_time:.1f}s")
+
+    stats["elapsed_seconds"] = round(time.time() - start_time, 1)
+    stats["glyph_cache"] = image_processor.glyph_cache.get_stats()
+    stats["conditioning_cache"] = conditioning_manager.map_cache.get_stats()
+    return stats
+
+
+def _load_config():
+    if GlobalHydra().is_initialized():
+        GlobalHydra.instance().clear()
+    initialize(config_path="../../conf/config", version_base=None)
+    config_holder.cfg = compose(config_name="default")
+    return config_holder.cfg
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.ai.prewarm_cache", description=__doc__.splitlines()[1])
+    parser.add_argument("--words-file", type=Path, default=DEFAULT_WORDS_FILE)
+    parser.add_argument("--top", type=int, default=1000, help="Number of most frequent characters")
+    parser.add_argument("--types", nargs="+", default=None,
+                        choices=["canny", "depth", "segmentation", "scribble"])
+    parser.add_argument("--width", type=int, default=None, help="Default: ai_generation.generation.width")
+    parser.add_argument("--height", type=int, default=None, help="Default: ai_generation.generation.height")
+    parser.add_argument("--workers", type=int, default=None, help="Default: conditioning.process_pool_workers")
+    args = parser.parse_args(argv)
+
+    cfg = _load_config()
+    generation_cfg = cfg.ai_generation.generation
+    config = AIGenerationConfig(
+        width=args.width or generation_cfg.get("width", 1024),
+        height=args.height or generation_cfg.get("height", 1024),
+        conditioning_workers=(
+            args.workers if args.workers is not None
+            else cfg.ai_generation.conditioning.get("process_pool_workers", 2)
+        ),
+    )
+
+    characters = load_top_characters(args.words_file, args.top)
+    try:
+        stats = asyncio.run(prewarm(characters, config, args.types))
+    finally:
+        shutdown_conditioning_pool()
+
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,8 +8,9 @@ import time
 import asyncio
 import json
 import hashlib
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List, Tuple, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import torch
 import traceback
@@ -17,6 +18,8 @@ import traceback
 from app.ai.models.translation_model import TranslationModel, TranslationResult, ModelInfo
 from app.utils.logger import get_module_logger
 from app.utils import config_holder
+from app.utils.sqlite_store import SQLiteKeyValueStore
+from app.utils.batch_scheduler import BatchScheduler
 
 logger = get_module_logger(__name__)
 
@@ -33,7 +36,15 @@ class TranslationServiceConfig:
     max_cache_size: int = 10000
     cache_ttl_hours: int = 168  # 7 дней
     persistent_cache: bool = True
-    cache_file: str = "./cache/translation_cache.json"
+    cache_file: str = "./cache/translation_cache.sqlite3"
+    # Изменения записываются пачками: не реже чем раз в interval или при batch_size изменений
+    cache_flush_interval_seconds: float = 5.0
+    cache_flush_batch_size: int = 100
+    
+    # Микро-батчинг: одиночные запросы, пришедшие за max_wait_ms, идут в модель одним generate
+    batching_enabled: bool = True
+    batch_max_size: int = 16
+    batch_max_wait_ms: float = 10.0
     
     # Fallback
     fallback_enabled: bool = True
@@ -63,6 +74,16 @@ class TranslationServiceConfig:
             }
 
 
+@dataclass
+class TranslationRequest:
+    """Одиночный запрос перевода в микро-батче"""
+    character: str
+    russian_text: str
+    generation_kwargs: Dict[str, Any]
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
 @dataclass
 class CacheEntry:
     """Запись в кэше переводов"""
@@ -77,20 +98,34 @@ class CacheEntry:
 
 
 class TranslationCache:
-    """Кэш переводов с TTL и персистентностью"""
+    """Кэш переводов с TTL, LRU вытеснением и персистентностью в SQLite"""
     
     def __init__(self, config: TranslationServiceConfig):
         self.config = config
-        self.cache: Dict[str, CacheEntry] = {}
+        # Порядок записей - порядок LRU: последние использованные в конце
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
         self.cache_file = Path(config.cache_file)
         self._cache_lock = asyncio.Lock()
         
-        # Создаем директорию если нужно
-        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Старый формат (JSON целиком) импортируется в базу при первом запуске
+        self.legacy_cache_file = self.cache_file.with_suffix(".json")
+        if self.cache_file.suffix == ".json":
+            self.cache_file = self.cache_file.with_suffix(".sqlite3")
+        
+        # Изменения копятся и записываются пачками
+        self._dirty: Dict[str, CacheEntry] = {}
+        self._deleted: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Задача записи еще ждет интервала (ее можно заменить немедленной записью)
+        self._flush_waiting = False
+        self._store: Optional[SQLiteKeyValueStore] = None
+        self.loaded = not config.persistent_cache
+        self.flush_count = 0
         
-        # Загружаем существующий кэш
         if config.persistent_cache:
-            asyncio.create_task(self._load_cache())
+            self._store = SQLiteKeyValueStore(self.cache_file, table="translations")
+            # Загрузка в фоне: до ее завершения запросы просто не попадают в кэш
+            self._load_task = asyncio.create_task(self._load_cache())
     
     def _generate_cache_key(self, character: str, russian_text: str) -> str:
         """Генерирует ключ для кэша"""
@@ -105,24 +140,25 @@ class TranslationCache:
         async with self._cache_lock:
             cache_key = self._generate_cache_key(character, russian_text)
             
-            if cache_key not in self.cache:
+            entry = self.cache.get(cache_key)
+            if entry is None:
                 return None
             
-            entry = self.cache[cache_key]
-            
             # Проверяем TTL
             current_time = time.time()
             age_hours = (current_time - entry.timestamp) / 3600
             
             if age_hours > self.config.cache_ttl_hours:
                 # Запись устарела
-                del self.cache[cache_key]
+                self._remove(cache_key)
                 logger.debug(f"Cache entry expired for: {character}")
                 return None
             
             # Обновляем статистику доступа
             entry.access_count += 1
             entry.last_access = current_time
+            self.cache.move_to_end(cache_key)
+            self._mark_dirty(cache_key, entry)
             
             logger.debug(f"Cache hit for: {character} -> {entry.english_text}")
             
@@ -145,11 +181,6 @@ class TranslationCache:
         async with self._cache_lock:
             cache_key = self._generate_cache_key(character, russian_text)
             
-            # Проверяем размер кэша
-            if len(self.cache) >= self.config.max_cache_size:
-                # Удаляем самые старые записи
-                await self._cleanup_old_entries()
-            
             # Создаем запись
             entry = CacheEntry(
                 character=character,
@@ -163,70 +194,173 @@ class TranslationCache:
             )
             
             self.cache[cache_key] = entry
+            self.cache.move_to_end(cache_key)
+            self._mark_dirty(cache_key, entry)
             
-            logger.debug(f"Cached translation: {character} -> {entry.english_text}")
+            # Вытесняем давно не использованные записи
+            self._evict()
             
-            # Сохраняем в файл если нужно
-            if self.config.persistent_cache:
-                asyncio.create_task(self._save_cache())
+            logger.debug(f"Cached translation: {character} -> {entry.english_text}")
+    
+    def _evict(self):
+        """Удаляет записи сверх max_cache_size, начиная с самой давно использованной (O(1) на запись)"""
+        while len(self.cache) > self.config.max_cache_size:
+            cache_key, _ = self.cache.popitem(last=False)
+            self._mark_deleted(cache_key)
+    
+    def _remove(self, cache_key: str):
+        self.cache.pop(cache_key, None)
+        self._mark_deleted(cache_key)
+    
+    def _mark_dirty(self, cache_key: str, entry: CacheEntry):
+        if not self._store:
+            return
+        self._dirty[cache_key] = entry
+        self._deleted.discard(cache_key)
+        self._schedule_flush()
     
-    async def _cleanup_old_entries(self):
-        """Удаляет старые записи из кэша"""
-        if len(self.cache) < self.config.max_cache_size:
+    def _mark_deleted(self, cache_key: str):
+        if not self._store:
             return
+        self._dirty.pop(cache_key, None)
+        self._deleted.add(cache_key)
+        self._schedule_flush()
+    
+    def _schedule_flush(self, retry: bool = False):
+        """
+        Запись пачкой: сразу при flush_batch_size изменений, иначе через flush_interval_seconds.
         
-        # Сортируем по времени последнего доступа
-        sorted_entries = sorted(
-            self.cache.items(),
-            key=lambda x: x[1].last_access
-        )
+        Ожидающая интервала запись заменяется немедленной, как только набирается пачка;
+        уже идущая запись не прерывается, остаток записывается сразу после нее.
+        
+        Args:
+            retry: Повтор после неудачной записи - только через интервал
+        """
+        pending = len(self._dirty) + len(self._deleted)
+        immediate = pending >= self.config.cache_flush_batch_size and not retry
+        if self._flush_task and not self._flush_task.done():
+            if not (immediate and self._flush_waiting):
+                return
+            self._flush_task.cancel()
+        delay = 0 if immediate else self.config.cache_flush_interval_seconds
+        self._flush_waiting = delay > 0
+        self._flush_task = asyncio.create_task(self._flush_later(delay))
+    
+    async def _flush_later(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._flush_waiting = False
+        saved = await self.flush()
+        if self._flush_task is asyncio.current_task():
+            self._flush_task = None
+        # Изменения, накопленные во время записи (или не записанные из-за ошибки)
+        if self._dirty or self._deleted:
+            self._schedule_flush(retry=not saved)
+    
+    async def flush(self) -> bool:
+        """
+        Записывает накопленные изменения в базу одной транзакцией.
+        
+        При ошибке изменения остаются для следующей записи.
+        
+        Returns:
+            bool: False, если запись не удалась
+        """
+        if not self._store or not (self._dirty or self._deleted):
+            return True
         
-        # Удаляем 20% самых старых записей
-        entries_to_remove = int(len(sorted_entries) * 0.2)
+        dirty, deleted = self._dirty, self._deleted
+        upserts = {key: (asdict(entry), entry.last_access) for key, entry in dirty.items()}
+        self._dirty = {}
+        self._deleted = set()
         
-        for cache_key, _ in sorted_entries[:entries_to_remove]:
-            del self.cache[cache_key]
+        try:
+            await asyncio.to_thread(self._store.write_batch, upserts, list(deleted))
+        except asyncio.CancelledError:
+            self._restore_pending(dirty, deleted)
+            raise
+        except Exception as e:
+            self._restore_pending(dirty, deleted)
+            logger.warning(f"Could not save translation cache, {len(dirty) + len(deleted)} changes kept for the next flush: {e}")
+            return False
         
-        logger.debug(f"Cleaned up {entries_to_remove} old cache entries")
+        self.flush_count += 1
+        logger.debug(f"Flushed {len(upserts)} translations, removed {len(deleted)} from cache database")
+        return True
+    
+    def _restore_pending(self, dirty: Dict[str, CacheEntry], deleted: set):
+        """Возвращает незаписанные изменения; более поздние изменения тех же ключей важнее"""
+        for cache_key, entry in dirty.items():
+            if cache_key not in self._dirty and cache_key not in self._deleted:
+                self._dirty[cache_key] = entry
+        for cache_key in deleted:
+            if cache_key not in self._dirty:
+                self._deleted.add(cache_key)
+    
+    def _read_persisted(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Читает записи из базы (в отдельном потоке); импортирует старый JSON файл"""
+        if self.legacy_cache_file.exists() and self._store.count() == 0:
+            try:
+                with open(self.legacy_cache_file, 'r', encoding='utf-8') as f:
+                    legacy_data = json.load(f)
+                self._store.write_batch({
+                    cache_key: (entry_data, entry_data.get('last_access', 0.0))
+                    for cache_key, entry_data in legacy_data.items()
+                })
+                self.legacy_cache_file.rename(self.legacy_cache_file.with_suffix(".json.migrated"))
+                logger.info(f"Imported {len(legacy_data)} translations from {self.legacy_cache_file}")
+            except Exception as e:
+                logger.warning(f"Could not import legacy cache file {self.legacy_cache_file}: {e}")
+        return self._store.items()
     
     async def _load_cache(self):
-        """Загружает кэш из файла"""
+        """Загружает кэш из базы, не блокируя event loop"""
         try:
-            if not self.cache_file.exists():
-                logger.debug("No existing cache file found")
-                return
-            
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            # Восстанавливаем записи
-            for cache_key, entry_data in cache_data.items():
-                entry = CacheEntry(**entry_data)
+            rows = await asyncio.to_thread(self._read_persisted)
+            
+            async with self._cache_lock:
+                # Загруженные записи старше всего, что уже использовано в этом процессе
+                loaded: "OrderedDict[str, CacheEntry]" = OrderedDict()
+                expired = []
+                for cache_key, entry_data in rows:
+                    if cache_key in self.cache:
+                        continue
+                    entry = CacheEntry(**entry_data)
+                    
+                    # Проверяем TTL при загрузке
+                    age_hours = (time.time() - entry.timestamp) / 3600
+                    if age_hours <= self.config.cache_ttl_hours:
+                        loaded[cache_key] = entry
+                    else:
+                        expired.append(cache_key)
                 
-                # Проверяем TTL при загрузке
-                age_hours = (time.time() - entry.timestamp) / 3600
-                if age_hours <= self.config.cache_ttl_hours:
-                    self.cache[cache_key] = entry
+                loaded.update(self.cache)
+                self.cache = loaded
+                for cache_key in expired:
+                    self._mark_deleted(cache_key)
+                self._evict()
             
-            logger.info(f"Loaded {len(self.cache)} translations from cache file")
+            logger.info(f"Loaded {len(self.cache)} translations from cache database")
             
         except Exception as e:
-            logger.warning(f"Could not load cache file: {e}")
+            logger.warning(f"Could not load cache database: {e}")
+        finally:
+            self.loaded = True
     
-    async def _save_cache(self):
-        """Сохраняет кэш в файл"""
-        try:
-            cache_data = {}
-            for cache_key, entry in self.cache.items():
-                cache_data[cache_key] = asdict(entry)
-            
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            
-            logger.debug(f"Saved {len(self.cache)} translations to cache file")
-            
-        except Exception as e:
-            logger.warning(f"Could not save cache file: {e}")
+    async def close(self):
+        """Записывает несохраненные изменения и закрывает базу"""
+        if not self._store:
+            return
+        if self._flush_task and not self._flush_task.done():
+            # Прерванная запись возвращает свои изменения, их запишет flush() ниже
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        self._store.close()
+        self._store = None
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Возвращает статистику кэша"""
@@ -235,7 +369,8 @@ class TranslationCache:
                 "enabled": self.config.cache_enabled,
                 "entries": 0,
                 "hit_rate": 0.0,
-                "total_accesses": 0
+                "total_accesses": 0,
+                "loaded": self.loaded
             }
         
         total_accesses = sum(entry.access_count for entry in self.cache.values())
@@ -248,7 +383,10 @@ class TranslationCache:
             "max_size": self.config.max_cache_size,
             "hit_rate": hit_rate,
             "total_accesses": total_accesses,
-            "cache_file": str(self.cache_file)
+            "cache_file": str(self.cache_file),
+            "loaded": self.loaded,
+            "pending_writes": len(self._dirty) + len(self._deleted),
+            "flushes": self.flush_count
         }
 
 
@@ -274,6 +412,14 @@ class TranslationService:
         
         self.config = self._load_config()
         self.cache = TranslationCache(self.config)
+        self.batcher = (
+            BatchScheduler(
+                self._run_translation_batch,
+                max_batch_size=self.config.batch_max_size,
+                max_wait_ms=self.config.batch_max_wait_ms
+            )
+            if self.config.batching_enabled else None
+        )
         
         logger.info("TranslationService initialized")
         
@@ -301,7 +447,15 @@ class TranslationService:
                 config.max_cache_size = cache_cfg.get('max_cache_size', 10000)
                 config.cache_ttl_hours = cache_cfg.get('cache_ttl_hours', 168)
                 config.persistent_cache = cache_cfg.get('persistent_cache', True)
-                config.cache_file = cache_cfg.get('cache_file', './cache/translation_cache.json')
+                config.cache_file = cache_cfg.get('cache_file', './cache/translation_cache.sqlite3')
+                config.cache_flush_interval_seconds = cache_cfg.get('flush_interval_seconds', 5.0)
+                config.cache_flush_batch_size = cache_cfg.get('flush_batch_size', 100)
+                
+                # Микро-батчинг
+                batching_cfg = translation_cfg.get('batching', {})
+                config.batching_enabled = batching_cfg.get('enabled', True)
+                config.batch_max_size = batching_cfg.get('max_batch_size', 16)
+                config.batch_max_wait_ms = batching_cfg.get('max_wait_ms', 10.0)
                 
                 # Fallback
                 fallback_cfg = translation_cfg.get('fallback', {})
@@ -489,7 +643,7 @@ class TranslationService:
                 await self._ensure_active_model_loaded()
                 
                 if self.active_model:
-                    result = await self.active_model.translate(character, russian_text, **kwargs)
+                    result = await self._translate_with_model(character, russian_text, **kwargs)
                     
                     if result.success:
                         # Сохраняем в кэш
@@ -508,28 +662,8 @@ class TranslationService:
             except Exception as e:
                 logger.error(f"AI translation error: {e}")
             
-            # 3. Fallback стратегии
-            if self.config.fallback_enabled:
-                fallback_result = await self._apply_fallback_strategies(character, russian_text)
-                
-                if fallback_result.success:
-                    self.fallback_usage += 1
-                    
-                    if self.config.log_translations:
-                        logger.info(f"Fallback translation: {character} ({russian_text}) -> {fallback_result.translated_text}")
-                    
-                    return fallback_result
-            
-            # 4. Полная неудача
-            translation_time_ms = int((time.time() - start_time) * 1000)
-            
-            return TranslationResult(
-                success=False,
-                original_text=russian_text,
-                character=character,
-                translation_time_ms=translation_time_ms,
-                error_message="All translation strategies failed"
-            )
+            # 3. Fallback стратегии, 4. полная неудача
+            return await self._fallback_or_failure(character, russian_text, start_time)
             
         except Exception as e:
             translation_time_ms = int((time.time() - start_time) * 1000)
@@ -543,6 +677,126 @@ class TranslationService:
                 error_message=str(e)
             )
     
+    async def translate_batch(
+        self,
+        items: List[Tuple[str, str]],
+        **kwargs
+    ) -> List[TranslationResult]:
+        """
+        Переводит список значений: кэш, затем батчевые вызовы модели для промахов.
+        
+        Повторяющиеся пары переводятся один раз; элементы, которые модель не
+        перевела, проходят через fallback стратегии, как в translate().
+        
+        Args:
+            items: Пары (китайский иероглиф, русское значение)
+            **kwargs: Дополнительные параметры генерации
+            
+        Returns:
+            List[TranslationResult]: Результат для каждого элемента (в порядке items)
+        """
+        if not self.config.enabled:
+            return [
+                TranslationResult(success=False, error_message="Translation service is disabled")
+                for _ in items
+            ]
+        
+        start_time = time.time()
+        results: List[Optional[TranslationResult]] = [None] * len(items)
+        
+        # 1. Кэш; одинаковые пары без перевода собираем вместе
+        misses: Dict[Tuple[str, str], List[int]] = {}
+        for index, (character, russian_text) in enumerate(items):
+            cached_result = await self.cache.get(character, russian_text)
+            if cached_result:
+                self.cache_hits += 1
+                results[index] = cached_result
+            else:
+                misses.setdefault((character, russian_text), []).append(index)
+        
+        # 2. Модель: промахи кусками по batch_max_size
+        if misses:
+            try:
+                await self._ensure_active_model_loaded()
+                
+                pending = list(misses)
+                chunk_size = max(1, self.config.batch_max_size)
+                for offset in range(0, len(pending), chunk_size):
+                    chunk = pending[offset:offset + chunk_size]
+                    model_results = await self.active_model.translate_batch(chunk, **kwargs)
+                    
+                    for (character, russian_text), result in zip(chunk, model_results):
+                        if not result.success:
+                            logger.warning(f"AI translation failed: {result.error_message}")
+                            continue
+                        
+                        await self.cache.put(character, russian_text, result)
+                        self.translation_count += 1
+                        for index in misses[(character, russian_text)]:
+                            results[index] = result
+                
+                if self.config.log_translations:
+                    logger.info(f"AI batch translation: {len(pending)} unique items, "
+                               f"{len(items) - sum(map(len, misses.values()))} cache hits "
+                               f"({int((time.time() - start_time) * 1000)}ms)")
+                    
+            except Exception as e:
+                logger.error(f"AI batch translation error: {e}")
+        
+        # 3. Fallback для непереведенных
+        for index, (character, russian_text) in enumerate(items):
+            if results[index] is None:
+                results[index] = await self._fallback_or_failure(character, russian_text, start_time)
+        
+        return results
+    
+    async def _translate_with_model(self, character: str, russian_text: str, **kwargs) -> TranslationResult:
+        """
+        Перевод активной моделью; при включенном батчинге запрос ждет
+        попутчиков с теми же параметрами генерации.
+        """
+        if self.batcher is None:
+            return await self.active_model.translate(character, russian_text, **kwargs)
+        
+        # В один generate попадают только запросы с одинаковыми параметрами
+        key = tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+        request = TranslationRequest(
+            character, russian_text, kwargs, asyncio.get_running_loop().create_future()
+        )
+        return await self.batcher.submit_item(key, request)
+    
+    async def _run_translation_batch(self, batch: List[TranslationRequest]) -> List[TranslationResult]:
+        """Запускает микро-батч одиночных запросов одним вызовом модели."""
+        await self._ensure_active_model_loaded()
+        return await self.active_model.translate_batch(
+            [(request.character, request.russian_text) for request in batch],
+            **batch[0].generation_kwargs
+        )
+    
+    async def _fallback_or_failure(self, character: str, russian_text: str, start_time: float) -> TranslationResult:
+        """Fallback стратегии, а если они не помогли - результат с ошибкой."""
+        if self.config.fallback_enabled:
+            fallback_result = await self._apply_fallback_strategies(character, russian_text)
+            
+            if fallback_result.success:
+                self.fallback_usage += 1
+                
+                if self.config.log_translations:
+                    logger.info(f"Fallback translation: {character} ({russian_text}) -> {fallback_result.translated_text}")
+                
+                return fallback_result
+        
+        # Полная неудача
+        translation_time_ms = int((time.time() - start_time) * 1000)
+        
+        return TranslationResult(
+            success=False,
+            original_text=russian_text,
+            character=character,
+            translation_time_ms=translation_time_ms,
+            error_message="All translation strategies failed"
+        )
+    
     async def _apply_fallback_strategies(self, character: str, russian_text: str) -> TranslationResult:
         """Применяет fallback стратегии"""
         
@@ -620,6 +874,7 @@ class TranslationService:
                 "cache_hit_rate": self.cache_hits / max(1, self.translation_count + self.cache_hits)
             },
             "cache_stats": self.cache.get_cache_stats(),
+            "batching": self.batcher.get_stats() if self.batcher else {"enabled": False},
             "available_models": list(self.available_models.keys()),
             "loaded_models": list(self.loaded_models.keys())
         }
@@ -674,9 +929,10 @@ class TranslationService:
         try:
             logger.info("Cleaning up Translation Service...")
             
-            # Сохраняем кэш
-            if self.config.persistent_cache:
-                await self.cache._save_cache()
+            # Останавливаем микро-батчинг и сохраняем кэш
+            if self.batcher:
+                await self.batcher.stop()
+            await self.cache.close()
             
             # Выгружаем все модели
             for model in self.loaded_models.values():
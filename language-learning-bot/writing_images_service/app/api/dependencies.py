@@ -9,16 +9,14 @@ from typing import Dict, Any, Optional
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.services.writing_image_service import WritingImageService
-from app.services.validation_service import ValidationService
-from app.core.exceptions import ServiceUnavailableError, RateLimitError
+from app.api.routes.services.writing_image_service import WritingImageService, get_shared_writing_image_service
+from app.api.routes.services.validation_service import ValidationService
+from app.core.exceptions import ServiceUnavailableError
 from app.utils import config_holder
+from app.utils.rate_limiter import get_rate_limiter, retry_after_header
 
 logger = logging.getLogger(__name__)
 
-# Rate limiting storage (in-memory for development)
-_rate_limit_storage: Dict[str, Dict[str, Any]] = {}
-
 # Security scheme for future authentication
 security = HTTPBearer(auto_error=False)
 
@@ -29,9 +27,9 @@ async def get_writing_image_service() -> WritingImageService:
     Получает экземпляр сервиса генерации картинок.
     
     Returns:
-        WritingImageService: Service instance
+        WritingImageService: Shared service instance
     """
-    return WritingImageService()
+    return get_shared_writing_image_service()
 
 
 async def get_validation_service() -> ValidationService:
@@ -100,75 +98,77 @@ async def get_client_id(request: Request) -> str:
     return client_ip
 
 
-async def check_rate_limit(
-    request: Request,
-    client_id: str = Depends(get_client_id)
-) -> bool:
+def enforce_rate_limit(route: str, client_id: str) -> bool:
     """
-    Check if client has exceeded rate limit.
-    Проверяет, превысил ли клиент лимит запросов.
+    Check the client's quota for a route.
+    Проверяет квоту клиента для маршрута.
     
     Args:
-        request: FastAPI request object
+        route: Route group name (api.rate_limits.routes)
         client_id: Client identifier
         
     Returns:
         bool: True if request is allowed
         
     Raises:
-        RateLimitError: If rate limit is exceeded
+        HTTPException: 429 with Retry-After if rate limit is exceeded
     """
-    # Get rate limit settings
-    enabled = False
-    limit = 60
-    window = 60
-    
-    try:
-        if hasattr(config_holder, 'cfg') and hasattr(config_holder.cfg, 'api'):
-            api_config = config_holder.cfg.api
-            enabled = api_config.get('enable_rate_limit', False)
-            limit = api_config.get('rate_limit_requests', 60)
-            window = api_config.get('rate_limit_period', 60)
-    except Exception as e:
-        logger.warning(f"Could not load rate limit config: {e}")
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return True
     
-    if not enabled:
+    decision = limiter.check(route, client_id)
+    if decision.allowed:
         return True
     
-    current_time = time.time()
+    logger.warning(f"Rate limit exceeded for client {client_id} on route {route}")
     
-    # Initialize client data if not exists
-    if client_id not in _rate_limit_storage:
-        _rate_limit_storage[client_id] = {
-            'requests': [],
-            'window_start': current_time
-        }
+    raise HTTPException(
+        status_code=429,
+        detail=(
+            f"Rate limit exceeded. Maximum {decision.limit.requests} requests "
+            f"per {decision.limit.period_seconds:g} seconds"
+        ),
+        headers={"Retry-After": retry_after_header(decision)}
+    )
+
+
+def rate_limit(route: str):
+    """
+    Dependency factory limiting requests of one route group.
+    Фабрика зависимости, ограничивающей запросы группы маршрутов.
     
-    client_data = _rate_limit_storage[client_id]
+    Args:
+        route: Route group name (api.rate_limits.routes)
+        
+    Returns:
+        FastAPI dependency
+    """
+    async def dependency(client_id: str = Depends(get_client_id)) -> bool:
+        return enforce_rate_limit(route, client_id)
     
-    # Clean old requests outside the window
-    client_data['requests'] = [
-        req_time for req_time in client_data['requests']
-        if current_time - req_time < window
-    ]
+    return dependency
+
+
+async def check_rate_limit(
+    request: Request,
+    client_id: str = Depends(get_client_id)
+) -> bool:
+    """
+    Check if client has exceeded the default rate limit.
+    Проверяет, превысил ли клиент лимит запросов по умолчанию.
     
-    # Check if limit is exceeded
-    if len(client_data['requests']) >= limit:
-        retry_after = int(window - (current_time - min(client_data['requests'])))
+    Args:
+        request: FastAPI request object
+        client_id: Client identifier
         
-        logger.warning(f"Rate limit exceeded for client {client_id}")
+    Returns:
+        bool: True if request is allowed
         
-        raise RateLimitError(
-            message=f"Rate limit exceeded. Maximum {limit} requests per {window} seconds",
-            limit=limit,
-            window=window,
-            retry_after=retry_after
-        )
-    
-    # Add current request
-    client_data['requests'].append(current_time)
-    
-    return True
+    Raises:
+        HTTPException: 429 with Retry-After if rate limit is exceeded
+    """
+    return enforce_rate_limit("default", client_id)
 
 
 async def validate_content_type(request: Request) -> bool:
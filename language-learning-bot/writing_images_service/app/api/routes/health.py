@@ -12,8 +12,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 import torch
 
+from app.api.routes.services import writing_image_service as writing_image_service_module
 from app.api.routes.services.writing_image_service import WritingImageService
 from app.ai.models.gpu_manager import GPUManager
+from app.ai.backends import DEFAULT_BACKEND, get_backend_class
+from app.utils import config_holder
+from app.utils import health_sampler as health_sampler_module
 from app.utils.logger import get_module_logger
 
 logger = get_module_logger(__name__)
@@ -25,8 +29,10 @@ _writing_service: Optional[WritingImageService] = None
 _gpu_manager: Optional[GPUManager] = None
 
 def get_writing_service() -> WritingImageService:
-    """Get writing service instance."""
+    """Get writing service instance (the shared one when the app is running)."""
     global _writing_service
+    if writing_image_service_module.writing_image_service is not None:
+        return writing_image_service_module.writing_image_service
     if _writing_service is None:
         _writing_service = WritingImageService()
     return _writing_service
@@ -42,6 +48,14 @@ def get_gpu_manager() -> GPUManager:
             raise HTTPException(status_code=503, detail=f"GPU initialization failed: {e}")
     return _gpu_manager
 
+def _backend_requires_gpu() -> bool:
+    """Нужен ли GPU выбранному бэкенду генерации (ai_generation.backend.name)."""
+    cfg = config_holder.cfg
+    backend_name = DEFAULT_BACKEND
+    if cfg is not None and hasattr(cfg, 'ai_generation') and hasattr(cfg.ai_generation, 'backend'):
+        backend_name = cfg.ai_generation.backend.get('name', DEFAULT_BACKEND)
+    return get_backend_class(backend_name).requires_gpu
+
 @router.get("/health")
 async def basic_health_check():
     """
@@ -54,11 +68,12 @@ async def basic_health_check():
     try:
         current_time = datetime.utcnow()
         
-        # Базовая проверка CUDA
+        # Базовая проверка CUDA (только для бэкендов, которым нужен GPU)
         cuda_available = torch.cuda.is_available()
+        gpu_ok = cuda_available or not _backend_requires_gpu()
         
         response = {
-            "status": "healthy" if cuda_available else "degraded",
+            "status": "healthy" if gpu_ok else "degraded",
             "service": "writing_image_service",
             "timestamp": current_time.isoformat(),
             "uptime_seconds": int(time.time()),  # Будет пересчитан в сервисе
@@ -66,10 +81,10 @@ async def basic_health_check():
             "cuda_available": cuda_available
         }
         
-        if not cuda_available:
+        if not gpu_ok:
             response["warnings"] = ["CUDA not available - AI generation will not work"]
         
-        status_code = 200 if cuda_available else 503
+        status_code = 200 if gpu_ok else 503
         return JSONResponse(content=response, status_code=status_code)
         
     except Exception as e:
@@ -84,27 +99,144 @@ async def basic_health_check():
             status_code=503
         )
 
+def _serve_snapshot(name: str, unavailable: Dict[str, Any]) -> JSONResponse:
+    """
+    Отдает ответ из снимка фонового сборщика.
+    
+    Args:
+        name: Раздел снимка (detailed, ready)
+        unavailable: Тело ответа, если снимка еще нет
+        
+    Returns:
+        JSONResponse с сохраненным ответом и возрастом снимка
+    """
+    sampler = health_sampler_module.health_sampler
+    snapshot = sampler.snapshot if sampler else None
+    if snapshot is None:
+        reason = sampler.error if sampler and sampler.error else "Health data not collected yet"
+        return JSONResponse(
+            content={**unavailable, "reason": reason, "timestamp": datetime.utcnow().isoformat()},
+            status_code=503
+        )
+    
+    age = sampler.age_seconds()
+    content = {**snapshot[name]["content"], "snapshot_age_seconds": round(age, 3)}
+    if sampler.error:
+        content["snapshot_error"] = sampler.error
+    return JSONResponse(content=content, status_code=snapshot[name]["status_code"])
+
 @router.get("/health/detailed")
-async def detailed_health_check(
-    writing_service: WritingImageService = Depends(get_writing_service),
-    gpu_manager: GPUManager = Depends(get_gpu_manager)
-):
+async def detailed_health_check():
     """
     Detailed health check with AI components status.
     Детальная проверка здоровья с статусом AI компонентов.
     
+    Данные собираются фоновым сборщиком (monitoring.health_sample_interval_seconds),
+    эндпоинт только отдает последний снимок.
+    
     Returns:
         Comprehensive service status including AI models and GPU
     """
+    return _serve_snapshot("detailed", {"status": "unknown", "service": "writing_image_service"})
+
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check - verifies service is ready to handle requests.
+    Проверка готовности - проверяет что сервис готов обрабатывать запросы.
+    
+    Returns:
+        Ready status with AI initialization state (из снимка фонового сборщика)
+    """
+    return _serve_snapshot("ready", {"ready": False})
+
+@router.get("/health/live")
+async def liveness_check():
+    """
+    Liveness check - verifies service is alive and responsive.
+    Проверка жизнеспособности - проверяет что сервис живой и отвечает.
+    
+    Ничего не проверяет: ответ означает, что event loop обрабатывает запросы,
+    а возраст снимка показывает, работает ли фоновый сбор health данных.
+    
+    Returns:
+        Liveness status with health snapshot age
+    """
+    sampler = health_sampler_module.health_sampler
+    age = sampler.age_seconds() if sampler else None
+    return {"alive": True, "snapshot_age_seconds": round(age, 3) if age is not None else None}
+
+@router.post("/health/warmup")
+async def warmup_ai_models(
+    writing_service: WritingImageService = Depends(get_writing_service)
+):
+    """
+    Warm up AI models for faster generation.
+    Прогрев AI моделей для более быстрой генерации.
+    
+    Returns:
+        Warmup results and performance metrics
+    """
     try:
-        start_time = time.time()
+        logger.info("Starting AI warmup via health endpoint...")
         
-        # Получаем статус сервиса
-        service_status = await writing_service.get_service_status()
+        # Запускаем прогрев
+        warmup_result = await writing_service.warmup_ai()
         
-        # Получаем статус GPU
-        gpu_status = gpu_manager.get_gpu_status()
-        gpu_diagnostics = gpu_manager.get_diagnostics()
+        if warmup_result["success"]:
+            logger.info(f"✓ AI warmup completed successfully in {warmup_result['total_time_ms']}ms")
+            status_code = 200
+        else:
+            logger.warning(f"AI warmup failed: {warmup_result.get('error')}")
+            status_code = 503
+        
+        response = {
+            "warmup_completed": warmup_result["success"],
+            "timestamp": datetime.utcnow().isoformat(),
+            "warmup_results": warmup_result
+        }
+        
+        return JSONResponse(content=response, status_code=status_code)
+        
+    except Exception as e:
+        logger.error(f"AI warmup failed: {e}")
+        return JSONResponse(
+            content={
+                "warmup_completed": False,
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": str(e)
+            },
+            status_code=503
+        )
+
+async def collect_health_snapshot() -> Dict[str, Any]:
+    """
+    Собирает данные для /health/detailed и /health/ready (вызывается фоновым сборщиком).
+    
+    Returns:
+        Dict[str, Any]: Ответы эндпоинтов {"detailed": {...}, "ready": {...}}
+            с полями content и status_code
+    """
+    writing_service = get_writing_service()
+    service_status = await writing_service.get_service_status()
+    return {
+        "detailed": await _collect_detailed(service_status),
+        "ready": _collect_readiness(service_status),
+    }
+
+async def _collect_detailed(service_status: Dict[str, Any]) -> Dict[str, Any]:
+    """Детальный статус: GPU, PyTorch, библиотеки, общий статус здоровья."""
+    try:
+        start_time = time.time()
+        
+        # Получаем статус GPU (только для бэкендов, которым нужен GPU)
+        gpu_required = _backend_requires_gpu()
+        gpu_status = None
+        gpu_diagnostics = None
+        if gpu_required:
+            gpu_manager = get_gpu_manager()
+            gpu_status = gpu_manager.get_gpu_status()
+            gpu_diagnostics = gpu_manager.get_diagnostics()
         
         # Проверяем компоненты PyTorch
         pytorch_info = {
@@ -124,7 +256,7 @@ async def detailed_health_check(
         
         # Определяем общий статус здоровья
         overall_status = _determine_overall_health(
-            service_status, gpu_status, pytorch_info, library_status
+            service_status, gpu_status, pytorch_info, library_status, gpu_required
         )
         
         check_duration = int((time.time() - start_time) * 1000)
@@ -138,6 +270,7 @@ async def detailed_health_check(
             
             # Service components
             "service_status": service_status,
+            "gpu_required": gpu_required,
             "gpu_status": {
                 "available": gpu_status.available,
                 "device_name": gpu_status.device_name,
@@ -149,13 +282,13 @@ async def detailed_health_check(
                 },
                 "temperature_celsius": gpu_status.temperature_celsius,
                 "power_usage_watts": gpu_status.power_usage_watts
-            },
+            } if gpu_status else None,
             "pytorch_info": pytorch_info,
             "library_status": library_status,
             "gpu_diagnostics": {
                 "optimization_profile": gpu_diagnostics["optimization_profile"]["name"],
                 "recommendations": gpu_diagnostics["recommendations"]
-            },
+            } if gpu_diagnostics else None,
             
             # Health summary
             "health_summary": overall_status,
@@ -164,50 +297,40 @@ async def detailed_health_check(
         }
         
         status_code = 200 if overall_status["status"] == "healthy" else 503
-        return JSONResponse(content=response, status_code=status_code)
+        return {"content": response, "status_code": status_code}
         
     except Exception as e:
-        logger.error(f"Detailed health check failed: {e}", exc_info=True)
-        return JSONResponse(
-            content={
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Detailed health check failed: {error}", exc_info=True)
+        return {
+            "content": {
                 "status": "unhealthy",
                 "service": "writing_image_service",
                 "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e),
+                "error": error,
                 "check_type": "detailed"
             },
-            status_code=503
-        )
+            "status_code": 503
+        }
 
-@router.get("/health/ready")
-async def readiness_check(
-    writing_service: WritingImageService = Depends(get_writing_service)
-):
-    """
-    Readiness check - verifies service is ready to handle requests.
-    Проверка готовности - проверяет что сервис готов обрабатывать запросы.
-    
-    Returns:
-        Ready status with AI initialization state
-    """
+def _collect_readiness(service_status: Dict[str, Any]) -> Dict[str, Any]:
+    """Готовность: CUDA (если нужен бэкенду) и состояние AI компонентов."""
     try:
         start_time = time.time()
         
-        # Проверяем базовые требования
+        # Проверяем базовые требования (CUDA - только для бэкендов, которым нужен GPU)
         cuda_available = torch.cuda.is_available()
-        if not cuda_available:
-            return JSONResponse(
-                content={
+        gpu_ok = cuda_available or not _backend_requires_gpu()
+        if not gpu_ok:
+            return {
+                "content": {
                     "ready": False,
                     "reason": "CUDA not available",
                     "timestamp": datetime.utcnow().isoformat(),
                     "requirements_met": False
                 },
-                status_code=503
-            )
-        
-        # Получаем статус сервиса
-        service_status = await writing_service.get_service_status()
+                "status_code": 503
+            }
         
         # Проверяем готовность AI компонентов
         ai_ready = False
@@ -226,8 +349,8 @@ async def readiness_check(
         
         check_duration = int((time.time() - start_time) * 1000)
         
-        # Сервис готов если CUDA доступен (AI инициализируется при первом запросе)
-        ready = cuda_available
+        # Сервис готов если доступен нужный бэкенду GPU (AI инициализируется при первом запросе)
+        ready = gpu_ok
         
         response = {
             "ready": ready,
@@ -251,104 +374,19 @@ async def readiness_check(
             response["note"] = "AI models will be loaded on first request (lazy initialization)"
         
         status_code = 200 if ready else 503
-        return JSONResponse(content=response, status_code=status_code)
+        return {"content": response, "status_code": status_code}
         
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
-        return JSONResponse(
-            content={
+        return {
+            "content": {
                 "ready": False,
                 "reason": f"Health check error: {str(e)}",
                 "timestamp": datetime.utcnow().isoformat(),
                 "error": True
             },
-            status_code=503
-        )
-
-@router.get("/health/live")
-async def liveness_check():
-    """
-    Liveness check - verifies service is alive and responsive.
-    Проверка жизнеспособности - проверяет что сервис живой и отвечает.
-    
-    Returns:
-        Basic liveness status
-    """
-    try:
-        start_time = time.time()
-        
-        # Простая проверка что сервис отвечает
-        current_time = datetime.utcnow()
-        
-        # Проверяем что PyTorch загружен
-        pytorch_loaded = hasattr(torch, '__version__')
-        
-        check_duration = int((time.time() - start_time) * 1000)
-        
-        response = {
-            "alive": True,
-            "timestamp": current_time.isoformat(),
-            "check_duration_ms": check_duration,
-            "service": "writing_image_service",
-            "pytorch_loaded": pytorch_loaded
+            "status_code": 503
         }
-        
-        return JSONResponse(content=response, status_code=200)
-        
-    except Exception as e:
-        logger.error(f"Liveness check failed: {e}")
-        return JSONResponse(
-            content={
-                "alive": False,
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e),
-                "service": "writing_image_service"
-            },
-            status_code=503
-        )
-
-@router.post("/health/warmup")
-async def warmup_ai_models(
-    writing_service: WritingImageService = Depends(get_writing_service)
-):
-    """
-    Warm up AI models for faster generation.
-    Прогрев AI моделей для более быстрой генерации.
-    
-    Returns:
-        Warmup results and performance metrics
-    """
-    try:
-        logger.info("Starting AI warmup via health endpoint...")
-        
-        # Запускаем прогрев
-        warmup_result = await writing_service.warmup_ai()
-        
-        if warmup_result["success"]:
-            logger.info(f"✓ AI warmup completed successfully in {warmup_result['total_time_ms']}ms")
-            status_code = 200
-        else:
-            logger.warning(f"AI warmup failed: {warmup_result.get('error')}")
-            status_code = 503
-        
-        response = {
-            "warmup_completed": warmup_result["success"],
-            "timestamp": datetime.utcnow().isoformat(),
-            "warmup_results": warmup_result
-        }
-        
-        return JSONResponse(content=response, status_code=status_code)
-        
-    except Exception as e:
-        logger.error(f"AI warmup failed: {e}")
-        return JSONResponse(
-            content={
-                "warmup_completed": False,
-                "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e)
-            },
-            status_code=503
-        )
 
 async def _check_ai_libraries() -> Dict[str, Any]:
     """Проверяет доступность ключевых AI библиотек."""
@@ -407,16 +445,17 @@ def _determine_overall_health(
     service_status: Dict[str, Any],
     gpu_status,
     pytorch_info: Dict[str, Any],
-    library_status: Dict[str, Any]
+    library_status: Dict[str, Any],
+    gpu_required: bool = True
 ) -> Dict[str, Any]:
-    """Определяет общий статус здоровья сервиса."""
+    """Определяет общий статус здоровья сервиса (GPU проверяется, только если нужен бэкенду)."""
     
     warnings = []
     errors = []
     status = "healthy"
     
     # Проверяем CUDA
-    if not pytorch_info.get("cuda_available", False):
+    if gpu_required and not pytorch_info.get("cuda_available", False):
         errors.append("CUDA not available - AI generation will not work")
         status = "unhealthy"
     
@@ -431,7 +470,7 @@ def _determine_overall_health(
         status = "unhealthy"
     
     # Проверяем GPU память
-    if gpu_status.available:
+    if gpu_status and gpu_status.available:
         memory_usage = gpu_status.utilization_percent
         if memory_usage > 90:
             warnings.append(f"High GPU memory usage: {memory_usage}%")
@@ -441,7 +480,7 @@ def _determine_overall_health(
             warnings.append(f"Moderate GPU memory usage: {memory_usage}%")
     
     # Проверяем температуру GPU
-    if gpu_status.temperature_celsius and gpu_status.temperature_celsius > 85:
+    if gpu_status and gpu_status.temperature_celsius and gpu_status.temperature_celsius > 85:
         warnings.append(f"High GPU temperature: {gpu_status.temperature_celsius}°C")
         if status == "healthy":
             status = "degraded"
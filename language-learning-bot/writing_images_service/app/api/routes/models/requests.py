@@ -78,6 +78,11 @@ class AIImageRequest:
     include_conditioning_images: bool = False
     include_prompt: bool = False
     
+    # Кэш сгенерированных изображений
+    use_cache: bool = True
+    # Без seed: вернуть любой ранее сгенерированный вариант из кэша
+    allow_cached_variant: bool = False
+    
     def __post_init__(self):
         """Валидация и инициализация после создания"""
         # Очистка пустых строк
@@ -144,6 +149,8 @@ class AIImageRequest:
             "translation_cache": self.translation_cache,
             "include_conditioning_images": self.include_conditioning_images,
             "include_prompt": self.include_prompt,
+            "use_cache": self.use_cache,
+            "allow_cached_variant": self.allow_cached_variant,
         }
     
     @classmethod
@@ -16,6 +16,7 @@ class GenerationStatus(str, Enum):
     PARTIAL_SUCCESS = "partial_success"
     IN_PROGRESS = "in_progress"
     QUEUED = "queued"
+    CANCELLED = "cancelled"
 
 
 @dataclass 
@@ -32,6 +33,8 @@ class AIGenerationMetadata:
     generation_time_ms: Optional[int] = None
     conditioning_time_ms: Optional[Dict[str, Dict[str, int]]] = None # {"canny": {"opencv_canny": 150, "hed_canny": 200}}
     total_processing_time_ms: Optional[int] = None
+    # Этапы пайплайна: {"conditioning": {"start_ms": 12.0, "duration_ms": 850.3}, ...}
+    stage_timings: Optional[Dict[str, Dict[str, float]]] = None
     
     # Ресурсы
     gpu_memory_used_mb: Optional[float] = None
@@ -49,6 +52,9 @@ class AIGenerationMetadata:
     timestamp: datetime = field(default_factory=datetime.now)
 
     error: bool = None
+    
+    # Результат взят из кэша сгенерированных изображений
+    cache_hit: bool = False
 
 
 @dataclass
@@ -0,0 +1,352 @@
+"""
+Asynchronous job queue for writing image generation.
+Асинхронная очередь заданий генерации картинок написания.
+
+Requests are admitted into a bounded priority queue and processed by a
+configurable number of workers sharing one pipeline (any object with an
+async ``generate_image(request)`` method, normally WritingImageService).
+When the queue is full, submit raises RateLimitError with a Retry-After
+estimate derived from the recent generation time.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.api.routes.models.requests import AIImageRequest
+from app.api.routes.models.responses import GenerationStatus
+from app.core.exceptions import RateLimitError
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+FINISHED_STATUSES = (GenerationStatus.SUCCESS, GenerationStatus.FAILED, GenerationStatus.CANCELLED)
+
+
+class GenerationJob:
+    """
+    Generation job state.
+    Состояние задания генерации.
+    """
+
+    def __init__(self, job_id: str, request: AIImageRequest, priority: int):
+        self.job_id = job_id
+        self.request = request
+        self.priority = priority
+        self.status = GenerationStatus.QUEUED
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final status."""
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def wait_time_ms(self) -> Optional[int]:
+        """Time spent in the queue."""
+        if self.started_at is None:
+            return None
+        return int((self.started_at - self.created_at) * 1000)
+
+    @property
+    def run_time_ms(self) -> Optional[int]:
+        """Time spent in the pipeline."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return int((self.finished_at - self.started_at) * 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job state to dictionary (without the generated image)."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "priority": self.priority,
+            "word": self.request.word,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_time_ms": self.wait_time_ms,
+            "run_time_ms": self.run_time_ms,
+        }
+
+
+class GenerationQueue:
+    """
+    Bounded priority queue with pipeline workers.
+    Ограниченная очередь с приоритетами и воркерами пайплайна.
+    """
+
+    def __init__(
+        self,
+        pipeline: Any,
+        max_queue_size: int = 20,
+        workers: int = 1,
+        result_ttl_seconds: float = 600.0,
+        max_finished_jobs: int = 500,
+        default_job_time_seconds: float = 10.0
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            pipeline: Object with ``async generate_image(request)`` returning GenerationResult
+            max_queue_size: Maximum number of queued (not yet running) jobs
+            workers: Number of concurrent pipeline workers
+            result_ttl_seconds: How long finished jobs and results are kept
+            max_finished_jobs: Upper bound on kept finished jobs
+            default_job_time_seconds: Job time used for Retry-After before any job finished
+        """
+        self.pipeline = pipeline
+        self.max_queue_size = max_queue_size
+        self.workers = max(1, workers)
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_finished_jobs = max_finished_jobs
+        self.default_job_time_seconds = default_job_time_seconds
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._queued = 0
+        self._running = 0
+
+        # Метрики
+        self._recent_wait_ms: Deque[int] = deque(maxlen=1000)
+        self._recent_run_ms: Deque[int] = deque(maxlen=100)
+        self.counters = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+        }
+        self.wait_time_ms_total = 0
+        self.wait_time_ms_max = 0
+
+    @property
+    def started(self) -> bool:
+        """Whether workers are running."""
+        return bool(self._worker_tasks)
+
+    async def start(self):
+        """Start pipeline workers."""
+        if self.started:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(index), name=f"generation-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"Generation queue started: workers={self.workers}, max_queue_size={self.max_queue_size}")
+
+    async def stop(self):
+        """Stop workers and cancel unfinished jobs."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for job in self._jobs.values():
+            if not job.finished:
+                self._finish(job, GenerationStatus.CANCELLED, error="Service shutdown")
+        logger.info("Generation queue stopped")
+
+    def retry_after_seconds(self) -> int:
+        """Estimate when a queue slot frees up, based on recent job times."""
+        if self._recent_run_ms:
+            job_seconds = sum(self._recent_run_ms) / len(self._recent_run_ms) / 1000
+        else:
+            job_seconds = self.default_job_time_seconds
+        return max(1, math.ceil(job_seconds * (self._queued + 1) / self.workers))
+
+    def submit(self, request: AIImageRequest, priority: int = 0) -> GenerationJob:
+        """
+        Add a generation job to the queue.
+
+        Args:
+            request: Generation request
+            priority: Higher values are processed first
+
+        Returns:
+            GenerationJob: Queued job
+
+        Raises:
+            RateLimitError: If the queue is full (retry_after is set)
+        """
+        if not self.started:
+            raise RuntimeError("Generation queue is not started")
+
+        self._prune()
+        if self._queued >= self.max_queue_size:
+            self.counters["rejected"] += 1
+            retry_after = self.retry_after_seconds()
+            logger.warning(f"Generation queue is full ({self._queued}), retry after {retry_after}s")
+            raise RateLimitError(
+                "Generation queue is full",
+                limit=self.max_queue_size,
+                retry_after=retry_after
+            )
+
+        job = GenerationJob(uuid.uuid4().hex, request, priority)
+        self._jobs[job.job_id] = job
+        self._queued += 1
+        self.counters["submitted"] += 1
+        self._queue.put_nowait((-priority, next(self._sequence), job.job_id))
+        logger.info(f"Queued generation job {job.job_id} for '{request.word}' (priority={priority}, queued={self._queued})")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[GenerationJob]:
+        """Get job by ID."""
+        return self._jobs.get(job_id)
+
+    def position(self, job: GenerationJob) -> Optional[int]:
+        """1-based position of a queued job among queued jobs (by priority, then submission)."""
+        if job.status != GenerationStatus.QUEUED:
+            return None
+        ahead = sum(
+            1 for other in self._jobs.values()
+            if other.status == GenerationStatus.QUEUED and (
+                other.priority > job.priority
+                or (other.priority == job.priority and other.created_at < job.created_at)
+            )
+        )
+        return ahead + 1
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            bool: True if the job was cancelled
+        """
+        job = self._jobs.get(job_id)
+        if not job or job.finished:
+            return False
+        if job.status == GenerationStatus.QUEUED:
+            # Запись остается в очереди, воркер пропустит отмененное задание
+            self._finish(job, GenerationStatus.CANCELLED)
+        elif job.task:
+            job.cancel_requested = True
+            job.task.cancel()
+        logger.info(f"Cancelled generation job {job_id}")
+        return True
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> GenerationJob:
+        """Wait until the job is finished (used by tests and synchronous callers)."""
+        job = self._jobs[job_id]
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Job {job_id} not finished")
+        return job
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Queue metrics: depth, running jobs, wait times and counters.
+
+        Returns:
+            Dict with metrics
+        """
+        recent_wait = sorted(self._recent_wait_ms)
+        started_jobs = self.counters["succeeded"] + self.counters["failed"] + self._running
+        return {
+            "queue_depth": self._queued,
+            "running": self._running,
+            "workers": self.workers,
+            "max_queue_size": self.max_queue_size,
+            "counters": dict(self.counters),
+            "wait_time_ms": {
+                "avg": int(self.wait_time_ms_total / started_jobs) if started_jobs else 0,
+                "max": self.wait_time_ms_max,
+                "p50": _percentile(recent_wait, 0.50),
+                "p95": _percentile(recent_wait, 0.95),
+            },
+            "avg_run_time_ms": int(sum(self._recent_run_ms) / len(self._recent_run_ms)) if self._recent_run_ms else None,
+            "retry_after_seconds": self.retry_after_seconds(),
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != GenerationStatus.QUEUED:
+                continue
+
+            self._queued -= 1
+            self._running += 1
+            job.status = GenerationStatus.IN_PROGRESS
+            job.started_at = time.time()
+            wait_ms = job.wait_time_ms
+            self._recent_wait_ms.append(wait_ms)
+            self.wait_time_ms_total += wait_ms
+            self.wait_time_ms_max = max(self.wait_time_ms_max, wait_ms)
+            logger.info(f"Worker {index} started job {job_id} after {wait_ms}ms in queue")
+
+            job.task = asyncio.create_task(self.pipeline.generate_image(job.request))
+            try:
+                result = await job.task
+                if result.success:
+                    job.result = result
+                    self._finish(job, GenerationStatus.SUCCESS)
+                else:
+                    self._finish(job, GenerationStatus.FAILED, error=result.error)
+            except asyncio.CancelledError:
+                self._finish(job, GenerationStatus.CANCELLED)
+                if not job.cancel_requested:
+                    # Отменен сам воркер (остановка сервиса)
+                    raise
+            except Exception as e:
+                logger.error(f"Generation job {job_id} failed: {e}", exc_info=True)
+                self._finish(job, GenerationStatus.FAILED, error=str(e))
+            finally:
+                self._running -= 1
+                job.task = None
+
+    def _finish(self, job: GenerationJob, status: GenerationStatus, error: Optional[str] = None):
+        if job.status == GenerationStatus.QUEUED:
+            self._queued -= 1
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+        if status == GenerationStatus.SUCCESS:
+            self.counters["succeeded"] += 1
+            self._recent_run_ms.append(job.run_time_ms)
+        elif status == GenerationStatus.FAILED:
+            self.counters["failed"] += 1
+        else:
+            self.counters["cancelled"] += 1
+
+    def _prune(self):
+        """Drop finished jobs older than the TTL or beyond the kept count."""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(finished) - self.max_finished_jobs
+        for job in finished:
+            if excess > 0 or now - job.finished_at > self.result_ttl_seconds:
+                del self._jobs[job.job_id]
+                excess -= 1
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+# Глобальная очередь, создается при старте сервиса (main_writing_service.lifespan)
+generation_queue: Optional[GenerationQueue] = None
@@ -0,0 +1,303 @@
+"""
+Content-addressed disk cache of generated writing images.
+Кэш сгенерированных картинок написания на диске с адресацией по содержимому.
+
+The key is a hash of the normalized AIImageRequest, the model configuration
+and the cache version; the seed selects an exact entry. Generations without
+a seed are stored as variants of the same key; requests that opt into
+``allow_cached_variant`` reuse any entry of the key, including seeded ones
+written by the offline pre-generation (app.ai.pregenerate). Entries are JSON files written
+atomically (temporary file + os.replace); the total size is kept under a
+byte budget by evicting least recently used entries.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.api.routes.models.requests import AIImageRequest
+from app.utils import config_holder
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+ENTRY_SUFFIX = ".json"
+VARIANT_PREFIX = "v"
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+
+def request_cache_key(request: AIImageRequest, model_version: Dict[str, Any], cache_version: int = 1) -> str:
+    """
+    Hash of everything that determines the generated image, except the seed.
+
+    Args:
+        request: Generation request
+        model_version: Model/config identifiers (base model, controlnets, size)
+        cache_version: Bump to invalidate all entries
+
+    Returns:
+        str: Hex digest
+    """
+    payload = {
+        "version": cache_version,
+        "model": model_version,
+        "word": _normalize_text(request.word),
+        "translation": _normalize_text(request.translation),
+        "hint_writing": _normalize_text(request.hint_writing),
+        "width": request.width,
+        "height": request.height,
+        "style": request.style,
+        "conditioning_methods": dict(sorted((request.conditioning_methods or {}).items())),
+        "include_translation": request.include_translation,
+        "translation_model": request.translation_model,
+        "include_conditioning_images": request.include_conditioning_images,
+        "include_prompt": request.include_prompt,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ImageCache:
+    """
+    Disk-backed LRU cache with a byte budget.
+    Дисковый LRU кэш с ограничением по объему.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int, max_variants: int = 8, version: int = 1):
+        """
+        Initialize the cache and index existing entries.
+
+        Args:
+            cache_dir: Directory for cache files
+            max_size_bytes: Byte budget for all entries
+            max_variants: Maximum number of seedless variants kept per key
+            version: Cache version included in keys (bump to invalidate)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.max_size_bytes = max_size_bytes
+        self.max_variants = max_variants
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # LRU индекс: имя файла -> размер; порядок - от давно использованных к недавним
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for path in self.cache_dir.glob(f"*/*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, self._name(path), stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total_bytes += size
+        logger.info(f"Image cache loaded: {len(self._index)} entries, {self._total_bytes / 1024 / 1024:.1f}MB in {self.cache_dir}")
+
+    def _name(self, path: Path) -> str:
+        return f"{path.parent.name}/{path.name}"
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / name
+
+    @staticmethod
+    def _entry_name(key: str, seed: Optional[int]) -> str:
+        suffix = f"s{seed}" if seed is not None else f"{VARIANT_PREFIX}{uuid.uuid4().hex[:12]}"
+        return f"{key[:2]}/{key}.{suffix}{ENTRY_SUFFIX}"
+
+    def _variants(self, key: str) -> List[str]:
+        prefix = f"{key[:2]}/{key}.{VARIANT_PREFIX}"
+        return [name for name in self._index if name.startswith(prefix)]
+
+    def _entries(self, key: str) -> List[str]:
+        prefix = f"{key[:2]}/{key}."
+        return [name for name in self._index if name.startswith(prefix)]
+
+    async def get(self, key: str, seed: Optional[int], allow_variant: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached entry.
+
+        Args:
+            key: Request key (request_cache_key)
+            seed: Exact seed, or None
+            allow_variant: For seed=None, return any cached entry of the key
+                (seedless variants and pre-generated seeded images)
+
+        Returns:
+            Stored payload or None
+        """
+        if seed is not None:
+            candidates = [self._entry_name(key, seed)]
+        elif allow_variant:
+            candidates = self._entries(key)
+            random.shuffle(candidates)
+        else:
+            candidates = []
+
+        for name in candidates:
+            if name not in self._index:
+                continue
+            payload = await asyncio.to_thread(self._read, name)
+            if payload is None:
+                self._forget(name)
+                continue
+            self._index.move_to_end(name)
+            self.hits += 1
+            return payload
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, seed: Optional[int], payload: Dict[str, Any]) -> None:
+        """
+        Store an entry atomically and evict old entries over the budget.
+
+        Args:
+            key: Request key (request_cache_key)
+            seed: Seed used for the generation, or None for a variant
+            payload: JSON-serializable result
+        """
+        name = self._entry_name(key, seed)
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        if len(data) > self.max_size_bytes:
+            return
+        await asyncio.to_thread(self._write, name, data)
+
+        if name in self._index:
+            self._total_bytes -= self._index.pop(name)
+        self._index[name] = len(data)
+        self._total_bytes += len(data)
+        self.writes += 1
+
+        if seed is None:
+            variants = self._variants(key)
+            for old in variants[:max(0, len(variants) - self.max_variants)]:
+                await self._evict(old)
+        while self._total_bytes > self.max_size_bytes and self._index:
+            await self._evict(next(iter(self._index)))
+
+    async def _evict(self, name: str):
+        self._forget(name)
+        self.evictions += 1
+        await asyncio.to_thread(self._remove, name)
+
+    def _forget(self, name: str):
+        size = self._index.pop(name, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self._path(name)
+        try:
+            with open(path, "rb") as file:
+                payload = json.loads(file.read().decode("utf-8"))
+            # mtime хранит порядок LRU между перезапусками
+            os.utime(path, None)
+            return payload
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Image cache entry {name} is unreadable: {e}")
+            return None
+
+    def _write(self, name: str, data: bytes):
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _remove(self, name: str):
+        try:
+            self._path(name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics.
+
+        Returns:
+            Dict with entry count, size and hit/miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "size_bytes": self._total_bytes,
+            "max_size_bytes": self.max_size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+_image_cache: Optional[ImageCache] = None
+_image_cache_loaded = False
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """
+    Get the shared image cache configured in generation.image_cache.
+
+    Returns:
+        ImageCache or None if caching is disabled
+    """
+    global _image_cache, _image_cache_loaded
+    if _image_cache_loaded:
+        return _image_cache
+
+    settings = {
+        "enabled": True,
+        "cache_dir": "./cache/writing_images",
+        "max_size_mb": 1024,
+        "max_variants": 8,
+        "version": 1,
+    }
+    cfg = getattr(config_holder, "cfg", None)
+    if cfg is not None and hasattr(cfg, "generation") and hasattr(cfg.generation, "image_cache"):
+        cache_cfg = cfg.generation.image_cache
+        for key in settings:
+            settings[key] = cache_cfg.get(key, settings[key])
+
+    _image_cache_loaded = True
+    if not settings["enabled"]:
+        logger.info("Image cache disabled")
+        return None
+    try:
+        _image_cache = ImageCache(
+            cache_dir=settings["cache_dir"],
+            max_size_bytes=int(float(settings["max_size_mb"]) * 1024 * 1024),
+            max_variants=int(settings["max_variants"]),
+            version=int(settings["version"]),
+        )
+    except OSError as e:
+        logger.error(f"Failed to initialize image cache: {e}")
+        _image_cache = None
+    return _image_cache
@@ -0,0 +1,108 @@
+"""
+Single-flight coalescing of identical in-flight generation requests.
+Объединение одинаковых одновременных запросов генерации в одну генерацию.
+
+The first request for a key starts the work as a separate task; requests
+with the same key that arrive while it is running await the same task.
+Waiters are shielded from each other: cancelling one waiter (e.g. a client
+disconnect) does not cancel the shared work or the other waiters.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.started_at = time.monotonic()
+        self.waiters = 1
+
+
+class SingleFlight:
+    """
+    Registry of in-flight tasks keyed by request.
+    Реестр выполняющихся задач по ключу запроса.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.counters = {
+            "executions": 0,
+            "coalesced": 0,
+            "cancelled_waiters": 0,
+        }
+        # Сэкономленное время: длительность общей работы на каждого присоединившегося
+        self.saved_time_ms = 0
+        self.max_waiters = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() once per key among concurrent callers.
+
+        Args:
+            key: Coalescing key (identical requests share it)
+            factory: Coroutine factory doing the actual work
+
+        Returns:
+            Result of the shared work
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task, key=key: self._complete(key, task))
+            self.counters["executions"] += 1
+        else:
+            flight.waiters += 1
+            self.counters["coalesced"] += 1
+            self.max_waiters = max(self.max_waiters, flight.waiters)
+            logger.info(f"Joined in-flight generation {key[:12]} ({flight.waiters} waiters)")
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                # Отменен только этот ожидающий, общая работа продолжается
+                self.counters["cancelled_waiters"] += 1
+            raise
+
+    def _complete(self, key: str, task: asyncio.Task):
+        flight = self._flights.get(key)
+        if flight is None or flight.task is not task:
+            return
+        del self._flights[key]
+        if flight.waiters > 1:
+            duration_ms = int((time.monotonic() - flight.started_at) * 1000)
+            self.saved_time_ms += duration_ms * (flight.waiters - 1)
+        if not task.cancelled():
+            # Помечаем исключение как полученное, даже если все ожидающие отменены
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys currently being executed."""
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Coalescing statistics.
+
+        Returns:
+            Dict with counters and saved work
+        """
+        return {
+            "in_flight": self.in_flight,
+            **self.counters,
+            "max_waiters": self.max_waiters,
+            "saved_time_ms": self.saved_time_ms,
+        }
+
+
+# Общий реестр для всех экземпляров WritingImageService (сервис создается на каждый запрос)
+generation_flights = SingleFlight()
@@ -9,11 +9,18 @@ import time
 import asyncio
 from typing import Dict, Any, Optional
 
+from PIL import Image
+
 from app.api.routes.models.requests import AIImageRequest
 from app.api.routes.models.responses import AIGenerationMetadata
+from app.api.routes.services.image_cache import ImageCache, get_image_cache, request_cache_key
+from app.api.routes.services.single_flight import generation_flights
 from app.utils.image_utils import get_image_processor
+from app.utils.image_encoding import encode_image, image_to_base64, transcode_base64_png
 from app.utils import config_holder
 from app.ai.ai_image_generator import AIImageGenerator, AIGenerationConfig
+from app.ai.backends import DEFAULT_BACKEND
+from app.ai.core.conditioning_manager import resolve_multi_types
 from app.utils.logger import get_module_logger
 
 logger = get_module_logger(__name__)
@@ -38,16 +45,90 @@ class GenerationResult:
         prompt_used: Optional[str] = None,
         # НОВОЕ: метаданные пользовательской подсказки
         user_hint_metadata: Optional[Dict[str, Any]] = None,
+        # Изображения свежей генерации (у результата из кэша есть только base64)
+        image: Optional[Image.Image] = None,
+        base_image: Optional[Image.Image] = None,
+        conditioning_images: Optional[Dict[str, Dict[str, Optional[Image.Image]]]] = None,
     ):
         self.success = success
-        self.image_data_base64 = image_data_base64
+        self._image_data_base64 = image_data_base64
         self.format = format
         self.metadata = metadata
         self.error = error
-        self.base_image_base64 = base_image_base64
-        self.conditioning_images_base64 = conditioning_images_base64
+        self._base_image_base64 = base_image_base64
+        self._conditioning_images_base64 = conditioning_images_base64
         self.prompt_used = prompt_used
         self.user_hint_metadata = user_hint_metadata or {}
+        self.image = image
+        self.base_image = base_image
+        self.conditioning_images = conditioning_images
+    
+    # base64 (PNG) нужен только JSON ответу и кэшу - считается при первом обращении
+    @property
+    def image_data_base64(self) -> Optional[str]:
+        if self._image_data_base64 is None and self.image is not None:
+            self._image_data_base64 = image_to_base64(self.image)
+        return self._image_data_base64
+    
+    @property
+    def base_image_base64(self) -> Optional[str]:
+        if self._base_image_base64 is None and self.base_image is not None:
+            self._base_image_base64 = image_to_base64(self.base_image)
+        return self._base_image_base64
+    
+    @property
+    def conditioning_images_base64(self) -> Optional[Dict[str, Dict[str, str]]]:
+        if self._conditioning_images_base64 is None and self.conditioning_images:
+            self._conditioning_images_base64 = {
+                conditioning_type: {
+                    method: image_to_base64(image) if image is not None else None
+                    for method, image in methods.items()
+                }
+                for conditioning_type, methods in self.conditioning_images.items()
+            }
+        return self._conditioning_images_base64
+    
+    @staticmethod
+    def _encode(image: Optional[Image.Image], data_base64: Optional[str], image_format: str) -> Optional[bytes]:
+        if image is not None:
+            return encode_image(image, image_format)
+        if data_base64 is not None:
+            return transcode_base64_png(data_base64, image_format)
+        return None
+    
+    def encode_image(self, image_format: str) -> Optional[bytes]:
+        """
+        Итоговое изображение в заданном формате (без промежуточного base64).
+        
+        Args:
+            image_format: "webp" или "png"
+            
+        Returns:
+            Optional[bytes]: Закодированное изображение
+        """
+        return self._encode(self.image, self._image_data_base64, image_format)
+    
+    def encode_base_image(self, image_format: str) -> Optional[bytes]:
+        """Базовое изображение в заданном формате."""
+        return self._encode(self.base_image, self._base_image_base64, image_format)
+    
+    def encode_conditioning_images(self, image_format: str) -> Dict[str, Dict[str, Optional[bytes]]]:
+        """Conditioning изображения в заданном формате: {type: {method: bytes}}."""
+        if self.conditioning_images:
+            return {
+                conditioning_type: {
+                    method: self._encode(image, None, image_format)
+                    for method, image in methods.items()
+                }
+                for conditioning_type, methods in self.conditioning_images.items()
+            }
+        return {
+            conditioning_type: {
+                method: self._encode(None, data_base64, image_format)
+                for method, data_base64 in methods.items()
+            }
+            for conditioning_type, methods in (self._conditioning_images_base64 or {}).items()
+        }
 
 
 class WritingImageService:
@@ -61,6 +142,7 @@ class WritingImageService:
         """Initialize the writing image service."""
         self.generation_count = 0
         self.hint_usage_count = 0  # НОВОЕ: счетчик использования подсказок
+        self.cache_hit_count = 0
         self.start_time = time.time()
         self.image_processor = get_image_processor()
         
@@ -71,6 +153,8 @@ class WritingImageService:
         self.ai_generator = None
         self._ai_initialization_lock = asyncio.Lock()
         self._ai_initialized = False
+        # Генерации в процессе: модели выгружаются только когда их нет
+        self._active_generations = 0
         
         logger.info("WritingImageService initialized with real AI generation and hint support")
     
@@ -80,6 +164,8 @@ class WritingImageService:
         self.default_width = 1024
         self.default_height = 1024
         self.show_guidelines_default = True
+        # Выгружать модели после каждой генерации (экономит видеопамять между запросами)
+        self.release_models_after_generation = True
         
         # AI Generation defaults
         self.ai_config = AIGenerationConfig()
@@ -117,12 +203,30 @@ class WritingImageService:
                         if hasattr(models_cfg, 'controlnet_models'):
                             self.ai_config.controlnet_models = dict(models_cfg.controlnet_models)
                     
+                    # Бэкенд генерации: ai_generation.backend.name, параметры - в секции с его именем
+                    if hasattr(ai_cfg, 'backend'):
+                        self.ai_config.backend = ai_cfg.backend.get('name', self.ai_config.backend)
+                        self.ai_config.backend_options = dict(ai_cfg.backend.get(self.ai_config.backend, None) or {})
+                    
                     # Update generation parameters
                     if hasattr(ai_cfg, 'generation'):
                         gen_cfg = ai_cfg.generation
                         self.ai_config.width = gen_cfg.get('width', 1024)
                         self.ai_config.height = gen_cfg.get('height', 1024)
                         self.ai_config.batch_size = gen_cfg.get('batch_size', 1)
+                        self.ai_config.batch_window_ms = gen_cfg.get('batch_window_ms', 50)
+                    
+                    if hasattr(ai_cfg, 'conditioning'):
+                        self.ai_config.conditioning_workers = ai_cfg.conditioning.get('process_pool_workers', 2)
+                        self.ai_config.conditioning_latency_budget_ms = ai_cfg.conditioning.get('latency_budget_ms', 0)
+                        self.ai_config.conditioning_latency_report = ai_cfg.conditioning.get('latency_report', None)
+                        self.ai_config.conditioning_mode = ai_cfg.conditioning.get('mode', 'single')
+                        multi_cfg = ai_cfg.conditioning.get('multi', None)
+                        if multi_cfg is not None:
+                            types = multi_cfg.get('types', None)
+                            self.ai_config.conditioning_types = list(types) if types else None
+                            self.ai_config.conditioning_timeout_ms = multi_cfg.get('timeout_ms', 0)
+                            self.ai_config.conditioning_type_timeouts_ms = dict(multi_cfg.get('type_timeouts_ms', None) or {})
                     
                     # Update GPU settings
                     if hasattr(ai_cfg, 'gpu'):
@@ -131,6 +235,13 @@ class WritingImageService:
                         self.ai_config.memory_efficient = gpu_cfg.get('memory_efficient', True)
                         self.ai_config.enable_attention_slicing = gpu_cfg.get('enable_attention_slicing', True)
                         self.ai_config.enable_cpu_offload = gpu_cfg.get('enable_cpu_offload', False)
+                        self.release_models_after_generation = gpu_cfg.get(
+                            'release_after_generation', self.release_models_after_generation
+                        )
+                
+                # Перевод значений моделью (translation.enabled); без него в промпт идет исходный текст
+                if hasattr(cfg, 'translation'):
+                    self.ai_config.enable_translation = cfg.translation.get('enabled', self.ai_config.enable_translation)
                 
                 # НОВОЕ: Load hint configuration
                 if hasattr(cfg, 'user_hints'):
@@ -194,22 +305,58 @@ class WritingImageService:
         Generate writing image for the given request using real AI models.
         ОБНОВЛЕНО: Поддержка пользовательской подсказки hint_writing
         
+        Одинаковые одновременные запросы (тот же ключ кэша и seed) выполняются
+        одной генерацией, результат получают все ожидающие.
+        
         Args:
             request: Writing image generation request with optional user hint
             
         Returns:
             GenerationResult: Result of generation with hint metadata
-            
-        Raises:
-            RuntimeError: If generation fails
         """
         start_time = time.time()
         
-        try:
-            # Логируем с информацией о подсказке
-            hint_info = f", hint: '{request.hint_writing}'" if request.has_user_hint() else ""
-            logger.info(f"Generating AI image for word: '{request.word}', translation: '{request.translation}'{hint_info}")
+        # Логируем с информацией о подсказке
+        hint_info = f", hint: '{request.hint_writing}'" if request.has_user_hint() else ""
+        logger.info(f"Generating AI image for word: '{request.word}', translation: '{request.translation}'{hint_info}")
+        
+        # Кэш проверяется до загрузки моделей: при попадании GPU не нужен
+        image_cache = get_image_cache() if request.use_cache else None
+        cache_key = self.cache_key_for(request, image_cache)
+        if image_cache:
+            cached = await image_cache.get(cache_key, request.seed, allow_variant=request.allow_cached_variant)
+            if cached:
+                self.cache_hit_count += 1
+                lookup_time_ms = int((time.time() - start_time) * 1000)
+                logger.info(f"✓ Cache hit for word: {request.word} ({lookup_time_ms}ms)")
+                return self._result_from_cache(cached, lookup_time_ms)
+        
+        return await generation_flights.run(
+            f"{cache_key}.{request.seed}",
+            lambda: self._generate(request, image_cache, cache_key, start_time)
+        )
+    
+    async def _generate(
+        self,
+        request: AIImageRequest,
+        image_cache: Optional[ImageCache],
+        cache_key: str,
+        start_time: float
+    ) -> GenerationResult:
+        """
+        Run the AI pipeline for a request and store the result in the image cache.
+        
+        Args:
+            request: Writing image generation request
+            image_cache: Image cache or None if caching is disabled for the request
+            cache_key: Request cache key
+            start_time: Request start time
             
+        Returns:
+            GenerationResult: Result of generation (errors are returned, not raised)
+        """
+        self._active_generations += 1
+        try:
             # Ensure AI is initialized
             await self._ensure_ai_initialized()
             
@@ -274,7 +421,8 @@ class WritingImageService:
                 conditioning_types_used=list(ai_result.generation_metadata.get('conditioning_methods_used', {}).keys()),
                 seed_used=seed,
                 image_dimensions=(width, height),
-                total_processing_time_ms=ai_result.generation_metadata.get('generation_time_ms', 0)
+                total_processing_time_ms=ai_result.generation_metadata.get('generation_time_ms', 0),
+                stage_timings=ai_result.generation_metadata.get('stage_timings')
             )
             
             # НОВОЕ: Add hint metadata to main metadata
@@ -303,28 +451,32 @@ class WritingImageService:
             logger.info(f"✓ Generated AI image for word: {request.word} "
                        f"(total_time: {generation_time_ms}ms, "
                        f"ai_time: {ai_result.generation_metadata.get('generation_time_ms')}ms, "
-                       f"size: {len(ai_result.generated_image_base64)} chars{hint_result_info})")
-            
-            await self.cleanup()
+                       f"size: {ai_result.generated_image.size}{hint_result_info})")
             
-            return GenerationResult(
+            result = GenerationResult(
                 success=True,
-                image_data_base64=ai_result.generated_image_base64,
                 format="png",
                 metadata=metadata,
-                base_image_base64=ai_result.base_image_base64,
-                conditioning_images_base64=ai_result.conditioning_images_base64,
                 prompt_used=ai_result.prompt_used,
-                user_hint_metadata=ai_result.generation_metadata.get('user_hint_metadata', {})  # НОВОЕ
+                user_hint_metadata=ai_result.generation_metadata.get('user_hint_metadata', {}),  # НОВОЕ
+                image=ai_result.generated_image,
+                base_image=ai_result.base_image,
+                conditioning_images=ai_result.conditioning_images,
             )
             
+            if image_cache:
+                try:
+                    await image_cache.put(cache_key, seed, self._cache_payload(result))
+                except OSError as e:
+                    logger.warning(f"Failed to store generated image in cache: {e}")
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Error generating AI image: {e}", exc_info=True)
             
             # Calculate error time
             error_time_ms = int((time.time() - start_time) * 1000)
-            
-            await self.cleanup()
 
             return GenerationResult(
                 success=False,
@@ -334,8 +486,97 @@ class WritingImageService:
                     error=True
                 )
             )
+        
+        finally:
+            self._active_generations -= 1
+            if self.release_models_after_generation:
+                await self._release_models_if_idle()
+    
+    async def _release_models_if_idle(self):
+        """
+        Выгружает модели после генерации, если других генераций нет.
+        
+        Воркеры очереди и синхронные запросы используют один сервис: выгрузка во время
+        чужой генерации оставила бы ее без бэкенда. Счетчик проверяется повторно под
+        блокировкой инициализации, чтобы не выгрузить модели, только что загруженные
+        другой генерацией.
+        """
+        if self._active_generations:
+            return
+        async with self._ai_initialization_lock:
+            if self._active_generations == 0:
+                await self._cleanup_unlocked()
 
 
+    def cache_key_for(self, request: AIImageRequest, image_cache: Optional[ImageCache] = None) -> str:
+        """
+        Ключ запроса в кэше изображений (без seed), общий для API и предгенерации.
+        
+        Args:
+            request: Запрос генерации
+            image_cache: Кэш изображений, версия которого входит в ключ (None - версия 0)
+            
+        Returns:
+            str: Ключ кэша
+        """
+        return request_cache_key(request, self._model_version(), image_cache.version if image_cache else 0)
+    
+    def _model_version(self) -> Dict[str, Any]:
+        """Model identifiers that are part of the image cache key."""
+        version = {
+            "base_model": self.ai_config.base_model,
+            "controlnet_models": dict(self.ai_config.controlnet_models),
+            "width": self.ai_config.width,
+            "height": self.ai_config.height,
+        }
+        # Картинки других бэкендов (cpu) не смешиваются с настоящими; ключи SDXL не меняются
+        if self.ai_config.backend != DEFAULT_BACKEND:
+            version["backend"] = self.ai_config.backend
+        # Несколько карт conditioning дают другие картинки; ключи режима single не меняются
+        if self.ai_config.conditioning_mode != "single":
+            version["conditioning"] = {
+                "mode": self.ai_config.conditioning_mode,
+                # Фактические типы (без заданных - все), как в ConditioningManager.get_multi_types()
+                "types": sorted(resolve_multi_types(self.ai_config.conditioning_types)),
+            }
+        return version
+    
+    @staticmethod
+    def _cache_payload(result: GenerationResult) -> Dict[str, Any]:
+        """Serialize a successful result for the image cache."""
+        # vars() включает динамически добавленные поля подсказки (user_hint_*)
+        metadata = {key: value for key, value in vars(result.metadata).items() if key != "timestamp"}
+        return {
+            "image_data_base64": result.image_data_base64,
+            "format": result.format,
+            "base_image_base64": result.base_image_base64,
+            "conditioning_images_base64": result.conditioning_images_base64,
+            "prompt_used": result.prompt_used,
+            "user_hint_metadata": result.user_hint_metadata,
+            "metadata": metadata,
+        }
+    
+    @staticmethod
+    def _result_from_cache(payload: Dict[str, Any], lookup_time_ms: int) -> GenerationResult:
+        """Build a GenerationResult from a cached payload."""
+        metadata = AIGenerationMetadata()
+        for key, value in payload.get("metadata", {}).items():
+            setattr(metadata, key, value)
+        if metadata.image_dimensions is not None:
+            metadata.image_dimensions = tuple(metadata.image_dimensions)
+        metadata.generation_time_ms = lookup_time_ms
+        metadata.cache_hit = True
+        
+        return GenerationResult(
+            success=True,
+            image_data_base64=payload["image_data_base64"],
+            format=payload.get("format", "png"),
+            metadata=metadata,
+            base_image_base64=payload.get("base_image_base64"),
+            conditioning_images_base64=payload.get("conditioning_images_base64"),
+            prompt_used=payload.get("prompt_used"),
+            user_hint_metadata=payload.get("user_hint_metadata"),
+        )
     
     async def get_service_status(self) -> Dict[str, Any]:
         """
@@ -407,6 +648,13 @@ class WritingImageService:
             "max_hint_length": self.hint_config["max_hint_length"]  # НОВОЕ
         }
         
+        image_cache = get_image_cache()
+        base_status["image_cache"] = (
+            {"enabled": True, "service_hits": self.cache_hit_count, **image_cache.get_stats()}
+            if image_cache else {"enabled": False}
+        )
+        base_status["single_flight"] = generation_flights.get_stats()
+        
         return base_status
     
     async def warmup_ai(self) -> Dict[str, Any]:
@@ -502,6 +750,11 @@ class WritingImageService:
     
     async def cleanup(self):
         """Clean up AI resources."""
+        async with self._ai_initialization_lock:
+            await self._cleanup_unlocked()
+    
+    async def _cleanup_unlocked(self):
+        """Выгружает AI генератор (вызывается под блокировкой инициализации)."""
         try:
             logger.info("Cleaning up Writing Image Service...")
             
@@ -522,4 +775,14 @@ class WritingImageService:
             # Note: We can't call async cleanup in __del__
             # This is just a safety net for garbage collection
             logger.warning("WritingImageService deleted without explicit cleanup")
-            
\ No newline at end of file
+
+
+# Общий сервис процесса, создается при старте (main_writing_service.lifespan). Запросы и
+# воркеры очереди используют один AIImageGenerator и ModelManager, поэтому одновременные
+# генерации попадают в один BatchScheduler.
+writing_image_service: Optional[WritingImageService] = None
+
+
+def get_shared_writing_image_service() -> WritingImageService:
+    """Общий сервис; без запущенного приложения (скрипты, тесты) - новый экземпляр."""
+    return writing_image_service or WritingImageService()
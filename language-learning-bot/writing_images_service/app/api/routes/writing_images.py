@@ -4,15 +4,24 @@ API routes for writing image generation.
 ОБНОВЛЕНО: Добавлена поддержка пользовательской подсказки hint_writing
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+from urllib.parse import quote
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import Response
 
 from app.api.routes.models.requests import AIImageRequest
 from app.api.routes.models.responses import AIImageResponse, GenerationStatus
-from app.api.routes.services.writing_image_service import WritingImageService
+from app.api.routes.services.writing_image_service import WritingImageService, get_shared_writing_image_service
 from app.api.routes.services.validation_service import ValidationService
-from app.core.exceptions import ValidationError, GenerationError
+from app.api.routes.services import generation_queue as generation_queue_module
+from app.api.routes.services.generation_queue import GenerationQueue
+from app.api.dependencies import rate_limit
+from app.core.exceptions import ValidationError, GenerationError, RateLimitError
 from app.utils.logger import get_module_logger
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.image_encoding import IMAGE_MEDIA_TYPES, build_multipart, json_part, negotiate_image_format
 
 logger = get_module_logger(__name__)
 
@@ -20,14 +29,110 @@ router = APIRouter(prefix="/writing", tags=["writing_images"])
 
 # Dependency injection
 def get_writing_image_service() -> WritingImageService:
-    """Get writing image service instance."""
-    return WritingImageService()
+    """Get the shared writing image service instance."""
+    return get_shared_writing_image_service()
 
 def get_validation_service() -> ValidationService:
     """Get validation service instance."""
     return ValidationService()
 
-@router.post("/generate-writing-image", response_model=AIImageResponse)
+def get_generation_queue() -> GenerationQueue:
+    """Get the generation job queue started by the service lifespan."""
+    queue = generation_queue_module.generation_queue
+    if queue is None or not queue.started:
+        raise HTTPException(status_code=503, detail="Generation queue is not available")
+    return queue
+
+def _build_ai_response(generation_result, include_images: bool = True) -> AIImageResponse:
+    """Convert GenerationResult to AIImageResponse (without base64 images for binary responses)."""
+    return AIImageResponse(
+        success=True,
+        status=GenerationStatus.SUCCESS,
+        generated_image_base64=generation_result.image_data_base64 if include_images else None,
+        base_image_base64=generation_result.base_image_base64 if include_images else None,
+        conditioning_images_base64=generation_result.conditioning_images_base64 if include_images else None,
+        prompt_used=generation_result.prompt_used,
+        generation_metadata=generation_result.metadata,
+        error=generation_result.error,
+        warnings=None,
+    )
+
+def _negotiate_or_406(accept):
+    """Image format from the Accept header; 406 if no supported format is acceptable."""
+    image_format = negotiate_image_format(accept)
+    if image_format is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Not Acceptable. Supported image types: {', '.join(IMAGE_MEDIA_TYPES.values())}"
+        )
+    return image_format
+
+def _header_value(value) -> str:
+    """HTTP headers are latin-1: percent-encode words, hints and translations."""
+    return quote(str(value), safe=" ,.:;/()-_'")
+
+def _binary_headers(request: AIImageRequest, generation_result) -> dict:
+    """Generation metadata headers for binary responses."""
+    headers = {
+        "X-Word": _header_value(request.word),
+        "X-Translation": _header_value(request.translation or ""),
+        "X-Style": _header_value(getattr(request, 'style', 'comic')),
+        "Vary": "Accept",
+    }
+    
+    # Add hint-related headers if user hint was provided
+    if request.has_user_hint():
+        headers["X-User-Hint"] = _header_value(request.hint_writing)
+        
+        # Add translated hint if available
+        if (generation_result.metadata and 
+            hasattr(generation_result.metadata, 'user_hint_translated')):
+            headers["X-User-Hint-Translated"] = _header_value(generation_result.metadata.user_hint_translated)
+            headers["X-User-Hint-Used"] = "true"
+        else:
+            headers["X-User-Hint-Used"] = "false"
+    
+    # Add generation metadata headers
+    if generation_result.metadata:
+        if getattr(generation_result.metadata, 'generation_time_ms', None) is not None:
+            headers["X-Generation-Time-Ms"] = str(generation_result.metadata.generation_time_ms)
+        if getattr(generation_result.metadata, 'ai_model_used', None):
+            headers["X-AI-Model-Used"] = _header_value(generation_result.metadata.ai_model_used)
+        if getattr(generation_result.metadata, 'translation_used', None):
+            headers["X-Translation-Used"] = _header_value(generation_result.metadata.translation_used)
+            headers["X-Translation-Source"] = _header_value(getattr(generation_result.metadata, 'translation_source', 'unknown'))
+        headers["X-Cache-Hit"] = "true" if getattr(generation_result.metadata, 'cache_hit', False) else "false"
+    
+    return headers
+
+def _encode_multipart(generation_result, image_format: str):
+    """Metadata JSON and every image of the result as multipart/mixed parts (runs in a thread)."""
+    media_type = IMAGE_MEDIA_TYPES[image_format]
+    conditioning_images = generation_result.encode_conditioning_images(image_format)
+    
+    metadata = jsonable_encoder(_build_ai_response(generation_result, include_images=False))
+    metadata["format"] = image_format
+    # Методы без изображения тоже перечисляются - клиент показывает их как (None)
+    metadata["conditioning_methods"] = {
+        conditioning_type: list(methods) for conditioning_type, methods in conditioning_images.items()
+    }
+    
+    parts = [json_part(metadata)]
+    parts.append(("generated_image", media_type, generation_result.encode_image(image_format)))
+    
+    base_image = generation_result.encode_base_image(image_format)
+    if base_image is not None:
+        parts.append(("base_image", media_type, base_image))
+    
+    for conditioning_type, methods in conditioning_images.items():
+        for method, image in methods.items():
+            if image is not None:
+                parts.append((f"conditioning/{conditioning_type}/{method}", media_type, image))
+    
+    return build_multipart(parts)
+
+@router.post("/generate-writing-image", response_model=AIImageResponse,
+             dependencies=[Depends(rate_limit("generation"))])
 async def generate_writing_image(
     request: AIImageRequest,
     writing_service: WritingImageService = Depends(get_writing_image_service),
@@ -100,17 +205,7 @@ async def generate_writing_image(
         logger.info(f"Successfully generated writing image for: {request.word}{hint_used_info}")
         
         # Prepare response with hint metadata
-        result = AIImageResponse(
-            success=True,
-            status=GenerationStatus.SUCCESS,
-            generated_image_base64=generation_result.image_data_base64,
-            base_image_base64=generation_result.base_image_base64,
-            conditioning_images_base64=generation_result.conditioning_images_base64,
-            prompt_used=generation_result.prompt_used,
-            generation_metadata=generation_result.metadata,
-            error=generation_result.error,
-            warnings=None,
-        )
+        result = _build_ai_response(generation_result)
         
         # Логируем детали результата
         logger.debug(f"Result details: success={result.success}, status={result.status}")
@@ -131,11 +226,51 @@ async def generate_writing_image(
         logger.error(f"Unexpected error in writing image generation: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/generate-writing-image-binary")
+async def _generate_for_binary(
+    request: AIImageRequest,
+    writing_service: WritingImageService,
+    validation_service: ValidationService
+):
+    """Validate and generate for the binary routes; raises HTTPException on failure."""
+    hint_info = f", hint: '{request.hint_writing}'" if request.has_user_hint() else ""
+    logger.info(f"Generating binary writing image for word: '{request.word}'{hint_info}")
+    
+    validation_result = await validation_service.validate_request(request)
+    if not validation_result.is_valid:
+        logger.warning(f"Invalid request: {validation_result.errors}")
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Validation failed: {', '.join(validation_result.errors)}"
+        )
+    
+    try:
+        generation_result = await writing_service.generate_image(request)
+    except ValidationError as e:
+        logger.warning(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except GenerationError as e:
+        logger.error(f"Generation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in binary writing image generation: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    if not generation_result.success:
+        logger.error(f"Generation failed: {generation_result.error}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Image generation failed: {generation_result.error}"
+        )
+    
+    logger.info(f"Successfully generated binary writing image for: {request.word}{hint_info}")
+    return generation_result
+
+@router.post("/generate-writing-image-binary", dependencies=[Depends(rate_limit("generation"))])
 async def generate_writing_image_binary(
     request: AIImageRequest,
     writing_service: WritingImageService = Depends(get_writing_image_service),
-    validation_service: ValidationService = Depends(get_validation_service)
+    validation_service: ValidationService = Depends(get_validation_service),
+    accept: str = Header(None)
 ):
     """
     Generate writing image and return as binary data.
@@ -146,98 +281,216 @@ async def generate_writing_image_binary(
         request: Writing image generation request with optional user hint
         writing_service: Writing image service
         validation_service: Validation service
+        accept: Accept header, selects WebP or PNG (PNG if absent)
         
     Returns:
         Response: Binary image data with hint metadata in headers
         
     Raises:
-        HTTPException: If generation fails
+        HTTPException: If generation fails, 406 if neither WebP nor PNG is acceptable
     """
+    image_format = _negotiate_or_406(accept)
+    generation_result = await _generate_for_binary(request, writing_service, validation_service)
+    
     try:
-        hint_info = f", hint: '{request.hint_writing}'" if request.has_user_hint() else ""
-        logger.info(f"Generating binary writing image for word: '{request.word}'{hint_info}")
-        
-        # Validate request including user hint
-        validation_result = await validation_service.validate_request(request)
-        if not validation_result.is_valid:
-            logger.warning(f"Invalid request: {validation_result.errors}")
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Validation failed: {', '.join(validation_result.errors)}"
-            )
-        
-        # Validate user hint if provided
-        if request.has_user_hint():
-            hint_validation = await validation_service.validate_user_hint(request.hint_writing)
-            if not hint_validation.is_valid:
-                logger.warning(f"Invalid user hint: {hint_validation.errors}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"User hint validation failed: {', '.join(hint_validation.errors)}"
-                )
-        
-        # Generate image
-        generation_result = await writing_service.generate_image(request)
-        
-        if not generation_result.success:
-            logger.error(f"Generation failed: {generation_result.error}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Image generation failed: {generation_result.error}"
-            )
-        
-        logger.info(f"Successfully generated binary writing image for: {request.word}{hint_info}")
+        headers = _binary_headers(request, generation_result)
+        headers["Content-Disposition"] = (
+            f"attachment; filename=writing.{image_format}; "
+            f"filename*=UTF-8''{quote(f'writing_{request.word}.{image_format}')}"
+        )
         
-        # Prepare response headers with hint metadata
-        headers = {
-            "Content-Disposition": f"attachment; filename=writing_{request.word}.{generation_result.format}",
-            "X-Word": request.word,
-            "X-Translation": request.translation or "",
-            "X-Style": getattr(request, 'style', 'comic'),
-        }
+        # Кодирование (WebP/PNG) - CPU работа, выполняем вне event loop
+        content = await asyncio.to_thread(generation_result.encode_image, image_format)
         
-        # Add hint-related headers if user hint was provided
-        if request.has_user_hint():
-            headers["X-User-Hint"] = request.hint_writing
-            
-            # Add translated hint if available
-            if (generation_result.metadata and 
-                hasattr(generation_result.metadata, 'user_hint_translated')):
-                headers["X-User-Hint-Translated"] = generation_result.metadata.user_hint_translated
-                headers["X-User-Hint-Used"] = "true"
-            else:
-                headers["X-User-Hint-Used"] = "false"
-        
-        # Add generation metadata headers
-        if generation_result.metadata:
-            if hasattr(generation_result.metadata, 'generation_time_ms'):
-                headers["X-Generation-Time-Ms"] = str(generation_result.metadata.generation_time_ms)
-            if hasattr(generation_result.metadata, 'ai_model_used'):
-                headers["X-AI-Model-Used"] = generation_result.metadata.ai_model_used
-            if hasattr(generation_result.metadata, 'translation_used'):
-                headers["X-Translation-Used"] = generation_result.metadata.translation_used
-                headers["X-Translation-Source"] = getattr(generation_result.metadata, 'translation_source', 'unknown')
-        
-        # Return binary response
-        media_type = f"image/{generation_result.format}"
         return Response(
-            content=generation_result.image_data,
-            media_type=media_type,
+            content=content,
+            media_type=IMAGE_MEDIA_TYPES[image_format],
             headers=headers
         )
         
-    except ValidationError as e:
-        logger.warning(f"Validation error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in binary writing image generation: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/generate-writing-image-multipart", dependencies=[Depends(rate_limit("generation"))])
+async def generate_writing_image_multipart(
+    request: AIImageRequest,
+    writing_service: WritingImageService = Depends(get_writing_image_service),
+    validation_service: ValidationService = Depends(get_validation_service),
+    accept: str = Header(None)
+):
+    """
+    Generate writing image and return metadata and images as multipart/mixed.
+    Генерирует картинку и возвращает метаданные и изображения одним multipart ответом.
+    
+    Parts: "metadata" (JSON, the generate-writing-image response without base64
+    fields plus "format" and "conditioning_methods"), "generated_image",
+    optional "base_image" and "conditioning/<type>/<method>" images.
+    
+    Args:
+        request: Writing image generation request with optional user hint
+        writing_service: Writing image service
+        validation_service: Validation service
+        accept: Accept header; its image types select WebP or PNG for all parts
         
-    except GenerationError as e:
-        logger.error(f"Generation error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    Returns:
+        Response: multipart/mixed body
+        
+    Raises:
+        HTTPException: If generation fails, 406 if neither WebP nor PNG is acceptable
+    """
+    image_format = _negotiate_or_406(accept)
+    generation_result = await _generate_for_binary(request, writing_service, validation_service)
+    
+    try:
+        body, content_type = await asyncio.to_thread(_encode_multipart, generation_result, image_format)
+        return Response(
+            content=body,
+            media_type=content_type,
+            headers=_binary_headers(request, generation_result)
+        )
         
     except Exception as e:
-        logger.error(f"Unexpected error in binary writing image generation: {e}", exc_info=True)
+        logger.error(f"Unexpected error in multipart writing image generation: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/jobs", status_code=202, dependencies=[Depends(rate_limit("generation"))])
+async def submit_generation_job(
+    request: AIImageRequest,
+    priority: int = Query(0, description="Job priority, higher values are processed first"),
+    queue: GenerationQueue = Depends(get_generation_queue),
+    validation_service: ValidationService = Depends(get_validation_service)
+):
+    """
+    Submit a writing image generation job.
+    Ставит задание генерации картинки написания в очередь.
+    
+    Args:
+        request: Writing image generation request
+        priority: Job priority
+        queue: Generation job queue
+        validation_service: Validation service
+        
+    Returns:
+        Dict with job ID, status and queue position
+        
+    Raises:
+        HTTPException: 400 if validation fails, 429 with Retry-After if the queue is full
+    """
+    validation_result = await validation_service.validate_request(request)
+    if not validation_result.is_valid:
+        logger.warning(f"Invalid request: {validation_result.errors}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Validation failed: {', '.join(validation_result.errors)}"
+        )
+    
+    try:
+        job = queue.submit(request, priority=priority)
+    except RateLimitError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    return {
+        **job.to_dict(),
+        "position": queue.position(job),
+        "queue_depth": queue.get_metrics()["queue_depth"],
+    }
+
+@router.get("/jobs/metrics")
+async def get_generation_queue_metrics(queue: GenerationQueue = Depends(get_generation_queue)):
+    """
+    Get generation queue metrics: queue depth, running jobs, wait times.
+    Возвращает метрики очереди генерации.
+    """
+    return queue.get_metrics()
+
+@router.get("/rate-limit/metrics")
+async def get_rate_limit_metrics():
+    """
+    Get rate limiter decisions: allowed and limited requests per route.
+    Возвращает метрики ограничения частоты запросов.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **limiter.get_metrics()}
+
+@router.get("/jobs/{job_id}")
+async def get_generation_job_status(job_id: str, queue: GenerationQueue = Depends(get_generation_queue)):
+    """
+    Get generation job status.
+    Возвращает статус задания генерации.
+    
+    Args:
+        job_id: Job ID
+        queue: Generation job queue
+        
+    Returns:
+        Dict with job status and queue position
+        
+    Raises:
+        HTTPException: If job not found
+    """
+    job = queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {**job.to_dict(), "position": queue.position(job)}
+
+@router.get("/jobs/{job_id}/result", response_model=AIImageResponse)
+async def get_generation_job_result(job_id: str, queue: GenerationQueue = Depends(get_generation_queue)):
+    """
+    Get generated image of a finished job.
+    Возвращает результат завершенного задания генерации.
+    
+    Args:
+        job_id: Job ID
+        queue: Generation job queue
+        
+    Returns:
+        AIImageResponse: Generated image response
+        
+    Raises:
+        HTTPException: 404 if job not found, 409 if not finished yet, 500 if generation failed,
+            410 if the job was cancelled
+    """
+    job = queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status.value}")
+    if job.status == GenerationStatus.CANCELLED:
+        raise HTTPException(status_code=410, detail=f"Job {job_id} was cancelled")
+    if job.status == GenerationStatus.FAILED:
+        raise HTTPException(status_code=500, detail=f"Image generation failed: {job.error}")
+    return _build_ai_response(job.result)
+
+@router.delete("/jobs/{job_id}")
+async def cancel_generation_job(job_id: str, queue: GenerationQueue = Depends(get_generation_queue)):
+    """
+    Cancel a queued or running generation job.
+    Отменяет задание генерации.
+    
+    Args:
+        job_id: Job ID
+        queue: Generation job queue
+        
+    Returns:
+        Dict with job status
+        
+    Raises:
+        HTTPException: 404 if job not found, 409 if already finished
+    """
+    job = queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status.value}")
+    return job.to_dict()
+
 @router.post("/validate-hint")
 async def validate_user_hint(
     hint_data: dict,
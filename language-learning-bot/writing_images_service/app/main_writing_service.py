@@ -17,7 +17,7 @@ from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional
 
 import torch
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
@@ -29,10 +29,18 @@ from hydra import compose, initialize
 from hydra.core.global_hydra import GlobalHydra
 
 from app.api.routes import writing_images, health
+from app.api.dependencies import rate_limit
 from app.utils.logger import setup_logger
 from app.utils import config_holder
 from app.ai.models.gpu_manager import GPUManager
+from app.api.routes.services import writing_image_service as writing_image_service_module
 from app.api.routes.services.writing_image_service import WritingImageService
+from app.api.routes.services import generation_queue as generation_queue_module
+from app.api.routes.services.generation_queue import GenerationQueue
+from app.utils import health_sampler as health_sampler_module
+from app.utils.health_sampler import HealthSampler
+from app.ai.core.conditioning_manager import shutdown_conditioning_pool
+from app.ai.backends import DEFAULT_BACKEND, get_backend_class
 
 # Глобальные сервисы
 gpu_manager: Optional[GPUManager] = None
@@ -71,6 +79,13 @@ log_format = cfg.logging.format if hasattr(cfg, "logging") and hasattr(cfg.loggi
 
 logger = setup_logger(__name__, log_level=log_level, log_format=log_format, log_dir=log_dir)
 
+def _backend_requires_gpu() -> bool:
+    """Нужен ли GPU выбранному бэкенду генерации (ai_generation.backend.name)."""
+    backend_name = DEFAULT_BACKEND
+    if hasattr(cfg, 'ai_generation') and hasattr(cfg.ai_generation, 'backend'):
+        backend_name = cfg.ai_generation.backend.get('name', DEFAULT_BACKEND)
+    return get_backend_class(backend_name).requires_gpu
+
 async def _check_system_requirements():
     """Проверяет системные требования для AI генерации."""
     logger.info("🔍 Checking system requirements...")
@@ -80,6 +95,10 @@ async def _check_system_requirements():
     if python_version < (3, 8):
         raise RuntimeError(f"Python 3.8+ required, got {python_version.major}.{python_version.minor}")
     
+    if not _backend_requires_gpu():
+        logger.info("✅ Generation backend runs on CPU, GPU checks skipped")
+        return
+    
     # Проверяем CUDA
     cuda_available = torch.cuda.is_available()
     if not cuda_available:
@@ -143,6 +162,8 @@ async def _initialize_writing_service():
     
     try:
         writing_service = WritingImageService()
+        # Один сервис на процесс: эндпоинты и очередь делят модели и BatchScheduler
+        writing_image_service_module.writing_image_service = writing_service
         
         # Проверяем статус сервиса
         service_status = await writing_service.get_service_status()
@@ -157,6 +178,38 @@ async def _initialize_writing_service():
         logger.error(f"❌ Failed to initialize Writing Service: {e}")
         raise
 
+async def _start_generation_queue():
+    """Запускает очередь заданий генерации поверх Writing Service."""
+    queue_cfg = {}
+    if hasattr(cfg.api, 'request_processing') and hasattr(cfg.api.request_processing, 'queue'):
+        queue_cfg = cfg.api.request_processing.queue
+    
+    queue = GenerationQueue(
+        pipeline=writing_service,
+        max_queue_size=int(queue_cfg.get('max_size', 20)),
+        workers=int(queue_cfg.get('workers', 1)),
+        result_ttl_seconds=float(queue_cfg.get('result_ttl_seconds', 600)),
+        default_job_time_seconds=float(queue_cfg.get('default_job_time_seconds', 10)),
+    )
+    await queue.start()
+    generation_queue_module.generation_queue = queue
+    
+    logger.info(f"✅ Generation queue started: workers={queue.workers}, max_size={queue.max_queue_size}")
+
+async def _start_health_sampler():
+    """Запускает фоновый сбор данных для /health/detailed и /health/ready."""
+    monitoring_cfg = cfg.api.get('monitoring', {}) or {}
+    
+    sampler = HealthSampler(
+        collect=health.collect_health_snapshot,
+        interval_seconds=float(monitoring_cfg.get('health_sample_interval_seconds', 15)),
+        timeout_seconds=float(monitoring_cfg.get('health_check_timeout', 10)),
+    )
+    await sampler.start()
+    health_sampler_module.health_sampler = sampler
+    
+    logger.info(f"✅ Health sampler started: interval={sampler.interval_seconds:g}s")
+
 async def _log_service_configuration():
     """Логирует конфигурацию сервиса."""
     logger.info("⚙️ Service Configuration:")
@@ -186,12 +239,27 @@ async def _cleanup_services():
     logger.info("🧹 Cleaning up services...")
     
     try:
+        # Останавливаем фоновый сбор health данных
+        if health_sampler_module.health_sampler:
+            await health_sampler_module.health_sampler.stop()
+            health_sampler_module.health_sampler = None
+        
+        # Останавливаем очередь до выгрузки моделей
+        if generation_queue_module.generation_queue:
+            await generation_queue_module.generation_queue.stop()
+            generation_queue_module.generation_queue = None
+            logger.info("✅ Generation queue stopped")
+        
         # Очищаем Writing Service
         if writing_service:
             await writing_service.cleanup()
             writing_service = None
+            writing_image_service_module.writing_image_service = None
             logger.info("✅ Writing Service cleaned up")
         
+        # Останавливаем процессы conditioning
+        shutdown_conditioning_pool()
+        
         # Очищаем GPU Manager
         if gpu_manager:
             gpu_manager.clear_cache(aggressive=True)
@@ -233,12 +301,19 @@ async def lifespan(app: FastAPI):
         await _check_system_requirements()
         
         # 2. Инициализируем GPU Manager
-        await _initialize_gpu_manager()
+        if _backend_requires_gpu():
+            await _initialize_gpu_manager()
         
         # 3. Инициализируем Writing Service (без загрузки AI моделей)
         await _initialize_writing_service()
         
-        # 4. Логируем конфигурацию
+        # 4. Запускаем очередь заданий генерации
+        await _start_generation_queue()
+        
+        # 5. Запускаем фоновый сбор health данных
+        await _start_health_sampler()
+        
+        # 6. Логируем конфигурацию
         await _log_service_configuration()
         
         startup_time = time.time() - startup_start
@@ -317,8 +392,9 @@ def create_application() -> FastAPI:
         )
     
     # Include routers
-    app.include_router(writing_images.router, prefix=api_prefix)
-    app.include_router(health.router)  # Health checks на корневом уровне
+    # Лимиты по группам маршрутов (api.rate_limits); генерация дополнительно ограничена квотой "generation"
+    app.include_router(writing_images.router, prefix=api_prefix, dependencies=[Depends(rate_limit("default"))])
+    app.include_router(health.router, dependencies=[Depends(rate_limit("health"))])  # Health checks на корневом уровне
     
     return app
 
@@ -0,0 +1,233 @@
+"""
+Batch Scheduler
+Динамическое объединение запросов генерации в батчи.
+
+Requests with compatible parameters (size, steps, guidance, conditioning
+scale and the set of control types) that arrive within a short window are
+run as one batched pipeline call; results are split back per request.
+The scheduler does not depend on torch: the batch runner is any coroutine
+function taking a list of BatchItem and returning one image per item.
+
+submit_item() accepts any item with ``future`` and ``submitted_at``
+attributes and an explicit batch key, so the same scheduler groups other
+batched model calls (e.g. translation) as well.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+# Параметры, которые должны совпадать у запросов одного батча
+BATCH_KEY_PARAMS = ("width", "height", "num_inference_steps", "guidance_scale", "controlnet_conditioning_scale")
+
+
+@dataclass
+class BatchItem:
+    """Один запрос в батче"""
+    prompt: str
+    control_images: Dict[str, Any]
+    seed: Optional[int]
+    params: Dict[str, Any]
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class _PendingGroup:
+    def __init__(self):
+        self.items: List[Any] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.ready = False
+
+
+def batch_key(control_images: Dict[str, Any], params: Dict[str, Any]) -> Tuple:
+    """
+    Key of compatible requests: same shape, step count and control types.
+
+    Args:
+        control_images: Conditioning images by type
+        params: Generation parameters
+
+    Returns:
+        Tuple: Hashable batch key
+    """
+    return tuple(params.get(name) for name in BATCH_KEY_PARAMS) + (tuple(sorted(control_images)),)
+
+
+class BatchScheduler:
+    """
+    Micro-batching scheduler in front of the diffusion pipeline.
+    Планировщик микро-батчей перед диффузионным пайплайном.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 4,
+        max_wait_ms: float = 50.0
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            run_batch: Coroutine function running one batch, returns results in item order
+            max_batch_size: Maximum number of requests in one pipeline call
+            max_wait_ms: How long the first request of a batch waits for companions
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: Dict[Hashable, _PendingGroup] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Статистика
+        self.batch_count = 0
+        self.item_count = 0
+        self.failed_batches = 0
+        self._recent_batch_sizes: Deque[int] = deque(maxlen=100)
+        self._recent_wait_ms: Deque[int] = deque(maxlen=100)
+
+    def _ensure_started(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._ready = asyncio.Queue()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="batch-scheduler")
+
+    async def submit(
+        self,
+        prompt: str,
+        control_images: Dict[str, Any],
+        seed: Optional[int] = None,
+        **params
+    ) -> Any:
+        """
+        Ставит запрос в батч и ждет его результат.
+
+        Args:
+            prompt: Промпт для генерации
+            control_images: Conditioning изображения по типам
+            seed: Seed для воспроизводимости
+            **params: Параметры генерации (width, height, num_inference_steps, ...)
+
+        Returns:
+            Сгенерированное изображение этого запроса
+        """
+        item = BatchItem(prompt, control_images, seed, params, asyncio.get_running_loop().create_future())
+        return await self.submit_item(batch_key(control_images, params), item)
+
+    async def submit_item(self, key: Hashable, item: Any) -> Any:
+        """
+        Ставит произвольный элемент в батч с заданным ключом и ждет результат.
+
+        Args:
+            key: Ключ совместимости - в один батч попадают элементы с равным ключом
+            item: Элемент с атрибутами future и submitted_at (например, BatchItem)
+
+        Returns:
+            Результат run_batch для этого элемента
+        """
+        self._ensure_started()
+
+        group = self._pending.get(key)
+        if group is None:
+            group = _PendingGroup()
+            self._pending[key] = group
+            group.timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._mark_ready, key)
+        group.items.append(item)
+        if len(group.items) >= self.max_batch_size:
+            self._mark_ready(key)
+
+        return await item.future
+
+    def _mark_ready(self, key: Hashable):
+        group = self._pending.get(key)
+        if group is None or group.ready:
+            return
+        group.ready = True
+        if group.timer:
+            group.timer.cancel()
+        self._ready.put_nowait(key)
+
+    async def _dispatch_loop(self):
+        while True:
+            key = await self._ready.get()
+            group = self._pending.get(key)
+            if group is None:
+                continue
+
+            # Отмененные запросы (клиент ушел) в батч не попадают
+            items = [item for item in group.items if not item.future.done()]
+            batch, rest = items[:self.max_batch_size], items[self.max_batch_size:]
+            if rest:
+                # Остаток уже ждал окно - запускаем следующим батчем без ожидания
+                group.items = rest
+                self._ready.put_nowait(key)
+            else:
+                del self._pending[key]
+
+            if batch:
+                await self._run(batch)
+
+    async def _run(self, batch: List[Any]):
+        started = time.monotonic()
+        for item in batch:
+            self._recent_wait_ms.append(int((started - item.submitted_at) * 1000))
+
+        try:
+            images = await self.run_batch(batch)
+            if len(images) != len(batch):
+                raise RuntimeError(f"Batch runner returned {len(images)} results for {len(batch)} requests")
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Batch of {len(batch)} requests failed: {e}")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        self.batch_count += 1
+        self.item_count += len(batch)
+        self._recent_batch_sizes.append(len(batch))
+        logger.debug(f"Batch of {len(batch)} requests completed in {time.monotonic() - started:.2f}s")
+        for item, image in zip(batch, images):
+            if not item.future.done():
+                item.future.set_result(image)
+
+    async def stop(self):
+        """Останавливает диспетчер, ожидающие запросы завершаются ошибкой."""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for group in self._pending.values():
+            if group.timer:
+                group.timer.cancel()
+            for item in group.items:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError("Batch scheduler stopped"))
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику батчинга"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batch_count,
+            "items": self.item_count,
+            "failed_batches": self.failed_batches,
+            "pending": sum(len(group.items) for group in self._pending.values()),
+            "avg_batch_size": (
+                sum(self._recent_batch_sizes) / len(self._recent_batch_sizes)
+                if self._recent_batch_sizes else 0
+            ),
+            "avg_wait_ms": (
+                sum(self._recent_wait_ms) / len(self._recent_wait_ms)
+                if self._recent_wait_ms else 0
+            ),
+        }
@@ -0,0 +1,123 @@
+"""
+Background sampler for health data.
+Фоновый сбор данных для health эндпоинтов.
+
+Detailed health data (service status, GPU diagnostics, library checks) is
+expensive to collect, and orchestrator probes arrive every few seconds.
+The sampler collects it at a fixed interval in a background task and keeps
+the last snapshot; endpoints only read the snapshot and report its age, so
+probe frequency does not affect the load on the service.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class HealthSampler:
+    """Периодически вызывает collect() и хранит последний результат."""
+
+    def __init__(
+        self,
+        collect: Callable[[], Awaitable[Dict[str, Any]]],
+        interval_seconds: float = 15.0,
+        timeout_seconds: float = 10.0
+    ):
+        """
+        Args:
+            collect: Корутина сбора данных, возвращает снимок
+            interval_seconds: Интервал между сборами
+            timeout_seconds: Таймаут одного сбора (0 - без ограничения)
+        """
+        self.collect = collect
+        self.interval_seconds = max(0.01, float(interval_seconds))
+        self.timeout_seconds = float(timeout_seconds)
+        self.snapshot: Optional[Dict[str, Any]] = None
+        # Ошибка последнего сбора (None - последний сбор успешен)
+        self.error: Optional[str] = None
+        self.samples = 0
+        self.failures = 0
+        self._collected_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def sample(self) -> Optional[Dict[str, Any]]:
+        """
+        Собирает снимок сейчас. Ошибки и таймауты не пробрасываются: сохраняется
+        текст ошибки, предыдущий снимок остается доступен.
+
+        Returns:
+            Optional[Dict[str, Any]]: Текущий снимок
+        """
+        try:
+            snapshot = await asyncio.wait_for(self.collect(), timeout=self.timeout_seconds or None)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._record_failure(f"health collection timed out after {self.timeout_seconds:g}s")
+        except Exception as e:
+            self._record_failure(f"health collection failed: {e}")
+        else:
+            self.snapshot = snapshot
+            self.error = None
+            self._collected_at = time.monotonic()
+            self.samples += 1
+        return self.snapshot
+
+    def _record_failure(self, error: str):
+        self.error = error
+        self.failures += 1
+        logger.warning(error)
+
+    def age_seconds(self) -> Optional[float]:
+        """Возраст последнего успешного снимка (None - снимка еще нет)."""
+        if self._collected_at is None:
+            return None
+        return time.monotonic() - self._collected_at
+
+    async def start(self):
+        """Собирает первый снимок и запускает фоновый сбор."""
+        if self._task is not None:
+            return
+        await self.sample()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Health sampler started (interval {self.interval_seconds:g}s)")
+
+    async def stop(self):
+        """Останавливает фоновый сбор."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.sample()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика сборщика."""
+        age = self.age_seconds()
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "samples": self.samples,
+            "failures": self.failures,
+            "last_error": self.error,
+            "snapshot_age_seconds": round(age, 3) if age is not None else None,
+        }
+
+
+# Экземпляр сервиса (создается при старте приложения)
+health_sampler: Optional[HealthSampler] = None
@@ -0,0 +1,208 @@
+"""
+Image encoding and content negotiation for binary delivery.
+Кодирование изображений и выбор формата по заголовку Accept.
+
+Images are returned as raw bytes (WebP or optimized PNG) instead of base64
+inside JSON: base64 inflates the payload by a third and costs an extra
+encode on the service and a decode on the bot. A multipart/mixed body
+carries the JSON metadata and every image of a debug response in one
+request.
+"""
+
+import base64
+import io
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.utils import config_holder
+
+# Формат -> MIME тип
+IMAGE_MEDIA_TYPES = {
+    "webp": "image/webp",
+    "png": "image/png",
+}
+
+# Порядок предпочтения при равных q в Accept (WebP меньше при том же качестве)
+DEFAULT_PREFERENCE = ("webp", "png")
+
+MULTIPART_MEDIA_TYPE = "multipart/mixed"
+
+
+def _parse_accept(accept: str) -> List[Tuple[str, float]]:
+    ranges = []
+    for item in accept.split(","):
+        media_range, *params = [part.strip() for part in item.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range.lower(), quality))
+    return ranges
+
+
+def negotiate_image_format(
+    accept: Optional[str],
+    preference: Tuple[str, ...] = DEFAULT_PREFERENCE,
+    default: str = "png"
+) -> Optional[str]:
+    """
+    Выбирает формат изображения по заголовку Accept.
+
+    Учитываются только диапазоны image/* и image/<format>, так что
+    "multipart/mixed, image/webp" выбирает WebP для частей multipart ответа,
+    а клиенты, присылающие только */*, по-прежнему получают формат по умолчанию.
+
+    Args:
+        accept: Значение заголовка Accept (None - клиент не указал)
+        preference: Порядок форматов при равном q
+        default: Формат, если Accept не задан или не называет типы image/*
+
+    Returns:
+        Optional[str]: "webp", "png" или None, если все форматы запрещены (q=0)
+    """
+    if not accept:
+        return default
+
+    ranges = [(media_range, quality) for media_range, quality in _parse_accept(accept)
+              if media_range.startswith("image/")]
+    if not ranges:
+        return default
+
+    def quality_of(image_format: str) -> float:
+        media_type = IMAGE_MEDIA_TYPES[image_format]
+        # Точное совпадение важнее шаблона
+        for candidates in ((media_type,), ("image/*",)):
+            matches = [quality for media_range, quality in ranges if media_range in candidates]
+            if matches:
+                return max(matches)
+        return 0.0
+
+    scored = [(quality_of(image_format), -index, image_format) for index, image_format in enumerate(preference)]
+    best_quality, _, best_format = max(scored)
+    return best_format if best_quality > 0 else None
+
+
+def get_encoding_options() -> Dict[str, Any]:
+    """
+    Параметры кодирования из cfg.api.image_encoding.
+
+    Returns:
+        Dict: webp_quality, webp_lossless, webp_method, png_compress_level, png_optimize
+    """
+    options = {
+        "webp_quality": 90,
+        "webp_lossless": False,
+        "webp_method": 4,
+        "png_compress_level": 6,
+        "png_optimize": False,
+    }
+    try:
+        encoding_cfg = config_holder.cfg.api.get("image_encoding", {}) or {}
+        options.update({key: encoding_cfg[key] for key in options if key in encoding_cfg})
+    except AttributeError:
+        pass
+    return options
+
+
+def encode_image(image: Image.Image, image_format: str, **options) -> bytes:
+    """
+    Кодирует изображение в WebP или PNG.
+
+    Args:
+        image: Изображение
+        image_format: "webp" или "png"
+        **options: Переопределение get_encoding_options()
+
+    Returns:
+        bytes: Закодированное изображение
+    """
+    options = {**get_encoding_options(), **options}
+    buffer = io.BytesIO()
+    if image_format == "webp":
+        image.save(
+            buffer,
+            format="WEBP",
+            quality=options["webp_quality"],
+            lossless=options["webp_lossless"],
+            method=options["webp_method"],
+        )
+    elif image_format == "png":
+        image.save(
+            buffer,
+            format="PNG",
+            optimize=options["png_optimize"],
+            compress_level=options["png_compress_level"],
+        )
+    else:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return buffer.getvalue()
+
+
+def image_to_base64(image: Image.Image) -> str:
+    """PNG в base64 (формат JSON ответа и кэша сгенерированных картинок)."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def transcode_base64_png(data_base64: str, image_format: str, **options) -> bytes:
+    """
+    Перекодирует PNG из base64 (например, из кэша) в нужный формат.
+
+    Args:
+        data_base64: PNG в base64
+        image_format: "webp" или "png"
+        **options: Параметры кодирования
+
+    Returns:
+        bytes: Изображение; для PNG - исходные байты без перекодирования
+    """
+    data = base64.b64decode(data_base64)
+    if image_format == "png":
+        return data
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        return encode_image(image, image_format, **options)
+
+
+def build_multipart(parts: List[Tuple[str, str, bytes]]) -> Tuple[bytes, str]:
+    """
+    Собирает тело multipart/mixed ответа.
+
+    Args:
+        parts: Части (name, content_type, content); имя попадает в Content-Disposition
+
+    Returns:
+        Tuple[bytes, str]: Тело и значение заголовка Content-Type с boundary
+    """
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for name, content_type, content in parts:
+        extension = content_type.split("/")[-1]
+        disposition = f'attachment; name="{name}"'
+        if content_type.startswith("image/"):
+            disposition += f'; filename="{name.replace("/", "_")}.{extension}"'
+        chunks.append(
+            f"--{boundary}\r\n"
+            f"Content-Disposition: {disposition}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(content)}\r\n\r\n".encode("ascii")
+        )
+        chunks.append(content)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{boundary}--\r\n".encode("ascii"))
+    return b"".join(chunks), f'{MULTIPART_MEDIA_TYPE}; boundary="{boundary}"'
+
+
+def json_part(data: Any) -> Tuple[str, str, bytes]:
+    """Часть multipart ответа с JSON метаданными."""
+    return "metadata", "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
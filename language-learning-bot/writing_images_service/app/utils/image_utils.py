@@ -89,7 +89,7 @@ class ImageProcessor:
         draw = ImageDraw.Draw(image)
         
         # Get Unicode font
-        font = await self.font_manager.get_font_async(font_size, font_path)
+        font = await self.font_manager.get_font_async(font_size, font_path, text)
         
         # Draw text
         draw.text(position, text, fill=text_color, font=font)
@@ -133,7 +133,7 @@ class ImageProcessor:
             Tuple of (modified image, final font size)
         """
         # Auto-fit font size
-        font, final_font_size, text_width, text_height = await self.font_manager.auto_fit_font_size(
+        font, final_font_size, text_width, text_height, _ = await self.font_manager.auto_fit_font_size(
             text, max_width, max_height, initial_font_size, min_font_size, font_path
         )
         
@@ -0,0 +1,109 @@
+"""
+Conditioning method latencies measured by the conditioning benchmark.
+Задержки методов conditioning по отчету бенчмарка.
+
+The report is the JSON written by ``python -m benchmarks conditioning``:
+{"results": {"<size>": {"<type>": {"<method>": {"p50_ms": ..., "p90_ms": ...}}}}}.
+It is used to weight the random method choice so that slow methods are
+picked less often when a latency budget is configured.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class MethodLatencyTable:
+    """
+    Per-resolution latency statistics of conditioning methods.
+    Статистика задержек методов conditioning по разрешениям.
+    """
+
+    def __init__(self, results: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]):
+        """
+        Args:
+            results: {size: {conditioning_type: {method: stats}}}
+        """
+        self.results = {int(size): by_type for size, by_type in results.items()}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["MethodLatencyTable"]:
+        """
+        Загружает отчет бенчмарка.
+
+        Args:
+            path: Путь к JSON отчету
+
+        Returns:
+            MethodLatencyTable или None, если файла нет или он поврежден
+        """
+        try:
+            with open(Path(path), encoding="utf-8") as f:
+                report = json.load(f)
+            return cls(report["results"])
+        except FileNotFoundError:
+            logger.warning(f"Conditioning latency report not found: {path}")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Invalid conditioning latency report {path}: {e}")
+        return None
+
+    def stats_for(self, conditioning_type: str, method: str, size: int) -> Optional[Dict[str, Any]]:
+        """Статистика метода для ближайшего измеренного разрешения."""
+        if not self.results:
+            return None
+        nearest = min(self.results, key=lambda measured: abs(measured - size))
+        return self.results[nearest].get(conditioning_type, {}).get(method)
+
+    def weights(self, conditioning_type: str, methods: List[str], size: int, budget_ms: float) -> List[float]:
+        """
+        Веса случайного выбора методов.
+
+        Методы, укладывающиеся в бюджет по p90, получают вес 1, более медленные -
+        budget / p90. Методы, которые в бенчмарке только падали, исключаются;
+        методы без статистики получают вес 1.
+
+        Args:
+            conditioning_type: Тип conditioning
+            methods: Доступные методы
+            size: Сторона изображения
+            budget_ms: Бюджет задержки (мс)
+
+        Returns:
+            List[float]: Вес для каждого метода (в том же порядке)
+        """
+        weights = []
+        for method in methods:
+            stats = self.stats_for(conditioning_type, method, size)
+            if not stats:
+                weights.append(1.0)
+            elif stats.get("failure_rate", 0) >= 1.0 or not stats.get("p90_ms"):
+                weights.append(0.0)
+            else:
+                weights.append(min(1.0, budget_ms / stats["p90_ms"]))
+
+        if not any(weights):
+            # Ни один метод не подходит - равновероятный выбор лучше, чем отказ
+            return [1.0] * len(methods)
+        return weights
+
+
+_tables: Dict[str, Optional[MethodLatencyTable]] = {}
+
+
+def get_method_latency_table(path: str) -> Optional[MethodLatencyTable]:
+    """
+    Отчет бенчмарка, загруженный один раз на процесс.
+
+    Args:
+        path: Путь к JSON отчету
+
+    Returns:
+        MethodLatencyTable или None
+    """
+    if path not in _tables:
+        _tables[path] = MethodLatencyTable.load(path)
+    return _tables[path]
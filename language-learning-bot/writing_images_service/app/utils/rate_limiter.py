@@ -0,0 +1,230 @@
+"""
+GCRA rate limiter with constant memory per client.
+Ограничение частоты запросов по алгоритму GCRA.
+
+GCRA (generic cell rate algorithm) is a token bucket stored as a single
+number: the theoretical arrival time (TAT) of the next request. A request
+is allowed while it does not push TAT more than ``burst`` emission
+intervals into the future. Each (route, client) pair therefore costs one
+float; pairs whose TAT is in the past are indistinguishable from new
+clients and are evicted, so idle clients do not accumulate.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.utils import config_holder
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Квота маршрута: requests запросов за period_seconds, до burst подряд"""
+    requests: int
+    period_seconds: float
+    burst: Optional[int] = None
+
+    @property
+    def emission_interval(self) -> float:
+        """Интервал между запросами при равномерной нагрузке (секунды)."""
+        return self.period_seconds / max(1, self.requests)
+
+    @property
+    def capacity(self) -> int:
+        """Сколько запросов можно сделать подряд после простоя."""
+        return max(1, self.burst if self.burst is not None else self.requests)
+
+
+@dataclass
+class RateLimitDecision:
+    """Решение лимитера по одному запросу"""
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    retry_after: float = 0.0
+
+
+class GCRARateLimiter:
+    """
+    Per-route GCRA limiter keyed by client id.
+    Лимитер GCRA по маршрутам и клиентам.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, RateLimit],
+        default_limit: RateLimit,
+        max_entries: int = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Инициализация лимитера.
+
+        Args:
+            limits: Квоты по имени маршрута
+            default_limit: Квота для маршрутов без своей настройки
+            max_entries: Максимум отслеживаемых пар (маршрут, клиент)
+            clock: Источник времени (секунды, монотонный)
+        """
+        self.limits = dict(limits)
+        self.default_limit = default_limit
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+
+        # (route, client) -> TAT; порядок - от давно обновленных к недавним
+        self._tat: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
+        # Метрики
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+        self.evicted = 0
+
+    def limit_for(self, route: str) -> RateLimit:
+        """Квота маршрута (или квота по умолчанию)."""
+        return self.limits.get(route, self.default_limit)
+
+    def check(self, route: str, client_id: str) -> RateLimitDecision:
+        """
+        Учитывает запрос клиента и решает, пропустить ли его.
+
+        Отклоненный запрос квоту не расходует.
+
+        Args:
+            route: Имя маршрута (группы эндпоинтов)
+            client_id: Идентификатор клиента
+
+        Returns:
+            RateLimitDecision: allowed, остаток квоты и retry_after (секунды)
+        """
+        limit = self.limit_for(route)
+        interval = limit.emission_interval
+        tolerance = interval * limit.capacity
+
+        now = self.clock()
+        self._evict_idle(now)
+
+        key = (route, client_id)
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + interval
+
+        if new_tat - now > tolerance:
+            self.limited[route] = self.limited.get(route, 0) + 1
+            return RateLimitDecision(
+                allowed=False,
+                limit=limit,
+                remaining=0,
+                retry_after=new_tat - tolerance - now
+            )
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_entries:
+            self._tat.popitem(last=False)
+            self.evicted += 1
+
+        self.allowed[route] = self.allowed.get(route, 0) + 1
+        return RateLimitDecision(
+            allowed=True,
+            limit=limit,
+            remaining=int((tolerance - (new_tat - now)) / interval + 1e-9)
+        )
+
+    def _evict_idle(self, now: float):
+        # Записи с TAT в прошлом эквивалентны отсутствию записи. Проверяем только
+        # самые давно обновленные - амортизированно O(1) на запрос
+        while self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                break
+            del self._tat[key]
+            self.evicted += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Метрики решений лимитера.
+
+        Returns:
+            Dict: Разрешенные/отклоненные запросы по маршрутам, квоты и размер состояния
+        """
+        routes = sorted(set(self.limits) | set(self.allowed) | set(self.limited))
+        return {
+            "routes": {
+                route: {
+                    "allowed": self.allowed.get(route, 0),
+                    "limited": self.limited.get(route, 0),
+                    "requests": self.limit_for(route).requests,
+                    "period_seconds": self.limit_for(route).period_seconds,
+                    "burst": self.limit_for(route).capacity,
+                }
+                for route in routes
+            },
+            "allowed_total": sum(self.allowed.values()),
+            "limited_total": sum(self.limited.values()),
+            "tracked_clients": len(self._tat),
+            "evicted": self.evicted,
+        }
+
+
+def retry_after_header(decision: RateLimitDecision) -> str:
+    """Значение заголовка Retry-After (целые секунды, не меньше 1)."""
+    return str(max(1, math.ceil(decision.retry_after)))
+
+
+_rate_limiter: Optional[GCRARateLimiter] = None
+_rate_limit_enabled: Optional[bool] = None
+
+
+def _limit_from_config(limit_cfg, default: RateLimit) -> RateLimit:
+    return RateLimit(
+        requests=int(limit_cfg.get("requests", default.requests)),
+        period_seconds=float(limit_cfg.get("period", default.period_seconds)),
+        burst=limit_cfg.get("burst"),
+    )
+
+
+def get_rate_limiter() -> Optional[GCRARateLimiter]:
+    """
+    Общий лимитер процесса, собранный из cfg.api.
+
+    Returns:
+        GCRARateLimiter или None, если ограничение выключено (api.enable_rate_limit)
+    """
+    global _rate_limiter, _rate_limit_enabled
+
+    if _rate_limit_enabled is None:
+        _rate_limit_enabled = False
+        try:
+            api_cfg = config_holder.cfg.api
+            _rate_limit_enabled = bool(api_cfg.get("enable_rate_limit", False))
+            if _rate_limit_enabled:
+                default_limit = RateLimit(
+                    requests=int(api_cfg.get("rate_limit_requests", 60)),
+                    period_seconds=float(api_cfg.get("rate_limit_period", 60)),
+                )
+                routes_cfg = api_cfg.get("rate_limits", {}) or {}
+                _rate_limiter = GCRARateLimiter(
+                    limits={
+                        route: _limit_from_config(limit_cfg, default_limit)
+                        for route, limit_cfg in routes_cfg.get("routes", {}).items()
+                    },
+                    default_limit=default_limit,
+                    max_entries=int(routes_cfg.get("max_clients", 100000)),
+                )
+                logger.info(f"Rate limiting enabled: default {default_limit.requests}/"
+                            f"{default_limit.period_seconds:g}s, routes {sorted(_rate_limiter.limits)}")
+        except Exception as e:
+            logger.warning(f"Could not load rate limit config, rate limiting disabled: {e}")
+
+    return _rate_limiter
+
+
+def reset_rate_limiter():
+    """Сбрасывает лимитер (конфигурация будет перечитана при следующем обращении)."""
+    global _rate_limiter, _rate_limit_enabled
+    _rate_limiter = None
+    _rate_limit_enabled = None
@@ -0,0 +1,167 @@
+"""
+Process pool for CPU-bound image work with shared-memory transfer.
+Пул процессов для тяжелой обработки изображений с передачей через shared memory.
+
+Images are passed to and from workers as raw numpy buffers in
+multiprocessing.shared_memory blocks instead of being pickled, so only a
+small reference crosses the process boundary. Workers are started with the
+"spawn" method: the service process has CUDA initialized, which does not
+survive fork.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SharedImage:
+    """Ссылка на изображение в shared memory"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+    mode: str
+
+
+def image_to_shared(image: Image.Image) -> Tuple[SharedImage, shared_memory.SharedMemory]:
+    """
+    Copy an image into a new shared memory block.
+
+    Args:
+        image: Source image
+
+    Returns:
+        Tuple of the reference and the open block (caller closes it)
+    """
+    array = np.asarray(image)
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return SharedImage(block.name, array.shape, array.dtype.str, image.mode), block
+
+
+def image_from_shared(ref: SharedImage, unlink: bool = False) -> Image.Image:
+    """
+    Copy an image out of a shared memory block.
+
+    Args:
+        ref: Block reference
+        unlink: Remove the block after reading
+
+    Returns:
+        Image.Image: Independent copy of the image
+    """
+    block = shared_memory.SharedMemory(name=ref.name)
+    try:
+        array = np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=block.buf).copy()
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+    image = Image.fromarray(array)
+    return image if image.mode == ref.mode else image.convert(ref.mode)
+
+
+def _discard_result(future: asyncio.Future):
+    """Удаляет результат задачи, которую уже никто не ждет."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result_ref, _ = future.result()
+    if result_ref is not None:
+        try:
+            block = shared_memory.SharedMemory(name=result_ref.name)
+            block.close()
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _run_in_worker(func: Callable, ref: SharedImage, args: tuple, kwargs: dict) -> Tuple[Optional[SharedImage], Any]:
+    image = image_from_shared(ref)
+    result_image, extra = func(image, *args, **kwargs)
+    if result_image is None:
+        return None, extra
+    # Блок результата удаляет родительский процесс (resource tracker общий для spawn-воркеров)
+    result_ref, block = image_to_shared(result_image)
+    block.close()
+    return result_ref, extra
+
+
+class SharedMemoryProcessPool:
+    """
+    Async facade over a process pool exchanging images via shared memory.
+    Асинхронный интерфейс к пулу процессов с обменом изображениями через shared memory.
+    """
+
+    def __init__(self, workers: int, initializer: Optional[Callable] = None):
+        """
+        Args:
+            workers: Number of worker processes
+            initializer: Optional function run once in every worker
+        """
+        self.workers = max(1, workers)
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.task_count = 0
+        self.failed_count = 0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+            logger.info(f"Started process pool with {self.workers} workers")
+        return self._executor
+
+    async def run_image(self, func: Callable, image: Image.Image, *args, **kwargs) -> Tuple[Optional[Image.Image], Any]:
+        """
+        Run func(image, *args, **kwargs) in a worker process.
+
+        Args:
+            func: Module-level function returning (image or None, picklable extra data)
+            image: Input image (transferred via shared memory)
+
+        Returns:
+            Tuple of the result image (or None) and the extra data
+        """
+        ref, block = image_to_shared(image)
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._ensure_executor(), _run_in_worker, func, ref, args, kwargs
+            )
+            try:
+                # shield: отмена ожидающего не теряет результат, его блок будет удален
+                result_ref, extra = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                future.add_done_callback(_discard_result)
+                raise
+            except BrokenProcessPool:
+                # Воркер упал (например, OOM) - пересоздаем пул для следующих задач
+                self.failed_count += 1
+                self._executor = None
+                raise
+        finally:
+            block.close()
+            block.unlink()
+
+        self.task_count += 1
+        result_image = image_from_shared(result_ref, unlink=True) if result_ref else None
+        return result_image, extra
+
+    def shutdown(self):
+        """Останавливает воркеры."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,91 @@
+"""
+Small key-value store on SQLite in WAL mode.
+Простое хранилище ключ-значение в SQLite (режим WAL).
+
+Values are JSON documents with a numeric sort key (for example the last
+access time), so a cache can restore its LRU order on startup. Writes are
+applied in batches inside one transaction; with WAL a batch is a single
+append to the log instead of rewriting the whole file. All methods are
+blocking - call them via asyncio.to_thread from async code.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+
+class SQLiteKeyValueStore:
+    """
+    JSON values by string key with a sort key column.
+    JSON значения по строковому ключу с колонкой для сортировки.
+    """
+
+    def __init__(self, path: Union[str, Path], table: str = "entries"):
+        """
+        Args:
+            path: Файл базы данных (каталог создается при необходимости)
+            table: Имя таблицы
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        # Соединение используется из потоков asyncio.to_thread, доступ сериализуется блокировкой
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, sort_key REAL NOT NULL DEFAULT 0)"
+        )
+        self._connection.commit()
+
+    def items(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Все записи в порядке возрастания sort_key.
+
+        Returns:
+            List of (key, value)
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, value FROM {self.table} ORDER BY sort_key"
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def count(self) -> int:
+        """Число записей."""
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def write_batch(self, upserts: Dict[str, Tuple[Dict[str, Any], float]], deletes: Iterable[str] = ()):
+        """
+        Применяет пачку изменений одной транзакцией.
+
+        Args:
+            upserts: {key: (value, sort_key)}
+            deletes: Ключи для удаления
+        """
+        deletes = [(key,) for key in deletes]
+        rows = [
+            (key, json.dumps(value, ensure_ascii=False), sort_key)
+            for key, (value, sort_key) in upserts.items()
+        ]
+        if not rows and not deletes:
+            return
+        with self._lock, self._connection:
+            if deletes:
+                self._connection.executemany(f"DELETE FROM {self.table} WHERE key = ?", deletes)
+            if rows:
+                self._connection.executemany(
+                    f"INSERT INTO {self.table} (key, value, sort_key) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, sort_key = excluded.sort_key",
+                    rows
+                )
+
+    def close(self):
+        """Закрывает соединение."""
+        with self._lock:
+            self._connection.close()
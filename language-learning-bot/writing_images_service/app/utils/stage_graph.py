@@ -0,0 +1,96 @@
+"""
+Stage Graph
+Граф этапов генерации: независимые этапы выполняются одновременно.
+
+Each stage is a coroutine function whose keyword arguments are the results
+of the stages it depends on. A stage starts as soon as all of its
+dependencies are finished; start offsets and durations of every stage are
+recorded so the result metadata shows what overlapped.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class StageGraph:
+    """
+    Small dependency graph of async stages.
+    Небольшой граф зависимостей асинхронных этапов.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Callable[..., Awaitable[Any]], List[str]]] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], depends_on: Iterable[str] = ()) -> "StageGraph":
+        """
+        Добавляет этап.
+
+        Args:
+            name: Имя этапа (имя аргумента для зависимых этапов)
+            func: Coroutine function, receives dependency results as keyword arguments
+            depends_on: Имена этапов, которые должны завершиться раньше
+
+        Returns:
+            StageGraph: self (для цепочки вызовов)
+
+        Raises:
+            ValueError: Если этап уже есть или зависимость еще не добавлена
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already defined")
+        depends_on = list(depends_on)
+        missing = [dependency for dependency in depends_on if dependency not in self._stages]
+        if missing:
+            # Зависимости добавляются раньше этапа, поэтому циклы невозможны
+            raise ValueError(f"Stage '{name}' depends on undefined stages: {missing}")
+        self._stages[name] = (func, depends_on)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Выполняет все этапы.
+
+        Returns:
+            Dict[str, Any]: Результаты этапов по именам
+
+        Raises:
+            Exception: Первая ошибка этапа (остальные этапы отменяются)
+        """
+        graph_start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str) -> Any:
+            func, depends_on = self._stages[name]
+            arguments = {dependency: await tasks[dependency] for dependency in depends_on}
+            started = time.perf_counter()
+            try:
+                return await func(**arguments)
+            finally:
+                self.timings[name] = {
+                    "start_ms": round((started - graph_start) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(run_stage(name), name=f"stage-{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        logger.debug(f"Stage timings: {self.timings}")
+        return {name: task.result() for name, task in tasks.items()}
+
+    def get_durations_ms(self) -> Dict[str, float]:
+        """Длительность каждого выполненного этапа в мс."""
+        return {name: timing["duration_ms"] for name, timing in self.timings.items()}
@@ -0,0 +1,242 @@
+"""
+Two-level image cache: in-memory LRU in front of a PNG store on disk.
+Двухуровневый кэш изображений: LRU в памяти + PNG файлы на диске.
+
+Used for artifacts that are a pure function of their inputs - rendered base
+glyphs and deterministic conditioning maps. Memory hits return a copy, so
+callers may modify the image freely; disk hits are promoted into memory.
+Files are written atomically (temporary file + os.replace), so several
+service processes can share one directory.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from app.utils import config_holder
+from app.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+ENTRY_SUFFIX = ".png"
+
+
+def cache_key(*parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable key parts.
+
+    Args:
+        *parts: Key components (strings, numbers, dicts, lists)
+
+    Returns:
+        str: Hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def image_digest(image: Image.Image) -> str:
+    """
+    Хэш содержимого изображения (пиксели, размер и режим).
+
+    Args:
+        image: Изображение
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha1(f"{image.mode}:{image.size}".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class TwoLevelImageCache:
+    """
+    Memory LRU + disk PNG cache of images by string key.
+    Кэш изображений по ключу: LRU в памяти + PNG на диске.
+    """
+
+    def __init__(self, cache_dir: Optional[str], memory_items: int = 256, name: str = "images"):
+        """
+        Args:
+            cache_dir: Directory for PNG files (None - memory only)
+            memory_items: Максимум изображений в памяти
+            name: Имя кэша для логов и статистики
+        """
+        self.name = name
+        self.memory_items = max(0, memory_items)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, Image.Image]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _path(self, key: str) -> Path:
+        # Подкаталоги по первым символам ключа, чтобы не держать тысячи файлов в одном каталоге
+        return self.cache_dir / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def _remember(self, key: str, image: Image.Image):
+        if self.memory_items == 0:
+            return
+        self._memory[key] = image
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _read(self, path: Path) -> Optional[Image.Image]:
+        try:
+            with Image.open(path) as stored:
+                return stored.copy()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Broken {self.name} cache entry {path.name}, removing: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _write(self, path: Path, image: Image.Image):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                image.save(tmp_file, format="PNG")
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def get(self, key: str) -> Optional[Image.Image]:
+        """
+        Ищет изображение сначала в памяти, затем на диске.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Optional[Image.Image]: Копия изображения или None
+        """
+        image = self._memory.get(key)
+        if image is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return image.copy()
+
+        if self.cache_dir is not None:
+            image = await asyncio.to_thread(self._read, self._path(key))
+            if image is not None:
+                self.disk_hits += 1
+                self._remember(key, image)
+                return image.copy()
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, image: Image.Image):
+        """
+        Сохраняет изображение в память и на диск.
+
+        Args:
+            key: Ключ записи
+            image: Изображение (сохраняется копия)
+        """
+        image = image.copy()
+        self._remember(key, image)
+        if self.cache_dir is not None:
+            try:
+                await asyncio.to_thread(self._write, self._path(key), image)
+                self.writes += 1
+            except Exception as e:
+                # Кэш не должен ломать генерацию
+                logger.warning(f"Failed to store {self.name} cache entry: {e}")
+
+    def contains(self, key: str) -> bool:
+        """Есть ли запись в памяти или на диске."""
+        return key in self._memory or (self.cache_dir is not None and self._path(key).exists())
+
+    def clear_memory(self):
+        """Очищает уровень в памяти (файлы на диске остаются)."""
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "memory_limit": self.memory_items,
+            "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_caches: Dict[str, Optional[TwoLevelImageCache]] = {}
+
+
+def get_render_cache(name: str) -> Optional[TwoLevelImageCache]:
+    """
+    Get a shared cache configured in ai_generation.render_cache.
+
+    Each name (for example "glyphs" or "conditioning") gets its own
+    subdirectory of cache_dir and its own memory limit.
+
+    Args:
+        name: Имя кэша (ключ в render_cache.memory_items)
+
+    Returns:
+        TwoLevelImageCache or None if caching is disabled
+    """
+    if name in _caches:
+        return _caches[name]
+
+    settings = {
+        "enabled": True,
+        "cache_dir": "./cache/render",
+        "memory_items": {},
+        "version": 1,
+    }
+    cfg = getattr(config_holder, "cfg", None)
+    if cfg is not None and hasattr(cfg, "ai_generation") and hasattr(cfg.ai_generation, "render_cache"):
+        cache_cfg = cfg.ai_generation.render_cache
+        for key in settings:
+            settings[key] = cache_cfg.get(key, settings[key])
+
+    if not settings["enabled"]:
+        logger.info(f"Render cache '{name}' disabled")
+        _caches[name] = None
+        return None
+
+    cache_dir = None
+    if settings["cache_dir"]:
+        # Версия в пути: увеличение версии сбрасывает весь кэш
+        cache_dir = os.path.join(settings["cache_dir"], f"v{settings['version']}", name)
+    try:
+        _caches[name] = TwoLevelImageCache(
+            cache_dir=cache_dir,
+            memory_items=int(settings["memory_items"].get(name, 256)),
+            name=name,
+        )
+        logger.info(f"Render cache '{name}' at {cache_dir}")
+    except OSError as e:
+        logger.warning(f"Render cache '{name}' disk store unavailable, using memory only: {e}")
+        _caches[name] = TwoLevelImageCache(None, int(settings["memory_items"].get(name, 256)), name)
+    return _caches[name]
+
+
+def reset_render_caches():
+    """Сбрасывает общие кэши (перечитать конфигурацию)."""
+    _caches.clear()
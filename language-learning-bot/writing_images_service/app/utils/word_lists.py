@@ -0,0 +1,108 @@
+"""
+Word lists for offline generation: backend exports and the character corpus.
+Списки слов для офлайн генерации: выгрузки бэкенда и словарь иероглифов.
+
+Supported sources:
+- JSON export of the backend (GET /api/languages/{id}/export?format=json):
+  {"language": ..., "export_info": ..., "words": [{word_number, word_foreign, translation, ...}]}
+- CSV export of the backend: columns "№", "Слово", "Перевод", "Транскрипция"
+- words/*.json corpus: {"1": {"character", "description": [...], "frequency"}, ...}
+
+Exports are ordered by word_number, the corpus by frequency. The bot sends
+the translation stored in the backend, so only exports reproduce its image
+cache keys exactly; for the corpus the senses are joined with "; ".
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+CSV_COLUMNS = {"number": "№", "word": "Слово", "translation": "Перевод"}
+
+
+@dataclass(frozen=True)
+class WordEntry:
+    """Слово для генерации: иностранное слово, перевод и ранг (меньше - важнее)."""
+    word: str
+    translation: str
+    rank: float
+
+
+def _rank(value: Any) -> float:
+    # У части записей номер или частотность не заполнены ("") - они идут в конец
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def _from_export(words: List[Dict[str, Any]]) -> List[WordEntry]:
+    return [
+        WordEntry(word=str(item.get("word_foreign") or "").strip(),
+                  translation=str(item.get("translation") or "").strip(),
+                  rank=_rank(item.get("word_number")))
+        for item in words
+    ]
+
+
+def _from_corpus(entries: Dict[str, Dict[str, Any]]) -> List[WordEntry]:
+    result = []
+    for entry in entries.values():
+        description = entry.get("description") or []
+        if isinstance(description, str):
+            description = [description]
+        result.append(WordEntry(word=str(entry.get("character") or "").strip(),
+                                translation="; ".join(description),
+                                rank=_rank(entry.get("frequency"))))
+    return result
+
+
+def _from_csv(path: Path) -> List[WordEntry]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    return [
+        WordEntry(word=(row.get(CSV_COLUMNS["word"]) or "").strip(),
+                  translation=(row.get(CSV_COLUMNS["translation"]) or "").strip(),
+                  rank=_rank(row.get(CSV_COLUMNS["number"])))
+        for row in rows
+    ]
+
+
+def load_words(path: Union[str, Path], top: int) -> List[WordEntry]:
+    """
+    Читает первые top слов из выгрузки бэкенда (JSON/CSV) или словаря иероглифов.
+
+    Args:
+        path: Файл со словами
+        top: Сколько слов вернуть
+
+    Returns:
+        List[WordEntry]: Слова по возрастанию ранга, без пустых и повторов (слово, перевод)
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        entries = _from_csv(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("words"), list):
+            entries = _from_export(data["words"])
+        elif isinstance(data, list):
+            entries = _from_export(data)
+        elif isinstance(data, dict):
+            entries = _from_corpus(data)
+        else:
+            raise ValueError(f"Unsupported word list format: {path}")
+
+    result = []
+    seen = set()
+    for entry in sorted(entries, key=lambda item: item.rank):
+        if not entry.word or (entry.word, entry.translation) in seen:
+            continue
+        seen.add((entry.word, entry.translation))
+        result.append(entry)
+        if len(result) >= top:
+            break
+    return result
@@ -0,0 +1,48 @@
+"""
+Benchmarks for the writing image service.
+
+Usage (from the writing_images_service directory):
+
+    python -m benchmarks event-loop --jobs 16 --workers 4
+    python -m benchmarks scribble --points 500 2000 8000
+    python -m benchmarks conditioning --limit 100 --sizes 512 1024
+    python -m benchmarks translation --model Helsinki-NLP/opus-mt-ru-en --limit 64
+    python -m benchmarks image-delivery --image-size 1024 --bandwidth-mbps 100
+    python -m benchmarks font-fit --limit 500
+    python -m benchmarks end-to-end --concurrency 1 4 16 --latency-ms 200
+
+event-loop runs a burst of CPU-bound conditioning jobs either inline on the
+event loop (as the generators did before) or in the shared-memory process
+pool, while a probe task measures how late the event loop wakes up.
+
+scribble times the per-point ScribbleConditioning helpers against their
+former Python-loop versions on contours of growing size, and every
+scribble method on a synthetic character.
+
+conditioning runs every method of every conditioning generator over the
+most frequent characters of words/chinese_characters_0_10000.json and
+prints latency percentiles, failure rate and peak memory per method. The
+JSON report (benchmarks/results/conditioning.json) can be set as
+ai_generation.conditioning.latency_report to make slow methods less likely
+to be chosen when latency_budget_ms is set.
+
+translation translates Russian meanings from the same corpus one generate
+call at a time, with TranslationModel.translate_batch, and as concurrent
+single requests grouped by the micro-batcher, and prints items/s and the
+speedup of each mode.
+
+image-delivery compares the base64-in-JSON response with binary PNG/WebP
+and multipart/mixed responses: payload size, encode time on the service,
+decode time on the bot and the estimated transfer time.
+
+font-fit fits glyphs, big words and transcriptions from the corpus with
+the former 10%-step loop and with FontManager.fit_font_size (cold and
+with the bbox cache warm) and prints time, measurements per fit and how
+often the chosen sizes differ.
+
+end-to-end starts the FastAPI service in-process with the cpu generation
+backend (app.ai.backends.cpu_backend: deterministic image, configurable
+artificial latency instead of diffusion) and sends the bot's requests at
+each concurrency level; prints requests/s, latency percentiles, errors and
+mean stage durations. With --url it loads a running service instead.
+"""
@@ -0,0 +1,167 @@
+"""
+Command line entry point:
+python -m benchmarks {event-loop,scribble,conditioning,translation,image-delivery,font-fit,end-to-end}.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+
+def _event_loop(args) -> None:
+    from benchmarks.event_loop import compare, conditioning_workload, synthetic_conditioning
+
+    if args.workload == "synthetic":
+        func = synthetic_conditioning
+    else:
+        func = conditioning_workload(args.workload, args.method)
+
+    report = asyncio.run(compare(func, args.image_size, args.jobs, args.workers))
+    print(json.dumps(report, indent=2))
+
+
+def _scribble(args) -> None:
+    from benchmarks.scribble import run
+
+    print(json.dumps(run(args.points, args.image_size, args.repeats), indent=2))
+
+
+def _conditioning(args) -> None:
+    from app.ai.prewarm_cache import DEFAULT_WORDS_FILE, load_top_characters
+    from benchmarks.conditioning import format_table, run
+
+    characters = load_top_characters(args.words_file or DEFAULT_WORDS_FILE, args.limit)
+    report = run(characters, args.sizes, args.types, args.memory_samples)
+    print(format_table(report["results"]))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Report written to {args.output}")
+
+
+def _translation(args) -> None:
+    from app.ai.prewarm_cache import DEFAULT_WORDS_FILE
+    from benchmarks.translation import load_meanings, run
+
+    pairs = load_meanings(args.words_file or DEFAULT_WORDS_FILE, args.limit)
+    print(json.dumps(run(args.model, pairs, args.batch_sizes, args.max_wait_ms, args.num_beams),
+                     indent=2, ensure_ascii=False))
+
+
+def _image_delivery(args) -> None:
+    from benchmarks.image_delivery import run
+
+    print(json.dumps(run(args.images, args.image_size, args.conditioning_images, args.repeats, args.bandwidth_mbps),
+                     indent=2))
+
+
+def _font_fit(args) -> None:
+    from app.ai.prewarm_cache import DEFAULT_WORDS_FILE
+    from benchmarks.font_fit import run
+
+    with open(args.words_file or DEFAULT_WORDS_FILE, encoding="utf-8") as f:
+        entries = [entry for entry in json.load(f).values() if entry.get("character")][:args.limit]
+    print(json.dumps(run(entries, args.glyph_sizes, args.font_path), indent=2, ensure_ascii=False))
+
+
+def _end_to_end(args) -> None:
+    from app.ai.prewarm_cache import DEFAULT_WORDS_FILE
+    from benchmarks.end_to_end import run
+    from benchmarks.translation import load_meanings
+
+    words = load_meanings(args.words_file or DEFAULT_WORDS_FILE, args.limit)
+    report = asyncio.run(run(words, args.requests, args.concurrency, args.endpoint, args.latency_ms,
+                             args.latency_per_image_ms, args.translation, args.use_cache, args.url))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Writing image service benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    event_loop = subparsers.add_parser("event-loop", help="Event loop lag during a conditioning burst")
+    event_loop.add_argument("--workload", default="synthetic",
+                            choices=["synthetic", "canny", "depth", "segmentation", "scribble"])
+    event_loop.add_argument("--method", default=None, help="Conditioning method (default: first available)")
+    event_loop.add_argument("--jobs", type=int, default=16)
+    event_loop.add_argument("--workers", type=int, default=4)
+    event_loop.add_argument("--image-size", type=int, default=1024)
+
+    scribble = subparsers.add_parser("scribble", help="Scribble helpers: Python loops vs NumPy, per-method timings")
+    scribble.add_argument("--points", type=int, nargs="+", default=[500, 2000, 8000],
+                          help="Contour sizes for the helper comparison")
+    scribble.add_argument("--image-size", type=int, default=1024)
+    scribble.add_argument("--repeats", type=int, default=5)
+
+    conditioning = subparsers.add_parser("conditioning", help="Latency, memory and failures of every conditioning method")
+    conditioning.add_argument("--words-file", type=Path, default=None,
+                              help="Character list (default: words/chinese_characters_0_10000.json)")
+    conditioning.add_argument("--limit", type=int, default=100, help="Most frequent characters to use")
+    conditioning.add_argument("--sizes", type=int, nargs="+", default=[512, 1024])
+    conditioning.add_argument("--types", nargs="+", default=None,
+                              choices=["canny", "depth", "segmentation", "scribble"])
+    conditioning.add_argument("--memory-samples", type=int, default=10,
+                              help="Characters measured with tracemalloc")
+    conditioning.add_argument("--output", type=Path, default=Path("benchmarks/results/conditioning.json"))
+
+    translation = subparsers.add_parser("translation", help="Sequential vs batched translation inference on CPU")
+    translation.add_argument("--model", default="Helsinki-NLP/opus-mt-ru-en")
+    translation.add_argument("--words-file", type=Path, default=None,
+                             help="Meanings source (default: words/chinese_characters_0_10000.json)")
+    translation.add_argument("--limit", type=int, default=64, help="Number of meanings to translate")
+    translation.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    translation.add_argument("--max-wait-ms", type=float, default=10.0, help="Micro-batch window")
+    translation.add_argument("--num-beams", type=int, default=4)
+
+    delivery = subparsers.add_parser("image-delivery", help="Payload size and latency: base64 JSON vs binary vs multipart")
+    delivery.add_argument("--images", type=Path, nargs="+", default=None,
+                          help="Generated images to use (default: synthetic)")
+    delivery.add_argument("--image-size", type=int, default=1024)
+    delivery.add_argument("--conditioning-images", type=int, default=4,
+                          help="Conditioning images in the debug response")
+    delivery.add_argument("--repeats", type=int, default=5)
+    delivery.add_argument("--bandwidth-mbps", type=float, default=100.0)
+
+    font_fit = subparsers.add_parser("font-fit", help="Font auto-fit: linear 10% steps vs binary search")
+    font_fit.add_argument("--words-file", type=Path, default=None,
+                          help="Characters and transcriptions (default: words/chinese_characters_0_10000.json)")
+    font_fit.add_argument("--limit", type=int, default=500)
+    font_fit.add_argument("--glyph-sizes", type=int, nargs="+", default=[512, 1024])
+    font_fit.add_argument("--font-path", default=None, help="Font file (default: FontManager selection)")
+
+    end_to_end = subparsers.add_parser("end-to-end", help="Service throughput on the CPU generation backend")
+    end_to_end.add_argument("--words-file", type=Path, default=None,
+                            help="Characters and meanings (default: words/chinese_characters_0_10000.json)")
+    end_to_end.add_argument("--limit", type=int, default=50, help="Distinct words to cycle through")
+    end_to_end.add_argument("--requests", type=int, default=50, help="Requests per concurrency level")
+    end_to_end.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    end_to_end.add_argument("--endpoint", default="multipart", choices=["json", "binary", "multipart"])
+    end_to_end.add_argument("--latency-ms", type=float, default=0.0, help="Artificial diffusion latency per call")
+    end_to_end.add_argument("--latency-per-image-ms", type=float, default=0.0)
+    end_to_end.add_argument("--translation", action="store_true", help="Translate meanings with the translation model")
+    end_to_end.add_argument("--use-cache", action="store_true", help="Allow image cache hits")
+    end_to_end.add_argument("--url", default=None, help="Running service (default: start the app in-process)")
+
+    args = parser.parse_args(argv)
+    if args.command == "event-loop":
+        _event_loop(args)
+    elif args.command == "scribble":
+        _scribble(args)
+    elif args.command == "conditioning":
+        _conditioning(args)
+    elif args.command == "translation":
+        _translation(args)
+    elif args.command == "image-delivery":
+        _image_delivery(args)
+    elif args.command == "font-fit":
+        _font_fit(args)
+    elif args.command == "end-to-end":
+        _end_to_end(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
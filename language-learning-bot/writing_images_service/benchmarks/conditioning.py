@@ -0,0 +1,164 @@
+"""
+Cost of every conditioning method over a real character corpus.
+Стоимость каждого метода conditioning на реальном списке иероглифов.
+
+Every method of every generator is run in-process (as one worker of the
+conditioning pool would run it) on glyphs rendered exactly like the
+service renders them. Latency percentiles and the failure rate come from
+all characters; peak memory is measured with tracemalloc on the first
+--memory-samples characters only, because tracing slows the calls down.
+"""
+
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def summarize(latencies_ms: List[float], failures: int, peak_bytes: int) -> Dict[str, Any]:
+    """
+    Сводка по одному методу.
+
+    Args:
+        latencies_ms: Задержки успешных вызовов
+        failures: Число неудачных вызовов (ошибка или success=False)
+        peak_bytes: Максимальный пик памяти за вызов
+
+    Returns:
+        Dict с перцентилями, долей ошибок и пиком памяти
+    """
+    runs = len(latencies_ms) + failures
+    return {
+        "runs": runs,
+        "failures": failures,
+        "failure_rate": round(failures / runs, 4) if runs else 0.0,
+        "mean_ms": round(float(np.mean(latencies_ms)), 2) if latencies_ms else None,
+        "p50_ms": _percentile(latencies_ms, 50),
+        "p90_ms": _percentile(latencies_ms, 90),
+        "p99_ms": _percentile(latencies_ms, 99),
+        "max_ms": round(max(latencies_ms), 2) if latencies_ms else None,
+        "peak_memory_mb": round(peak_bytes / 2**20, 1),
+    }
+
+
+async def _run_once(generator, image, method: str, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        result = await generator.generate_from_image(image, method=method)
+        success = result.success and result.image is not None
+    except Exception:
+        success = False
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    return success, elapsed_ms, peak
+
+
+async def benchmark_size(
+    characters: List[str],
+    size: int,
+    types: Optional[List[str]] = None,
+    memory_samples: int = 10,
+    progress: bool = True
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Runs every method of every generator on all characters at one resolution.
+
+    Args:
+        characters: Иероглифы
+        size: Сторона изображения
+        types: Типы conditioning (по умолчанию все)
+        memory_samples: Сколько первых иероглифов измерять с tracemalloc
+        progress: Печатать прогресс
+
+    Returns:
+        {conditioning_type: {method: summary}}
+    """
+    from app.ai.core.conditioning_manager import CONDITIONING_CLASSES
+    from app.ai.core.generation_config import AIGenerationConfig
+    from app.ai.core.image_processor import ImageProcessor
+
+    image_processor = ImageProcessor(AIGenerationConfig(width=size, height=size))
+    generators = {
+        conditioning_type: conditioning_class()
+        for conditioning_type, conditioning_class in CONDITIONING_CLASSES.items()
+        if not types or conditioning_type in types
+    }
+    samples = {
+        (conditioning_type, method): {"latencies": [], "failures": 0, "peak": 0}
+        for conditioning_type, generator in generators.items()
+        for method in generator.get_available_methods()
+    }
+
+    started = time.perf_counter()
+    for index, character in enumerate(characters):
+        image = await image_processor.preprocess_character(character, size, size)
+        trace_memory = index < memory_samples
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            for (conditioning_type, method), sample in samples.items():
+                success, elapsed_ms, peak = await _run_once(generators[conditioning_type], image, method, trace_memory)
+                if success:
+                    sample["latencies"].append(elapsed_ms)
+                else:
+                    sample["failures"] += 1
+                sample["peak"] = max(sample["peak"], peak)
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        if progress and ((index + 1) % 10 == 0 or index + 1 == len(characters)):
+            print(f"  {size}px: {index + 1}/{len(characters)} characters, {time.perf_counter() - started:.0f}s",
+                  flush=True)
+
+    report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (conditioning_type, method), sample in samples.items():
+        report.setdefault(conditioning_type, {})[method] = summarize(
+            sample["latencies"], sample["failures"], sample["peak"]
+        )
+    return report
+
+
+def format_table(results: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]) -> str:
+    """Текстовая таблица: одна строка на (разрешение, тип, метод)."""
+    columns = ["size", "type", "method", "p50_ms", "p90_ms", "p99_ms", "max_ms", "fail_%", "peak_mb"]
+    rows = []
+    for size, by_type in results.items():
+        for conditioning_type, by_method in by_type.items():
+            for method, stats in sorted(by_method.items(), key=lambda item: item[1]["p50_ms"] or float("inf")):
+                rows.append([
+                    str(size), conditioning_type, method,
+                    *(f"{stats[key]:.1f}" if stats[key] is not None else "-"
+                      for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms")),
+                    f"{stats['failure_rate'] * 100:.1f}",
+                    f"{stats['peak_memory_mb']:.1f}",
+                ])
+    widths = [max(len(column), *(len(row[i]) for row in rows)) if rows else len(column)
+              for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+    return "\n".join(lines)
+
+
+def run(characters: List[str], sizes: List[int], types: Optional[List[str]], memory_samples: int) -> Dict[str, Any]:
+    """Benchmark at every resolution; the result is the JSON report format."""
+    results = {}
+    for size in sizes:
+        results[str(size)] = asyncio.run(benchmark_size(characters, size, types, memory_samples))
+    return {
+        "config": {
+            "characters": len(characters),
+            "sizes": sizes,
+            "types": types,
+            "memory_samples": memory_samples,
+        },
+        "results": results,
+    }
@@ -0,0 +1,202 @@
+"""
+End-to-end throughput of the FastAPI service on the CPU generation backend.
+Пропускная способность всего сервиса с бэкендом генерации cpu.
+
+Without --url the service app is started in-process (lifespan included) with
+ai_generation.backend.name=cpu, rate limiting off and the requested artificial
+diffusion latency, and requests go through httpx's ASGI transport. With --url
+an already running service is loaded instead (start it with the cpu backend
+in conf/config/ai_generation.yaml to measure the same thing over the network).
+
+Everything except the diffusion itself runs for real: validation, character
+rendering, conditioning, translation (unless disabled), prompt building,
+image encoding and the HTTP layer. The report has throughput, latency
+percentiles, errors and mean stage durations from the response metadata.
+"""
+
+import asyncio
+import email
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+ENDPOINTS = {
+    "json": "/api/writing/generate-writing-image",
+    "binary": "/api/writing/generate-writing-image-binary",
+    "multipart": "/api/writing/generate-writing-image-multipart",
+}
+
+
+def build_payloads(words: List[Tuple[str, str]], count: int, use_cache: bool) -> List[Dict[str, Any]]:
+    """Запросы как у бота (512x512, без отладочных данных), слова по кругу."""
+    return [
+        {
+            "word": word,
+            "translation": translation,
+            "width": 512,
+            "height": 512,
+            "batch_size": 1,
+            "use_cache": use_cache,
+        }
+        for word, translation in (words[index % len(words)] for index in range(count))
+    ]
+
+
+def _metadata(response: httpx.Response) -> Optional[Dict[str, Any]]:
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        return response.json().get("generation_metadata")
+    if content_type.startswith("multipart/"):
+        message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + response.content)
+        for part in message.walk():
+            if part.get_content_type() == "application/json":
+                return json.loads(part.get_payload(decode=True)).get("generation_metadata")
+    return None
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "p99": round(float(np.percentile(values, 99)), 1),
+        "max": round(max(values), 1),
+    }
+
+
+async def load(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    payloads: List[Dict[str, Any]],
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    Отправляет запросы с ограничением одновременных и собирает статистику.
+
+    Args:
+        client: HTTP клиент (ASGI или сеть)
+        endpoint: Путь эндпоинта генерации
+        payloads: Тела запросов
+        concurrency: Сколько запросов выполняется одновременно
+
+    Returns:
+        Dict[str, Any]: Пропускная способность, задержки, ошибки, средние длительности этапов
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    stages: Dict[str, List[float]] = {}
+    response_bytes = 0
+
+    async def send(payload: Dict[str, Any]):
+        nonlocal response_bytes
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=payload)
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+            return
+        latencies.append(elapsed_ms)
+        response_bytes += len(response.content)
+        metadata = _metadata(response) or {}
+        for stage, timing in (metadata.get("stage_timings") or {}).items():
+            stages.setdefault(stage, []).append(timing["duration_ms"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(payload) for payload in payloads))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(payloads),
+        "succeeded": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": _percentiles(latencies),
+        "mean_response_kb": round(response_bytes / len(latencies) / 1024, 1) if latencies else None,
+        "stage_mean_ms": {stage: round(float(np.mean(values)), 1) for stage, values in sorted(stages.items())},
+    }
+
+
+def _configure_in_process(latency_ms: float, latency_per_image_ms: float, translation: bool):
+    """Загружает приложение и переключает конфигурацию на бэкенд cpu до старта lifespan."""
+    from omegaconf import open_dict
+
+    from app import main_writing_service
+    from app.utils import config_holder
+
+    cfg = config_holder.cfg
+    with open_dict(cfg):
+        cfg.ai_generation.backend.name = "cpu"
+        cfg.ai_generation.backend.cpu = {
+            "latency_ms": latency_ms,
+            "latency_per_image_ms": latency_per_image_ms,
+            "run_in_thread": False,
+        }
+        cfg.api.enable_rate_limit = False
+        cfg.translation.enabled = translation
+    return main_writing_service.app
+
+
+async def run(
+    words: List[Tuple[str, str]],
+    requests: int,
+    concurrency: List[int],
+    endpoint: str = "multipart",
+    latency_ms: float = 0.0,
+    latency_per_image_ms: float = 0.0,
+    translation: bool = False,
+    use_cache: bool = False,
+    url: Optional[str] = None,
+    timeout: float = 300.0
+) -> Dict[str, Any]:
+    """
+    Нагружает сервис при каждой степени параллельности.
+
+    Args:
+        words: Пары (иероглиф, перевод)
+        requests: Запросов на каждую степень параллельности
+        concurrency: Степени параллельности
+        endpoint: json, binary или multipart (как у бота)
+        latency_ms: Искусственная задержка диффузии на вызов (только без url)
+        latency_per_image_ms: Искусственная задержка на изображение (только без url)
+        translation: Переводить значения моделью перевода (только без url)
+        use_cache: Разрешить кэш готовых изображений (иначе каждый запрос генерируется)
+        url: Адрес запущенного сервиса; None - приложение в этом процессе
+        timeout: Таймаут запроса в секундах
+
+    Returns:
+        Dict[str, Any]: Отчет по каждой степени параллельности
+    """
+    results = {}
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            for level in concurrency:
+                results[str(level)] = await load(client, ENDPOINTS[endpoint], build_payloads(words, requests, use_cache), level)
+        return {"target": url, "endpoint": endpoint, "results": results}
+
+    app = _configure_in_process(latency_ms, latency_per_image_ms, translation)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+            # Прогрев: инициализация бэкенда, процессов conditioning и шрифтов не входит в замеры
+            await load(client, ENDPOINTS[endpoint], build_payloads(words, 1, use_cache), 1)
+            for level in concurrency:
+                results[str(level)] = await load(client, ENDPOINTS[endpoint], build_payloads(words, requests, use_cache), level)
+
+    return {
+        "target": "in-process",
+        "endpoint": endpoint,
+        "backend": {"name": "cpu", "latency_ms": latency_ms, "latency_per_image_ms": latency_per_image_ms},
+        "translation": translation,
+        "results": results,
+    }
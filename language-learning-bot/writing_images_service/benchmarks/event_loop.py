@@ -0,0 +1,122 @@
+"""
+Event loop responsiveness during a burst of conditioning jobs.
+Отзывчивость event loop во время пачки задач conditioning.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.utils.shared_memory_pool import SharedMemoryProcessPool
+
+
+def synthetic_conditioning(image: Image.Image, iterations: int = 3):
+    """
+    CPU-bound stand-in for a conditioning generator (bilateral filter,
+    Canny and skeletonization), usable without the AI stack.
+    """
+    import cv2
+    from skimage.morphology import skeletonize
+
+    array = np.asarray(image.convert("L"))
+    for _ in range(iterations):
+        array = cv2.bilateralFilter(array, 9, 75, 75)
+    edges = cv2.Canny(array, 50, 150)
+    skeleton = skeletonize(array < 128)
+    result = np.maximum(edges, skeleton.astype(np.uint8) * 255)
+    return Image.fromarray(result), {"success": True}
+
+
+def conditioning_workload(conditioning_type: str, method: Optional[str]) -> Callable:
+    """Real conditioning generator run (requires the full AI environment)."""
+    from functools import partial
+
+    from app.ai.core.conditioning_manager import CONDITIONING_CLASSES, _generate_in_worker
+
+    method = method or CONDITIONING_CLASSES[conditioning_type]().get_available_methods()[0]
+    return partial(_generate_in_worker, conditioning_type=conditioning_type, method=method)
+
+
+def character_image(size: int) -> Image.Image:
+    """Black strokes on white, roughly like a rendered character."""
+    image = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(image)
+    step = size // 8
+    for offset in range(step, size - step, step):
+        draw.line([(step, offset), (size - step, offset)], fill="black", width=size // 40)
+        draw.line([(offset, step), (offset, size - step)], fill="black", width=size // 60)
+    return image
+
+
+async def _probe(stop: asyncio.Event, interval: float, lags: List[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+def _summary(lags: List[float], elapsed: float) -> Dict[str, Any]:
+    values = sorted(lags) or [0.0]
+    return {
+        "burst_seconds": round(elapsed, 3),
+        "probe_samples": len(lags),
+        "lag_p50_ms": round(values[len(values) // 2], 2),
+        "lag_p99_ms": round(values[min(len(values) - 1, int(len(values) * 0.99))], 2),
+        "lag_max_ms": round(values[-1], 2),
+    }
+
+
+async def run_burst(func: Callable, image: Image.Image, jobs: int,
+                    pool: Optional[SharedMemoryProcessPool], interval: float = 0.005) -> Dict[str, Any]:
+    """
+    Run a burst of jobs while probing event loop lag.
+
+    Args:
+        func: Module-level function (image) -> (image, extra)
+        image: Input image
+        jobs: Number of concurrent jobs
+        pool: Process pool, or None to run jobs inline on the event loop
+        interval: Probe sleep interval in seconds
+
+    Returns:
+        Dict with burst time and lag percentiles
+    """
+    async def inline_job():
+        # Так работали генераторы conditioning: синхронный код внутри async def
+        await asyncio.sleep(0)
+        return func(image)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    probe = asyncio.create_task(_probe(stop, interval, lags))
+    await asyncio.sleep(interval * 2)
+
+    started = time.perf_counter()
+    if pool:
+        await asyncio.gather(*[pool.run_image(func, image) for _ in range(jobs)])
+    else:
+        await asyncio.gather(*[inline_job() for _ in range(jobs)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    return _summary(lags, elapsed)
+
+
+async def compare(func: Callable, image_size: int, jobs: int, workers: int) -> Dict[str, Any]:
+    """Run the same burst inline and in the process pool."""
+    image = character_image(image_size)
+    pool = SharedMemoryProcessPool(workers)
+    try:
+        # Прогрев: запуск процессов и импорты не входят в измерение
+        await asyncio.gather(*[pool.run_image(func, image) for _ in range(workers)])
+        return {
+            "config": {"jobs": jobs, "workers": workers, "image_size": image_size},
+            "inline": await run_burst(func, image, jobs, None),
+            "process_pool": await run_burst(func, image, jobs, pool),
+        }
+    finally:
+        pool.shutdown()
@@ -0,0 +1,101 @@
+"""
+Font auto-fit: 10% linear steps vs estimate + binary search with a bbox LRU.
+Автоподбор размера шрифта: линейное уменьшение на 10% против оценки и бинарного поиска.
+
+Workloads follow the callers: ImageProcessor renders a glyph with
+initial_font_size=min(width, height) into the image minus 10% margins,
+BigWordGenerator fits the word (80pt, half the card height) and the
+"[transcription]" line (20pt, quarter height) into an 800x400 card.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from common.utils.font_utils import FontCoverageIndex, FontManager, DEFAULT_FONT_COVERAGE_INDEX
+
+# (text, max_width, max_height, initial_font_size, min_font_size)
+FitCase = Tuple[str, int, int, int, int]
+
+
+def linear_fit(manager: FontManager, case: FitCase, font_path: Optional[str] = None) -> Tuple[int, int]:
+    """Прежний алгоритм FontManager.auto_fit_font_size; возвращает (размер, число измерений)."""
+    text, max_width, max_height, current_font_size, min_font_size = case
+    measurements = 0
+    while current_font_size >= min_font_size:
+        font = manager.get_font(current_font_size, font_path, text)
+        draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+        bbox = draw.textbbox((0, 0), text, font=font)
+        measurements += 1
+        if bbox[2] - bbox[0] <= max_width and bbox[3] - bbox[1] <= max_height:
+            return current_font_size, measurements
+        current_font_size = int(current_font_size * 0.9)
+    return min_font_size, measurements + 1
+
+
+def build_cases(entries: List[Dict[str, Any]], glyph_sizes: List[int]) -> Dict[str, List[FitCase]]:
+    """Наборы задач подбора для каждого места вызова."""
+    cases: Dict[str, List[FitCase]] = {f"glyph_{size}": [] for size in glyph_sizes}
+    cases["big_word"] = []
+    cases["big_word_transcription"] = []
+    for entry in entries:
+        character = entry["character"]
+        for size in glyph_sizes:
+            margin = size // 10
+            cases[f"glyph_{size}"].append((character, size - 2 * margin, size - 2 * margin, size, 12))
+        cases["big_word"].append((character, 760, 200, 80, 12))
+        if entry.get("transcription"):
+            cases["big_word_transcription"].append((f"[{entry['transcription']}]", 760, 100, 20, 12))
+    return cases
+
+
+def _time_cases(cases: List[FitCase], fit: Callable[[FitCase], int]) -> Tuple[float, List[int]]:
+    started = time.perf_counter()
+    sizes = [fit(case) for case in cases]
+    return (time.perf_counter() - started) * 1000, sizes
+
+
+def run(entries: List[Dict[str, Any]], glyph_sizes: List[int], font_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Сравнивает алгоритмы подбора на каждом наборе задач.
+
+    Args:
+        entries: Записи словаря (character, transcription)
+        glyph_sizes: Размеры изображений иероглифа
+        font_path: Шрифт (по умолчанию - автоподбор FontManager)
+
+    Returns:
+        Dict: по наборам - время, число измерений, совпадение размеров
+    """
+    manager = FontManager(FontCoverageIndex(DEFAULT_FONT_COVERAGE_INDEX))
+    results = {}
+    for name, cases in build_cases(entries, glyph_sizes).items():
+        # Прогрев: выбор и загрузка шрифтов одинаковы для обоих алгоритмов
+        linear = [linear_fit(manager, case, font_path) for case in cases]
+        linear_ms, _ = _time_cases(cases, lambda case: linear_fit(manager, case, font_path)[0])
+
+        manager.clear_cache()
+        for case in cases:
+            manager.get_font(case[3], font_path, case[0])
+        misses_before = manager.get_cache_info()["bbox_cache"]["misses"]
+        cold_ms, sizes = _time_cases(cases, lambda case: manager.fit_font_size(*case, font_path)[1])
+        misses = manager.get_cache_info()["bbox_cache"]["misses"] - misses_before
+        warm_ms, _ = _time_cases(cases, lambda case: manager.fit_font_size(*case, font_path)[1])
+
+        linear_sizes = [size for size, _ in linear]
+        results[name] = {
+            "cases": len(cases),
+            "linear_ms": round(linear_ms, 2),
+            "binary_ms": round(cold_ms, 2),
+            "binary_cached_ms": round(warm_ms, 2),
+            "speedup": round(linear_ms / cold_ms, 2) if cold_ms else None,
+            "speedup_cached": round(linear_ms / warm_ms, 2) if warm_ms else None,
+            "linear_measurements_per_fit": round(sum(count for _, count in linear) / len(cases), 2),
+            "binary_measurements_per_fit": round(misses / len(cases), 2),
+            # Оба алгоритма выбирают размер из одного ряда -10%, размеры должны совпадать
+            "same_size": sum(a == b for a, b in zip(sizes, linear_sizes)),
+            "larger_size": sum(a > b for a, b in zip(sizes, linear_sizes)),
+            "smaller_size": sum(a < b for a, b in zip(sizes, linear_sizes)),
+        }
+    return {"font": font_path or manager.select_font_path(), "results": results}
@@ -0,0 +1,174 @@
+"""
+Payload size and latency of image delivery paths.
+Размер ответа и задержка для способов доставки изображений.
+
+Compares the JSON response with base64 PNG images (generate-writing-image)
+with binary PNG/WebP (generate-writing-image-binary) and multipart/mixed
+(generate-writing-image-multipart). For every path the service-side encode
+time, the bot-side decode time (JSON parse + base64 decode, or multipart
+parse) and the payload size are measured; the transfer time is estimated
+for the given bandwidth. Pass real generations with --images, otherwise a
+synthetic noisy image of the requested size is used.
+"""
+
+import base64
+import email
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.utils.image_encoding import build_multipart, encode_image, image_to_base64, json_part
+
+
+def synthetic_image(size: int, seed: int = 0) -> Image.Image:
+    """Гладкий цветной фон с шумом и штрихами - грубое подобие результата диффузии."""
+    rng = np.random.default_rng(seed)
+    low = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    image = Image.fromarray(low).resize((size, size), Image.BICUBIC)
+    noise = rng.normal(0, 12, (size, size, 3))
+    image = Image.fromarray(np.clip(np.asarray(image) + noise, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x0, y0, x1, y1 = rng.integers(size // 8, size - size // 8, 4)
+        draw.line((x0, y0, x1, y1), fill=(20, 20, 20), width=max(2, size // 40))
+    return image.filter(ImageFilter.GaussianBlur(1))
+
+
+def _timed(func: Callable[[], Any], repeats: int) -> Tuple[Any, float]:
+    result = None
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, float(np.median(timings))
+
+
+def _json_path(images: Dict[str, Image.Image]):
+    def encode() -> bytes:
+        payload = {
+            "success": True,
+            "status": "success",
+            "generated_image_base64": image_to_base64(images["generated_image"]),
+            "conditioning_images_base64": {},
+        }
+        if "base_image" in images:
+            payload["base_image_base64"] = image_to_base64(images["base_image"])
+        for name, image in images.items():
+            if name.startswith("conditioning/"):
+                _, conditioning_type, method = name.split("/")
+                payload["conditioning_images_base64"].setdefault(conditioning_type, {})[method] = image_to_base64(image)
+        return json.dumps(payload).encode("utf-8")
+
+    def decode(body: bytes) -> List[bytes]:
+        data = json.loads(body)
+        decoded = [base64.b64decode(data["generated_image_base64"])]
+        if data.get("base_image_base64"):
+            decoded.append(base64.b64decode(data["base_image_base64"]))
+        for methods in data["conditioning_images_base64"].values():
+            decoded.extend(base64.b64decode(value) for value in methods.values())
+        return decoded
+
+    return encode, decode
+
+
+def _multipart_path(images: Dict[str, Image.Image], image_format: str):
+    media_type = f"image/{image_format}"
+
+    def encode() -> Tuple[bytes, str]:
+        parts = [json_part({"success": True, "status": "success", "format": image_format})]
+        parts.extend((name, media_type, encode_image(image, image_format)) for name, image in images.items())
+        return build_multipart(parts)
+
+    def decode(encoded: Tuple[bytes, str]) -> List[bytes]:
+        body, content_type = encoded
+        message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        return [part.get_payload(decode=True) for part in message.get_payload()[1:]]
+
+    return encode, decode
+
+
+def _binary_path(image: Image.Image, image_format: str):
+    return (lambda: encode_image(image, image_format)), (lambda body: [body])
+
+
+def _summary(encode_ms: float, decode_ms: float, payload: int, bandwidth_mbps: float) -> Dict[str, Any]:
+    transfer_ms = payload * 8 / (bandwidth_mbps * 1e6) * 1000
+    return {
+        "payload_bytes": payload,
+        "encode_ms": round(encode_ms, 2),
+        "decode_ms": round(decode_ms, 2),
+        "transfer_ms": round(transfer_ms, 2),
+        "total_ms": round(encode_ms + decode_ms + transfer_ms, 2),
+    }
+
+
+def compare(
+    images: Dict[str, Image.Image],
+    repeats: int = 5,
+    bandwidth_mbps: float = 100.0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Измеряет все способы доставки для одного набора изображений.
+
+    Args:
+        images: {"generated_image": ..., "base_image": ..., "conditioning/<type>/<method>": ...}
+        repeats: Повторы (берется медиана)
+        bandwidth_mbps: Пропускная способность сети для оценки передачи
+
+    Returns:
+        {path: {payload_bytes, encode_ms, decode_ms, transfer_ms, total_ms}}
+    """
+    paths = {"json_base64_png": _json_path(images)}
+    if len(images) == 1:
+        paths["binary_png"] = _binary_path(images["generated_image"], "png")
+        paths["binary_webp"] = _binary_path(images["generated_image"], "webp")
+    paths["multipart_png"] = _multipart_path(images, "png")
+    paths["multipart_webp"] = _multipart_path(images, "webp")
+
+    report = {}
+    for name, (encode, decode) in paths.items():
+        encoded, encode_ms = _timed(encode, repeats)
+        _, decode_ms = _timed(lambda: decode(encoded), repeats)
+        payload = len(encoded[0]) if isinstance(encoded, tuple) else len(encoded)
+        report[name] = _summary(encode_ms, decode_ms, payload, bandwidth_mbps)
+
+    baseline = report["json_base64_png"]["payload_bytes"]
+    for stats in report.values():
+        stats["payload_vs_json"] = round(stats["payload_bytes"] / baseline, 3)
+    return report
+
+
+def run(
+    image_files: Optional[List[Path]],
+    size: int,
+    conditioning_images: int,
+    repeats: int,
+    bandwidth_mbps: float
+) -> Dict[str, Any]:
+    """Обычный ответ (одно изображение) и отладочный (с base и conditioning картинками)."""
+    if image_files:
+        sources = [Image.open(path).convert("RGB") for path in image_files]
+    else:
+        sources = [synthetic_image(size, seed) for seed in range(1 + 1 + conditioning_images)]
+
+    generated = {"generated_image": sources[0]}
+    debug = dict(generated)
+    debug["base_image"] = sources[1 % len(sources)].convert("L").convert("RGB")
+    for index in range(conditioning_images):
+        debug[f"conditioning/canny/method_{index}"] = sources[(2 + index) % len(sources)].convert("L").convert("RGB")
+
+    return {
+        "config": {
+            "images": [str(path) for path in image_files] if image_files else f"synthetic {size}x{size}",
+            "conditioning_images": conditioning_images,
+            "repeats": repeats,
+            "bandwidth_mbps": bandwidth_mbps,
+        },
+        "single_image": compare(generated, repeats, bandwidth_mbps),
+        "debug_response": compare(debug, repeats, bandwidth_mbps),
+    }
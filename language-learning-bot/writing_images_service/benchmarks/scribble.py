@@ -0,0 +1,145 @@
+"""
+Per-point scribble helpers: Python loops versus NumPy array operations.
+Вспомогательные функции scribble: циклы Python против операций NumPy.
+
+The loop_* functions are the implementations ScribbleConditioning used
+before vectorization; they are kept as the reference for the timing
+comparison and the pixel-difference test.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List
+
+import cv2
+import numpy as np
+from scipy import interpolate
+from scipy.ndimage import gaussian_filter
+
+from benchmarks.event_loop import character_image
+
+
+def loop_smooth_contour(contour: np.ndarray) -> np.ndarray:
+    points = contour.reshape(-1, 2)
+    distances = np.zeros(len(points))
+    for i in range(1, len(points)):
+        distances[i] = distances[i-1] + np.linalg.norm(points[i] - points[i-1])
+    if len(np.unique(distances)) < 4:
+        return contour
+    cs_x = interpolate.CubicSpline(distances, points[:, 0], bc_type='natural')
+    cs_y = interpolate.CubicSpline(distances, points[:, 1], bc_type='natural')
+    smooth_distances = np.linspace(0, distances[-1], len(points))
+    smooth_points = np.column_stack([cs_x(smooth_distances), cs_y(smooth_distances)]).astype(np.int32)
+    return smooth_points.reshape(-1, 1, 2)
+
+
+def loop_add_hand_tremor(contour: np.ndarray, noise_level: float) -> np.ndarray:
+    points = contour.reshape(-1, 2).astype(np.float32)
+    noise_x = gaussian_filter(np.random.normal(0, noise_level, len(points)), sigma=1.0)
+    noise_y = gaussian_filter(np.random.normal(0, noise_level, len(points)), sigma=1.0)
+    noisy_points = points.copy()
+    noisy_points[:, 0] += noise_x
+    noisy_points[:, 1] += noise_y
+    return np.clip(noisy_points, 0, 2048).astype(np.int32).reshape(-1, 1, 2)
+
+
+def loop_draw_pressure_sensitive_line(image: np.ndarray, contour: np.ndarray, line_variation: float) -> None:
+    points = contour.reshape(-1, 2)
+    base_thickness = 2
+    for i in range(len(points) - 1):
+        t = i / max(len(points) - 1, 1)
+        pressure = np.sin(t * np.pi)
+        pressure += np.random.normal(0, line_variation * 0.1)
+        pressure = np.clip(pressure, 0.1, 1.0)
+        thickness = int(base_thickness * pressure * line_variation)
+        thickness = max(1, min(thickness, 8))
+        cv2.line(image, tuple(points[i]), tuple(points[i + 1]), 0, thickness)
+
+
+def spiral_contour(points: int, size: int = 1024) -> np.ndarray:
+    """Contour with many points, like the outline of a complex character."""
+    angles = np.linspace(0, 24 * np.pi, points)
+    radius = np.linspace(size * 0.05, size * 0.45, points)
+    xy = np.column_stack([size / 2 + radius * np.cos(angles), size / 2 + radius * np.sin(angles)]).astype(np.int32)
+    # Как у cv2.findContours: соседние точки не совпадают
+    keep = np.concatenate(([True], np.any(np.diff(xy, axis=0) != 0, axis=1)))
+    return xy[keep].reshape(-1, 1, 2)
+
+
+def _time_ms(func: Callable[[], Any], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(sorted(samples)[len(samples) // 2], 3)
+
+
+def compare_helpers(points: int, repeats: int, size: int = 1024) -> Dict[str, Any]:
+    """
+    Median time of every helper before and after vectorization.
+
+    Args:
+        points: Number of contour points
+        repeats: Repetitions per measurement
+        size: Canvas size for drawing
+
+    Returns:
+        Dict: {helper: {"loop_ms", "vectorized_ms", "speedup"}}
+    """
+    from app.ai.conditioning.scribble_conditioning import ScribbleConditioning
+
+    scribble = ScribbleConditioning()
+    contour = spiral_contour(points, size)
+    canvas = np.full((size, size), 255, dtype=np.uint8)
+
+    pairs = {
+        "smooth_contour": (
+            lambda: loop_smooth_contour(contour),
+            lambda: scribble._smooth_contour(contour),
+        ),
+        "add_hand_tremor": (
+            lambda: loop_add_hand_tremor(contour, 1.5),
+            lambda: scribble._add_hand_tremor(contour, 1.5),
+        ),
+        "draw_pressure_sensitive_line": (
+            lambda: loop_draw_pressure_sensitive_line(canvas.copy(), contour, 0.8),
+            lambda: scribble._draw_pressure_sensitive_line(canvas.copy(), contour, 0.8),
+        ),
+    }
+    report = {}
+    for name, (loop, vectorized) in pairs.items():
+        loop_ms = _time_ms(loop, repeats)
+        vectorized_ms = _time_ms(vectorized, repeats)
+        report[name] = {
+            "loop_ms": loop_ms,
+            "vectorized_ms": vectorized_ms,
+            "speedup": round(loop_ms / vectorized_ms, 1) if vectorized_ms else None,
+        }
+    return report
+
+
+def time_methods(image_size: int, repeats: int) -> Dict[str, float]:
+    """
+    Median time of every scribble method on a synthetic character (ms).
+    Only the method itself: validation and post-processing are excluded.
+    """
+    from app.ai.conditioning.scribble_conditioning import ScribbleConditioning
+
+    scribble = ScribbleConditioning()
+    image = character_image(image_size)
+    report = {}
+    for method in scribble.get_available_methods():
+        report[method] = _time_ms(
+            lambda: asyncio.run(getattr(scribble, f"_{method}")(image)), repeats
+        )
+    return report
+
+
+def run(points: List[int], image_size: int, repeats: int) -> Dict[str, Any]:
+    """Helper comparison for each contour size plus per-method timings."""
+    return {
+        "config": {"points": points, "image_size": image_size, "repeats": repeats},
+        "helpers": {str(count): compare_helpers(count, repeats) for count in points},
+        "methods_ms": time_methods(image_size, repeats),
+    }
@@ -0,0 +1,158 @@
+"""
+Throughput of batched translation inference on CPU.
+Пропускная способность батчевого перевода на CPU.
+
+Real Russian meanings from the character corpus are translated three ways
+with the same TranslationModel: one generate call per item (as before),
+translate_batch with growing batch sizes, and concurrent single requests
+grouped by the BatchScheduler as TranslationService groups them. Use a
+small Marian model (Helsinki-NLP/opus-mt-ru-en) to keep the run short.
+"""
+
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# "I.1.а. качественный признак" -> "качественный признак"
+_SENSE_PREFIX = re.compile(r"^[IVX]+(\.\d+)?(\.[а-я])?\.\s*")
+
+
+def load_meanings(words_file: Path, limit: int) -> List[Tuple[str, str]]:
+    """
+    Пары (иероглиф, первое русское значение) из словаря.
+
+    Args:
+        words_file: JSON вида {"1": {"character": "的", "description": [...], ...}, ...}
+        limit: Сколько пар вернуть
+
+    Returns:
+        List[Tuple[str, str]]: Пары в порядке словаря
+    """
+    with open(words_file, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    pairs = []
+    for entry in entries.values():
+        descriptions = entry.get("description") or []
+        if not entry.get("character") or not descriptions:
+            continue
+        meaning = _SENSE_PREFIX.sub("", descriptions[0]).strip()
+        if meaning:
+            pairs.append((entry["character"], meaning))
+        if len(pairs) >= limit:
+            break
+    return pairs
+
+
+def _throughput(items: int, seconds: float) -> Dict[str, Any]:
+    return {
+        "seconds": round(seconds, 2),
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+    }
+
+
+async def _sequential(model, pairs: List[Tuple[str, str]], **kwargs) -> float:
+    started = time.perf_counter()
+    for character, russian_text in pairs:
+        await model.translate(character, russian_text, **kwargs)
+    return time.perf_counter() - started
+
+
+async def _batched(model, pairs: List[Tuple[str, str]], batch_size: int, **kwargs) -> float:
+    started = time.perf_counter()
+    for offset in range(0, len(pairs), batch_size):
+        await model.translate_batch(pairs[offset:offset + batch_size], **kwargs)
+    return time.perf_counter() - started
+
+
+async def _micro_batched(model, pairs: List[Tuple[str, str]], batch_size: int, max_wait_ms: float, **kwargs):
+    from app.ai.services.translation_service import TranslationRequest
+    from app.utils.batch_scheduler import BatchScheduler
+
+    async def run_batch(batch):
+        return await model.translate_batch([(item.character, item.russian_text) for item in batch], **kwargs)
+
+    scheduler = BatchScheduler(run_batch, max_batch_size=batch_size, max_wait_ms=max_wait_ms)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            scheduler.submit_item((), TranslationRequest(character, russian_text, kwargs, loop.create_future()))
+            for character, russian_text in pairs
+        ))
+    finally:
+        await scheduler.stop()
+    return time.perf_counter() - started, scheduler.get_stats()
+
+
+async def benchmark(
+    model_id: str,
+    pairs: List[Tuple[str, str]],
+    batch_sizes: List[int],
+    max_wait_ms: float = 10.0,
+    **generation_kwargs
+) -> Dict[str, Any]:
+    """
+    Сравнивает последовательный, батчевый и микро-батчевый перевод.
+
+    Args:
+        model_id: HuggingFace id модели перевода
+        pairs: Пары (иероглиф, русское значение)
+        batch_sizes: Размеры батча для translate_batch
+        max_wait_ms: Окно сбора микро-батча
+        **generation_kwargs: Параметры generate (например, num_beams)
+
+    Returns:
+        Dict: Время и items/s для каждого режима, ускорение относительно последовательного
+    """
+    from app.ai.models.translation_model import TranslationModel
+
+    model = TranslationModel({"model_id": model_id})
+    if not await model.load_model():
+        raise RuntimeError(f"Failed to load {model_id}")
+
+    # Прогрев: первый generate заметно медленнее остальных
+    await model.translate_batch(pairs[:2], **generation_kwargs)
+
+    sequential = await _sequential(model, pairs, **generation_kwargs)
+    report: Dict[str, Any] = {"sequential": _throughput(len(pairs), sequential)}
+
+    for batch_size in batch_sizes:
+        seconds = await _batched(model, pairs, batch_size, **generation_kwargs)
+        report[f"batch_{batch_size}"] = {**_throughput(len(pairs), seconds),
+                                         "speedup": round(sequential / seconds, 2)}
+
+    largest = max(batch_sizes)
+    seconds, stats = await _micro_batched(model, pairs, largest, max_wait_ms, **generation_kwargs)
+    report[f"micro_batch_{largest}"] = {**_throughput(len(pairs), seconds),
+                                        "speedup": round(sequential / seconds, 2),
+                                        "avg_batch_size": stats["avg_batch_size"]}
+
+    sample = await model.translate_batch(pairs[:5], **generation_kwargs)
+    report["samples"] = [f"{result.character} {result.original_text} -> {result.translated_text}" for result in sample]
+
+    await model.unload_model()
+    return report
+
+
+def run(
+    model_id: str,
+    pairs: List[Tuple[str, str]],
+    batch_sizes: List[int],
+    max_wait_ms: float,
+    num_beams: int
+) -> Dict[str, Any]:
+    """Benchmark one model; the result is the JSON report format."""
+    return {
+        "config": {
+            "model_id": model_id,
+            "items": len(pairs),
+            "batch_sizes": batch_sizes,
+            "max_wait_ms": max_wait_ms,
+            "num_beams": num_beams,
+        },
+        "results": asyncio.run(benchmark(model_id, pairs, batch_sizes, max_wait_ms, num_beams=num_beams)),
+    }
@@ -13,6 +13,9 @@ from fastapi.testclient import TestClient
 # Add the parent directory to sys.path to allow imports from app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# patch('app.utils.config_holder') requires the submodule to be imported
+import app.utils.config_holder  # noqa: E402,F401
+
 # Mock configuration holder to avoid Hydra dependency issues in tests
 @pytest.fixture(autouse=True)
 def mock_config_holder():
@@ -131,4 +131,32 @@ class TestHealthRoutes:
         data = response.json()
         assert data["status"] == "dead"
         assert "PID error" in data["error"]
-        
\ No newline at end of file
+        
+
+class TestBackendGpuRequirement:
+    
+    @pytest.mark.parametrize("backend, status_code", [("cpu", 200), ("sdxl_union", 503)])
+    @patch('app.api.routes.health.torch.cuda.is_available', return_value=False)
+    def test_cuda_checked_only_for_gpu_backend(self, mock_cuda, backend, status_code):
+        """Without CUDA only GPU backends are reported as not ready."""
+        import asyncio
+        from omegaconf import OmegaConf
+        from app.api.routes.health import _collect_detailed, _collect_readiness
+        
+        cfg = OmegaConf.create({"ai_generation": {"backend": {"name": backend}}})
+        with patch('app.api.routes.health.config_holder.cfg', cfg), \
+                patch('app.api.routes.health._check_ai_libraries', return_value={}):
+            response = client.get("/health")
+            readiness = _collect_readiness({})
+            detailed = asyncio.run(_collect_detailed({}))
+        
+        assert response.status_code == status_code
+        assert response.json()["cuda_available"] is False
+        assert readiness["status_code"] == status_code
+        assert readiness["content"]["ready"] is (status_code == 200)
+        assert detailed["status_code"] == status_code
+        if status_code == 200:
+            assert detailed["content"]["status"] == "healthy"
+            assert detailed["content"]["gpu_required"] is False
+            assert detailed["content"]["gpu_status"] is None
+            assert detailed["content"]["errors"] == []
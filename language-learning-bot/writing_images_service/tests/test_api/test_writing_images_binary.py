@@ -0,0 +1,45 @@
+"""
+Tests for error mapping of the binary writing image routes.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes.writing_images import get_validation_service, get_writing_image_service, router
+from app.core.exceptions import GenerationError
+
+ROUTES = ["/api/writing/generate-writing-image-binary", "/api/writing/generate-writing-image-multipart"]
+
+
+@pytest.fixture
+def client_with():
+    def make(error: Exception) -> TestClient:
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        validation = SimpleNamespace(validate_request=AsyncMock(return_value=SimpleNamespace(is_valid=True, errors=[])))
+        service = SimpleNamespace(generate_image=AsyncMock(side_effect=error))
+        app.dependency_overrides[get_validation_service] = lambda: validation
+        app.dependency_overrides[get_writing_image_service] = lambda: service
+        return TestClient(app, raise_server_exceptions=False)
+
+    return make
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_unexpected_error_is_internal_server_error(client_with, route):
+    response = client_with(RuntimeError("CUDA out of memory")).post(route, json={"word": "学"})
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Internal server error"
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_generation_error_keeps_message(client_with, route):
+    response = client_with(GenerationError("pipeline broken")).post(route, json={"word": "学"})
+
+    assert response.status_code == 500
+    assert "pipeline broken" in response.json()["detail"]
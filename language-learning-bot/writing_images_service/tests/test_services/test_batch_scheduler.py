@@ -0,0 +1,167 @@
+"""
+Tests for the micro-batching scheduler with a fake pipeline (CPU only).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+import pytest
+
+from app.utils.batch_scheduler import BatchScheduler
+
+PARAMS = {"width": 512, "height": 512, "num_inference_steps": 30, "guidance_scale": 5.0}
+CONTROLS = {"canny": "canny-image", "depth": "depth-image"}
+
+
+class FakePipeline:
+    """Records batch compositions and returns one image per prompt."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+
+    async def run_batch(self, items):
+        self.batches.append([item.prompt for item in items])
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return [f"image:{item.prompt}:{item.seed}" for item in items]
+
+
+@dataclass
+class TextItem:
+    """Non-diffusion item, like a translation request."""
+    text: str
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class TestBatchScheduler:
+
+    @pytest.mark.asyncio
+    async def test_requests_within_window_share_a_batch(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=4, max_wait_ms=30)
+        try:
+            results = await asyncio.gather(*[
+                scheduler.submit(f"p{index}", CONTROLS, seed=index, **PARAMS) for index in range(3)
+            ])
+
+            assert results == ["image:p0:0", "image:p1:1", "image:p2:2"]
+            assert pipeline.batches == [["p0", "p1", "p2"]]
+            assert scheduler.get_stats()["avg_batch_size"] == 3
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_incompatible_requests_are_not_batched(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=4, max_wait_ms=20)
+        try:
+            await asyncio.gather(
+                scheduler.submit("small", CONTROLS, **PARAMS),
+                scheduler.submit("large", CONTROLS, **{**PARAMS, "width": 1024, "height": 1024}),
+                scheduler.submit("steps", CONTROLS, **{**PARAMS, "num_inference_steps": 20}),
+                scheduler.submit("controls", {"canny": "canny-image"}, **PARAMS),
+            )
+
+            assert sorted(pipeline.batches) == [["controls"], ["large"], ["small"], ["steps"]]
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_runs_without_waiting_for_window(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=2, max_wait_ms=5000)
+        try:
+            results = await asyncio.wait_for(asyncio.gather(
+                scheduler.submit("a", CONTROLS, **PARAMS),
+                scheduler.submit("b", CONTROLS, **PARAMS),
+            ), timeout=1)
+
+            assert len(results) == 2
+            assert pipeline.batches == [["a", "b"]]
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_overflow_is_split_into_batches(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=2, max_wait_ms=20)
+        try:
+            await asyncio.gather(*[scheduler.submit(f"p{index}", CONTROLS, **PARAMS) for index in range(5)])
+
+            assert [len(batch) for batch in pipeline.batches] == [2, 2, 1]
+            assert scheduler.get_stats()["items"] == 5
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_single_request_latency_is_bounded_by_window(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=4, max_wait_ms=20)
+        try:
+            started = asyncio.get_running_loop().time()
+            await scheduler.submit("alone", CONTROLS, **PARAMS)
+
+            assert asyncio.get_running_loop().time() - started < 0.2
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_is_dropped_from_batch(self):
+        pipeline = FakePipeline()
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=4, max_wait_ms=30)
+        try:
+            gone = asyncio.create_task(scheduler.submit("gone", CONTROLS, **PARAMS))
+            kept = asyncio.create_task(scheduler.submit("kept", CONTROLS, **PARAMS))
+            await asyncio.sleep(0)
+            gone.cancel()
+
+            assert await kept == "image:kept:None"
+            assert pipeline.batches == [["kept"]]
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_is_reported_to_every_request(self):
+        pipeline = FakePipeline(fail=True)
+        scheduler = BatchScheduler(pipeline.run_batch, max_batch_size=4, max_wait_ms=10)
+        try:
+            results = await asyncio.gather(
+                scheduler.submit("a", CONTROLS, **PARAMS),
+                scheduler.submit("b", CONTROLS, **PARAMS),
+                return_exceptions=True
+            )
+
+            assert all(isinstance(result, RuntimeError) for result in results)
+            assert scheduler.get_stats()["failed_batches"] == 1
+
+            # Планировщик продолжает работать после ошибки
+            pipeline.fail = False
+            assert await scheduler.submit("c", CONTROLS, **PARAMS) == "image:c:None"
+        finally:
+            await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_submit_item_groups_arbitrary_items_by_key(self):
+        batches = []
+
+        async def run_batch(items):
+            batches.append([item.text for item in items])
+            return [item.text.upper() for item in items]
+
+        scheduler = BatchScheduler(run_batch, max_batch_size=8, max_wait_ms=20)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.gather(*[
+                scheduler.submit_item(key, TextItem(text, loop.create_future()))
+                for key, text in [("beams=4", "a"), ("beams=1", "b"), ("beams=4", "c")]
+            ])
+
+            assert results == ["A", "B", "C"]
+            assert sorted(batches) == [["a", "c"], ["b"]]
+        finally:
+            await scheduler.stop()
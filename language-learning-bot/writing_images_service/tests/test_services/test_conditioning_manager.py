@@ -0,0 +1,112 @@
+"""
+Tests for the parallel (multi) conditioning mode.
+"""
+
+import asyncio
+import time
+
+import pytest
+from PIL import Image
+
+from app.ai.conditioning.base_conditioning import ConditioningResult
+from app.ai.core.conditioning_manager import ConditioningManager
+from app.ai.core.generation_config import AIGenerationConfig
+
+# Задержка каждой карты (с); None - ошибка генерации
+DELAYS = {"canny": 0.1, "depth": 0.1, "scribble": 0.1, "segmentation": None}
+
+
+def make_manager(monkeypatch, delays=DELAYS, **config) -> ConditioningManager:
+    manager = ConditioningManager(AIGenerationConfig(conditioning_workers=0, **config))
+
+    async def fake_generate(conditioning_type, base_image, method):
+        delay = delays[conditioning_type]
+        if delay is None:
+            return ConditioningResult(success=False, error_message="broken")
+        await asyncio.sleep(delay)
+        return ConditioningResult(success=True, image=base_image.copy(), method_used=method)
+
+    monkeypatch.setattr(manager, "_generate", fake_generate)
+    return manager
+
+
+@pytest.fixture
+def base_image():
+    return Image.new("RGB", (64, 64), "white")
+
+
+class TestMultiConditioning:
+
+    @pytest.mark.asyncio
+    async def test_latency_is_slowest_map_not_sum(self, monkeypatch, base_image):
+        manager = make_manager(monkeypatch, conditioning_mode="multi",
+                               conditioning_types=["canny", "depth", "scribble"])
+
+        started = time.perf_counter()
+        images = await manager.generate_all_conditioning(base_image, "水")
+        elapsed = time.perf_counter() - started
+
+        assert set(images) == {"canny", "depth", "scribble"}
+        assert all(image is not None for methods in images.values() for image in methods.values())
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_timed_out_and_failed_types_are_skipped(self, monkeypatch, base_image):
+        manager = make_manager(
+            monkeypatch, delays={**DELAYS, "depth": 1.0},
+            conditioning_mode="multi", conditioning_types=["canny", "depth", "segmentation"],
+            conditioning_timeout_ms=300
+        )
+
+        started = time.perf_counter()
+        images = await manager.generate_all_conditioning(base_image, "水")
+
+        assert time.perf_counter() - started < 0.6
+        assert list(images["canny"].values())[0] is not None
+        assert list(images["depth"].values()) == [None]
+        assert list(images["segmentation"].values()) == [None]
+        status = await manager.get_status()
+        assert status["timeouts"] == {"depth": 1}
+        assert status["failures"] == {"segmentation": 1}
+
+    @pytest.mark.asyncio
+    async def test_per_type_timeout_override(self, monkeypatch, base_image):
+        manager = make_manager(
+            monkeypatch, conditioning_mode="multi", conditioning_types=["canny", "depth"],
+            conditioning_timeout_ms=300, conditioning_type_timeouts_ms={"depth": 20}
+        )
+
+        images = await manager.generate_all_conditioning(base_image, "水")
+
+        assert list(images["canny"].values())[0] is not None
+        assert list(images["depth"].values()) == [None]
+
+    @pytest.mark.asyncio
+    async def test_error_when_no_map_is_ready(self, monkeypatch, base_image):
+        manager = make_manager(monkeypatch, conditioning_mode="multi", conditioning_types=["segmentation"])
+
+        with pytest.raises(RuntimeError):
+            await manager.generate_all_conditioning(base_image, "水")
+
+    @pytest.mark.asyncio
+    async def test_requested_methods_and_unknown_types(self, monkeypatch, base_image):
+        manager = make_manager(monkeypatch, conditioning_mode="multi", conditioning_types=["canny", "unknown"])
+
+        images = await manager.generate_all_conditioning(base_image, "水", {"canny": "opencv_canny"})
+
+        assert list(images) == ["canny"]
+        assert list(images["canny"]) == ["opencv_canny"]
+
+
+@pytest.mark.asyncio
+async def test_single_mode_uses_one_type(monkeypatch, base_image):
+    manager = make_manager(monkeypatch, delays={**DELAYS, "segmentation": 0.0})
+
+    images = await manager.generate_all_conditioning(base_image, "水")
+
+    assert len(images) == 1
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        ConditioningManager(AIGenerationConfig(conditioning_workers=0, conditioning_mode="all"))
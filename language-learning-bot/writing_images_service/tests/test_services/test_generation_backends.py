@@ -0,0 +1,142 @@
+"""
+Tests for the generation backend registry and the deterministic CPU backend.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.ai.backends import available_backends, create_backend, get_backend_class, register_backend
+from app.ai.backends import base
+from app.ai.backends.base import GenerationBackend
+from app.ai.backends.cpu_backend import CPUBackend
+from app.ai.core.generation_config import AIGenerationConfig
+from app.ai.core.model_manager import ModelManager
+
+PARAMS = {"width": 128, "height": 128, "num_inference_steps": 30, "guidance_scale": 5.0,
+          "controlnet_conditioning_scale": 1.0}
+
+
+def control_image(size: int = 128) -> Image.Image:
+    """Белый квадрат на черном фоне, как контур иероглифа на карте canny."""
+    image = Image.new("RGB", (size, size))
+    ImageDraw.Draw(image).rectangle((size // 4, size // 4, size // 2, size // 2), fill="white")
+    return image
+
+
+def cpu_config(**options) -> AIGenerationConfig:
+    return AIGenerationConfig(width=128, height=128, backend="cpu", backend_options=options)
+
+
+class TestRegistry:
+
+    def test_builtin_backends(self):
+        assert {"cpu", "sdxl_union"} <= set(available_backends())
+        assert get_backend_class("cpu") is CPUBackend
+        assert not CPUBackend.requires_gpu
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_backend_class("missing")
+
+    def test_register_custom_backend(self, monkeypatch):
+        monkeypatch.setattr(base, "_BACKENDS", dict(base._BACKENDS))
+
+        class ConstantBackend(GenerationBackend):
+            name = "constant"
+
+            async def load(self):
+                pass
+
+            async def unload(self):
+                pass
+
+            def is_ready(self):
+                return True
+
+            async def generate(self, prompt, control_images, seed=None, **generation_params):
+                return Image.new("RGB", (generation_params["width"], generation_params["height"]))
+
+        register_backend("constant", ConstantBackend)
+        backend = create_backend(AIGenerationConfig(backend="constant", backend_options={"color": "red"}))
+
+        assert isinstance(backend, ConstantBackend)
+        assert backend.options == {"color": "red"}
+        images = asyncio.run(backend.generate_batch(["a", "b"], [{}, {}], [1, 2], **PARAMS))
+        assert [image.size for image in images] == [(128, 128), (128, 128)]
+
+
+class TestCPUBackend:
+
+    @pytest.mark.asyncio
+    async def test_deterministic_by_prompt_and_seed(self):
+        backend = create_backend(cpu_config())
+        await backend.load()
+        controls = {"canny": control_image()}
+
+        first = await backend.generate("a cat", controls, seed=7, **PARAMS)
+        again = await backend.generate("a cat", controls, seed=7, **PARAMS)
+        other_seed = await backend.generate("a cat", controls, seed=8, **PARAMS)
+        other_prompt = await backend.generate("a dog", controls, seed=7, **PARAMS)
+
+        assert first.size == (128, 128)
+        assert first.tobytes() == again.tobytes()
+        assert first.tobytes() != other_seed.tobytes()
+        assert first.tobytes() != other_prompt.tobytes()
+
+    @pytest.mark.asyncio
+    async def test_conditioning_is_visible(self):
+        backend = create_backend(cpu_config())
+        await backend.load()
+
+        pixels = np.asarray(await backend.generate("a cat", {"canny": control_image()}, seed=1, **PARAMS))
+        inside = pixels[40:60, 40:60].mean()
+        outside = pixels[100:120, 100:120].mean()
+        assert inside < outside
+
+        no_control = np.asarray(await backend.generate(
+            "a cat", {"canny": control_image()}, seed=1, **{**PARAMS, "controlnet_conditioning_scale": 0.0}
+        ))
+        assert abs(no_control[40:60, 40:60].mean() - outside) < abs(inside - outside)
+
+    @pytest.mark.asyncio
+    async def test_artificial_latency(self):
+        backend = create_backend(cpu_config(latency_ms=30, latency_per_image_ms=10, run_in_thread=True))
+        await backend.load()
+
+        started = time.perf_counter()
+        images = await backend.generate_batch(["a", "b"], [{}, {}], [1, 2], **PARAMS)
+
+        assert len(images) == 2
+        assert time.perf_counter() - started >= 0.05
+        assert backend.get_status()["batch_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_loaded(self):
+        with pytest.raises(RuntimeError):
+            await create_backend(cpu_config()).generate("a", {}, seed=1, **PARAMS)
+
+
+@pytest.mark.asyncio
+async def test_model_manager_batches_requests_on_cpu_backend():
+    config = AIGenerationConfig(width=128, height=128, batch_size=4, batch_window_ms=20,
+                                backend="cpu", backend_options={"latency_ms": 20})
+    manager = ModelManager(config)
+    await manager.ensure_models_loaded()
+    try:
+        conditioning = {"canny": {"opencv_canny": control_image()}}
+        images = await asyncio.gather(*(
+            manager.run_generation(f"prompt {index}", conditioning, seed=index, width=128, height=128)
+            for index in range(4)
+        ))
+
+        assert [image.size for image in images] == [(128, 128)] * 4
+        status = await manager.get_status()
+        assert status["backend"] == "cpu"
+        assert status["backend_status"]["generation_count"] == 4
+        assert status["batching"]["batches"] < 4
+    finally:
+        await manager.cleanup()
@@ -0,0 +1,140 @@
+"""
+Tests for the generation job queue with a stub pipeline (CPU only).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.routes.models.requests import AIImageRequest
+from app.api.routes.models.responses import GenerationStatus
+from app.api.routes.services.generation_queue import GenerationQueue
+from app.core.exceptions import RateLimitError
+
+
+class StubPipeline:
+    """Pipeline stub: records call order and finishes when released."""
+
+    def __init__(self, delay: float = 0.0, fail_words=()):
+        self.delay = delay
+        self.fail_words = set(fail_words)
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def generate_image(self, request):
+        self.calls.append(request.word)
+        await self.release.wait()
+        await asyncio.sleep(self.delay)
+        if request.word in self.fail_words:
+            return SimpleNamespace(success=False, error="stub failure")
+        return SimpleNamespace(success=True, error=None, image_data_base64=f"img:{request.word}")
+
+
+@asynccontextmanager
+async def running_queue(pipeline, **kwargs):
+    queue = GenerationQueue(pipeline, **kwargs)
+    await queue.start()
+    try:
+        yield queue
+    finally:
+        await queue.stop()
+
+
+class TestGenerationQueue:
+
+    @pytest.mark.asyncio
+    async def test_submit_and_result(self):
+        pipeline = StubPipeline()
+        async with running_queue(pipeline) as queue:
+            job = queue.submit(AIImageRequest(word="学"))
+            finished = await queue.wait(job.job_id, timeout=2)
+
+            assert finished.status == GenerationStatus.SUCCESS
+            assert finished.result.image_data_base64 == "img:学"
+            assert finished.wait_time_ms is not None
+            assert queue.get_metrics()["counters"]["succeeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_generation(self):
+        async with running_queue(StubPipeline(fail_words={"错"})) as queue:
+            job = queue.submit(AIImageRequest(word="错"))
+            finished = await queue.wait(job.job_id, timeout=2)
+
+            assert finished.status == GenerationStatus.FAILED
+            assert finished.error == "stub failure"
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        pipeline = StubPipeline()
+        pipeline.release.clear()
+        async with running_queue(pipeline, workers=1) as queue:
+            first = queue.submit(AIImageRequest(word="一"))
+            await asyncio.sleep(0.01)  # воркер забирает первое задание и ждет release
+            low = queue.submit(AIImageRequest(word="低"), priority=0)
+            high = queue.submit(AIImageRequest(word="高"), priority=5)
+            assert queue.position(high) == 1
+            assert queue.position(low) == 2
+
+            pipeline.release.set()
+            await queue.wait(low.job_id, timeout=2)
+
+            assert pipeline.calls == ["一", "高", "低"]
+            assert first.status == GenerationStatus.SUCCESS
+
+    @pytest.mark.asyncio
+    async def test_queue_full_raises_with_retry_after(self):
+        pipeline = StubPipeline()
+        pipeline.release.clear()
+        async with running_queue(pipeline, max_queue_size=2, workers=1, default_job_time_seconds=3) as queue:
+            queue.submit(AIImageRequest(word="一"))
+            await asyncio.sleep(0.01)
+            queue.submit(AIImageRequest(word="二"))
+            queue.submit(AIImageRequest(word="三"))
+
+            with pytest.raises(RateLimitError) as exc_info:
+                queue.submit(AIImageRequest(word="四"))
+
+            assert exc_info.value.retry_after == 9
+            metrics = queue.get_metrics()
+            assert metrics["queue_depth"] == 2
+            assert metrics["running"] == 1
+            assert metrics["counters"]["rejected"] == 1
+            pipeline.release.set()
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_and_running(self):
+        pipeline = StubPipeline()
+        pipeline.release.clear()
+        async with running_queue(pipeline, workers=1) as queue:
+            running = queue.submit(AIImageRequest(word="跑"))
+            await asyncio.sleep(0.01)
+            queued = queue.submit(AIImageRequest(word="等"))
+
+            assert queue.cancel(queued.job_id) is True
+            assert queued.status == GenerationStatus.CANCELLED
+            assert queue.cancel(running.job_id) is True
+            await queue.wait(running.job_id, timeout=2)
+
+            assert running.status == GenerationStatus.CANCELLED
+            assert queue.cancel(running.job_id) is False
+            assert queue.get_metrics()["queue_depth"] == 0
+
+            # Воркер продолжает обрабатывать задания после отмены
+            pipeline.release.set()
+            job = queue.submit(AIImageRequest(word="后"))
+            finished = await queue.wait(job.job_id, timeout=2)
+            assert finished.status == GenerationStatus.SUCCESS
+            assert "等" not in pipeline.calls
+
+    @pytest.mark.asyncio
+    async def test_parallel_workers(self):
+        async with running_queue(StubPipeline(delay=0.1), workers=3) as queue:
+            jobs = [queue.submit(AIImageRequest(word=str(number))) for number in range(3)]
+            started = asyncio.get_running_loop().time()
+            for job in jobs:
+                await queue.wait(job.job_id, timeout=2)
+
+            assert asyncio.get_running_loop().time() - started < 0.25
@@ -0,0 +1,85 @@
+"""
+Tests for the background health sampler.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.health_sampler import HealthSampler
+
+
+class Collector:
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("gpu gone")
+        return {"calls": self.calls}
+
+
+class TestHealthSampler:
+
+    @pytest.mark.asyncio
+    async def test_start_collects_first_snapshot(self):
+        collector = Collector()
+        sampler = HealthSampler(collector, interval_seconds=60)
+
+        assert sampler.snapshot is None and sampler.age_seconds() is None
+        await sampler.start()
+        try:
+            assert sampler.snapshot == {"calls": 1}
+            assert 0 <= sampler.age_seconds() < 1
+            assert sampler.running
+        finally:
+            await sampler.stop()
+        assert not sampler.running
+
+    @pytest.mark.asyncio
+    async def test_samples_in_background_independent_of_readers(self):
+        collector = Collector()
+        sampler = HealthSampler(collector, interval_seconds=0.02)
+        await sampler.start()
+        try:
+            # Чтение снимка ничего не собирает
+            for _ in range(100):
+                assert sampler.snapshot is not None
+            assert collector.calls == 1
+            await asyncio.sleep(0.1)
+            assert collector.calls >= 3
+        finally:
+            await sampler.stop()
+        calls = collector.calls
+        await asyncio.sleep(0.05)
+        assert collector.calls == calls
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_previous_snapshot(self):
+        collector = Collector()
+        sampler = HealthSampler(collector)
+        await sampler.sample()
+
+        collector.fail = True
+        await sampler.sample()
+
+        assert sampler.snapshot == {"calls": 1}
+        assert "gpu gone" in sampler.error
+        assert sampler.get_stats()["failures"] == 1
+
+        collector.fail = False
+        await sampler.sample()
+        assert sampler.error is None
+        assert sampler.snapshot == {"calls": 3}
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        sampler = HealthSampler(Collector(delay=1.0), timeout_seconds=0.02)
+
+        assert await sampler.sample() is None
+        assert "timed out" in sampler.error
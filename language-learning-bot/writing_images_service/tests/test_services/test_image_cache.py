@@ -0,0 +1,120 @@
+"""
+Tests for the content-addressed image cache (disk only, no models).
+"""
+
+import json
+import os
+
+import pytest
+
+from app.api.routes.models.requests import AIImageRequest
+from app.api.routes.services.image_cache import ImageCache, request_cache_key
+
+MODEL = {"base_model": "stub", "controlnet_models": {"union": "stub"}, "width": 1024, "height": 1024}
+
+
+def payload(image: str, size: int = 0):
+    return {"image_data_base64": image + "x" * size, "metadata": {"seed_used": None}}
+
+
+class TestRequestCacheKey:
+
+    def test_normalizes_whitespace(self):
+        first = request_cache_key(AIImageRequest(word="学习", translation="to  study "), MODEL)
+        second = request_cache_key(AIImageRequest(word=" 学习", translation="to study"), MODEL)
+        assert first == second
+
+    def test_depends_on_request_model_and_version(self):
+        request = AIImageRequest(word="学习", translation="to study")
+        key = request_cache_key(request, MODEL)
+
+        assert key != request_cache_key(AIImageRequest(word="学习", translation="learn"), MODEL)
+        assert key != request_cache_key(request, {**MODEL, "base_model": "other"})
+        assert key != request_cache_key(request, MODEL, cache_version=2)
+
+    def test_ignores_seed(self):
+        assert request_cache_key(AIImageRequest(word="学", seed=1), MODEL) == \
+            request_cache_key(AIImageRequest(word="学", seed=2), MODEL)
+
+
+class TestImageCache:
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_by_seed(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        await cache.put("ab" * 32, 42, payload("img42"))
+
+        assert (await cache.get("ab" * 32, 42))["image_data_base64"] == "img42"
+        assert await cache.get("ab" * 32, 7) is None
+        assert await cache.get("cd" * 32, 42) is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["entries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_variants_only_when_allowed(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024, max_variants=2)
+        key = "ab" * 32
+        for index in range(3):
+            await cache.put(key, None, payload(f"variant{index}"))
+
+        assert await cache.get(key, None) is None
+        cached = await cache.get(key, None, allow_variant=True)
+        # Самый старый вариант вытеснен ограничением max_variants
+        assert cached["image_data_base64"] in ("variant1", "variant2")
+        assert cache.get_stats()["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_variant_lookup_reuses_seeded_entries(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        key = "ab" * 32
+        await cache.put(key, 42, payload("pregenerated"))
+
+        assert await cache.get(key, None) is None
+        assert (await cache.get(key, None, allow_variant=True))["image_data_base64"] == "pregenerated"
+        assert await cache.get("cd" * 32, None, allow_variant=True) is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_over_budget(self, tmp_path):
+        entry_size = len(json.dumps(payload("a", size=300)).encode("utf-8"))
+        cache = ImageCache(str(tmp_path), max_size_bytes=entry_size * 2 + 10)
+
+        await cache.put("aa" * 32, 1, payload("a", size=300))
+        await cache.put("bb" * 32, 1, payload("b", size=300))
+        await cache.get("aa" * 32, 1)  # aa становится недавно использованным
+        await cache.put("cc" * 32, 1, payload("c", size=300))
+
+        assert await cache.get("bb" * 32, 1) is None
+        assert await cache.get("aa" * 32, 1) is not None
+        assert await cache.get("cc" * 32, 1) is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["size_bytes"] <= cache.max_size_bytes
+
+    @pytest.mark.asyncio
+    async def test_index_survives_restart(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        await cache.put("ab" * 32, 5, payload("persisted"))
+
+        reopened = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        assert (await reopened.get("ab" * 32, 5))["image_data_base64"] == "persisted"
+
+    @pytest.mark.asyncio
+    async def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        await cache.put("ab" * 32, 1, payload("one"))
+        await cache.put("ab" * 32, 1, payload("two"))
+
+        files = [name for _, _, names in os.walk(tmp_path) for name in names]
+        assert files == [f"{'ab' * 32}.s1.json"]
+        assert (await cache.get("ab" * 32, 1))["image_data_base64"] == "two"
+
+    @pytest.mark.asyncio
+    async def test_corrupted_entry_is_a_miss(self, tmp_path):
+        cache = ImageCache(str(tmp_path), max_size_bytes=1024 * 1024)
+        await cache.put("ab" * 32, 1, payload("one"))
+        (tmp_path / "ab" / f"{'ab' * 32}.s1.json").write_text("{broken")
+
+        assert await cache.get("ab" * 32, 1) is None
+        assert cache.get_stats()["entries"] == 0
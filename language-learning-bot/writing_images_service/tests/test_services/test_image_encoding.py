@@ -0,0 +1,87 @@
+"""
+Tests for Accept negotiation, WebP/PNG encoding and multipart bodies.
+"""
+
+import base64
+import email
+import io
+import json
+
+import pytest
+from PIL import Image
+
+from app.utils.image_encoding import (
+    build_multipart,
+    encode_image,
+    image_to_base64,
+    json_part,
+    negotiate_image_format,
+    transcode_base64_png,
+)
+
+
+@pytest.fixture
+def image():
+    image = Image.new("RGB", (64, 48), "white")
+    for x in range(10, 50):
+        image.putpixel((x, 20), (0, 0, 0))
+    return image
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "png"),
+    ("", "png"),
+    ("application/json", "png"),
+    ("image/webp", "webp"),
+    ("image/png", "png"),
+    ("image/*", "webp"),
+    ("*/*", "png"),
+    ("image/png, image/webp;q=0.5", "png"),
+    ("multipart/mixed, image/webp;q=0.9, image/png;q=0.8", "webp"),
+    ("image/webp;q=0, image/*", "png"),
+    ("image/jpeg", None),
+    ("image/*;q=0", None),
+])
+def test_negotiate_image_format(accept, expected):
+    assert negotiate_image_format(accept) == expected
+
+
+@pytest.mark.parametrize("image_format", ["webp", "png"])
+def test_encode_image_round_trip(image, image_format):
+    data = encode_image(image, image_format)
+
+    with Image.open(io.BytesIO(data)) as decoded:
+        assert decoded.format == image_format.upper()
+        assert decoded.size == image.size
+
+
+def test_encode_unknown_format_raises(image):
+    with pytest.raises(ValueError):
+        encode_image(image, "gif")
+
+
+def test_transcode_keeps_png_bytes_and_converts_to_webp(image):
+    data_base64 = image_to_base64(image)
+
+    assert transcode_base64_png(data_base64, "png") == base64.b64decode(data_base64)
+    with Image.open(io.BytesIO(transcode_base64_png(data_base64, "webp"))) as decoded:
+        assert decoded.format == "WEBP"
+
+
+def test_build_multipart_parts(image):
+    webp = encode_image(image, "webp")
+    body, content_type = build_multipart([
+        json_part({"word": "学", "format": "webp"}),
+        ("generated_image", "image/webp", webp),
+        ("conditioning/canny/opencv_canny", "image/webp", webp),
+    ])
+
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    parts = message.get_payload()
+
+    assert [part.get_param("name", header="content-disposition") for part in parts] == [
+        "metadata", "generated_image", "conditioning/canny/opencv_canny"
+    ]
+    assert json.loads(parts[0].get_payload(decode=True)) == {"word": "学", "format": "webp"}
+    assert parts[1].get_payload(decode=True) == webp
+    assert parts[2].get_filename() == "conditioning_canny_opencv_canny.webp"
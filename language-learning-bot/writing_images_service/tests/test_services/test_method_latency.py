@@ -0,0 +1,53 @@
+"""
+Tests for latency-budget weighting of conditioning methods.
+"""
+
+import json
+
+import pytest
+
+from app.utils.method_latency import MethodLatencyTable
+
+RESULTS = {
+    "512": {
+        "canny": {
+            "fast": {"p50_ms": 20, "p90_ms": 40, "failure_rate": 0.0},
+            "slow": {"p50_ms": 300, "p90_ms": 400, "failure_rate": 0.0},
+            "broken": {"p50_ms": None, "p90_ms": None, "failure_rate": 1.0},
+        }
+    },
+    "1024": {
+        "canny": {
+            "fast": {"p50_ms": 80, "p90_ms": 160, "failure_rate": 0.0},
+            "slow": {"p50_ms": 1200, "p90_ms": 1600, "failure_rate": 0.0},
+        }
+    },
+}
+
+
+@pytest.fixture
+def table():
+    return MethodLatencyTable(RESULTS)
+
+
+class TestMethodLatencyTable:
+
+    def test_methods_within_budget_keep_full_weight(self, table):
+        assert table.weights("canny", ["fast", "slow"], 512, budget_ms=100) == [1.0, 0.25]
+
+    def test_nearest_resolution_is_used(self, table):
+        assert table.weights("canny", ["fast", "slow"], 900, budget_ms=160) == [1.0, 0.1]
+
+    def test_failing_and_unknown_methods(self, table):
+        assert table.weights("canny", ["broken", "unmeasured"], 512, budget_ms=100) == [0.0, 1.0]
+        assert table.weights("depth", ["any"], 512, budget_ms=100) == [1.0]
+
+    def test_all_excluded_falls_back_to_uniform(self, table):
+        assert table.weights("canny", ["broken"], 512, budget_ms=100) == [1.0]
+
+    def test_load_benchmark_report(self, tmp_path):
+        path = tmp_path / "conditioning.json"
+        path.write_text(json.dumps({"config": {}, "results": RESULTS}))
+
+        assert MethodLatencyTable.load(str(path)).stats_for("canny", "fast", 512)["p90_ms"] == 40
+        assert MethodLatencyTable.load(str(tmp_path / "missing.json")) is None
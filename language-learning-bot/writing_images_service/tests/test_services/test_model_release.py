@@ -0,0 +1,107 @@
+"""
+Tests for releasing models after generation when several generations share one service
+and for the model version in the image cache key.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.api.routes.models.requests import AIImageRequest
+from app.api.routes.services.writing_image_service import WritingImageService
+
+
+class StubGenerator:
+    """AIImageGenerator stub: records whether cleanup ran while a generation was in progress."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.running = 0
+        self.cleanups = 0
+        self.cleaned_while_running = False
+
+    async def generate_character_image(self, character, translation, **kwargs):
+        self.running += 1
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return SimpleNamespace(
+            success=True,
+            generated_image=Image.new("RGB", (8, 8)),
+            base_image=None,
+            conditioning_images=None,
+            prompt_used="stub",
+            generation_metadata={"generation_time_ms": 1},
+        )
+
+    async def cleanup(self):
+        self.cleanups += 1
+        self.cleaned_while_running |= self.running > 0
+
+
+@pytest.fixture
+def service():
+    service = WritingImageService()
+    service.release_models_after_generation = True
+
+    async def initialize():
+        if service.ai_generator is None:
+            service.ai_generator = StubGenerator(service.stub_delay)
+            service.generators.append(service.ai_generator)
+        service._ai_initialized = True
+
+    service.stub_delay = 0.05
+    service.generators = []
+    service._ensure_ai_initialized = initialize
+    return service
+
+
+async def generate(service, word, delay=0.0):
+    await asyncio.sleep(delay)
+    return await service._generate(AIImageRequest(word=word), None, "key", 0.0)
+
+
+@pytest.mark.asyncio
+async def test_models_released_once_after_concurrent_generations(service):
+    results = await asyncio.gather(generate(service, "学"), generate(service, "写", delay=0.02))
+
+    assert all(result.success for result in results)
+    generator = service.generators[0]
+    assert len(service.generators) == 1
+    assert generator.cleanups == 1
+    assert not generator.cleaned_while_running
+    assert service.ai_generator is None
+
+
+@pytest.mark.asyncio
+async def test_models_kept_when_release_disabled(service):
+    service.release_models_after_generation = False
+
+    await generate(service, "学")
+
+    assert service.generators[0].cleanups == 0
+    assert service.ai_generator is service.generators[0]
+
+
+def test_multi_mode_version_lists_resolved_types(service):
+    service.ai_config.conditioning_mode = "multi"
+    service.ai_config.conditioning_types = None
+    default_version = service._model_version()
+
+    service.ai_config.conditioning_types = ["segmentation", "scribble", "depth", "canny"]
+
+    assert default_version["conditioning"]["types"] == ["canny", "depth", "scribble", "segmentation"]
+    assert service._model_version() == default_version
+
+
+def test_cache_key_depends_on_model_and_cache_version(service):
+    request = AIImageRequest(word="学")
+    key = service.cache_key_for(request)
+
+    assert key == service.cache_key_for(AIImageRequest(word="学"))
+    assert key != service.cache_key_for(request, SimpleNamespace(version=2))
+    service.ai_config.conditioning_mode = "multi"
+    assert key != service.cache_key_for(request)
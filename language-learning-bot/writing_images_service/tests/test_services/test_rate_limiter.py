@@ -0,0 +1,102 @@
+"""
+Tests for the GCRA rate limiter with a manual clock.
+"""
+
+import pytest
+
+from app.utils.rate_limiter import GCRARateLimiter, RateLimit, retry_after_header
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return ManualClock()
+
+
+def make_limiter(clock, **kwargs):
+    return GCRARateLimiter(
+        limits={"generation": RateLimit(requests=6, period_seconds=60, burst=2)},
+        default_limit=RateLimit(requests=60, period_seconds=60),
+        clock=clock,
+        **kwargs
+    )
+
+
+def test_burst_then_limited_with_retry_after(clock):
+    limiter = make_limiter(clock)
+
+    first = limiter.check("generation", "client")
+    second = limiter.check("generation", "client")
+    third = limiter.check("generation", "client")
+
+    assert (first.allowed, first.remaining) == (True, 1)
+    assert (second.allowed, second.remaining) == (True, 0)
+    assert not third.allowed
+    # Интервал квоты 10 секунд: следующий запрос возможен через 10 секунд
+    assert third.retry_after == pytest.approx(10.0)
+    assert retry_after_header(third) == "10"
+
+
+def test_quota_refills_at_emission_rate(clock):
+    limiter = make_limiter(clock)
+    for _ in range(2):
+        limiter.check("generation", "client")
+
+    clock.now += 9.9
+    assert not limiter.check("generation", "client").allowed
+    clock.now += 0.1
+    assert limiter.check("generation", "client").allowed
+
+
+def test_limits_are_per_route_and_per_client(clock):
+    limiter = make_limiter(clock)
+    for _ in range(2):
+        limiter.check("generation", "a")
+
+    assert not limiter.check("generation", "a").allowed
+    assert limiter.check("generation", "b").allowed
+    assert limiter.check("health", "a").allowed
+    assert limiter.limit_for("health").requests == 60
+
+
+def test_idle_clients_are_evicted(clock):
+    limiter = make_limiter(clock)
+    for client in range(100):
+        limiter.check("generation", f"client-{client}")
+    assert limiter.get_metrics()["tracked_clients"] == 100
+
+    # Через 10 секунд квота всех клиентов полностью восстановлена
+    clock.now += 10
+    limiter.check("generation", "new")
+
+    metrics = limiter.get_metrics()
+    assert metrics["tracked_clients"] == 1
+    assert metrics["evicted"] == 100
+
+
+def test_max_entries_bounds_state(clock):
+    limiter = make_limiter(clock, max_entries=10)
+    for client in range(50):
+        limiter.check("generation", f"client-{client}")
+
+    assert limiter.get_metrics()["tracked_clients"] == 10
+
+
+def test_metrics_count_decisions_per_route(clock):
+    limiter = make_limiter(clock)
+    for _ in range(5):
+        limiter.check("generation", "client")
+    limiter.check("health", "client")
+
+    metrics = limiter.get_metrics()
+    assert metrics["routes"]["generation"]["allowed"] == 2
+    assert metrics["routes"]["generation"]["limited"] == 3
+    assert metrics["routes"]["health"]["allowed"] == 1
+    assert (metrics["allowed_total"], metrics["limited_total"]) == (3, 3)
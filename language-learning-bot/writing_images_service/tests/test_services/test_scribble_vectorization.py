@@ -0,0 +1,55 @@
+"""
+Vectorized ScribbleConditioning helpers must draw the same pixels as the
+former per-point loops (benchmarks.scribble keeps the loop versions).
+"""
+
+import numpy as np
+import pytest
+
+from app.ai.conditioning.scribble_conditioning import ScribbleConditioning
+from benchmarks.scribble import (
+    loop_add_hand_tremor,
+    loop_draw_pressure_sensitive_line,
+    loop_smooth_contour,
+    spiral_contour,
+)
+
+
+@pytest.fixture(scope="module")
+def scribble():
+    return ScribbleConditioning()
+
+
+@pytest.mark.parametrize("points", [5, 300, 3000])
+def test_smooth_contour_matches_loop(scribble, points):
+    contour = spiral_contour(points, 512)
+
+    assert np.array_equal(scribble._smooth_contour(contour), loop_smooth_contour(contour))
+
+
+@pytest.mark.parametrize("noise_level", [0.5, 1.5, 3.0])
+def test_hand_tremor_matches_loop_with_same_seed(scribble, noise_level):
+    contour = spiral_contour(2000, 512)
+
+    np.random.seed(7)
+    expected = loop_add_hand_tremor(contour, noise_level)
+    np.random.seed(7)
+    actual = scribble._add_hand_tremor(contour, noise_level)
+
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("line_variation", [0.8, 1.2, 3.0])
+def test_pressure_sensitive_line_pixel_difference(scribble, line_variation):
+    contour = spiral_contour(2000, 512)
+    expected = np.full((512, 512), 255, dtype=np.uint8)
+    actual = expected.copy()
+
+    np.random.seed(11)
+    loop_draw_pressure_sensitive_line(expected, contour, line_variation)
+    np.random.seed(11)
+    scribble._draw_pressure_sensitive_line(actual, contour, line_variation)
+
+    # cv2.polylines рисует сегменты теми же примитивами, что и cv2.line
+    assert np.count_nonzero(actual != expected) == 0
+    assert np.count_nonzero(actual == 0) > 0
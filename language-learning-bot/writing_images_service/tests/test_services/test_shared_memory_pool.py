@@ -0,0 +1,65 @@
+"""
+Tests for the shared-memory process pool used by conditioning.
+"""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageOps
+
+from app.utils.shared_memory_pool import SharedMemoryProcessPool, image_from_shared, image_to_shared
+
+
+def invert(image, suffix=""):
+    """Worker function: inverts the image and reports the worker pid."""
+    return ImageOps.invert(image.convert("RGB")), {"pid": os.getpid(), "suffix": suffix}
+
+
+def nothing(image):
+    return None, {"success": False}
+
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+
+class TestSharedImage:
+
+    @pytest.mark.parametrize("mode", ["RGB", "L", "RGBA"])
+    def test_roundtrip(self, mode):
+        image = Image.fromarray(np.random.randint(0, 255, (32, 48, len(mode)), dtype=np.uint8).squeeze()).convert(mode)
+        ref, block = image_to_shared(image)
+        block.close()
+
+        restored = image_from_shared(ref, unlink=True)
+
+        assert restored.mode == mode
+        assert restored.size == (48, 32)
+        assert np.array_equal(np.asarray(restored), np.asarray(image))
+
+
+class TestSharedMemoryProcessPool:
+
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_and_cleans_up(self):
+        blocks_before = shared_blocks()
+        image = Image.new("RGB", (64, 64), (10, 20, 30))
+        pool = SharedMemoryProcessPool(workers=2)
+        try:
+            results = await asyncio.gather(*[pool.run_image(invert, image, suffix="x") for _ in range(4)])
+
+            for result_image, extra in results:
+                assert result_image.getpixel((0, 0)) == (245, 235, 225)
+                assert extra["pid"] != os.getpid()
+                assert extra["suffix"] == "x"
+            assert pool.task_count == 4
+
+            result_image, extra = await pool.run_image(nothing, image)
+            assert result_image is None
+            assert extra == {"success": False}
+        finally:
+            pool.shutdown()
+
+        assert shared_blocks() == blocks_before
@@ -0,0 +1,101 @@
+"""
+Tests for single-flight coalescing of identical requests.
+"""
+
+import asyncio
+
+import pytest
+
+from app.api.routes.services.single_flight import SingleFlight
+
+
+class CountingWork:
+    """Work stub: counts executions and finishes when released."""
+
+    def __init__(self, result="image", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_execution(self):
+        flights = SingleFlight()
+        work = CountingWork()
+        waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert flights.in_flight == 1
+
+        work.release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert results == ["image"] * 5
+        assert work.calls == 1
+        stats = flights.get_stats()
+        assert stats["executions"] == 1
+        assert stats["coalesced"] == 4
+        assert stats["max_waiters"] == 5
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        work = CountingWork()
+        work.release.set()
+
+        await asyncio.gather(flights.run("a", work), flights.run("b", work))
+        assert work.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_work(self):
+        flights = SingleFlight()
+        work = CountingWork()
+        first = asyncio.create_task(flights.run("key", work))
+        second = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        work.release.set()
+
+        assert await second == "image"
+        assert first.cancelled()
+        assert work.calls == 1
+        assert flights.get_stats()["cancelled_waiters"] == 1
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_next_call_retries(self):
+        flights = SingleFlight()
+        failing = CountingWork(error=RuntimeError("boom"))
+        waiters = [asyncio.create_task(flights.run("key", failing)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        failing.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        work = CountingWork()
+        work.release.set()
+        assert await flights.run("key", work) == "image"
+        assert flights.get_stats()["executions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_saved_time_counts_followers(self):
+        flights = SingleFlight()
+        work = CountingWork()
+        waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        work.release.set()
+        await asyncio.gather(*waiters)
+
+        assert flights.get_stats()["saved_time_ms"] >= 2 * 40
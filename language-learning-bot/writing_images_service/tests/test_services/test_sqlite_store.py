@@ -0,0 +1,46 @@
+"""
+Tests for the SQLite key-value store behind the translation cache.
+"""
+
+import sqlite3
+
+from app.utils.sqlite_store import SQLiteKeyValueStore
+
+
+class TestSQLiteKeyValueStore:
+
+    def test_items_are_ordered_by_sort_key(self, tmp_path):
+        store = SQLiteKeyValueStore(tmp_path / "cache.sqlite3")
+        store.write_batch({"b": ({"text": "two"}, 2.0), "a": ({"text": "one"}, 1.0), "c": ({"text": "три"}, 3.0)})
+
+        assert store.items() == [("a", {"text": "one"}), ("b", {"text": "two"}), ("c", {"text": "три"})]
+        store.close()
+
+    def test_batch_upserts_and_deletes(self, tmp_path):
+        store = SQLiteKeyValueStore(tmp_path / "cache.sqlite3")
+        store.write_batch({"a": ({"v": 1}, 1.0), "b": ({"v": 2}, 2.0)})
+        store.write_batch({"a": ({"v": 10}, 5.0)}, deletes=["b"])
+
+        assert store.items() == [("a", {"v": 10})]
+        assert store.count() == 1
+        store.close()
+
+    def test_data_survives_reopen_in_wal_mode(self, tmp_path):
+        path = tmp_path / "cache.sqlite3"
+        store = SQLiteKeyValueStore(path)
+        store.write_batch({"a": ({"v": 1}, 1.0)})
+        store.close()
+
+        reopened = SQLiteKeyValueStore(path)
+        assert reopened.items() == [("a", {"v": 1})]
+        reopened.close()
+
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_empty_batch_is_a_no_op(self, tmp_path):
+        store = SQLiteKeyValueStore(tmp_path / "cache.sqlite3")
+        store.write_batch({}, deletes=[])
+
+        assert store.count() == 0
+        store.close()
@@ -0,0 +1,93 @@
+"""
+Tests for the generation stage dependency graph.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.stage_graph import StageGraph
+
+
+def delayed(value, delay=0.05, log=None, name=None):
+    async def stage(**dependencies):
+        if log is not None:
+            log.append(("start", name))
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(("end", name))
+        return (value, dependencies) if dependencies else value
+    return stage
+
+
+class TestStageGraph:
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        graph = (
+            StageGraph()
+            .add("preprocess", delayed("base"))
+            .add("conditioning", delayed("controls"), depends_on=["preprocess"])
+            .add("translation", delayed("study"))
+            .add("hint_translation", delayed("hint"))
+        )
+        started = asyncio.get_running_loop().time()
+        results = await graph.run()
+        elapsed = asyncio.get_running_loop().time() - started
+
+        # preprocess + conditioning (0.1s) параллельно с переводами (0.05s)
+        assert elapsed < 0.14
+        assert results["conditioning"] == ("controls", {"preprocess": "base"})
+        assert graph.timings["translation"]["start_ms"] < 10
+        assert graph.timings["conditioning"]["start_ms"] >= 45
+
+    @pytest.mark.asyncio
+    async def test_dependencies_receive_results(self):
+        graph = (
+            StageGraph()
+            .add("translation", delayed("study", 0))
+            .add("hint_translation", delayed("hint", 0))
+            .add("prompt", delayed("prompt", 0), depends_on=["translation", "hint_translation"])
+        )
+        results = await graph.run()
+
+        assert results["prompt"] == ("prompt", {"translation": "study", "hint_translation": "hint"})
+        assert set(graph.get_durations_ms()) == {"translation", "hint_translation", "prompt"}
+
+    @pytest.mark.asyncio
+    async def test_dependent_stage_waits(self):
+        log = []
+        graph = (
+            StageGraph()
+            .add("conditioning", delayed("controls", 0.02, log, "conditioning"))
+            .add("prompt", delayed("prompt", 0.01, log, "prompt"))
+            .add("diffusion", delayed("image", 0, log, "diffusion"), depends_on=["conditioning", "prompt"])
+        )
+        await graph.run()
+
+        assert log.index(("start", "diffusion")) > log.index(("end", "conditioning"))
+        assert log.index(("start", "diffusion")) > log.index(("end", "prompt"))
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_other_stages(self):
+        cancelled = []
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("translation failed")
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append("conditioning")
+                raise
+
+        graph = StageGraph().add("conditioning", slow).add("translation", failing)
+        with pytest.raises(RuntimeError, match="translation failed"):
+            await graph.run()
+        assert cancelled == ["conditioning"]
+
+    def test_undefined_dependency_is_rejected(self):
+        with pytest.raises(ValueError):
+            StageGraph().add("prompt", delayed("prompt"), depends_on=["translation"])
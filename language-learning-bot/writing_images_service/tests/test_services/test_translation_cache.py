@@ -0,0 +1,88 @@
+"""
+Tests for batched persistence of the translation cache.
+"""
+
+import asyncio
+
+import pytest
+
+from app.ai.models.translation_model import TranslationResult
+from app.ai.services.translation_service import TranslationCache, TranslationServiceConfig
+
+
+class FlakyStore:
+    """SQLiteKeyValueStore stub: records batches, fails while fail is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def write_batch(self, upserts, deletes=()):
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append((dict(upserts), list(deletes)))
+
+    def close(self):
+        pass
+
+
+def make_cache(**config) -> TranslationCache:
+    cache = TranslationCache(TranslationServiceConfig(persistent_cache=False, **config))
+    cache._store = FlakyStore()
+    return cache
+
+
+async def put(cache, count, prefix="w"):
+    for i in range(count):
+        await cache.put(f"{prefix}{i}", f"слово {i}", TranslationResult(success=True, translated_text=f"word {i}"))
+
+
+@pytest.mark.asyncio
+async def test_batch_size_flushes_while_delayed_flush_pending():
+    cache = make_cache(cache_flush_interval_seconds=60, cache_flush_batch_size=5)
+
+    await put(cache, 2)
+    delayed = cache._flush_task
+    assert delayed is not None and not cache._store.batches
+
+    await put(cache, 3, prefix="x")
+    await asyncio.sleep(0.05)
+
+    assert delayed.cancelled()
+    assert len(cache._store.batches) == 1
+    assert len(cache._store.batches[0][0]) == 5
+    assert not cache._dirty
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_changes():
+    cache = make_cache(cache_flush_interval_seconds=60)
+    await put(cache, 3)
+    cache._store.fail = True
+
+    assert await cache.flush() is False
+    assert len(cache._dirty) == 3
+
+    cache._store.fail = False
+    assert await cache.flush() is True
+    assert len(cache._store.batches[0][0]) == 3
+    assert not cache._dirty
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_newer_changes_win_over_restored_ones():
+    cache = make_cache(cache_flush_interval_seconds=60)
+    await put(cache, 2)
+    dirty, deleted = cache._dirty, cache._deleted
+    cache._dirty, cache._deleted = {}, set()
+
+    # Пока запись шла, одну запись удалили
+    removed_key = next(iter(dirty))
+    cache._remove(removed_key)
+    cache._restore_pending(dirty, deleted)
+
+    assert removed_key not in cache._dirty
+    assert cache._deleted == {removed_key}
+    assert len(cache._dirty) == 1
+    await cache.close()
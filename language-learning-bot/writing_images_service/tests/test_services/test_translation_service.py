@@ -0,0 +1,101 @@
+"""
+Tests for batch translation: cache, deduplication, chunking and fallback.
+"""
+
+from typing import List, Tuple
+
+import pytest
+
+from app.ai.models.translation_model import TranslationResult
+from app.ai.services.translation_service import TranslationService, TranslationServiceConfig
+
+
+class FakeModel:
+    """TranslationModel stub: records batches, fails for texts in fail."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.batches: List[List[Tuple[str, str]]] = []
+
+    def is_loaded(self) -> bool:
+        return True
+
+    async def translate_batch(self, items, **kwargs):
+        self.batches.append(list(items))
+        return [
+            TranslationResult(success=False, error_message="bad output")
+            if russian_text in self.fail else
+            TranslationResult(success=True, translated_text=f"en:{russian_text}", character=character,
+                              original_text=russian_text, model_used="fake")
+            for character, russian_text in items
+        ]
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    async def skip_initialization(self):
+        pass
+
+    def make(model: FakeModel, **config) -> TranslationService:
+        config = TranslationServiceConfig(persistent_cache=False, log_translations=False, **config)
+        monkeypatch.setattr(TranslationService, "_load_config", lambda self: config)
+        monkeypatch.setattr(TranslationService, "_initialize_service", skip_initialization)
+        service = TranslationService()
+        service.active_model = model
+        return service
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_results_in_input_order_and_duplicates_translated_once(make_service):
+    model = FakeModel()
+    service = make_service(model)
+    items = [("学", "учить"), ("写", "писать"), ("学", "учить"), ("读", "читать")]
+
+    results = await service.translate_batch(items)
+
+    assert [result.translated_text for result in results] == ["en:учить", "en:писать", "en:учить", "en:читать"]
+    assert model.batches == [[("学", "учить"), ("写", "писать"), ("读", "читать")]]
+
+
+@pytest.mark.asyncio
+async def test_cached_items_skip_the_model(make_service):
+    model = FakeModel()
+    service = make_service(model)
+    await service.translate_batch([("学", "учить")])
+
+    results = await service.translate_batch([("写", "писать"), ("学", "учить")])
+
+    assert results[1].cache_hit
+    assert model.batches[1] == [("写", "писать")]
+    assert service.cache_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_misses_split_into_chunks_of_batch_max_size(make_service):
+    model = FakeModel()
+    service = make_service(model, batch_max_size=2)
+    items = [(str(i), f"слово {i}") for i in range(5)]
+
+    results = await service.translate_batch(items)
+
+    assert [len(batch) for batch in model.batches] == [2, 2, 1]
+    assert [result.translated_text for result in results] == [f"en:слово {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_failed_items_fall_back_individually(make_service):
+    model = FakeModel(fail={"дом", "облако"})
+    service = make_service(model, fallback_strategies=["use_simple_dict"])
+
+    results = await service.translate_batch([("家", "дом"), ("写", "писать"), ("云", "облако")])
+
+    assert results[0].success and results[0].translated_text == "house"
+    assert results[0].model_used == "simple_dictionary"
+    assert results[1].translated_text == "en:писать"
+    assert not results[2].success
+    assert results[2].error_message == "All translation strategies failed"
+    assert service.fallback_usage == 1
+    # Непереведенное в кэш не попадает
+    assert await service.cache.get("家", "дом") is None
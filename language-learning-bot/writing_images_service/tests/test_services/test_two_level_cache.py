@@ -0,0 +1,77 @@
+"""
+Tests for the two-level (memory + disk PNG) render cache.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.utils.two_level_cache import TwoLevelImageCache, cache_key, image_digest
+
+
+def glyph(value: int = 0) -> Image.Image:
+    return Image.new("RGB", (32, 32), (value, value, value))
+
+
+class TestKeys:
+
+    def test_cache_key_is_stable_and_distinct(self):
+        assert cache_key("canny", "opencv_canny", "abc") == cache_key("canny", "opencv_canny", "abc")
+        assert cache_key("canny", "opencv_canny", "abc") != cache_key("canny", "adaptive_canny", "abc")
+        assert cache_key("glyph", "的", 512, 512, {"b": 1, "a": 2}) == cache_key("glyph", "的", 512, 512, {"a": 2, "b": 1})
+
+    def test_image_digest_depends_on_pixels_and_mode(self):
+        assert image_digest(glyph(0)) == image_digest(glyph(0))
+        assert image_digest(glyph(0)) != image_digest(glyph(1))
+        assert image_digest(glyph(0)) != image_digest(glyph(0).convert("L"))
+
+
+class TestTwoLevelImageCache:
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_returns_copy(self, tmp_path):
+        cache = TwoLevelImageCache(str(tmp_path), memory_items=4)
+        await cache.put("k", glyph(10))
+
+        first = await cache.get("k")
+        first.putpixel((0, 0), (255, 0, 0))
+        second = await cache.get("k")
+
+        assert second.getpixel((0, 0)) == (10, 10, 10)
+        assert cache.get_stats()["memory_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disk_hit_after_restart(self, tmp_path):
+        image = Image.fromarray(np.random.randint(0, 255, (40, 30, 3), dtype=np.uint8))
+        await TwoLevelImageCache(str(tmp_path)).put("k", image)
+
+        restarted = TwoLevelImageCache(str(tmp_path))
+        restored = await restarted.get("k")
+
+        assert np.array_equal(np.asarray(restored), np.asarray(image))
+        assert restarted.get_stats()["disk_hits"] == 1
+        # Запись с диска поднимается в память
+        await restarted.get("k")
+        assert restarted.get_stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_level_is_lru_bounded(self, tmp_path):
+        cache = TwoLevelImageCache(None, memory_items=2)
+        await cache.put("a", glyph(1))
+        await cache.put("b", glyph(2))
+        await cache.get("a")
+        await cache.put("c", glyph(3))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert cache.get_stats()["memory_items"] == 2
+
+    @pytest.mark.asyncio
+    async def test_broken_file_is_a_miss(self, tmp_path):
+        cache = TwoLevelImageCache(str(tmp_path))
+        await cache.put("k", glyph())
+        cache.clear_memory()
+        cache._path("k").write_bytes(b"not a png")
+
+        assert await cache.get("k") is None
+        assert not cache.contains("k")
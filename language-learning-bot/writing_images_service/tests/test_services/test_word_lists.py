@@ -0,0 +1,59 @@
+"""
+Tests for word list loading used by the offline pre-generation.
+"""
+
+import json
+
+from app.utils.word_lists import WordEntry, load_words
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_backend_json_export_is_ordered_by_word_number(tmp_path):
+    path = write_json(tmp_path / "export.json", {
+        "language": {"name_ru": "Китайский"},
+        "export_info": {"total_words": 3},
+        "words": [
+            {"word_number": 3, "word_foreign": "学习", "translation": "учиться", "transcription": "xuéxí"},
+            {"word_number": 1, "word_foreign": "的", "translation": "частица", "transcription": "de"},
+            {"word_number": 2, "word_foreign": "一", "translation": "один", "transcription": "yī"},
+        ],
+    })
+
+    assert load_words(path, 2) == [WordEntry("的", "частица", 1.0), WordEntry("一", "один", 2.0)]
+
+
+def test_backend_csv_export(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text("№,Слово,Перевод,Транскрипция\n2,一,один,yī\n1,的,частица,de\n", encoding="utf-8-sig")
+
+    assert [entry.word for entry in load_words(path, 10)] == ["的", "一"]
+    assert load_words(path, 10)[1].translation == "один"
+
+
+def test_corpus_is_ordered_by_frequency_and_joins_senses(tmp_path):
+    path = write_json(tmp_path / "words.json", {
+        "1": {"character": "一", "description": ["one", "single"], "frequency": 2},
+        "2": {"character": "的", "description": ["of"], "frequency": 1},
+        "3": {"character": "学", "description": ["study"], "frequency": ""},
+    })
+
+    assert load_words(path, 3) == [
+        WordEntry("的", "of", 1.0),
+        WordEntry("一", "one; single", 2.0),
+        WordEntry("学", "study", float("inf")),
+    ]
+
+
+def test_empty_and_duplicate_words_are_skipped(tmp_path):
+    path = write_json(tmp_path / "export.json", [
+        {"word_number": 1, "word_foreign": "的", "translation": "частица"},
+        {"word_number": 2, "word_foreign": "", "translation": "пусто"},
+        {"word_number": 3, "word_foreign": "的", "translation": "частица"},
+        {"word_number": 4, "word_foreign": "的", "translation": "цель"},
+    ])
+
+    assert load_words(path, 10) == [WordEntry("的", "частица", 1.0), WordEntry("的", "цель", 4.0)]